@@ -4,6 +4,8 @@ import numpy as np
 import torch
 import torch.nn.functional as F
 from fastapi import APIRouter
+from fastapi import Header
+from fastapi import Response
 from huggingface_hub import snapshot_download  # type: ignore
 from setfit import SetFitModel  # type: ignore[import]
 from transformers import AutoTokenizer  # type: ignore
@@ -12,6 +14,7 @@ from transformers import PreTrainedTokenizer  # type: ignore
 
 from model_server.constants import INFORMATION_CONTENT_MODEL_WARM_UP_STRING
 from model_server.constants import MODEL_WARM_UP_STRING
+from model_server.model_registry import get_model_registry
 from model_server.onyx_torch_model import ConnectorClassifier
 from model_server.onyx_torch_model import HybridClassifier
 from model_server.utils import simple_log_function_time
@@ -31,9 +34,16 @@ from shared_configs.configs import INFORMATION_CONTENT_MODEL_TAG
 from shared_configs.configs import INFORMATION_CONTENT_MODEL_VERSION
 from shared_configs.configs import INTENT_MODEL_TAG
 from shared_configs.configs import INTENT_MODEL_VERSION
+from shared_configs.enums import LocalModelType
 from shared_configs.model_server_models import ConnectorClassificationRequest
 from shared_configs.model_server_models import ConnectorClassificationResponse
+from shared_configs.model_server_models import (
+    CONTENT_CLASSIFICATION_BINARY_MEDIA_TYPE,
+)
 from shared_configs.model_server_models import ContentClassificationPrediction
+from shared_configs.model_server_models import (
+    encode_content_classification_predictions,
+)
 from shared_configs.model_server_models import IntentRequest
 from shared_configs.model_server_models import IntentResponse
 
@@ -42,12 +52,8 @@ logger = setup_logger()
 router = APIRouter(prefix="/custom")
 
 _CONNECTOR_CLASSIFIER_TOKENIZER: PreTrainedTokenizer | None = None
-_CONNECTOR_CLASSIFIER_MODEL: ConnectorClassifier | None = None
 
 _INTENT_TOKENIZER: PreTrainedTokenizer | None = None
-_INTENT_MODEL: HybridClassifier | None = None
-
-_INFORMATION_CONTENT_MODEL: SetFitModel | None = None
 
 _INFORMATION_CONTENT_MODEL_PROMPT_PREFIX: str = ""  # spec to model version!
 
@@ -64,35 +70,36 @@ def get_connector_classifier_tokenizer() -> PreTrainedTokenizer:
     return _CONNECTOR_CLASSIFIER_TOKENIZER
 
 
+def _load_connector_classifier(
+    model_name_or_path: str, tag: str | None
+) -> ConnectorClassifier:
+    try:
+        local_path = snapshot_download(
+            repo_id=model_name_or_path, revision=tag, local_files_only=True
+        )
+        return ConnectorClassifier.from_pretrained(local_path)
+    except Exception as e:
+        logger.warning(f"Failed to load model directly: {e}")
+        try:
+            logger.info(f"Downloading model snapshot for {model_name_or_path}")
+            local_path = snapshot_download(repo_id=model_name_or_path, revision=tag)
+            return ConnectorClassifier.from_pretrained(local_path)
+        except Exception as e:
+            logger.error(
+                f"Failed to load model even after attempted snapshot download: {e}"
+            )
+            raise
+
+
 def get_local_connector_classifier(
     model_name_or_path: str = CONNECTOR_CLASSIFIER_MODEL_REPO,
     tag: str = CONNECTOR_CLASSIFIER_MODEL_TAG,
 ) -> ConnectorClassifier:
-    global _CONNECTOR_CLASSIFIER_MODEL
-    if _CONNECTOR_CLASSIFIER_MODEL is None:
-        try:
-            # Calculate where the cache should be, then load from local if available
-            local_path = snapshot_download(
-                repo_id=model_name_or_path, revision=tag, local_files_only=True
-            )
-            _CONNECTOR_CLASSIFIER_MODEL = ConnectorClassifier.from_pretrained(
-                local_path
-            )
-        except Exception as e:
-            logger.warning(f"Failed to load model directly: {e}")
-            try:
-                # Attempt to download the model snapshot
-                logger.info(f"Downloading model snapshot for {model_name_or_path}")
-                local_path = snapshot_download(repo_id=model_name_or_path, revision=tag)
-                _CONNECTOR_CLASSIFIER_MODEL = ConnectorClassifier.from_pretrained(
-                    local_path
-                )
-            except Exception as e:
-                logger.error(
-                    f"Failed to load model even after attempted snapshot download: {e}"
-                )
-                raise
-    return _CONNECTOR_CLASSIFIER_MODEL
+    return get_model_registry().get(
+        LocalModelType.CONNECTOR_CLASSIFIER,
+        model_name_or_path,
+        lambda: _load_connector_classifier(model_name_or_path, tag),
+    )
 
 
 def get_intent_model_tokenizer() -> PreTrainedTokenizer:
@@ -107,73 +114,82 @@ def get_intent_model_tokenizer() -> PreTrainedTokenizer:
     return _INTENT_TOKENIZER
 
 
-def get_local_intent_model(
-    model_name_or_path: str = INTENT_MODEL_VERSION,
-    tag: str | None = INTENT_MODEL_TAG,
-) -> HybridClassifier:
-    global _INTENT_MODEL
-    if _INTENT_MODEL is None:
+def _load_intent_model(model_name_or_path: str, tag: str | None) -> HybridClassifier:
+    try:
+        logger.notice(f"Loading model from local cache: {model_name_or_path}")
+        local_path = snapshot_download(
+            repo_id=model_name_or_path, revision=tag, local_files_only=True
+        )
+        intent_model = HybridClassifier.from_pretrained(local_path)
+        logger.notice(f"Loaded model from local cache: {local_path}")
+        return intent_model
+    except Exception as e:
+        logger.warning(f"Failed to load model directly: {e}")
         try:
-            # Calculate where the cache should be, then load from local if available
-            logger.notice(f"Loading model from local cache: {model_name_or_path}")
+            logger.notice(f"Downloading model snapshot for {model_name_or_path}")
             local_path = snapshot_download(
-                repo_id=model_name_or_path, revision=tag, local_files_only=True
+                repo_id=model_name_or_path, revision=tag, local_files_only=False
             )
-            _INTENT_MODEL = HybridClassifier.from_pretrained(local_path)
-            logger.notice(f"Loaded model from local cache: {local_path}")
+            return HybridClassifier.from_pretrained(local_path)
         except Exception as e:
-            logger.warning(f"Failed to load model directly: {e}")
-            try:
-                # Attempt to download the model snapshot
-                logger.notice(f"Downloading model snapshot for {model_name_or_path}")
-                local_path = snapshot_download(
-                    repo_id=model_name_or_path, revision=tag, local_files_only=False
-                )
-                _INTENT_MODEL = HybridClassifier.from_pretrained(local_path)
-            except Exception as e:
-                logger.error(
-                    f"Failed to load model even after attempted snapshot download: {e}"
-                )
-                raise
-    return _INTENT_MODEL
+            logger.error(
+                f"Failed to load model even after attempted snapshot download: {e}"
+            )
+            raise
 
 
-def get_local_information_content_model(
-    model_name_or_path: str = INFORMATION_CONTENT_MODEL_VERSION,
-    tag: str | None = INFORMATION_CONTENT_MODEL_TAG,
+def get_local_intent_model(
+    model_name_or_path: str = INTENT_MODEL_VERSION,
+    tag: str | None = INTENT_MODEL_TAG,
+) -> HybridClassifier:
+    return get_model_registry().get(
+        LocalModelType.INTENT,
+        model_name_or_path,
+        lambda: _load_intent_model(model_name_or_path, tag),
+    )
+
+
+def _load_information_content_model(
+    model_name_or_path: str, tag: str | None
 ) -> SetFitModel:
-    global _INFORMATION_CONTENT_MODEL
-    if _INFORMATION_CONTENT_MODEL is None:
+    try:
+        logger.notice(
+            f"Loading content information model from local cache: {model_name_or_path}"
+        )
+        local_path = snapshot_download(
+            repo_id=model_name_or_path, revision=tag, local_files_only=True
+        )
+        information_content_model = SetFitModel.from_pretrained(local_path)
+        logger.notice(
+            f"Loaded content information model from local cache: {local_path}"
+        )
+        return information_content_model
+    except Exception as e:
+        logger.warning(f"Failed to load content information model directly: {e}")
         try:
-            # Calculate where the cache should be, then load from local if available
             logger.notice(
-                f"Loading content information model from local cache: {model_name_or_path}"
+                f"Downloading content information model snapshot for {model_name_or_path}"
             )
             local_path = snapshot_download(
-                repo_id=model_name_or_path, revision=tag, local_files_only=True
-            )
-            _INFORMATION_CONTENT_MODEL = SetFitModel.from_pretrained(local_path)
-            logger.notice(
-                f"Loaded content information model from local cache: {local_path}"
+                repo_id=model_name_or_path, revision=tag, local_files_only=False
             )
+            return SetFitModel.from_pretrained(local_path)
         except Exception as e:
-            logger.warning(f"Failed to load content information model directly: {e}")
-            try:
-                # Attempt to download the model snapshot
-                logger.notice(
-                    f"Downloading content information model snapshot for {model_name_or_path}"
-                )
-                local_path = snapshot_download(
-                    repo_id=model_name_or_path, revision=tag, local_files_only=False
-                )
-                _INFORMATION_CONTENT_MODEL = SetFitModel.from_pretrained(local_path)
-            except Exception as e:
-                logger.error(
-                    f"Failed to load content information model even after attempted snapshot download: {e}"
-                )
-                raise
+            logger.error(
+                f"Failed to load content information model even after attempted snapshot download: {e}"
+            )
+            raise
 
-    return _INFORMATION_CONTENT_MODEL
+
+def get_local_information_content_model(
+    model_name_or_path: str = INFORMATION_CONTENT_MODEL_VERSION,
+    tag: str | None = INFORMATION_CONTENT_MODEL_TAG,
+) -> SetFitModel:
+    return get_model_registry().get(
+        LocalModelType.INFORMATION_CONTENT,
+        model_name_or_path,
+        lambda: _load_information_content_model(model_name_or_path, tag),
+    )
 
 
 def tokenize_connector_classification_query(
@@ -242,6 +258,9 @@ def warm_up_connector_classifier_model() -> None:
     attention_mask = attention_mask.to(connector_classifier.device)
 
     connector_classifier(input_ids, attention_mask)
+    get_model_registry().set_pinned(
+        LocalModelType.CONNECTOR_CLASSIFIER, CONNECTOR_CLASSIFIER_MODEL_REPO, True
+    )
 
 
 def warm_up_intent_model() -> None:
@@ -257,6 +276,8 @@ def warm_up_intent_model() -> None:
         query_ids=tokens["input_ids"].to(device),
         query_mask=tokens["attention_mask"].to(device),
     )
+    # the model server always serves the intent model, so it's never evicted
+    get_model_registry().set_pinned(LocalModelType.INTENT, INTENT_MODEL_VERSION, True)
 
 
 def warm_up_information_content_model() -> None:
@@ -264,6 +285,9 @@ def warm_up_information_content_model() -> None:
 
     information_content_model = get_local_information_content_model()
     information_content_model(INFORMATION_CONTENT_MODEL_WARM_UP_STRING)
+    get_model_registry().set_pinned(
+        LocalModelType.INFORMATION_CONTENT, INFORMATION_CONTENT_MODEL_VERSION, True
+    )
 
 
 @simple_log_function_time()
@@ -546,8 +570,15 @@ async def process_analysis_request(
     return IntentResponse(is_keyword=is_keyword, keywords=keywords)
 
 
-@router.post("/content-classification")
+@router.post("/content-classification", response_model=None)
 async def process_content_classification_request(
     content_classification_requests: list[str],
-) -> list[ContentClassificationPrediction]:
-    return run_content_classification_inference(content_classification_requests)
+    accept: str | None = Header(default=None),
+) -> list[ContentClassificationPrediction] | Response:
+    predictions = run_content_classification_inference(content_classification_requests)
+    if accept == CONTENT_CLASSIFICATION_BINARY_MEDIA_TYPE:
+        return Response(
+            content=encode_content_classification_predictions(predictions),
+            media_type=CONTENT_CLASSIFICATION_BINARY_MEDIA_TYPE,
+        )
+    return predictions
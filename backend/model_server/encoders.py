@@ -3,7 +3,6 @@ import json
 import time
 from types import TracebackType
 from typing import cast
-from typing import Optional
 
 import aioboto3  # type: ignore
 import httpx
@@ -29,20 +28,32 @@ from model_server.constants import DEFAULT_VERTEX_MODEL
 from model_server.constants import DEFAULT_VOYAGE_MODEL
 from model_server.constants import EmbeddingModelTextType
 from model_server.constants import EmbeddingProvider
+from model_server.model_registry import get_model_registry
+from model_server.onnx_backend import load_onnx_embedding_model
+from model_server.onnx_backend import load_onnx_reranking_model
+from model_server.onnx_backend import OnnxCrossEncoder
+from model_server.request_scheduler import get_request_scheduler
+from model_server.request_scheduler import ModelServerOverloadedError
 from model_server.utils import pass_aws_key
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
 from shared_configs.configs import INDEXING_ONLY
+from shared_configs.configs import LOCAL_MODEL_INFERENCE_BACKEND
+from shared_configs.configs import MODEL_SERVER_PRIORITY_HEADER
+from shared_configs.configs import MODEL_SERVER_RETRY_AFTER_SECONDS
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
 from shared_configs.configs import VERTEXAI_EMBEDDING_LOCAL_BATCH_SIZE
 from shared_configs.enums import EmbedTextType
+from shared_configs.enums import LocalModelType
+from shared_configs.enums import ModelServerRequestPriority
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import Embedding
 from shared_configs.model_server_models import EmbedRequest
 from shared_configs.model_server_models import EmbedResponse
 from shared_configs.model_server_models import RerankRequest
 from shared_configs.model_server_models import RerankResponse
+from shared_configs.utils import batch_by_token_budget
 from shared_configs.utils import batch_list
 
 
@@ -50,8 +61,6 @@ logger = setup_logger()
 
 router = APIRouter(prefix="/encoder")
 
-_GLOBAL_MODELS_DICT: dict[str, "SentenceTransformer"] = {}
-_RERANK_MODEL: Optional["CrossEncoder"] = None
 
 # If we are not only indexing, dont want retry very long
 _RETRY_DELAY = 10 if INDEXING_ONLY else 0.1
@@ -59,6 +68,11 @@ _RETRY_TRIES = 10 if INDEXING_ONLY else 2
 
 # OpenAI only allows 2048 embeddings to be computed at once
 _OPENAI_MAX_INPUT_LEN = 2048
+# and up to 300k tokens across all inputs of a request
+_OPENAI_MAX_TOKENS_PER_REQUEST = 300_000
+# The model server doesn't have the provider tokenizers, token counts are estimated
+# from the length of the text. This errs on the side of more tokens per character
+_ESTIMATED_CHARS_PER_TOKEN = 3
 # Cohere allows up to 96 embeddings in a single embedding calling
 _COHERE_MAX_INPUT_LEN = 96
 
@@ -109,6 +123,10 @@ def format_embedding_error(
     )
 
 
+def _estimate_token_count(text: str) -> int:
+    return len(text) // _ESTIMATED_CHARS_PER_TOKEN + 1
+
+
 # Custom exception for authentication errors
 class AuthenticationError(Exception):
     """Raised when authentication fails with a provider."""
@@ -148,17 +166,20 @@ class CloudEmbedding:
             api_key=self.api_key, timeout=OPENAI_EMBEDDING_TIMEOUT
         )
 
-        final_embeddings: list[Embedding] = []
+        final_embeddings: list[Embedding] = [[] for _ in texts]
 
-        for text_batch in batch_list(texts, _OPENAI_MAX_INPUT_LEN):
+        for text_idx_batch in batch_by_token_budget(
+            [_estimate_token_count(text) for text in texts],
+            max_tokens_per_batch=_OPENAI_MAX_TOKENS_PER_REQUEST,
+            max_batch_size=_OPENAI_MAX_INPUT_LEN,
+        ):
             response = await client.embeddings.create(
-                input=text_batch,
+                input=[texts[text_idx] for text_idx in text_idx_batch],
                 model=model,
                 dimensions=reduced_dimension or openai.NOT_GIVEN,
             )
-            final_embeddings.extend(
-                [embedding.embedding for embedding in response.data]
-            )
+            for text_idx, embedding in zip(text_idx_batch, response.data):
+                final_embeddings[text_idx] = embedding.embedding
         return final_embeddings
 
     async def _embed_cohere(
@@ -271,6 +292,31 @@ class CloudEmbedding:
         result = response.json()
         return [embedding["embedding"] for embedding in result["data"]]
 
+    async def _embed_with_provider(
+        self,
+        texts: list[str],
+        text_type: EmbedTextType,
+        model_name: str | None,
+        deployment_name: str | None,
+        reduced_dimension: int | None,
+    ) -> list[Embedding]:
+        if self.provider == EmbeddingProvider.OPENAI:
+            return await self._embed_openai(texts, model_name, reduced_dimension)
+        elif self.provider == EmbeddingProvider.AZURE:
+            return await self._embed_azure(texts, f"azure/{deployment_name}")
+        elif self.provider == EmbeddingProvider.LITELLM:
+            return await self._embed_litellm_proxy(texts, model_name)
+
+        embedding_type = EmbeddingModelTextType.get_type(self.provider, text_type)
+        if self.provider == EmbeddingProvider.COHERE:
+            return await self._embed_cohere(texts, model_name, embedding_type)
+        elif self.provider == EmbeddingProvider.VOYAGE:
+            return await self._embed_voyage(texts, model_name, embedding_type)
+        elif self.provider == EmbeddingProvider.GOOGLE:
+            return await self._embed_vertex(texts, model_name, embedding_type)
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+
     @retry(tries=_RETRY_TRIES, delay=_RETRY_DELAY)
     async def embed(
         self,
@@ -282,22 +328,21 @@ class CloudEmbedding:
         reduced_dimension: int | None = None,
     ) -> list[Embedding]:
         try:
-            if self.provider == EmbeddingProvider.OPENAI:
-                return await self._embed_openai(texts, model_name, reduced_dimension)
-            elif self.provider == EmbeddingProvider.AZURE:
-                return await self._embed_azure(texts, f"azure/{deployment_name}")
-            elif self.provider == EmbeddingProvider.LITELLM:
-                return await self._embed_litellm_proxy(texts, model_name)
-
-            embedding_type = EmbeddingModelTextType.get_type(self.provider, text_type)
-            if self.provider == EmbeddingProvider.COHERE:
-                return await self._embed_cohere(texts, model_name, embedding_type)
-            elif self.provider == EmbeddingProvider.VOYAGE:
-                return await self._embed_voyage(texts, model_name, embedding_type)
-            elif self.provider == EmbeddingProvider.GOOGLE:
-                return await self._embed_vertex(texts, model_name, embedding_type)
-            else:
-                raise ValueError(f"Unsupported provider: {self.provider}")
+            # providers split the texts into batches, sorting them by length first
+            # keeps texts of a similar length in the same batch
+            text_order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+            sorted_embeddings = await self._embed_with_provider(
+                [texts[idx] for idx in text_order],
+                text_type=text_type,
+                model_name=model_name,
+                deployment_name=deployment_name,
+                reduced_dimension=reduced_dimension,
+            )
+
+            embeddings: list[Embedding] = [[] for _ in texts]
+            for idx, embedding in zip(text_order, sorted_embeddings):
+                embeddings[idx] = embedding
+            return embeddings
         except openai.AuthenticationError:
             raise AuthenticationError(provider="OpenAI")
         except httpx.HTTPStatusError as e:
@@ -367,41 +412,58 @@ class CloudEmbedding:
             )
 
 
+def _load_embedding_model(model_name: str) -> "SentenceTransformer":
+    logger.notice(f"Loading {model_name}")
+    if LOCAL_MODEL_INFERENCE_BACKEND == "onnx":
+        try:
+            return load_onnx_embedding_model(model_name)
+        except Exception:
+            logger.exception(
+                f"Failed to load {model_name} with ONNX Runtime, falling back to torch"
+            )
+
+    # Some model architectures that aren't built into the Transformers or Sentence
+    # Transformer need to be downloaded to be loaded locally. This does not mean
+    # data is sent to remote servers for inference, however the remote code can
+    # be fairly arbitrary so only use trusted models
+    return SentenceTransformer(
+        model_name_or_path=model_name,
+        trust_remote_code=True,
+    )
+
+
 def get_embedding_model(
     model_name: str,
     max_context_length: int,
 ) -> "SentenceTransformer":
-    from sentence_transformers import SentenceTransformer  # type: ignore
-
-    global _GLOBAL_MODELS_DICT  # A dictionary to store models
-
-    if model_name not in _GLOBAL_MODELS_DICT:
-        logger.notice(f"Loading {model_name}")
-        # Some model architectures that aren't built into the Transformers or Sentence
-        # Transformer need to be downloaded to be loaded locally. This does not mean
-        # data is sent to remote servers for inference, however the remote code can
-        # be fairly arbitrary so only use trusted models
-        model = SentenceTransformer(
-            model_name_or_path=model_name,
-            trust_remote_code=True,
-        )
+    model: SentenceTransformer = get_model_registry().get(
+        LocalModelType.EMBEDDING, model_name, lambda: _load_embedding_model(model_name)
+    )
+    if max_context_length != model.max_seq_length:
         model.max_seq_length = max_context_length
-        _GLOBAL_MODELS_DICT[model_name] = model
-    elif max_context_length != _GLOBAL_MODELS_DICT[model_name].max_seq_length:
-        _GLOBAL_MODELS_DICT[model_name].max_seq_length = max_context_length
 
-    return _GLOBAL_MODELS_DICT[model_name]
+    return model
+
+
+def _load_reranking_model(model_name: str) -> CrossEncoder | OnnxCrossEncoder:
+    logger.notice(f"Loading {model_name}")
+    if LOCAL_MODEL_INFERENCE_BACKEND == "onnx":
+        try:
+            return load_onnx_reranking_model(model_name)
+        except Exception:
+            logger.exception(
+                f"Failed to load {model_name} with ONNX Runtime, falling back to torch"
+            )
+
+    return CrossEncoder(model_name)
 
 
 def get_local_reranking_model(
     model_name: str,
-) -> CrossEncoder:
-    global _RERANK_MODEL
-    if _RERANK_MODEL is None:
-        logger.notice(f"Loading {model_name}")
-        model = CrossEncoder(model_name)
-        _RERANK_MODEL = model
-    return _RERANK_MODEL
+) -> CrossEncoder | OnnxCrossEncoder:
+    return get_model_registry().get(
+        LocalModelType.RERANKING, model_name, lambda: _load_reranking_model(model_name)
+    )
 
 
 @simple_log_function_time()
@@ -486,8 +548,9 @@ async def embed_text(
 
         prefixed_texts = [f"{prefix}{text}" for text in texts] if prefix else texts
 
-        local_model = get_embedding_model(
-            model_name=model_name, max_context_length=max_context_length
+        # loading the model can take minutes, so it's kept off the event loop
+        local_model = await asyncio.get_event_loop().run_in_executor(
+            None, get_embedding_model, model_name, max_context_length
         )
         # Run CPU-bound embedding in a thread pool
         embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
@@ -525,7 +588,10 @@ async def embed_text(
 
 @simple_log_function_time()
 async def local_rerank(query: str, docs: list[str], model_name: str) -> list[float]:
-    cross_encoder = get_local_reranking_model(model_name)
+    # loading the model can take minutes, so it's kept off the event loop
+    cross_encoder = await asyncio.get_event_loop().run_in_executor(
+        None, get_local_reranking_model, model_name
+    )
     # Run CPU-bound reranking in a thread pool
     return await asyncio.get_event_loop().run_in_executor(
         None,
@@ -604,12 +670,37 @@ async def litellm_rerank(
         ]
 
 
+def _overloaded_error(e: ModelServerOverloadedError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(e),
+        headers={"Retry-After": str(MODEL_SERVER_RETRY_AFTER_SECONDS)},
+    )
+
+
 @router.post("/bi-encoder-embed")
 async def route_bi_encoder_embed(
     request: Request,
     embed_request: EmbedRequest,
 ) -> EmbedResponse:
-    return await process_embed_request(embed_request, request.app.state.gpu_type)
+    # cloud embedding requests don't use the model server's compute
+    if embed_request.provider_type is not None:
+        return await process_embed_request(embed_request, request.app.state.gpu_type)
+
+    try:
+        priority = ModelServerRequestPriority(
+            request.headers.get(MODEL_SERVER_PRIORITY_HEADER)
+        )
+    except ValueError:
+        priority = ModelServerRequestPriority.for_text_type(embed_request.text_type)
+
+    try:
+        async with get_request_scheduler().slot(priority):
+            return await process_embed_request(
+                embed_request, request.app.state.gpu_type
+            )
+    except ModelServerOverloadedError as e:
+        raise _overloaded_error(e)
 
 
 async def process_embed_request(
@@ -681,11 +772,14 @@ async def process_rerank_request(rerank_request: RerankRequest) -> RerankRespons
 
     try:
         if rerank_request.provider_type is None:
-            sim_scores = await local_rerank(
-                query=rerank_request.query,
-                docs=rerank_request.documents,
-                model_name=rerank_request.model_name,
-            )
+            async with get_request_scheduler().slot(
+                ModelServerRequestPriority.INTERACTIVE
+            ):
+                sim_scores = await local_rerank(
+                    query=rerank_request.query,
+                    docs=rerank_request.documents,
+                    model_name=rerank_request.model_name,
+                )
             return RerankResponse(scores=sim_scores)
         elif rerank_request.provider_type == RerankerProvider.LITELLM:
             if rerank_request.api_url is None:
@@ -730,6 +824,8 @@ async def process_rerank_request(rerank_request: RerankRequest) -> RerankRespons
         else:
             raise ValueError(f"Unsupported provider: {rerank_request.provider_type}")
 
+    except ModelServerOverloadedError as e:
+        raise _overloaded_error(e)
     except Exception as e:
         logger.exception(f"Error during reranking process:\n{str(e)}")
         raise HTTPException(
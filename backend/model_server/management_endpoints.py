@@ -1,8 +1,22 @@
+import asyncio
+
 from fastapi import APIRouter
+from fastapi import HTTPException
 from fastapi import Response
 
 from model_server.constants import GPUStatus
+from model_server.custom_models import get_local_connector_classifier
+from model_server.custom_models import get_local_information_content_model
+from model_server.custom_models import get_local_intent_model
+from model_server.encoders import get_embedding_model
+from model_server.encoders import get_local_reranking_model
+from model_server.model_registry import get_model_registry
+from model_server.request_scheduler import get_request_scheduler
 from model_server.utils import get_gpu_type
+from shared_configs.enums import LocalModelType
+from shared_configs.model_server_models import LoadedModelInfo
+from shared_configs.model_server_models import LocalModelRequest
+from shared_configs.model_server_models import PreloadModelRequest
 
 router = APIRouter(prefix="/api")
 
@@ -17,3 +31,79 @@ async def route_gpu_status() -> dict[str, bool | str]:
     gpu_type = get_gpu_type()
     gpu_available = gpu_type != GPUStatus.NONE
     return {"gpu_available": gpu_available, "type": gpu_type}
+
+
+@router.get("/request-queue")
+async def route_request_queue() -> dict[str, dict[str, int]]:
+    return get_request_scheduler().get_stats()
+
+
+@router.get("/models")
+async def route_loaded_models() -> list[LoadedModelInfo]:
+    return [
+        LoadedModelInfo(
+            model_type=loaded_model.model_type,
+            model_name=loaded_model.model_name,
+            size_bytes=loaded_model.size_bytes,
+            load_seconds=loaded_model.load_seconds,
+            pinned=loaded_model.pinned,
+            last_used=loaded_model.last_used,
+            num_uses=loaded_model.num_uses,
+        )
+        for loaded_model in get_model_registry().get_loaded_models()
+    ]
+
+
+def _load_model(preload_request: PreloadModelRequest) -> None:
+    model_type = preload_request.model_type
+    model_name = preload_request.model_name
+    if model_type == LocalModelType.EMBEDDING:
+        get_embedding_model(model_name, preload_request.max_context_length)
+    elif model_type == LocalModelType.RERANKING:
+        get_local_reranking_model(model_name)
+    elif model_type == LocalModelType.INTENT:
+        get_local_intent_model(model_name)
+    elif model_type == LocalModelType.INFORMATION_CONTENT:
+        get_local_information_content_model(model_name)
+    elif model_type == LocalModelType.CONNECTOR_CLASSIFIER:
+        get_local_connector_classifier(model_name)
+    else:
+        raise ValueError(f"Unsupported model type: {model_type}")
+
+
+@router.post("/models/preload")
+async def route_preload_model(preload_request: PreloadModelRequest) -> Response:
+    # loading a model is blocking, so it's done in a thread
+    await asyncio.get_event_loop().run_in_executor(None, _load_model, preload_request)
+    if preload_request.pin:
+        get_model_registry().set_pinned(
+            preload_request.model_type, preload_request.model_name, True
+        )
+    return Response(status_code=200)
+
+
+def _set_pinned(model_request: LocalModelRequest, pinned: bool) -> Response:
+    if not get_model_registry().set_pinned(
+        model_request.model_type, model_request.model_name, pinned
+    ):
+        raise HTTPException(status_code=404, detail="Model is not loaded")
+    return Response(status_code=200)
+
+
+@router.post("/models/pin")
+async def route_pin_model(model_request: LocalModelRequest) -> Response:
+    return _set_pinned(model_request, True)
+
+
+@router.post("/models/unpin")
+async def route_unpin_model(model_request: LocalModelRequest) -> Response:
+    return _set_pinned(model_request, False)
+
+
+@router.post("/models/evict")
+async def route_evict_model(model_request: LocalModelRequest) -> Response:
+    if not get_model_registry().evict(
+        model_request.model_type, model_request.model_name
+    ):
+        raise HTTPException(status_code=404, detail="Model is not loaded")
+    return Response(status_code=200)
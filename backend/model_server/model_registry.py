@@ -0,0 +1,248 @@
+"""Keeps the local models of the model server in memory.
+
+Models are loaded on first use and kept up to MODEL_SERVER_MEMORY_BUDGET_MB. Loading a
+model that doesn't fit evicts the least recently used models that aren't pinned.
+Models that the server is configured to serve (e.g. the intent model) are pinned
+when they are warmed up, others can be preloaded and pinned through the management
+endpoints."""
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any
+from typing import cast
+from typing import TypeVar
+
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+
+from onyx.utils.logger import setup_logger
+from shared_configs.configs import MODEL_SERVER_MEMORY_BUDGET_MB
+from shared_configs.enums import LocalModelType
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+_loaded_model_bytes = Gauge(
+    "model_server_loaded_model_bytes",
+    "Estimated memory used by a loaded model",
+    ["model_type", "model_name"],
+)
+_model_load_seconds = Histogram(
+    "model_server_model_load_seconds",
+    "Time taken to load a model",
+    ["model_type"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600),
+)
+
+
+@dataclass
+class LoadedModel:
+    model_type: LocalModelType
+    model_name: str
+    model: Any
+    size_bytes: int
+    load_seconds: float
+    pinned: bool = False
+    last_used: float = 0.0
+    num_uses: int = 0
+
+
+def _get_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _get_torch_module_size_bytes(module: Any) -> int:
+    return sum(
+        tensor.numel() * tensor.element_size()
+        for tensor in chain(module.parameters(), module.buffers())
+    )
+
+
+def estimate_model_size_bytes(model: Any) -> int:
+    """Size of the weights of torch models, including models that wrap them (e.g.
+    CrossEncoder, SetFitModel). 0 if the model has no torch weights."""
+    if callable(getattr(model, "parameters", None)):
+        return _get_torch_module_size_bytes(model)
+
+    return sum(
+        _get_torch_module_size_bytes(wrapped)
+        for wrapped in (
+            getattr(model, attr, None) for attr in ("model", "model_body", "model_head")
+        )
+        if callable(getattr(wrapped, "parameters", None))
+    )
+
+
+class ModelRegistry:
+    def __init__(self, memory_budget_bytes: int | None) -> None:
+        self.memory_budget_bytes = memory_budget_bytes
+        # ordered from least to most recently used
+        self._models: OrderedDict[tuple[LocalModelType, str], LoadedModel] = (
+            OrderedDict()
+        )
+        # models being loaded. Requests for a model that is being loaded wait for it
+        # instead of loading it again
+        self._loading: dict[tuple[LocalModelType, str], Future[LoadedModel]] = {}
+        # only held to look up and update the models, never while loading one, so
+        # that loading a model doesn't hold up requests for the loaded ones
+        self._lock = threading.Lock()
+
+    def get(
+        self, model_type: LocalModelType, model_name: str, load: Callable[[], T]
+    ) -> T:
+        key = (model_type, model_name)
+        with self._lock:
+            loaded_model = self._models.get(key)
+            if loaded_model is not None:
+                self._mark_used(key, loaded_model)
+                return cast(T, loaded_model.model)
+
+            loading = self._loading.get(key)
+            is_loading_here = loading is None
+            if loading is None:
+                loading = Future()
+                self._loading[key] = loading
+
+        if not is_loading_here:
+            # raises if loading the model failed
+            loaded_model = loading.result()
+            with self._lock:
+                self._mark_used(key, loaded_model)
+            return cast(T, loaded_model.model)
+
+        try:
+            loaded_model = self._load(model_type, model_name, load)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            loading.set_exception(e)
+            raise
+
+        with self._lock:
+            self._models[key] = loaded_model
+            del self._loading[key]
+            self._mark_used(key, loaded_model)
+            self._evict_over_budget(keep=key)
+        loading.set_result(loaded_model)
+        return cast(T, loaded_model.model)
+
+    def _mark_used(
+        self, key: tuple[LocalModelType, str], loaded_model: LoadedModel
+    ) -> None:
+        # the model may have been evicted since it was loaded
+        if key in self._models:
+            self._models.move_to_end(key)
+        loaded_model.last_used = time.time()
+        loaded_model.num_uses += 1
+
+    def _load(
+        self, model_type: LocalModelType, model_name: str, load: Callable[[], Any]
+    ) -> LoadedModel:
+        """Runs without the lock. Other models may be loaded at the same time, which
+        can throw off the memory estimate of models without torch weights."""
+        rss_before = _get_rss_bytes()
+        start = time.monotonic()
+        model = load()
+        load_seconds = time.monotonic() - start
+        rss_after = _get_rss_bytes()
+
+        # e.g. models running in ONNX Runtime don't have torch weights
+        size_bytes = estimate_model_size_bytes(model)
+        if not size_bytes and rss_before is not None and rss_after is not None:
+            size_bytes = max(rss_after - rss_before, 0)
+
+        loaded_model = LoadedModel(
+            model_type=model_type,
+            model_name=model_name,
+            model=model,
+            size_bytes=size_bytes,
+            load_seconds=load_seconds,
+        )
+        _loaded_model_bytes.labels(model_type.value, model_name).set(size_bytes)
+        _model_load_seconds.labels(model_type.value).observe(load_seconds)
+        logger.notice(
+            f"Loaded {model_type.value} model {model_name}: "
+            f"size={size_bytes / 1024**2:.0f}MB load_time={load_seconds:.2f}s"
+        )
+        return loaded_model
+
+    def _evict_over_budget(
+        self, keep: tuple[LocalModelType, str] | None = None
+    ) -> None:
+        if self.memory_budget_bytes is None:
+            return
+
+        total_bytes = sum(model.size_bytes for model in self._models.values())
+        for key, loaded_model in list(self._models.items()):
+            if total_bytes <= self.memory_budget_bytes:
+                break
+            if key == keep or loaded_model.pinned:
+                continue
+            self._evict(key)
+            total_bytes -= loaded_model.size_bytes
+
+        if total_bytes > self.memory_budget_bytes:
+            logger.warning(
+                f"Loaded models use {total_bytes / 1024**2:.0f}MB, over the budget of "
+                f"{self.memory_budget_bytes / 1024**2:.0f}MB, but the rest are pinned"
+            )
+
+    def _evict(self, key: tuple[LocalModelType, str]) -> None:
+        loaded_model = self._models.pop(key)
+        _loaded_model_bytes.remove(key[0].value, key[1])
+        logger.notice(
+            f"Evicted {key[0].value} model {key[1]}: "
+            f"size={loaded_model.size_bytes / 1024**2:.0f}MB"
+        )
+        # requests still using the model keep it alive until they finish
+        del loaded_model
+        gc.collect()
+
+    def evict(self, model_type: LocalModelType, model_name: str) -> bool:
+        with self._lock:
+            if (model_type, model_name) not in self._models:
+                return False
+            self._evict((model_type, model_name))
+            return True
+
+    def set_pinned(
+        self, model_type: LocalModelType, model_name: str, pinned: bool
+    ) -> bool:
+        """Pinned models are never evicted. Returns False if the model isn't loaded."""
+        with self._lock:
+            loaded_model = self._models.get((model_type, model_name))
+            if loaded_model is None:
+                return False
+            loaded_model.pinned = pinned
+            if not pinned:
+                self._evict_over_budget()
+            return True
+
+    def get_loaded_models(self) -> list[LoadedModel]:
+        with self._lock:
+            return list(self._models.values())
+
+
+_MODEL_REGISTRY = ModelRegistry(
+    memory_budget_bytes=(
+        MODEL_SERVER_MEMORY_BUDGET_MB * 1024**2
+        if MODEL_SERVER_MEMORY_BUDGET_MB
+        else None
+    )
+)
+
+
+def get_model_registry() -> ModelRegistry:
+    return _MODEL_REGISTRY
@@ -0,0 +1,173 @@
+"""Runs the local embedding and reranking models with ONNX Runtime instead of PyTorch,
+optionally with int8 dynamically quantized weights.
+
+Models are exported (and quantized) to ONNX the first time they are loaded and saved
+under ONNX_MODEL_DIR, one directory per model and quantization config."""
+
+import os
+import shutil
+import tempfile
+from collections.abc import Callable
+from typing import Any
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from onyx.utils.logger import setup_logger
+from shared_configs.configs import ONNX_INTRA_OP_NUM_THREADS
+from shared_configs.configs import ONNX_MODEL_DIR
+from shared_configs.configs import ONNX_QUANTIZATION_CONFIG
+from shared_configs.utils import batch_list
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer  # type: ignore
+
+logger = setup_logger()
+
+_CPU_PROVIDER = "CPUExecutionProvider"
+
+
+def _get_onnx_file_name() -> str:
+    # the names sentence-transformers and optimum give the exported models
+    if ONNX_QUANTIZATION_CONFIG:
+        return f"model_qint8_{ONNX_QUANTIZATION_CONFIG}.onnx"
+    return "model.onnx"
+
+
+def _get_model_kwargs() -> dict[str, Any]:
+    import onnxruntime as ort  # type: ignore
+
+    session_options = ort.SessionOptions()
+    session_options.intra_op_num_threads = ONNX_INTRA_OP_NUM_THREADS
+    return {"provider": _CPU_PROVIDER, "session_options": session_options}
+
+
+def _get_quantization_config() -> Any:
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig  # type: ignore
+
+    if ONNX_QUANTIZATION_CONFIG not in ("arm64", "avx2", "avx512", "avx512_vnni"):
+        raise ValueError(
+            f"Unsupported ONNX quantization config: {ONNX_QUANTIZATION_CONFIG}"
+        )
+    return getattr(AutoQuantizationConfig, ONNX_QUANTIZATION_CONFIG)(is_static=False)
+
+
+def _get_exported_model_dir(
+    model_name: str, export_model: Callable[[str], None]
+) -> str:
+    model_dir = os.path.join(
+        ONNX_MODEL_DIR,
+        f"{model_name.replace('/', '__')}__{ONNX_QUANTIZATION_CONFIG or 'fp32'}",
+    )
+    if os.path.isdir(model_dir):
+        return model_dir
+
+    logger.notice(
+        f"Exporting {model_name} to ONNX with quantization config: {ONNX_QUANTIZATION_CONFIG}"
+    )
+    os.makedirs(ONNX_MODEL_DIR, exist_ok=True)
+    export_dir = tempfile.mkdtemp(dir=ONNX_MODEL_DIR)
+    try:
+        export_model(export_dir)
+        # only a complete export is moved into place
+        os.rename(export_dir, model_dir)
+    except OSError:
+        # another process finished the same export first
+        if not os.path.isdir(model_dir):
+            raise
+    finally:
+        shutil.rmtree(export_dir, ignore_errors=True)
+
+    return model_dir
+
+
+def load_onnx_embedding_model(model_name: str) -> "SentenceTransformer":
+    from sentence_transformers import SentenceTransformer
+
+    def _export_model(export_dir: str) -> None:
+        # exports the model if the repo doesn't ship ONNX weights
+        model = SentenceTransformer(
+            model_name,
+            backend="onnx",
+            trust_remote_code=True,
+            model_kwargs={"provider": _CPU_PROVIDER},
+        )
+        model.save(export_dir)
+
+        if ONNX_QUANTIZATION_CONFIG:
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            export_dynamic_quantized_onnx_model(
+                model,
+                _get_quantization_config(),
+                export_dir,
+                file_suffix=f"qint8_{ONNX_QUANTIZATION_CONFIG}",
+            )
+
+    model_dir = _get_exported_model_dir(model_name, _export_model)
+    return SentenceTransformer(
+        model_dir,
+        backend="onnx",
+        trust_remote_code=True,
+        model_kwargs={
+            **_get_model_kwargs(),
+            "file_name": os.path.join("onnx", _get_onnx_file_name()),
+        },
+    )
+
+
+class OnnxCrossEncoder:
+    """Scores (query, passage) pairs the same way as sentence-transformers'
+    CrossEncoder.predict, with the model running in ONNX Runtime."""
+
+    def __init__(self, model: Any, tokenizer: Any) -> None:
+        self.model = model
+        self.tokenizer = tokenizer
+
+    def predict(
+        self, sentence_pairs: list[tuple[str, str]], batch_size: int = 32
+    ) -> npt.NDArray[np.float32]:
+        batch_logits = []
+        for pair_batch in batch_list(sentence_pairs, batch_size):
+            features = self.tokenizer(
+                [query for query, _ in pair_batch],
+                [passage for _, passage in pair_batch],
+                padding=True,
+                truncation=True,
+                return_tensors="np",
+            )
+            batch_logits.append(self.model(**features).logits)
+
+        logits = np.concatenate(batch_logits)
+        if logits.shape[1] == 1:
+            # CrossEncoder applies a sigmoid to the logits of single label models
+            return 1 / (1 + np.exp(-logits[:, 0]))
+        return logits
+
+
+def load_onnx_reranking_model(model_name: str) -> OnnxCrossEncoder:
+    from optimum.onnxruntime import ORTModelForSequenceClassification  # type: ignore
+    from transformers import AutoTokenizer  # type: ignore
+
+    def _export_model(export_dir: str) -> None:
+        model = ORTModelForSequenceClassification.from_pretrained(
+            model_name, export=True, provider=_CPU_PROVIDER
+        )
+        model.save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+
+        if ONNX_QUANTIZATION_CONFIG:
+            from optimum.onnxruntime import ORTQuantizer
+
+            ORTQuantizer.from_pretrained(model).quantize(
+                quantization_config=_get_quantization_config(),
+                save_dir=export_dir,
+                file_suffix=f"qint8_{ONNX_QUANTIZATION_CONFIG}",
+            )
+
+    model_dir = _get_exported_model_dir(model_name, _export_model)
+    model = ORTModelForSequenceClassification.from_pretrained(
+        model_dir, file_name=_get_onnx_file_name(), **_get_model_kwargs()
+    )
+    return OnnxCrossEncoder(model, AutoTokenizer.from_pretrained(model_dir))
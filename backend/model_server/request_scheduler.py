@@ -0,0 +1,132 @@
+"""Admission control for requests that run on local models.
+
+Local model inference is CPU/GPU bound, so the model server only runs a few requests
+at once. The rest wait in a queue per priority, interactive requests (query
+embeddings, reranking) are started before indexing ones, and indexing requests can't
+take every slot. When the queue of a priority is full, requests are rejected so that
+clients back off instead of piling up more work."""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from onyx.utils.logger import setup_logger
+from shared_configs.configs import MODEL_SERVER_MAX_CONCURRENT_INDEXING_REQUESTS
+from shared_configs.configs import MODEL_SERVER_MAX_CONCURRENT_REQUESTS
+from shared_configs.configs import MODEL_SERVER_MAX_QUEUED_INDEXING_REQUESTS
+from shared_configs.configs import MODEL_SERVER_MAX_QUEUED_INTERACTIVE_REQUESTS
+from shared_configs.enums import ModelServerRequestPriority
+
+logger = setup_logger()
+
+
+class ModelServerOverloadedError(Exception):
+    def __init__(self, priority: ModelServerRequestPriority) -> None:
+        self.priority = priority
+        super().__init__(f"Too many queued {priority.value} requests")
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        max_concurrent_requests: int,
+        max_concurrent_requests_by_priority: dict[ModelServerRequestPriority, int],
+        max_queued_requests_by_priority: dict[ModelServerRequestPriority, int],
+    ) -> None:
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_concurrent_requests_by_priority = max_concurrent_requests_by_priority
+        self.max_queued_requests_by_priority = max_queued_requests_by_priority
+
+        self._running: dict[ModelServerRequestPriority, int] = {
+            priority: 0 for priority in ModelServerRequestPriority
+        }
+        self._waiting: dict[ModelServerRequestPriority, deque[asyncio.Future[None]]] = {
+            priority: deque() for priority in ModelServerRequestPriority
+        }
+
+    def _can_start(self, priority: ModelServerRequestPriority) -> bool:
+        max_running = self.max_concurrent_requests_by_priority.get(
+            priority, self.max_concurrent_requests
+        )
+        return (
+            sum(self._running.values()) < self.max_concurrent_requests
+            and self._running[priority] < max_running
+        )
+
+    def _start_waiting(self) -> None:
+        # ModelServerRequestPriority is ordered from highest to lowest priority
+        for priority in ModelServerRequestPriority:
+            waiting = self._waiting[priority]
+            while waiting and self._can_start(priority):
+                waiter = waiting.popleft()
+                if waiter.done():
+                    # cancelled while waiting
+                    continue
+                self._running[priority] += 1
+                waiter.set_result(None)
+
+    async def _acquire(self, priority: ModelServerRequestPriority) -> None:
+        waiting = self._waiting[priority]
+        max_queued = self.max_queued_requests_by_priority.get(priority, 0)
+        if (waiting or not self._can_start(priority)) and len(waiting) >= max_queued:
+            logger.warning(f"Rejecting {priority.value} request: {self.get_stats()}")
+            raise ModelServerOverloadedError(priority)
+
+        waiter = asyncio.get_running_loop().create_future()
+        waiting.append(waiter)
+        # starts right away if there is a free slot and nothing of a higher
+        # priority is waiting for it
+        self._start_waiting()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over right as the request was cancelled
+                self._release(priority)
+            elif waiter in waiting:
+                waiting.remove(waiter)
+            raise
+
+    def _release(self, priority: ModelServerRequestPriority) -> None:
+        self._running[priority] -= 1
+        self._start_waiting()
+
+    @asynccontextmanager
+    async def slot(self, priority: ModelServerRequestPriority) -> AsyncIterator[None]:
+        """Waits until the request can run. Raises ModelServerOverloadedError if
+        too many requests of this priority are already waiting."""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        return {
+            priority.value: {
+                "running": self._running[priority],
+                "queued": len(self._waiting[priority]),
+            }
+            for priority in ModelServerRequestPriority
+        }
+
+
+_REQUEST_SCHEDULER: RequestScheduler | None = None
+
+
+def get_request_scheduler() -> RequestScheduler:
+    # created lazily so that it's only ever used from the server's event loop
+    global _REQUEST_SCHEDULER
+    if _REQUEST_SCHEDULER is None:
+        _REQUEST_SCHEDULER = RequestScheduler(
+            max_concurrent_requests=MODEL_SERVER_MAX_CONCURRENT_REQUESTS,
+            max_concurrent_requests_by_priority={
+                ModelServerRequestPriority.INDEXING: MODEL_SERVER_MAX_CONCURRENT_INDEXING_REQUESTS,
+            },
+            max_queued_requests_by_priority={
+                ModelServerRequestPriority.INTERACTIVE: MODEL_SERVER_MAX_QUEUED_INTERACTIVE_REQUESTS,
+                ModelServerRequestPriority.INDEXING: MODEL_SERVER_MAX_QUEUED_INDEXING_REQUESTS,
+            },
+        )
+    return _REQUEST_SCHEDULER
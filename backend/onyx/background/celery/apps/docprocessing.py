@@ -1,3 +1,4 @@
+import os
 from typing import Any
 from typing import cast
 
@@ -12,8 +13,11 @@ from celery.signals import worker_ready
 from celery.signals import worker_shutdown
 
 import onyx.background.celery.apps.app_base as app_base
+from onyx.configs.app_configs import DOCPROCESSING_TOKENIZERS_PARALLELISM
+from onyx.configs.app_configs import SKIP_WARM_UP
 from onyx.configs.constants import POSTGRES_CELERY_WORKER_DOCPROCESSING_APP_NAME
 from onyx.db.engine.sql_engine import SqlEngine
+from onyx.natural_language_processing.utils import warm_up_tokenizer
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import MULTI_TENANT
 
@@ -73,6 +77,16 @@ def on_worker_init(sender: Worker, **kwargs: Any) -> None:
     app_base.wait_for_db(sender, **kwargs)
     app_base.wait_for_vespa_or_shutdown(sender, **kwargs)
 
+    # indexing tasks run in threads of this process, so the tokenizers can
+    # encode batches in parallel without being forked afterwards
+    if DOCPROCESSING_TOKENIZERS_PARALLELISM:
+        os.environ["TOKENIZERS_PARALLELISM"] = "true"
+
+    # tokenizers are loaded lazily, load the default one while the worker
+    # starts up instead of in the first indexing task
+    if not SKIP_WARM_UP:
+        warm_up_tokenizer(non_blocking=True)
+
     # Less startup checks in multi-tenant case
     if MULTI_TENANT:
         return
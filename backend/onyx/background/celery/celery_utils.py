@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timezone
 from pathlib import Path
@@ -18,6 +19,7 @@ from onyx.connectors.interfaces import SlimConnector
 from onyx.connectors.models import Document
 from onyx.httpx.httpx_pool import HttpxPool
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.utils.disk_backed_id_set import DiskBackedIdSet
 from onyx.utils.logger import setup_logger
 
 
@@ -30,21 +32,13 @@ def document_batch_to_ids(
     return {doc.id for doc in doc_batch}
 
 
-def extract_ids_from_runnable_connector(
+def _extract_id_batches_from_runnable_connector(
     runnable_connector: BaseConnector,
     callback: IndexingHeartbeatInterface | None = None,
-) -> set[str]:
-    """
-    If the SlimConnector hasnt been implemented for the given connector, just pull
-    all docs using the load_from_state and grab out the IDs.
-
-    Optionally, a callback can be passed to handle the length of each document batch.
-    """
-    all_connector_doc_ids: set[str] = set()
-
+) -> Iterator[set[str]]:
     if isinstance(runnable_connector, SlimConnector):
         for metadata_batch in runnable_connector.retrieve_all_slim_documents():
-            all_connector_doc_ids.update({doc.id for doc in metadata_batch})
+            yield {doc.id for doc in metadata_batch}
 
     doc_batch_generator = None
 
@@ -69,14 +63,43 @@ def extract_ids_from_runnable_connector(
                     "extract_ids_from_runnable_connector: Stop signal detected"
                 )
 
-        all_connector_doc_ids.update(doc_batch_processing_func(doc_batch))
+        yield doc_batch_processing_func(doc_batch)
 
         if callback:
             callback.progress("extract_ids_from_runnable_connector", len(doc_batch))
 
+
+def extract_ids_from_runnable_connector(
+    runnable_connector: BaseConnector,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> set[str]:
+    """
+    If the SlimConnector hasnt been implemented for the given connector, just pull
+    all docs using the load_from_state and grab out the IDs.
+
+    Optionally, a callback can be passed to handle the length of each document batch.
+    """
+    all_connector_doc_ids: set[str] = set()
+    for doc_ids in _extract_id_batches_from_runnable_connector(
+        runnable_connector, callback
+    ):
+        all_connector_doc_ids.update(doc_ids)
     return all_connector_doc_ids
 
 
+def extract_ids_from_runnable_connector_to_disk(
+    runnable_connector: BaseConnector,
+    all_connector_doc_ids: DiskBackedIdSet,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> None:
+    """Same as extract_ids_from_runnable_connector, but the IDs are added to a set
+    on disk, so that only one batch of them is held in memory at a time."""
+    for doc_ids in _extract_id_batches_from_runnable_connector(
+        runnable_connector, callback
+    ):
+        all_connector_doc_ids.add_many(doc_ids)
+
+
 def celery_is_listening_to_queue(worker: Any, name: str) -> bool:
     """Checks to see if we're listening to the named queue"""
 
@@ -26,11 +26,18 @@ from onyx.background.celery.tasks.docprocessing.utils import should_index
 from onyx.background.celery.tasks.docprocessing.utils import (
     try_creating_docfetching_task,
 )
+from onyx.background.celery.tasks.docprocessing.warm_state import (
+    get_batch_prefetcher,
+)
+from onyx.background.celery.tasks.docprocessing.warm_state import (
+    get_warm_indexing_components,
+)
 from onyx.background.celery.tasks.models import DocProcessingContext
 from onyx.background.indexing.checkpointing_utils import cleanup_checkpoint
 from onyx.background.indexing.checkpointing_utils import (
     get_index_attempts_with_old_checkpoints,
 )
+from onyx.configs.app_configs import DOCPROCESSING_WARM_WORKER_MODE
 from onyx.configs.app_configs import MANAGED_VESPA
 from onyx.configs.app_configs import VESPA_CLOUD_CERT_PATH
 from onyx.configs.app_configs import VESPA_CLOUD_KEY_PATH
@@ -1059,7 +1066,13 @@ def _docprocessing_task(
     per_batch_lock: RedisLock | None = None
     try:
         # Retrieve documents from storage
-        documents = storage.get_batch(batch_num)
+        if DOCPROCESSING_WARM_WORKER_MODE:
+            batch_prefetcher = get_batch_prefetcher()
+            documents = batch_prefetcher.get_batch(storage, batch_num)
+            # overlap fetching the next batch with processing this one
+            batch_prefetcher.prefetch(storage, batch_num + 1)
+        else:
+            documents = storage.get_batch(batch_num)
         if not documents:
             task_logger.error(f"No documents found for batch {batch_num}")
             return
@@ -1105,20 +1118,30 @@ def _docprocessing_task(
                 raise RuntimeError("Docprocessing cancelled by connector pausing")
 
             # Set up indexing pipeline components
-            embedding_model = DefaultIndexingEmbedder.from_db_search_settings(
-                search_settings=index_attempt.search_settings,
-                callback=callback,
-            )
+            if DOCPROCESSING_WARM_WORKER_MODE:
+                (
+                    embedding_model,
+                    information_content_classification_model,
+                    document_index,
+                ) = get_warm_indexing_components(
+                    search_settings=index_attempt.search_settings,
+                    callback=callback,
+                )
+            else:
+                embedding_model = DefaultIndexingEmbedder.from_db_search_settings(
+                    search_settings=index_attempt.search_settings,
+                    callback=callback,
+                )
 
-            information_content_classification_model = (
-                InformationContentClassificationModel()
-            )
+                information_content_classification_model = (
+                    InformationContentClassificationModel()
+                )
 
-            document_index = get_default_document_index(
-                index_attempt.search_settings,
-                None,
-                httpx_client=HttpxPool.get("vespa"),
-            )
+                document_index = get_default_document_index(
+                    index_attempt.search_settings,
+                    None,
+                    httpx_client=HttpxPool.get("vespa"),
+                )
 
             # Set up metadata for this batch
             index_attempt_metadata = IndexAttemptMetadata(
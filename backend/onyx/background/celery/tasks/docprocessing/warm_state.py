@@ -0,0 +1,165 @@
+"""State kept alive across docprocessing tasks.
+
+The docprocessing worker runs its tasks in a thread pool inside a single
+process, so batches of the same index attempt are usually processed by the
+same process one after another. This module lets those tasks reuse the
+indexing components they build and start pulling the next batch from the file
+store while the current batch is still being chunked and embedded."""
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from onyx.configs.app_configs import CELERY_WORKER_DOCPROCESSING_CONCURRENCY
+from onyx.connectors.models import Document
+from onyx.db.models import SearchSettings
+from onyx.document_index.factory import get_default_document_index
+from onyx.document_index.interfaces import DocumentIndex
+from onyx.file_store.document_batch_storage import DocumentBatchStorage
+from onyx.httpx.httpx_pool import HttpxPool
+from onyx.indexing.embedder import DefaultIndexingEmbedder
+from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.natural_language_processing.search_nlp_models import (
+    InformationContentClassificationModel,
+)
+from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_in_background
+from onyx.utils.threadpool_concurrency import TimeoutThread
+from onyx.utils.threadpool_concurrency import wait_on_background
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+# (cc_pair_id, index_attempt_id, batch_num)
+_BatchKey = tuple[int, int, int]
+
+
+def _batch_key(storage: DocumentBatchStorage, batch_num: int) -> _BatchKey:
+    return (storage.cc_pair_id, storage.index_attempt_id, batch_num)
+
+
+class DocumentBatchPrefetcher:
+    """Process-wide cache of document batches that are being fetched ahead of the
+    task that will process them. Only a bounded number of batches are kept
+    around; if the task for a prefetched batch ends up running in another
+    process, the batch is simply evicted later on."""
+
+    def __init__(self, max_prefetched_batches: int) -> None:
+        self._max_prefetched_batches = max_prefetched_batches
+        self._lock = threading.Lock()
+        self._pending: OrderedDict[_BatchKey, TimeoutThread[list[Document] | None]] = (
+            OrderedDict()
+        )
+        # batches that a task in this process has already started working on,
+        # there is no point in prefetching those
+        self._claimed: OrderedDict[_BatchKey, None] = OrderedDict()
+
+    def get_batch(
+        self, storage: DocumentBatchStorage, batch_num: int
+    ) -> list[Document] | None:
+        key = _batch_key(storage, batch_num)
+        with self._lock:
+            self._claimed[key] = None
+            while len(self._claimed) > 4 * self._max_prefetched_batches:
+                self._claimed.popitem(last=False)
+            prefetch = self._pending.pop(key, None)
+
+        if prefetch is not None:
+            try:
+                documents = wait_on_background(prefetch)
+                # a missing batch may just not have been stored yet at prefetch
+                # time, so only trust positive results
+                if documents:
+                    return documents
+            except Exception:
+                logger.exception(
+                    f"Prefetch of batch {batch_num} failed, fetching it directly"
+                )
+
+        return storage.get_batch(batch_num)
+
+    def prefetch(self, storage: DocumentBatchStorage, batch_num: int) -> None:
+        key = _batch_key(storage, batch_num)
+        with self._lock:
+            if key in self._pending or key in self._claimed:
+                return
+
+            while len(self._pending) >= self._max_prefetched_batches:
+                # the in-flight fetch (if any) finishes on its own, its result is
+                # just never picked up
+                self._pending.popitem(last=False)
+
+            self._pending[key] = run_in_background(storage.get_batch, batch_num)
+
+
+_BATCH_PREFETCHER = DocumentBatchPrefetcher(
+    max_prefetched_batches=CELERY_WORKER_DOCPROCESSING_CONCURRENCY
+)
+
+
+def get_batch_prefetcher() -> DocumentBatchPrefetcher:
+    return _BATCH_PREFETCHER
+
+
+class WarmIndexingComponents(NamedTuple):
+    embedder: DefaultIndexingEmbedder
+    information_content_classification_model: InformationContentClassificationModel
+    document_index: DocumentIndex
+
+
+def _components_key(search_settings: SearchSettings) -> tuple:
+    # anything that goes into building the components. Search settings ids are
+    # only unique within a tenant.
+    return (
+        get_current_tenant_id(),
+        search_settings.id,
+        search_settings.index_name,
+        search_settings.large_chunks_enabled,
+        search_settings.model_name,
+        search_settings.normalize,
+        search_settings.query_prefix,
+        search_settings.passage_prefix,
+        search_settings.provider_type,
+        search_settings.api_key,
+        search_settings.api_url,
+        search_settings.api_version,
+        search_settings.deployment_name,
+        search_settings.reduced_dimension,
+    )
+
+
+# Components are not shared between threads since the embedder carries the
+# heartbeat callback of the task that is currently using it
+_thread_local = threading.local()
+
+
+def get_warm_indexing_components(
+    search_settings: SearchSettings,
+    callback: IndexingHeartbeatInterface | None,
+) -> WarmIndexingComponents:
+    """Returns the indexing components for the given search settings, reusing the
+    ones built by the previous task on this thread if the settings didn't change."""
+    key = _components_key(search_settings)
+
+    cached: tuple[tuple, WarmIndexingComponents] | None = getattr(
+        _thread_local, "components", None
+    )
+    if cached is not None and cached[0] == key:
+        components = cached[1]
+        components.embedder.embedding_model.callback = callback
+        return components
+
+    components = WarmIndexingComponents(
+        embedder=DefaultIndexingEmbedder.from_db_search_settings(
+            search_settings=search_settings,
+            callback=callback,
+        ),
+        information_content_classification_model=InformationContentClassificationModel(),
+        document_index=get_default_document_index(
+            search_settings,
+            None,
+            httpx_client=HttpxPool.get("vespa"),
+        ),
+    )
+    _thread_local.components = (key, components)
+    return components
@@ -21,10 +21,14 @@ from onyx.background.celery.celery_redis import celery_get_queue_length
 from onyx.background.celery.celery_redis import celery_get_queued_task_ids
 from onyx.background.celery.celery_redis import celery_get_unacked_task_ids
 from onyx.background.celery.celery_utils import extract_ids_from_runnable_connector
+from onyx.background.celery.celery_utils import (
+    extract_ids_from_runnable_connector_to_disk,
+)
 from onyx.background.celery.tasks.beat_schedule import CLOUD_BEAT_MULTIPLIER_DEFAULT
 from onyx.background.celery.tasks.docprocessing.utils import IndexingCallbackBase
 from onyx.configs.app_configs import ALLOW_SIMULTANEOUS_PRUNING
 from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.app_configs import PRUNING_DISK_BACKED_ID_DIFF
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PRUNING_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_TASK_WAIT_FOR_FENCE_TIMEOUT
@@ -36,11 +40,14 @@ from onyx.configs.constants import OnyxRedisConstants
 from onyx.configs.constants import OnyxRedisLocks
 from onyx.configs.constants import OnyxRedisSignals
 from onyx.connectors.factory import instantiate_connector
+from onyx.connectors.interfaces import BaseConnector
 from onyx.connectors.models import InputType
+from onyx.connectors.web.connector import WebConnector
 from onyx.db.connector import mark_ccpair_as_pruned
 from onyx.db.connector_credential_pair import get_connector_credential_pair
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
 from onyx.db.connector_credential_pair import get_connector_credential_pairs
+from onyx.db.document import get_document_ids_for_connector_credential_pair_in_batches
 from onyx.db.document import get_documents_for_connector_credential_pair
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.enums import ConnectorCredentialPairStatus
@@ -58,6 +65,7 @@ from onyx.redis.redis_pool import get_redis_client
 from onyx.redis.redis_pool import get_redis_replica_client
 from onyx.server.runtime.onyx_runtime import OnyxRuntime
 from onyx.server.utils import make_short_id
+from onyx.utils.disk_backed_id_set import DiskBackedIdSet
 from onyx.utils.logger import format_error_for_logging
 from onyx.utils.logger import LoggerContextVars
 from onyx.utils.logger import pruning_ctx
@@ -390,6 +398,85 @@ def try_creating_prune_generator_task(
     return payload_id
 
 
+def _generate_prune_tasks_with_in_memory_diff(
+    celery_app: Celery,
+    db_session: Session,
+    redis_connector: RedisConnector,
+    runnable_connector: BaseConnector,
+    callback: PruneCallback,
+    cc_pair: ConnectorCredentialPair,
+) -> int | None:
+    # a list of docs in the source
+    all_connector_doc_ids: set[str] = extract_ids_from_runnable_connector(
+        runnable_connector, callback
+    )
+
+    # a list of docs in our local index
+    all_indexed_document_ids = {
+        doc.id
+        for doc in get_documents_for_connector_credential_pair(
+            db_session=db_session,
+            connector_id=cc_pair.connector_id,
+            credential_id=cc_pair.credential_id,
+        )
+    }
+
+    # generate list of docs to remove (no longer in the source)
+    doc_ids_to_remove = list(all_indexed_document_ids - all_connector_doc_ids)
+
+    task_logger.info(
+        "Pruning set collected: "
+        f"cc_pair={cc_pair.id} "
+        f"connector_source={cc_pair.connector.source} "
+        f"docs_to_remove={len(doc_ids_to_remove)}"
+    )
+
+    task_logger.info(
+        f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair.id}"
+    )
+    return redis_connector.prune.generate_tasks(
+        set(doc_ids_to_remove), celery_app, db_session, None
+    )
+
+
+def _generate_prune_tasks_with_disk_backed_diff(
+    celery_app: Celery,
+    db_session: Session,
+    redis_connector: RedisConnector,
+    runnable_connector: BaseConnector,
+    callback: PruneCallback,
+    cc_pair: ConnectorCredentialPair,
+) -> int | None:
+    """Same as the in memory diff, but the IDs of the docs in the source are kept on
+    disk and the indexed IDs are streamed from the db in batches, so the tasks are
+    sent as the docs to remove are found."""
+    with DiskBackedIdSet() as all_connector_doc_ids:
+        extract_ids_from_runnable_connector_to_disk(
+            runnable_connector, all_connector_doc_ids, callback
+        )
+
+        task_logger.info(
+            "Pruning set collected on disk, "
+            "RedisConnector.prune.generate_tasks starting: "
+            f"cc_pair={cc_pair.id} "
+            f"connector_source={cc_pair.connector.source} "
+            f"connector_docs={len(all_connector_doc_ids)}"
+        )
+
+        doc_ids_to_remove = (
+            doc_id
+            for indexed_doc_ids in get_document_ids_for_connector_credential_pair_in_batches(
+                db_session=db_session,
+                connector_id=cc_pair.connector_id,
+                credential_id=cc_pair.credential_id,
+            )
+            for doc_id in all_connector_doc_ids.missing(indexed_doc_ids)
+        )
+        return redis_connector.prune.generate_tasks(
+            doc_ids_to_remove, celery_app, db_session, None
+        )
+
+
 @shared_task(
     name=OnyxCeleryTask.CONNECTOR_PRUNING_GENERATOR_TASK,
     acks_late=False,
@@ -518,6 +605,13 @@ def connector_pruning_generator_task(
                 cc_pair.connector.connector_specific_config,
                 cc_pair.credential,
             )
+            if isinstance(runnable_connector, WebConnector):
+                # unchanged pages are listed without being extracted again
+                runnable_connector.set_page_fingerprint_scope(
+                    connector_id=cc_pair.connector_id,
+                    credential_id=cc_pair.credential_id,
+                    skip_unchanged_pages=True,
+                )
 
             search_settings = get_current_search_settings(db_session)
             redis_connector.new_index(search_settings.id)
@@ -529,37 +623,24 @@ def connector_pruning_generator_task(
                 r,
             )
 
-            # a list of docs in the source
-            all_connector_doc_ids: set[str] = extract_ids_from_runnable_connector(
-                runnable_connector, callback
-            )
-
-            # a list of docs in our local index
-            all_indexed_document_ids = {
-                doc.id
-                for doc in get_documents_for_connector_credential_pair(
-                    db_session=db_session,
-                    connector_id=connector_id,
-                    credential_id=credential_id,
+            if PRUNING_DISK_BACKED_ID_DIFF:
+                tasks_generated = _generate_prune_tasks_with_disk_backed_diff(
+                    self.app,
+                    db_session,
+                    redis_connector,
+                    runnable_connector,
+                    callback,
+                    cc_pair,
+                )
+            else:
+                tasks_generated = _generate_prune_tasks_with_in_memory_diff(
+                    self.app,
+                    db_session,
+                    redis_connector,
+                    runnable_connector,
+                    callback,
+                    cc_pair,
                 )
-            }
-
-            # generate list of docs to remove (no longer in the source)
-            doc_ids_to_remove = list(all_indexed_document_ids - all_connector_doc_ids)
-
-            task_logger.info(
-                "Pruning set collected: "
-                f"cc_pair={cc_pair_id} "
-                f"connector_source={cc_pair.connector.source} "
-                f"docs_to_remove={len(doc_ids_to_remove)}"
-            )
-
-            task_logger.info(
-                f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair_id}"
-            )
-            tasks_generated = redis_connector.prune.generate_tasks(
-                set(doc_ids_to_remove), self.app, db_session, None
-            )
             if tasks_generated is None:
                 return None
 
@@ -36,6 +36,7 @@ from onyx.connectors.models import DocExtractionContext
 from onyx.connectors.models import Document
 from onyx.connectors.models import IndexAttemptMetadata
 from onyx.connectors.models import TextSection
+from onyx.connectors.web.connector import WebConnector
 from onyx.db.connector import mark_cc_pair_as_permissions_synced
 from onyx.db.connector import mark_ccpair_with_indexing_trigger
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
@@ -111,6 +112,20 @@ def _get_connector_runner(
             credential=attempt.connector_credential_pair.credential,
         )
 
+        # pages that haven't changed since the last crawl of this cc-pair are only
+        # skipped when they are already in the index being built. A new index or a
+        # re-index from the beginning needs every page
+        if (
+            isinstance(runnable_connector, WebConnector)
+            and attempt.search_settings is not None
+            and attempt.search_settings.status == IndexModelStatus.PRESENT
+        ):
+            runnable_connector.set_page_fingerprint_scope(
+                connector_id=attempt.connector_credential_pair.connector_id,
+                credential_id=attempt.connector_credential_pair.credential_id,
+                skip_unchanged_pages=not attempt.from_beginning,
+            )
+
         # validate the connector settings
         if not INTEGRATION_TESTS_MODE:
             runnable_connector.validate_connector_settings()
@@ -183,6 +183,16 @@ INDEX_BATCH_SIZE = int(os.environ.get("INDEX_BATCH_SIZE") or 16)
 
 MAX_DRIVE_WORKERS = int(os.environ.get("MAX_DRIVE_WORKERS", 4))
 
+# Objects downloaded and extracted at once by the blob storage connector
+BLOB_STORAGE_MAX_CONCURRENT_DOWNLOADS = int(
+    os.environ.get("BLOB_STORAGE_MAX_CONCURRENT_DOWNLOADS") or 8
+)
+# Objects larger than this are skipped by the blob storage connector, based on the
+# size in the bucket listing, so they are never downloaded
+BLOB_STORAGE_MAX_OBJECT_SIZE_BYTES = int(
+    os.environ.get("BLOB_STORAGE_MAX_OBJECT_SIZE_BYTES") or 2 * 1024 * 1024 * 1024
+)  # 2GB in bytes
+
 # Below are intended to match the env variables names used by the official postgres docker image
 # https://hub.docker.com/_/postgres
 POSTGRES_USER = os.environ.get("POSTGRES_USER") or "postgres"
@@ -325,6 +335,13 @@ except ValueError:
         CELERY_WORKER_DOCPROCESSING_CONCURRENCY_DEFAULT
     )
 
+# Lets the docprocessing worker's tokenizers encode batches on all cores. The worker
+# runs its tasks in threads, so nothing is forked after the tokenizers have been used
+# (which would make them fall back to a single thread in the child)
+DOCPROCESSING_TOKENIZERS_PARALLELISM = (
+    os.environ.get("DOCPROCESSING_TOKENIZERS_PARALLELISM", "true").lower() == "true"
+)
+
 CELERY_WORKER_DOCFETCHING_CONCURRENCY_DEFAULT = 1
 try:
     env_value = os.environ.get("CELERY_WORKER_DOCFETCHING_CONCURRENCY")
@@ -339,6 +356,13 @@ except ValueError:
         CELERY_WORKER_DOCFETCHING_CONCURRENCY_DEFAULT
     )
 
+# Keep embedder / document index clients warm across batches within each
+# docprocessing worker thread and prefetch the next document batch from the
+# file store while the current one is being processed
+DOCPROCESSING_WARM_WORKER_MODE = (
+    os.environ.get("DOCPROCESSING_WARM_WORKER_MODE", "").lower() == "true"
+)
+
 CELERY_WORKER_KG_PROCESSING_CONCURRENCY = int(
     os.environ.get("CELERY_WORKER_KG_PROCESSING_CONCURRENCY") or 4
 )
@@ -382,6 +406,29 @@ WEB_CONNECTOR_OAUTH_CLIENT_ID = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_ID")
 WEB_CONNECTOR_OAUTH_CLIENT_SECRET = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_SECRET")
 WEB_CONNECTOR_OAUTH_TOKEN_URL = os.environ.get("WEB_CONNECTOR_OAUTH_TOKEN_URL")
 WEB_CONNECTOR_VALIDATE_URLS = os.environ.get("WEB_CONNECTOR_VALIDATE_URLS")
+# Pages fetched at once by a web connector run
+WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS") or 8
+)
+# Browser pages open at once, for pages that need JavaScript to be rendered
+WEB_CONNECTOR_MAX_CONCURRENT_PAGES = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENT_PAGES") or 4
+)
+# Politeness limits, so that crawling a site doesn't overload it
+WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS_PER_HOST = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS_PER_HOST") or 4
+)
+WEB_CONNECTOR_MIN_REQUEST_INTERVAL_SECONDS = float(
+    os.environ.get("WEB_CONNECTOR_MIN_REQUEST_INTERVAL_SECONDS") or 0.1
+)
+# Re-crawls send conditional requests and skip pages that haven't changed since they
+# were last indexed
+WEB_CONNECTOR_CONDITIONAL_RECRAWL = (
+    os.environ.get("WEB_CONNECTOR_CONDITIONAL_RECRAWL", "").lower() != "false"
+)
+WEB_CONNECTOR_PAGE_FINGERPRINT_TTL_SECONDS = int(
+    os.environ.get("WEB_CONNECTOR_PAGE_FINGERPRINT_TTL_SECONDS") or 30 * 24 * 60 * 60
+)
 
 HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY = os.environ.get(
     "HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY",
@@ -420,6 +467,16 @@ CONFLUENCE_CONNECTOR_ATTACHMENT_SIZE_THRESHOLD = int(
 CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD = int(
     os.environ.get("CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD", 200_000)
 )
+# Attachments of a page downloaded and converted at once
+CONFLUENCE_CONNECTOR_ATTACHMENT_CONCURRENCY = int(
+    os.environ.get("CONFLUENCE_CONNECTOR_ATTACHMENT_CONCURRENCY") or 4
+)
+# How long the converted content of an attachment version is kept, so that unchanged
+# attachments aren't downloaded again when their page is re-indexed. 0 disables it
+CONFLUENCE_CONNECTOR_ATTACHMENT_CACHE_TTL_SECONDS = int(
+    os.environ.get("CONFLUENCE_CONNECTOR_ATTACHMENT_CACHE_TTL_SECONDS")
+    or 7 * 24 * 60 * 60
+)
 
 # A JSON-formatted array. Each item in the array should have the following structure:
 # {
@@ -473,6 +530,11 @@ CONFLUENCE_TIMEZONE_OFFSET = float(
 GOOGLE_DRIVE_CONNECTOR_SIZE_THRESHOLD = int(
     os.environ.get("GOOGLE_DRIVE_CONNECTOR_SIZE_THRESHOLD", 10 * 1024 * 1024)
 )
+# Most files converted at the same time. Fewer are converted while Google reports
+# that the API quota is used up.
+GOOGLE_DRIVE_CONNECTOR_CONVERSION_WORKERS = int(
+    os.environ.get("GOOGLE_DRIVE_CONNECTOR_CONVERSION_WORKERS", 8)
+)
 
 # Default size threshold for SharePoint files (20MB)
 SHAREPOINT_CONNECTOR_SIZE_THRESHOLD = int(
@@ -488,10 +550,24 @@ JIRA_CONNECTOR_LABELS_TO_SKIP = [
 JIRA_CONNECTOR_MAX_TICKET_SIZE = int(
     os.environ.get("JIRA_CONNECTOR_MAX_TICKET_SIZE", 100 * 1024)
 )
+# Splits the time range of a Jira run into this many windows of the update time,
+# fetched concurrently. 1 fetches the whole range with a single query.
+JIRA_CONNECTOR_FETCH_PARTITIONS = max(
+    int(os.environ.get("JIRA_CONNECTOR_FETCH_PARTITIONS") or 1), 1
+)
+# Most windows fetched at the same time
+JIRA_CONNECTOR_MAX_CONCURRENT_PARTITIONS = max(
+    int(os.environ.get("JIRA_CONNECTOR_MAX_CONCURRENT_PARTITIONS") or 4), 1
+)
 
 GONG_CONNECTOR_START_TIME = os.environ.get("GONG_CONNECTOR_START_TIME")
 
 GITHUB_CONNECTOR_BASE_URL = os.environ.get("GITHUB_CONNECTOR_BASE_URL") or None
+# Fetch PRs and issues through the GraphQL API, which returns them together with
+# their comments, labels and users instead of needing extra calls per item
+GITHUB_CONNECTOR_USE_GRAPHQL = (
+    os.environ.get("GITHUB_CONNECTOR_USE_GRAPHQL", "").lower() == "true"
+)
 
 GITLAB_CONNECTOR_INCLUDE_CODE_FILES = (
     os.environ.get("GITLAB_CONNECTOR_INCLUDE_CODE_FILES", "").lower() == "true"
@@ -510,8 +586,22 @@ LINEAR_CLIENT_SECRET = os.getenv("LINEAR_CLIENT_SECRET")
 
 # Slack specific configs
 SLACK_NUM_THREADS = int(os.getenv("SLACK_NUM_THREADS") or 8)
+# Channels whose messages are fetched at the same time. 1 fetches them one by one.
+SLACK_NUM_CHANNEL_WORKERS = max(int(os.getenv("SLACK_NUM_CHANNEL_WORKERS") or 1), 1)
 MAX_SLACK_QUERY_EXPANSIONS = int(os.environ.get("MAX_SLACK_QUERY_EXPANSIONS", "5"))
 
+# Salesforce specific configs
+# Number of bulk API query jobs run at the same time. Salesforce caps concurrent
+# bulk jobs per org, and every running job counts against the org's API limits.
+SALESFORCE_BULK_MAX_CONCURRENT_JOBS = int(
+    os.environ.get("SALESFORCE_BULK_MAX_CONCURRENT_JOBS") or 4
+)
+# Number of object types whose downloaded data may sit on local disk before being
+# loaded into the connector's SQLite db. Bounds the disk used during a full sync.
+SALESFORCE_MAX_PENDING_CSV_OBJECT_TYPES = int(
+    os.environ.get("SALESFORCE_MAX_PENDING_CSV_OBJECT_TYPES") or 8
+)
+
 DASK_JOB_CLIENT_ENABLED = (
     os.environ.get("DASK_JOB_CLIENT_ENABLED", "").lower() == "true"
 )
@@ -536,6 +626,13 @@ MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE = int(
     os.environ.get("MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE", 0)
 )
 
+# Keeps the document IDs of the connector in a SQLite file instead of in memory while
+# pruning, and compares the indexed IDs to them in batches. For connectors with more
+# documents than the pruning worker can hold in memory.
+PRUNING_DISK_BACKED_ID_DIFF = (
+    os.environ.get("PRUNING_DISK_BACKED_ID_DIFF", "").lower() == "true"
+)
+
 # comma delimited list of zendesk article labels to skip indexing for
 ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS = os.environ.get(
     "ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS", ""
@@ -617,6 +714,12 @@ AVERAGE_SUMMARY_EMBEDDINGS = (
 
 MAX_TOKENS_FOR_FULL_INCLUSION = 4096
 
+# How long contextual rag document summaries and chunk contexts are cached, so that
+# re-indexing unchanged content doesn't call the LLM again. 0 disables the cache
+CONTEXTUAL_RAG_CACHE_TTL_SECONDS = int(
+    os.environ.get("CONTEXTUAL_RAG_CACHE_TTL_SECONDS") or 30 * 24 * 60 * 60
+)
+
 #####
 # Miscellaneous
 #####
@@ -799,6 +902,21 @@ IMAGE_ANALYSIS_SYSTEM_PROMPT = os.environ.get(
     DEFAULT_IMAGE_ANALYSIS_SYSTEM_PROMPT,
 )
 
+# Number of images of an indexing batch that are summarized at the same time
+IMAGE_SUMMARIZATION_MAX_WORKERS = int(
+    os.environ.get("IMAGE_SUMMARIZATION_MAX_WORKERS") or 8
+)
+# Max number of image summarization requests in flight to a single LLM provider,
+# shared by all indexing batches of a worker process
+IMAGE_SUMMARIZATION_MAX_CONCURRENT_REQUESTS_PER_PROVIDER = int(
+    os.environ.get("IMAGE_SUMMARIZATION_MAX_CONCURRENT_REQUESTS_PER_PROVIDER") or 4
+)
+# How long summaries are cached by image content, so identical images (logos,
+# repeated diagrams) are only summarized once. 0 disables the cache
+IMAGE_SUMMARY_CACHE_TTL_SECONDS = int(
+    os.environ.get("IMAGE_SUMMARY_CACHE_TTL_SECONDS") or 30 * 24 * 60 * 60
+)
+
 DISABLE_AUTO_AUTH_REFRESH = (
     os.environ.get("DISABLE_AUTO_AUTH_REFRESH", "").lower() == "true"
 )
@@ -822,6 +940,22 @@ S3_VERIFY_SSL = os.environ.get("S3_VERIFY_SSL", "").lower() == "true"
 S3_AWS_ACCESS_KEY_ID = os.environ.get("S3_AWS_ACCESS_KEY_ID")
 S3_AWS_SECRET_ACCESS_KEY = os.environ.get("S3_AWS_SECRET_ACCESS_KEY")
 
+# Files larger than this are uploaded to S3 via a streaming multipart upload
+# instead of a single PUT. Part size must be at least 5MB (an S3 requirement).
+S3_MULTIPART_THRESHOLD = int(
+    os.environ.get("S3_MULTIPART_THRESHOLD") or 16 * 1024 * 1024
+)
+S3_MULTIPART_PART_SIZE = max(
+    int(os.environ.get("S3_MULTIPART_PART_SIZE") or 8 * 1024 * 1024),
+    5 * 1024 * 1024,
+)
+S3_MULTIPART_MAX_CONCURRENCY = int(os.environ.get("S3_MULTIPART_MAX_CONCURRENCY") or 4)
+# If set, the SHA-256 of each saved file is stored alongside the object and
+# re-saving identical content under the same file ID skips the upload entirely
+S3_DEDUPLICATE_BY_CONTENT_HASH = (
+    os.environ.get("S3_DEDUPLICATE_BY_CONTENT_HASH", "").lower() == "true"
+)
+
 # Forcing Vespa Language
 # English: en, German:de, etc. See: https://docs.vespa.ai/en/linguistics.html
 VESPA_LANGUAGE_OVERRIDE = os.environ.get("VESPA_LANGUAGE_OVERRIDE")
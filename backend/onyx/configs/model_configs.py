@@ -25,6 +25,9 @@ DOC_EMBEDDING_CONTEXT_SIZE = 512
 NORMALIZE_EMBEDDINGS = (
     os.environ.get("NORMALIZE_EMBEDDINGS") or "true"
 ).lower() == "true"
+# Directory where the tokenizers of embedding models are saved after being loaded
+# from the HuggingFace hub, so later loads don't need the hub at all
+TOKENIZER_CACHE_DIR = os.environ.get("TOKENIZER_CACHE_DIR") or None
 
 # Old default model settings, which are needed for an automatic easy upgrade
 OLD_DEFAULT_DOCUMENT_ENCODER_MODEL = "thenlper/gte-small"
@@ -46,6 +49,16 @@ EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE") or 0) or None
 BATCH_SIZE_ENCODE_CHUNKS = EMBEDDING_BATCH_SIZE or 8
 # don't send over too many chunks at once, as sending too many could cause timeouts
 BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES = EMBEDDING_BATCH_SIZE or 512
+# Texts are batched by token count, a batch is padded to its longest text. The token
+# budget of a batch defaults to the batch size times the max sequence length, i.e. the
+# same work as a batch of max length texts, so shorter texts (e.g. mini-chunks) go
+# in bigger batches, up to the batch size times this multiplier
+EMBEDDING_BATCH_TOKEN_BUDGET = (
+    int(os.environ.get("EMBEDDING_BATCH_TOKEN_BUDGET") or 0) or None
+)
+EMBEDDING_BATCH_MAX_SIZE_MULTIPLIER = int(
+    os.environ.get("EMBEDDING_BATCH_MAX_SIZE_MULTIPLIER") or 8
+)
 # For score display purposes, only way is to know the expected ranges
 CROSS_ENCODER_RANGE_MAX = 1
 CROSS_ENCODER_RANGE_MIN = 0
@@ -139,3 +152,13 @@ if _LITELLM_EXTRA_BODY_RAW:
 USE_INFORMATION_CONTENT_CLASSIFICATION = (
     os.environ.get("USE_INFORMATION_CONTENT_CLASSIFICATION", "false").lower() == "true"
 )
+# Max number of chunks sent to the model server in one content classification request
+INFORMATION_CONTENT_CLASSIFICATION_BATCH_SIZE = int(
+    os.environ.get("INFORMATION_CONTENT_CLASSIFICATION_BATCH_SIZE") or 64
+)
+# How long content classification scores are cached by chunk content, so that
+# re-indexing unchanged chunks doesn't classify them again. 0 disables the cache
+INFORMATION_CONTENT_CLASSIFICATION_CACHE_TTL_SECONDS = int(
+    os.environ.get("INFORMATION_CONTENT_CLASSIFICATION_CACHE_TTL_SECONDS")
+    or 30 * 24 * 60 * 60
+)
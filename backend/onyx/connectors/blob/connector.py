@@ -1,5 +1,10 @@
+import contextvars
 import os
 import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from datetime import timezone
 from io import BytesIO
@@ -14,7 +19,10 @@ from botocore.exceptions import NoCredentialsError
 from botocore.exceptions import PartialCredentialsError
 from botocore.session import get_session
 from mypy_boto3_s3 import S3Client  # type: ignore
+from mypy_boto3_s3.type_defs import ObjectTypeDef  # type: ignore
 
+from onyx.configs.app_configs import BLOB_STORAGE_MAX_CONCURRENT_DOWNLOADS
+from onyx.configs.app_configs import BLOB_STORAGE_MAX_OBJECT_SIZE_BYTES
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.constants import BlobType
 from onyx.configs.constants import DocumentSource
@@ -236,18 +244,14 @@ class BlobStorageConnector(LoadConnector, PollConnector):
         else:
             raise ValueError(f"Unsupported bucket type: {self.bucket_type}")
 
-    def _yield_blob_objects(
-        self,
-        start: datetime,
-        end: datetime,
-    ) -> GenerateDocumentsOutput:
+    def _list_objects(self, start: datetime, end: datetime) -> Iterator[ObjectTypeDef]:
+        """The objects to index, in listing order."""
         if self.s3_client is None:
             raise ConnectorMissingCredentialError("Blob storage")
 
         paginator = self.s3_client.get_paginator("list_objects_v2")
         pages = paginator.paginate(Bucket=self.bucket_name, Prefix=self.prefix)
 
-        batch: list[Document] = []
         for page in pages:
             if "Contents" not in page:
                 continue
@@ -261,103 +265,154 @@ class BlobStorageConnector(LoadConnector, PollConnector):
                 if not start <= last_modified <= end:
                     continue
 
-                file_name = os.path.basename(obj["Key"])
-                file_ext = get_file_ext(file_name)
                 key = obj["Key"]
-                link = self._get_blob_link(key)
+                if (
+                    is_accepted_file_ext(
+                        get_file_ext(os.path.basename(key)),
+                        OnyxExtensionType.Multimedia,
+                    )
+                    and not self._allow_images
+                ):
+                    logger.debug(
+                        f"Skipping image file: {key} (image processing not enabled)"
+                    )
+                    continue
 
-                # Handle image files
-                if is_accepted_file_ext(file_ext, OnyxExtensionType.Multimedia):
-                    if not self._allow_images:
-                        logger.debug(
-                            f"Skipping image file: {key} (image processing not enabled)"
-                        )
-                        continue
-
-                    # Process the image file
-                    try:
-                        downloaded_file = self._download_object(key)
-
-                        # TODO: Refactor to avoid direct DB access in connector
-                        # This will require broader refactoring across the codebase
-                        image_section, _ = store_image_and_create_section(
-                            image_data=downloaded_file,
-                            file_id=f"{self.bucket_type}_{self.bucket_name}_{key.replace('/', '_')}",
-                            display_name=file_name,
-                            link=link,
-                            file_origin=FileOrigin.CONNECTOR,
-                        )
+                # the listing has the size of each object, same as the
+                # ContentLength of a HEAD request, so it's checked before downloading
+                if obj.get("Size", 0) > BLOB_STORAGE_MAX_OBJECT_SIZE_BYTES:
+                    logger.warning(
+                        f"Skipping {key}: {obj['Size']} bytes is over the limit of "
+                        f"{BLOB_STORAGE_MAX_OBJECT_SIZE_BYTES} bytes"
+                    )
+                    continue
 
-                        batch.append(
-                            Document(
-                                id=f"{self.bucket_type}:{self.bucket_name}:{key}",
-                                sections=[image_section],
-                                source=DocumentSource(self.bucket_type.value),
-                                semantic_identifier=file_name,
-                                doc_updated_at=last_modified,
-                                metadata={},
-                            )
-                        )
+                yield obj
+
+    def _process_object(self, obj: ObjectTypeDef) -> Document | None:
+        key = obj["Key"]
+        last_modified = obj["LastModified"].replace(tzinfo=timezone.utc)
+        file_name = os.path.basename(key)
+        file_ext = get_file_ext(file_name)
+        link = self._get_blob_link(key)
+
+        # Handle image files
+        if is_accepted_file_ext(file_ext, OnyxExtensionType.Multimedia):
+            # Process the image file
+            try:
+                downloaded_file = self._download_object(key)
+
+                # TODO: Refactor to avoid direct DB access in connector
+                # This will require broader refactoring across the codebase
+                image_section, _ = store_image_and_create_section(
+                    image_data=downloaded_file,
+                    file_id=f"{self.bucket_type}_{self.bucket_name}_{key.replace('/', '_')}",
+                    display_name=file_name,
+                    link=link,
+                    file_origin=FileOrigin.CONNECTOR,
+                )
 
-                        if len(batch) == self.batch_size:
-                            yield batch
-                            batch = []
-                    except Exception:
-                        logger.exception(f"Error processing image {key}")
-                    continue
+                return Document(
+                    id=f"{self.bucket_type}:{self.bucket_name}:{key}",
+                    sections=[image_section],
+                    source=DocumentSource(self.bucket_type.value),
+                    semantic_identifier=file_name,
+                    doc_updated_at=last_modified,
+                    metadata={},
+                )
+            except Exception:
+                logger.exception(f"Error processing image {key}")
+            return None
 
-                # Handle text and document files
-                try:
-                    downloaded_file = self._download_object(key)
-                    extraction_result = extract_text_and_images(
-                        BytesIO(downloaded_file), file_name=file_name
-                    )
+        # Handle text and document files
+        try:
+            downloaded_file = self._download_object(key)
+            extraction_result = extract_text_and_images(
+                BytesIO(downloaded_file), file_name=file_name
+            )
 
-                    onyx_metadata, custom_tags = process_onyx_metadata(
-                        extraction_result.metadata
+            onyx_metadata, custom_tags = process_onyx_metadata(
+                extraction_result.metadata
+            )
+            file_display_name = onyx_metadata.file_display_name or file_name
+            time_updated = onyx_metadata.doc_updated_at or last_modified
+            link = onyx_metadata.link or link
+            primary_owners = onyx_metadata.primary_owners
+            secondary_owners = onyx_metadata.secondary_owners
+
+            sections: list[TextSection | ImageSection] = []
+            if extraction_result.text_content.strip():
+                logger.debug(f"Creating TextSection for {file_name} with link: {link}")
+                sections.append(
+                    TextSection(
+                        link=link,
+                        text=extraction_result.text_content.strip(),
                     )
-                    file_display_name = onyx_metadata.file_display_name or file_name
-                    time_updated = onyx_metadata.doc_updated_at or last_modified
-                    link = onyx_metadata.link or link
-                    primary_owners = onyx_metadata.primary_owners
-                    secondary_owners = onyx_metadata.secondary_owners
-
-                    sections: list[TextSection | ImageSection] = []
-                    if extraction_result.text_content.strip():
-                        logger.debug(
-                            f"Creating TextSection for {file_name} with link: {link}"
-                        )
-                        sections.append(
-                            TextSection(
-                                link=link,
-                                text=extraction_result.text_content.strip(),
-                            )
-                        )
+                )
+
+            return Document(
+                id=f"{self.bucket_type}:{self.bucket_name}:{key}",
+                sections=(sections if sections else [TextSection(link=link, text="")]),
+                source=DocumentSource(self.bucket_type.value),
+                semantic_identifier=file_display_name,
+                doc_updated_at=time_updated,
+                metadata=custom_tags,
+                primary_owners=primary_owners,
+                secondary_owners=secondary_owners,
+            )
+        except Exception:
+            logger.exception(f"Error decoding object {key} as UTF-8")
+        return None
 
-                    batch.append(
-                        Document(
-                            id=f"{self.bucket_type}:{self.bucket_name}:{key}",
-                            sections=(
-                                sections
-                                if sections
-                                else [TextSection(link=link, text="")]
-                            ),
-                            source=DocumentSource(self.bucket_type.value),
-                            semantic_identifier=file_display_name,
-                            doc_updated_at=time_updated,
-                            metadata=custom_tags,
-                            primary_owners=primary_owners,
-                            secondary_owners=secondary_owners,
+    def _yield_blob_objects(
+        self,
+        start: datetime,
+        end: datetime,
+    ) -> GenerateDocumentsOutput:
+        """Objects are downloaded and extracted concurrently, documents are still
+        yielded in listing order."""
+        if self.s3_client is None:
+            raise ConnectorMissingCredentialError("Blob storage")
+
+        download_executor = ThreadPoolExecutor(
+            max_workers=BLOB_STORAGE_MAX_CONCURRENT_DOWNLOADS,
+            thread_name_prefix="blob_download",
+        )
+        try:
+            in_flight: deque[Future[Document | None]] = deque()
+            batch: list[Document] = []
+            objects = self._list_objects(start, end)
+            while True:
+                # keeps a few objects ahead of the download threads, without
+                # holding many downloaded objects in memory
+                while len(in_flight) < 2 * BLOB_STORAGE_MAX_CONCURRENT_DOWNLOADS:
+                    obj = next(objects, None)
+                    if obj is None:
+                        break
+                    in_flight.append(
+                        download_executor.submit(
+                            contextvars.copy_context().run,
+                            self._process_object,
+                            obj,
                         )
                     )
-                    if len(batch) == self.batch_size:
-                        yield batch
-                        batch = []
 
-                except Exception:
-                    logger.exception(f"Error decoding object {key} as UTF-8")
-        if batch:
-            yield batch
+                if not in_flight:
+                    break
+
+                doc = in_flight.popleft().result()
+                if doc is None:
+                    continue
+
+                batch.append(doc)
+                if len(batch) == self.batch_size:
+                    yield batch
+                    batch = []
+
+            if batch:
+                yield batch
+        finally:
+            download_executor.shutdown(wait=False, cancel_futures=True)
 
     def load_from_state(self) -> GenerateDocumentsOutput:
         logger.debug("Loading blob objects")
@@ -0,0 +1,113 @@
+"""Remembers the converted content of Confluence attachments by attachment id and
+version, so that re-indexing a page doesn't download and convert its unchanged
+attachments again.
+
+Only attachments that were converted successfully are cached. Images are only taken
+from the cache while the image they were stored as is still in the file store."""
+
+import hashlib
+from typing import Any
+from typing import cast
+
+from pydantic import BaseModel
+
+from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_ATTACHMENT_CACHE_TTL_SECONDS
+from onyx.configs.constants import FileOrigin
+from onyx.file_store.file_store import get_default_file_store
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_ATTACHMENT_CACHE_KEY_PREFIX = "confluence_attachment_content"
+
+
+class CachedAttachmentContent(BaseModel):
+    text: str | None
+    file_name: str | None
+
+
+class AttachmentContentCache:
+    def __init__(self, wiki_base: str) -> None:
+        # attachment ids are only unique within a Confluence instance
+        self.key_prefix = (
+            f"{_ATTACHMENT_CACHE_KEY_PREFIX}:"
+            f"{hashlib.sha256(wiki_base.encode('utf-8')).hexdigest()[:16]}"
+        )
+
+    def _get_key(self, attachment: dict[str, Any], allow_images: bool) -> str | None:
+        version = attachment.get("version", {}).get("number")
+        if version is None:
+            return None
+        # the content of an attachment depends on whether images are processed
+        return f"{self.key_prefix}:{attachment['id']}:{version}:{int(allow_images)}"
+
+    def get_many(
+        self, attachments: list[dict[str, Any]], allow_images: bool
+    ) -> dict[str, CachedAttachmentContent]:
+        """Cached content of the attachments, by attachment id."""
+        if CONFLUENCE_CONNECTOR_ATTACHMENT_CACHE_TTL_SECONDS <= 0:
+            return {}
+
+        keys_by_id = {
+            attachment["id"]: key
+            for attachment in attachments
+            if (key := self._get_key(attachment, allow_images))
+        }
+        if not keys_by_id:
+            return {}
+
+        try:
+            values = cast(
+                list[bytes | None], get_redis_client().mget(list(keys_by_id.values()))
+            )
+            cached = {
+                attachment_id: CachedAttachmentContent.model_validate_json(value)
+                for attachment_id, value in zip(keys_by_id, values)
+                if value is not None
+            }
+
+            media_types = {
+                attachment["id"]: attachment.get("metadata", {}).get("mediaType", "")
+                for attachment in attachments
+            }
+            file_store = get_default_file_store()
+            for attachment_id, content in list(cached.items()):
+                if content.file_name and not file_store.has_file(
+                    file_id=content.file_name,
+                    file_origin=FileOrigin.CONNECTOR,
+                    file_type=media_types[attachment_id],
+                ):
+                    del cached[attachment_id]
+        except Exception as e:
+            logger.warning(f"Failed to load cached Confluence attachments: {e}")
+            return {}
+
+        return cached
+
+    def set(
+        self,
+        attachment: dict[str, Any],
+        allow_images: bool,
+        text: str | None,
+        file_name: str | None,
+    ) -> None:
+        if CONFLUENCE_CONNECTOR_ATTACHMENT_CACHE_TTL_SECONDS <= 0:
+            return
+
+        key = self._get_key(attachment, allow_images)
+        if key is None:
+            return
+
+        try:
+            get_redis_client().set(
+                key,
+                CachedAttachmentContent(
+                    text=text, file_name=file_name
+                ).model_dump_json(),
+                ex=CONFLUENCE_CONNECTOR_ATTACHMENT_CACHE_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(
+                f"Failed to cache Confluence attachment {attachment['id']}: {e}"
+            )
@@ -9,6 +9,7 @@ from requests.exceptions import HTTPError
 from typing_extensions import override
 
 from onyx.access.models import ExternalAccess
+from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_ATTACHMENT_CONCURRENCY
 from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_LABELS_TO_SKIP
 from onyx.configs.app_configs import CONFLUENCE_TIMEZONE_OFFSET
 from onyx.configs.app_configs import CONTINUE_ON_CONNECTOR_FAILURE
@@ -16,8 +17,10 @@ from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.confluence.access import get_all_space_permissions
 from onyx.connectors.confluence.access import get_page_restrictions
+from onyx.connectors.confluence.attachment_cache import AttachmentContentCache
 from onyx.connectors.confluence.onyx_confluence import extract_text_from_confluence_html
 from onyx.connectors.confluence.onyx_confluence import OnyxConfluence
+from onyx.connectors.confluence.utils import AttachmentProcessingResult
 from onyx.connectors.confluence.utils import build_confluence_document_id
 from onyx.connectors.confluence.utils import convert_attachment_to_content
 from onyx.connectors.confluence.utils import datetime_from_string
@@ -50,6 +53,7 @@ from onyx.connectors.models import SlimDocument
 from onyx.connectors.models import TextSection
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 # Potential Improvements
@@ -125,6 +129,7 @@ class ConfluenceConnector(
 
         # Remove trailing slash from wiki_base if present
         self.wiki_base = wiki_base.rstrip("/")
+        self._attachment_cache = AttachmentContentCache(self.wiki_base)
         """
         If nothing is provided, we default to fetching all pages
         Only one or none of the following options should be specified so
@@ -306,15 +311,27 @@ class ConfluenceConnector(
                     page_id, expand="metadata"
                 )
 
-                for attachment in attachments.get("results", []):
-                    # Process each attachment
-                    result = process_attachment(
-                        self.confluence_client,
-                        attachment,
-                        page_id,
-                        self.allow_images,
+                attachment_results = attachments.get("results", [])
+                # Process the attachments in parallel
+                results: list[AttachmentProcessingResult] = (
+                    run_functions_tuples_in_parallel(
+                        [
+                            (
+                                process_attachment,
+                                (
+                                    self.confluence_client,
+                                    attachment,
+                                    page_id,
+                                    self.allow_images,
+                                ),
+                            )
+                            for attachment in attachment_results
+                        ],
+                        max_workers=CONFLUENCE_CONNECTOR_ATTACHMENT_CONCURRENCY,
                     )
+                )
 
+                for attachment, result in zip(attachment_results, results):
                     if result and result.text:
                         # Create a section for the attachment text
                         attachment_section = TextSection(
@@ -381,11 +398,10 @@ class ConfluenceConnector(
                 exception=e,
             )
 
-    def _fetch_page_attachments(
-        self, page: dict[str, Any], doc: Document
-    ) -> Document | ConnectorFailure:
+    def _get_page_attachments(self, page: dict[str, Any]) -> list[dict[str, Any]]:
         attachment_query = self._construct_attachment_query(page["id"])
 
+        attachments = []
         for attachment in self.confluence_client.paginated_cql_retrieval(
             cql=attachment_query,
             expand=",".join(_ATTACHMENT_EXPANSION_FIELDS),
@@ -410,41 +426,68 @@ class ConfluenceConnector(
                 )
                 continue
 
-            logger.info(
-                f"Processing attachment: {attachment['title']} attached to page {page['title']}"
+            attachments.append(attachment)
+        return attachments
+
+    def _convert_attachment(
+        self, page: dict[str, Any], attachment: dict[str, Any]
+    ) -> tuple[str | None, str | None] | None | Exception:
+        """Returns the exception instead of raising it, so that the first failing
+        attachment of the page is reported no matter which one fails first."""
+        logger.info(
+            f"Processing attachment: {attachment['title']} attached to page {page['title']}"
+        )
+        try:
+            response = convert_attachment_to_content(
+                confluence_client=self.confluence_client,
+                attachment=attachment,
+                page_id=page["id"],
+                allow_images=self.allow_images,
+            )
+        except Exception as e:
+            return e
+
+        if response is not None:
+            self._attachment_cache.set(attachment, self.allow_images, *response)
+        return response
+
+    def _fetch_page_attachments(
+        self, page: dict[str, Any], doc: Document
+    ) -> Document | ConnectorFailure:
+        attachments = self._get_page_attachments(page)
+        cached = self._attachment_cache.get_many(attachments, self.allow_images)
+
+        # attachments are downloaded and converted in parallel, the client retries
+        # them when rate limited like any other call
+        uncached = [
+            attachment for attachment in attachments if attachment["id"] not in cached
+        ]
+        converted = dict(
+            zip(
+                (attachment["id"] for attachment in uncached),
+                run_functions_tuples_in_parallel(
+                    [
+                        (self._convert_attachment, (page, attachment))
+                        for attachment in uncached
+                    ],
+                    max_workers=CONFLUENCE_CONNECTOR_ATTACHMENT_CONCURRENCY,
+                ),
             )
+        )
 
-            # Attempt to get textual content or image summarization:
+        for attachment in attachments:
             object_url = build_confluence_document_id(
                 self.wiki_base, attachment["_links"]["webui"], self.is_cloud
             )
-            try:
-                response = convert_attachment_to_content(
-                    confluence_client=self.confluence_client,
-                    attachment=attachment,
-                    page_id=page["id"],
-                    allow_images=self.allow_images,
-                )
-                if response is None:
-                    continue
-
-                content_text, file_storage_name = response
+            if attachment["id"] in cached:
+                logger.info(f"Using cached attachment: {attachment['title']}")
+                cached_content = cached[attachment["id"]]
+                response = cached_content.text, cached_content.file_name
+            else:
+                response = converted[attachment["id"]]
 
-                if content_text:
-                    doc.sections.append(
-                        TextSection(
-                            text=content_text,
-                            link=object_url,
-                        )
-                    )
-                elif file_storage_name:
-                    doc.sections.append(
-                        ImageSection(
-                            link=object_url,
-                            image_file_id=file_storage_name,
-                        )
-                    )
-            except Exception as e:
+            if isinstance(response, Exception):
+                e = response
                 logger.error(
                     f"Failed to extract/summarize attachment {attachment['title']}",
                     exc_info=e,
@@ -452,7 +495,7 @@ class ConfluenceConnector(
                 if is_atlassian_date_error(
                     e
                 ):  # propagate error to be caught and retried
-                    raise
+                    raise e
                 return ConnectorFailure(
                     failed_document=DocumentFailure(
                         document_id=doc.id,
@@ -461,6 +504,25 @@ class ConfluenceConnector(
                     failure_message=f"Failed to extract/summarize attachment {attachment['title']} for doc {doc.id}",
                     exception=e,
                 )
+            if response is None:
+                continue
+
+            content_text, file_storage_name = response
+
+            if content_text:
+                doc.sections.append(
+                    TextSection(
+                        text=content_text,
+                        link=object_url,
+                    )
+                )
+            elif file_storage_name:
+                doc.sections.append(
+                    ImageSection(
+                        link=object_url,
+                        image_file_id=file_storage_name,
+                    )
+                )
         return doc
 
     def _fetch_document_batches(
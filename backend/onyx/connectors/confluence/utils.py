@@ -164,18 +164,19 @@ def process_attachment(
         )
 
         # Download the attachment
-        resp: requests.Response = confluence_client._session.get(attachment_link)
-        if resp.status_code != 200:
+        try:
+            raw_bytes = _download_attachment(confluence_client, attachment_link)
+        except requests.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
             logger.warning(
-                f"Failed to fetch {attachment_link} with status code {resp.status_code}"
+                f"Failed to fetch {attachment_link} with status code {status_code}"
             )
             return AttachmentProcessingResult(
                 text=None,
                 file_name=None,
-                error=f"Attachment download status code is {resp.status_code}",
+                error=f"Attachment download status code is {status_code}",
             )
 
-        raw_bytes = resp.content
         if not raw_bytes:
             return AttachmentProcessingResult(
                 text=None, file_name=None, error="attachment.content is None"
@@ -390,6 +391,17 @@ def handle_confluence_rate_limit(confluence_call: F) -> F:
     return cast(F, wrapped_call)
 
 
+# downloads go through the session of the client directly, so they are retried
+# here the same way as the calls made through the client
+@handle_confluence_rate_limit
+def _download_attachment(
+    confluence_client: "OnyxConfluence", attachment_link: str
+) -> bytes:
+    resp: requests.Response = confluence_client._session.get(attachment_link)
+    resp.raise_for_status()
+    return resp.content
+
+
 def _handle_http_error(e: requests.HTTPError, attempt: int) -> int:
     MIN_DELAY = 2
     MAX_DELAY = 60
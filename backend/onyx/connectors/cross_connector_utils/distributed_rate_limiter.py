@@ -0,0 +1,305 @@
+"""Rate limiting for the API of a source that is shared by every worker using the same
+credential, unlike `rate_limit_builder`, which only limits the calls of one process.
+
+Each (source, credential) has a token bucket in Redis holding up to `max_calls`
+tokens, refilled at `max_calls` per `period`. A call takes a token or waits for
+one. Responses of the API can shrink the bucket: a `Retry-After` header (or a 429)
+blocks every worker until it has passed, and `X-RateLimit-Remaining` caps the tokens
+left, with `X-RateLimit-Reset` blocking the workers once it reaches 0.
+
+If Redis can't be reached, calls are let through, so that a Redis outage doesn't
+stop indexing."""
+
+import hashlib
+import time
+from collections.abc import Callable
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+from functools import wraps
+from typing import Any
+from typing import cast
+from typing import TypeVar
+
+import requests
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    RateLimitTriedTooManyTimesError,
+)
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+F = TypeVar("F", bound=Callable[..., Any])
+R = TypeVar("R", bound=Callable[..., requests.Response])
+
+_RATE_LIMIT_KEY_PREFIX = "connector_rate_limit"
+# waits are done in steps, so that a worker notices when another one was told to
+# back off or when tokens were freed up
+_MAX_SLEEP_SECONDS = 5.0
+# resets further away than this are taken to be a unix timestamp, not a delay
+_MAX_RESET_DELAY_SECONDS = 365 * 24 * 60 * 60
+
+# Returns how long to wait before the tokens can be taken, "0" if they were taken.
+# Floats are returned as strings since Lua numbers are truncated to integers.
+_TAKE_TOKENS_SCRIPT = """
+local key = KEYS[1]
+local max_tokens = tonumber(ARGV[1])
+local tokens_per_second = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+
+local redis_time = redis.call('TIME')
+local now = tonumber(redis_time[1]) + tonumber(redis_time[2]) / 1000000
+
+local state = redis.call('HMGET', key, 'tokens', 'updated_at', 'blocked_until')
+local tokens = tonumber(state[1]) or max_tokens
+local updated_at = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+
+if blocked_until > now then
+    return tostring(blocked_until - now)
+end
+
+tokens = math.min(max_tokens, tokens + math.max(0, now - updated_at) * tokens_per_second)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / tokens_per_second
+end
+
+redis.call('HSET', key, 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', key, ttl)
+return tostring(wait)
+"""
+
+# ARGV[1] is the most tokens the API allows right now, negative if it didn't say
+_LIMIT_TOKENS_SCRIPT = """
+local key = KEYS[1]
+local max_tokens = tonumber(ARGV[1])
+local blocked_for = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+
+local redis_time = redis.call('TIME')
+local now = tonumber(redis_time[1]) + tonumber(redis_time[2]) / 1000000
+
+if max_tokens >= 0 then
+    local tokens = tonumber(redis.call('HGET', key, 'tokens'))
+    if tokens == nil or tokens > max_tokens then
+        redis.call('HSET', key, 'tokens', tostring(max_tokens), 'updated_at', tostring(now))
+    end
+end
+
+if blocked_for > 0 then
+    local blocked_until = tonumber(redis.call('HGET', key, 'blocked_until')) or 0
+    redis.call(
+        'HSET', key,
+        'blocked_until', tostring(math.max(blocked_until, now + blocked_for)),
+        'tokens', '0',
+        'updated_at', tostring(now)
+    )
+end
+
+redis.call('EXPIRE', key, ttl)
+return 0
+"""
+
+
+def _get_header(headers: Mapping[str, str], name: str) -> str | None:
+    # requests and httpx headers are case insensitive, plain dicts are not
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    return value
+
+
+def _parse_retry_after(value: str) -> float | None:
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    # Retry-After can also be an HTTP date
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_reset(value: str) -> float | None:
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+
+    if reset > _MAX_RESET_DELAY_SECONDS:
+        return max(reset - time.time(), 0.0)
+    return max(reset, 0.0)
+
+
+def get_rate_limit_from_headers(
+    headers: Mapping[str, str], status_code: int | None = None
+) -> tuple[int | None, float]:
+    """The calls the API still allows (None if it didn't say) and how long to wait
+    before making any more calls."""
+    wait_seconds = 0.0
+    retry_after = _get_header(headers, "Retry-After")
+    if retry_after is not None:
+        wait_seconds = _parse_retry_after(retry_after) or 0.0
+
+    remaining: int | None = None
+    remaining_header = _get_header(headers, "X-RateLimit-Remaining")
+    if remaining_header is not None:
+        try:
+            remaining = max(int(float(remaining_header)), 0)
+        except ValueError:
+            pass
+
+    if status_code == 429:
+        remaining = 0
+
+    if remaining == 0 and not wait_seconds:
+        reset = _get_header(headers, "X-RateLimit-Reset")
+        if reset is not None:
+            wait_seconds = _parse_reset(reset) or 0.0
+
+    return remaining, wait_seconds
+
+
+class DistributedRateLimiter:
+    """Limits the calls made with one credential to the API of a source to `max_calls`
+    per `period` across all workers.
+
+    `credential_key` identifies the credential, e.g. its id. It is hashed before it is
+    stored, so a token can be used as well."""
+
+    def __init__(
+        self,
+        source: DocumentSource,
+        credential_key: str,
+        max_calls: int,
+        period: float,  # in seconds
+        max_wait_seconds: float = 600,
+        default_retry_after_seconds: float = 30,
+    ) -> None:
+        if max_calls <= 0 or period <= 0:
+            raise ValueError("max_calls and period must be positive")
+
+        self.source = source
+        self.max_calls = max_calls
+        self.period = period
+        self.max_wait_seconds = max_wait_seconds
+        self.default_retry_after_seconds = default_retry_after_seconds
+        self.credential_hash = hashlib.sha256(
+            credential_key.encode("utf-8")
+        ).hexdigest()[:16]
+
+    @property
+    def _key(self) -> str:
+        # scripts aren't prefixed by the tenant redis client
+        return (
+            f"{get_current_tenant_id()}:{_RATE_LIMIT_KEY_PREFIX}:"
+            f"{self.source.value}:{self.credential_hash}"
+        )
+
+    @property
+    def _ttl_seconds(self) -> int:
+        # an idle bucket is full again after one period
+        return int(self.period) + 1
+
+    def _take_tokens(self, tokens: int) -> float:
+        redis_client = get_redis_client()
+        wait_seconds = redis_client.register_script(_TAKE_TOKENS_SCRIPT)(
+            keys=[self._key],
+            args=[
+                self.max_calls,
+                self.max_calls / self.period,
+                tokens,
+                self._ttl_seconds,
+            ],
+        )
+        return float(cast(bytes, wait_seconds))
+
+    def acquire(self, tokens: int = 1) -> None:
+        """Waits until the tokens are taken from the bucket."""
+        tokens = min(tokens, self.max_calls)
+        waited = 0.0
+        while True:
+            try:
+                wait_seconds = self._take_tokens(tokens)
+            except Exception as e:
+                logger.warning(
+                    f"Failed to check the {self.source.value} rate limit, "
+                    f"not limiting the call: {e}"
+                )
+                return
+
+            if wait_seconds <= 0:
+                return
+
+            if waited + wait_seconds > self.max_wait_seconds:
+                raise RateLimitTriedTooManyTimesError(
+                    f"Waited over {self.max_wait_seconds} seconds for the "
+                    f"{self.source.value} rate limit"
+                )
+
+            sleep_seconds = min(wait_seconds, _MAX_SLEEP_SECONDS)
+            logger.debug(
+                f"Rate limited by {self.source.value}, "
+                f"waiting {sleep_seconds:.2f} seconds"
+            )
+            time.sleep(sleep_seconds)
+            waited += sleep_seconds
+
+    def update_from_response(
+        self, headers: Mapping[str, str], status_code: int | None = None
+    ) -> None:
+        """Shrinks the bucket to what the API says is left of its own limit."""
+        remaining, wait_seconds = get_rate_limit_from_headers(headers, status_code)
+        if status_code == 429 and not wait_seconds:
+            wait_seconds = self.default_retry_after_seconds
+        if remaining is None and not wait_seconds:
+            return
+
+        try:
+            redis_client = get_redis_client()
+            redis_client.register_script(_LIMIT_TOKENS_SCRIPT)(
+                keys=[self._key],
+                args=[
+                    -1 if remaining is None else remaining,
+                    wait_seconds,
+                    max(self._ttl_seconds, int(wait_seconds) + 1),
+                ],
+            )
+        except Exception as e:
+            logger.warning(f"Failed to update the {self.source.value} rate limit: {e}")
+
+    def __call__(self, func: F) -> F:
+        """Decorator that takes a token before every call of `func`."""
+
+        @wraps(func)
+        def wrapped_func(*args: Any, **kwargs: Any) -> Any:
+            self.acquire()
+            return func(*args, **kwargs)
+
+        return cast(F, wrapped_func)
+
+    def wrap_request(self, request_fn: R, max_retries: int = 10) -> R:
+        """Like `wrap_request_to_handle_ratelimiting`, but the wait is shared with the
+        other workers and the bucket follows the rate limit headers of the responses."""
+
+        @wraps(request_fn)
+        def wrapped_request(*args: Any, **kwargs: Any) -> requests.Response:
+            for _ in range(max_retries):
+                self.acquire()
+                response = request_fn(*args, **kwargs)
+                self.update_from_response(response.headers, response.status_code)
+                if response.status_code != 429:
+                    return response
+
+            raise RateLimitTriedTooManyTimesError(f"Exceeded '{max_retries}' retries")
+
+        return cast(R, wrapped_request)
@@ -16,17 +16,24 @@ from github.Issue import Issue
 from github.NamedUser import NamedUser
 from github.PaginatedList import PaginatedList
 from github.PullRequest import PullRequest
-from pydantic import BaseModel
 from typing_extensions import override
 
 from onyx.access.models import ExternalAccess
 from onyx.configs.app_configs import GITHUB_CONNECTOR_BASE_URL
+from onyx.configs.app_configs import GITHUB_CONNECTOR_USE_GRAPHQL
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.connector_runner import ConnectorRunner
 from onyx.connectors.exceptions import ConnectorValidationError
 from onyx.connectors.exceptions import CredentialExpiredError
 from onyx.connectors.exceptions import InsufficientPermissionsError
 from onyx.connectors.exceptions import UnexpectedValidationError
+from onyx.connectors.github.graphql import convert_graphql_issue_to_document
+from onyx.connectors.github.graphql import convert_graphql_pr_to_document
+from onyx.connectors.github.graphql import fetch_issues_page
+from onyx.connectors.github.graphql import fetch_pull_requests_page
+from onyx.connectors.github.graphql import get_updated_at
+from onyx.connectors.github.graphql import GraphQLPage
+from onyx.connectors.github.models import DocMetadata
 from onyx.connectors.github.models import SerializedRepository
 from onyx.connectors.github.rate_limit_utils import sleep_after_rate_limit_exception
 from onyx.connectors.github.utils import deserialize_repository
@@ -66,10 +73,6 @@ SLIM_BATCH_SIZE = 100
 # checkpoint progress (no infinite loop)
 
 
-class DocMetadata(BaseModel):
-    repo: str
-
-
 def get_nextUrl_key(pag_list: PaginatedList[PullRequest | Issue]) -> str:
     if "_PaginatedList__nextUrl" in pag_list.__dict__:
         return "_PaginatedList__nextUrl"
@@ -218,6 +221,36 @@ def _get_batch_rate_limited(
         )
 
 
+def _is_graphql_rate_limit_error(e: GithubException) -> bool:
+    # GraphQL reports running out of its rate limit as an error in the response
+    # body instead of with a 403
+    errors = (e.data or {}).get("errors") if isinstance(e.data, dict) else None
+    return any(
+        isinstance(error, dict) and error.get("type") == "RATE_LIMITED"
+        for error in errors or []
+    )
+
+
+def _get_graphql_page_rate_limited(
+    fetch_page: Callable[[], GraphQLPage],
+    github_client: Github,
+    attempt_num: int = 0,
+) -> GraphQLPage:
+    if attempt_num > _MAX_NUM_RATE_LIMIT_RETRIES:
+        raise RuntimeError(
+            "Re-tried fetching batch too many times. Something is going wrong with fetching objects from Github"
+        )
+    try:
+        return fetch_page()
+    except RateLimitExceededException:
+        sleep_after_rate_limit_exception(github_client, graphql=True)
+    except GithubException as e:
+        if not _is_graphql_rate_limit_error(e):
+            raise
+        sleep_after_rate_limit_exception(github_client, graphql=True)
+    return _get_graphql_page_rate_limited(fetch_page, github_client, attempt_num + 1)
+
+
 def _get_userinfo(user: NamedUser) -> dict[str, str]:
     return {
         k: v
@@ -402,12 +435,14 @@ class GithubConnector(CheckpointedConnectorWithPermSync[GithubConnectorCheckpoin
         state_filter: str = "all",
         include_prs: bool = True,
         include_issues: bool = False,
+        use_graphql: bool = GITHUB_CONNECTOR_USE_GRAPHQL,
     ) -> None:
         self.repo_owner = repo_owner
         self.repositories = repositories
         self.state_filter = state_filter
         self.include_prs = include_prs
         self.include_issues = include_issues
+        self.use_graphql = use_graphql
         self.github_client: Github | None = None
 
     def load_credentials(self, credentials: dict[str, Any]) -> dict[str, Any] | None:
@@ -504,6 +539,155 @@ class GithubConnector(CheckpointedConnectorWithPermSync[GithubConnectorCheckpoin
             state=self.state_filter, sort="updated", direction="desc"
         )
 
+    def _fetch_graphql_batch(
+        self,
+        checkpoint: GithubConnectorCheckpoint,
+        repo: Repository.Repository,
+        start: datetime | None,
+        end: datetime | None,
+        repo_external_access: ExternalAccess | None,
+    ) -> Generator[Document | ConnectorFailure, None, bool]:
+        """Fetches the next page of PRs or issues, depending on the stage. The GraphQL
+        cursor is kept in the checkpoint like the REST cursor url. Returns whether
+        the stage is done."""
+        if self.github_client is None:
+            raise ConnectorMissingCredentialError("GitHub")
+        github_client = self.github_client
+
+        cursor = checkpoint.cursor_url
+        if cursor and cursor.startswith("http"):
+            # left by the REST API, e.g. if the fetch mode was changed mid-run
+            logger.warning(
+                "Found a REST cursor url in the checkpoint, starting from the first page"
+            )
+            checkpoint.reset()
+            cursor = None
+
+        is_prs = checkpoint.stage == GithubConnectorStage.PRS
+        if is_prs:
+            page = _get_graphql_page_rate_limited(
+                lambda: fetch_pull_requests_page(
+                    github_client,
+                    repo.full_name,
+                    self.state_filter,
+                    ITEMS_PER_PAGE,
+                    cursor,
+                ),
+                github_client,
+            )
+        else:
+            page = _get_graphql_page_rate_limited(
+                lambda: fetch_issues_page(
+                    github_client,
+                    repo.full_name,
+                    self.state_filter,
+                    ITEMS_PER_PAGE,
+                    cursor,
+                    since=start,
+                ),
+                github_client,
+            )
+        checkpoint.curr_page += 1
+
+        cursor_url_callback = make_cursor_url_callback(checkpoint)
+        num_objs = checkpoint.num_retrieved
+        for node in page.nodes:
+            num_objs += 1
+            updated_at = get_updated_at(node)
+            # we iterate backwards in time, so at this point we are done
+            if start is not None and updated_at < start:
+                cursor_url_callback(page.end_cursor, num_objs)
+                return True
+            if end is not None and updated_at > end:
+                continue
+
+            try:
+                if is_prs:
+                    yield convert_graphql_pr_to_document(node, repo_external_access)
+                else:
+                    yield convert_graphql_issue_to_document(node, repo_external_access)
+            except Exception as e:
+                error_msg = (
+                    f"Error converting {'PR' if is_prs else 'issue'} to document: {e}"
+                )
+                logger.exception(error_msg)
+                yield ConnectorFailure(
+                    failed_document=DocumentFailure(
+                        document_id=str(node.get("databaseId")),
+                        document_link=node.get("url"),
+                    ),
+                    failure_message=error_msg,
+                    exception=e,
+                )
+
+        cursor_url_callback(page.end_cursor, num_objs)
+        logger.info(
+            f"Fetched {len(page.nodes)} {'PRs' if is_prs else 'issues'} "
+            f"for repo: {repo.name}"
+        )
+        return not page.has_next_page
+
+    def _fetch_from_github_graphql(
+        self,
+        checkpoint: GithubConnectorCheckpoint,
+        repo: Repository.Repository,
+        start: datetime | None,
+        end: datetime | None,
+        repo_external_access: ExternalAccess | None,
+    ) -> Generator[Document | ConnectorFailure, None, GithubConnectorCheckpoint]:
+        if checkpoint.stage == GithubConnectorStage.PRS:
+            if self.include_prs:
+                logger.info(f"Fetching PRs with GraphQL for repo: {repo.name}")
+                done_with_prs = yield from self._fetch_graphql_batch(
+                    checkpoint, repo, start, end, repo_external_access
+                )
+                if not done_with_prs:
+                    return checkpoint
+
+            checkpoint.stage = GithubConnectorStage.ISSUES
+            checkpoint.reset()
+
+        if self.include_issues:
+            logger.info(f"Fetching issues with GraphQL for repo: {repo.name}")
+            done_with_issues = yield from self._fetch_graphql_batch(
+                checkpoint, repo, start, end, repo_external_access
+            )
+            if not done_with_issues:
+                return checkpoint
+
+        checkpoint.stage = GithubConnectorStage.PRS
+        checkpoint.reset()
+        return self._move_to_next_repo(checkpoint)
+
+    def _move_to_next_repo(
+        self, checkpoint: GithubConnectorCheckpoint
+    ) -> GithubConnectorCheckpoint:
+        if self.github_client is None:
+            raise ConnectorMissingCredentialError("GitHub")
+        if checkpoint.cached_repo_ids is None:
+            raise ValueError("No repo ids saved in checkpoint")
+
+        checkpoint.has_more = len(checkpoint.cached_repo_ids) > 0
+        if checkpoint.cached_repo_ids:
+            next_id = checkpoint.cached_repo_ids.pop()
+            next_repo = self.github_client.get_repo(next_id)
+            checkpoint.cached_repo = SerializedRepository(
+                id=next_id,
+                headers=next_repo.raw_headers,
+                raw_data=next_repo.raw_data,
+            )
+            checkpoint.stage = GithubConnectorStage.PRS
+            checkpoint.reset()
+
+        if checkpoint.cached_repo_ids:
+            logger.info(
+                f"{len(checkpoint.cached_repo_ids)} repos remaining (IDs: {checkpoint.cached_repo_ids})"
+            )
+        else:
+            logger.info("No more repos remaining")
+
+        return checkpoint
+
     def _fetch_from_github(
         self,
         checkpoint: GithubConnectorCheckpoint,
@@ -557,6 +741,13 @@ class GithubConnector(CheckpointedConnectorWithPermSync[GithubConnectorCheckpoin
             repo_external_access = get_external_access_permission(
                 repo, self.github_client
             )
+        if self.use_graphql:
+            return (
+                yield from self._fetch_from_github_graphql(
+                    checkpoint, repo, start, end, repo_external_access
+                )
+            )
+
         if self.include_prs and checkpoint.stage == GithubConnectorStage.PRS:
             logger.info(f"Fetching PRs for repo: {repo.name}")
 
@@ -694,26 +885,7 @@ class GithubConnector(CheckpointedConnectorWithPermSync[GithubConnectorCheckpoin
             checkpoint.stage = GithubConnectorStage.PRS
             checkpoint.reset()
 
-        checkpoint.has_more = len(checkpoint.cached_repo_ids) > 0
-        if checkpoint.cached_repo_ids:
-            next_id = checkpoint.cached_repo_ids.pop()
-            next_repo = self.github_client.get_repo(next_id)
-            checkpoint.cached_repo = SerializedRepository(
-                id=next_id,
-                headers=next_repo.raw_headers,
-                raw_data=next_repo.raw_data,
-            )
-            checkpoint.stage = GithubConnectorStage.PRS
-            checkpoint.reset()
-
-        if checkpoint.cached_repo_ids:
-            logger.info(
-                f"{len(checkpoint.cached_repo_ids)} repos remaining (IDs: {checkpoint.cached_repo_ids})"
-            )
-        else:
-            logger.info("No more repos remaining")
-
-        return checkpoint
+        return self._move_to_next_repo(checkpoint)
 
     def _load_from_checkpoint(
         self,
@@ -0,0 +1,367 @@
+"""Fetches PRs and issues through the GitHub GraphQL API.
+
+A page of PRs or issues comes back with their comments, labels and users, where the
+REST API needs extra calls per item for the comments and to complete the users. The
+documents match the ones built from the REST API, plus a section with the comments."""
+
+from datetime import datetime
+from typing import Any
+
+from github import Github
+from pydantic import BaseModel
+
+from onyx.access.models import ExternalAccess
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.github.models import DocMetadata
+from onyx.connectors.models import Document
+from onyx.connectors.models import ImageSection
+from onyx.connectors.models import TextSection
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Items with more comments, labels or assignees than this only get the first ones
+_MAX_NESTED_ITEMS = 100
+
+_USER_FIELDS = """
+    login
+    ... on User {
+        name
+        email
+    }
+"""
+
+_PULL_REQUESTS_QUERY = f"""
+query PullRequests(
+    $owner: String!, $name: String!, $pageSize: Int!, $cursor: String,
+    $states: [PullRequestState!]
+) {{
+    repository(owner: $owner, name: $name) {{
+        pullRequests(
+            first: $pageSize,
+            after: $cursor,
+            states: $states,
+            orderBy: {{field: UPDATED_AT, direction: DESC}}
+        ) {{
+            pageInfo {{
+                hasNextPage
+                endCursor
+            }}
+            nodes {{
+                databaseId
+                number
+                title
+                body
+                url
+                state
+                merged
+                createdAt
+                updatedAt
+                closedAt
+                mergedAt
+                changedFiles
+                commits {{
+                    totalCount
+                }}
+                baseRepository {{
+                    nameWithOwner
+                }}
+                author {{ {_USER_FIELDS} }}
+                mergedBy {{ {_USER_FIELDS} }}
+                assignees(first: {_MAX_NESTED_ITEMS}) {{
+                    nodes {{ {_USER_FIELDS} }}
+                }}
+                labels(first: {_MAX_NESTED_ITEMS}) {{
+                    nodes {{
+                        name
+                    }}
+                }}
+                comments(first: {_MAX_NESTED_ITEMS}) {{
+                    totalCount
+                    nodes {{
+                        body
+                    }}
+                }}
+            }}
+        }}
+    }}
+}}
+"""
+
+_ISSUES_QUERY = f"""
+query Issues(
+    $owner: String!, $name: String!, $pageSize: Int!, $cursor: String,
+    $states: [IssueState!], $since: DateTime
+) {{
+    repository(owner: $owner, name: $name) {{
+        issues(
+            first: $pageSize,
+            after: $cursor,
+            states: $states,
+            filterBy: {{since: $since}},
+            orderBy: {{field: UPDATED_AT, direction: DESC}}
+        ) {{
+            pageInfo {{
+                hasNextPage
+                endCursor
+            }}
+            nodes {{
+                databaseId
+                number
+                title
+                body
+                url
+                state
+                createdAt
+                updatedAt
+                closedAt
+                repository {{
+                    nameWithOwner
+                }}
+                author {{ {_USER_FIELDS} }}
+                assignees(first: {_MAX_NESTED_ITEMS}) {{
+                    nodes {{ {_USER_FIELDS} }}
+                }}
+                labels(first: {_MAX_NESTED_ITEMS}) {{
+                    nodes {{
+                        name
+                    }}
+                }}
+                comments(first: {_MAX_NESTED_ITEMS}) {{
+                    totalCount
+                    nodes {{
+                        body
+                    }}
+                }}
+                timelineItems(itemTypes: [CLOSED_EVENT], last: 1) {{
+                    nodes {{
+                        ... on ClosedEvent {{
+                            actor {{ {_USER_FIELDS} }}
+                        }}
+                    }}
+                }}
+            }}
+        }}
+    }}
+}}
+"""
+
+# the REST API state filter to the GraphQL states
+_PULL_REQUEST_STATES: dict[str, list[str] | None] = {
+    "open": ["OPEN"],
+    "closed": ["CLOSED", "MERGED"],
+    "all": None,
+}
+_ISSUE_STATES: dict[str, list[str] | None] = {
+    "open": ["OPEN"],
+    "closed": ["CLOSED"],
+    "all": None,
+}
+
+
+class GraphQLPage(BaseModel):
+    nodes: list[dict[str, Any]]
+    end_cursor: str | None
+    has_next_page: bool
+
+
+def _fetch_page(
+    github_client: Github,
+    query: str,
+    connection_name: str,
+    variables: dict[str, Any],
+) -> GraphQLPage:
+    _, data = github_client.requester.graphql_query(query, variables)
+    connection = data["data"]["repository"][connection_name]
+    return GraphQLPage(
+        nodes=[node for node in connection["nodes"] if node],
+        end_cursor=connection["pageInfo"]["endCursor"],
+        has_next_page=connection["pageInfo"]["hasNextPage"],
+    )
+
+
+def fetch_pull_requests_page(
+    github_client: Github,
+    repo_full_name: str,
+    state_filter: str,
+    page_size: int,
+    cursor: str | None,
+) -> GraphQLPage:
+    """PRs from the most to the least recently updated."""
+    owner, name = repo_full_name.split("/", 1)
+    return _fetch_page(
+        github_client,
+        _PULL_REQUESTS_QUERY,
+        "pullRequests",
+        {
+            "owner": owner,
+            "name": name,
+            "pageSize": page_size,
+            "cursor": cursor,
+            "states": _PULL_REQUEST_STATES.get(state_filter),
+        },
+    )
+
+
+def fetch_issues_page(
+    github_client: Github,
+    repo_full_name: str,
+    state_filter: str,
+    page_size: int,
+    cursor: str | None,
+    since: datetime | None,
+) -> GraphQLPage:
+    """Issues updated since `since`, from the most to the least recently updated.
+    Unlike the REST API, PRs are not included."""
+    owner, name = repo_full_name.split("/", 1)
+    return _fetch_page(
+        github_client,
+        _ISSUES_QUERY,
+        "issues",
+        {
+            "owner": owner,
+            "name": name,
+            "pageSize": page_size,
+            "cursor": cursor,
+            "states": _ISSUE_STATES.get(state_filter),
+            "since": since.isoformat() if since else None,
+        },
+    )
+
+
+def get_updated_at(node: dict[str, Any]) -> datetime:
+    return datetime.fromisoformat(node["updatedAt"])
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _get_userinfo(user: dict[str, Any] | None) -> dict[str, str] | None:
+    if not user:
+        return None
+    # like the REST API, users without a public email or name don't get one
+    return {
+        k: v
+        for k, v in {
+            "login": user.get("login"),
+            "name": user.get("name"),
+            "email": user.get("email"),
+        }.items()
+        if v
+    }
+
+
+def _get_nodes(node: dict[str, Any], connection_name: str) -> list[dict[str, Any]]:
+    return [
+        nested
+        for nested in (node.get(connection_name) or {}).get("nodes", [])
+        if nested
+    ]
+
+
+def _build_metadata(fields: dict[str, Any]) -> dict[str, str | list[str]]:
+    return {
+        k: [str(vi) for vi in v] if isinstance(v, list) else str(v)
+        for k, v in fields.items()
+        if v is not None
+    }
+
+
+def _build_sections(node: dict[str, Any]) -> list[TextSection | ImageSection]:
+    sections: list[TextSection | ImageSection] = [
+        TextSection(link=node["url"], text=node.get("body") or "")
+    ]
+    comment_nodes = _get_nodes(node, "comments")
+    total_comments = (node.get("comments") or {}).get("totalCount") or 0
+    if total_comments > len(comment_nodes):
+        logger.warning(
+            f"Only indexing the first {len(comment_nodes)} of {total_comments} "
+            f"comments of {node['url']}"
+        )
+    comments = [comment["body"] for comment in comment_nodes if comment.get("body")]
+    if comments:
+        sections.append(
+            TextSection(link=node["url"], text="\nComment: ".join(comments))
+        )
+    return sections
+
+
+def convert_graphql_pr_to_document(
+    node: dict[str, Any], repo_external_access: ExternalAccess | None
+) -> Document:
+    repo_name = (node.get("baseRepository") or {}).get("nameWithOwner")
+    return Document(
+        id=node["url"],
+        sections=_build_sections(node),
+        external_access=repo_external_access,
+        source=DocumentSource.GITHUB,
+        semantic_identifier=f"{node['number']}: {node['title']}",
+        doc_updated_at=get_updated_at(node),
+        # this metadata is used in perm sync
+        doc_metadata=DocMetadata(repo=repo_name or "").model_dump(),
+        metadata=_build_metadata(
+            {
+                "object_type": "PullRequest",
+                "id": node["number"],
+                "merged": node.get("merged"),
+                # the REST API has merged PRs as closed
+                "state": "open" if node.get("state") == "OPEN" else "closed",
+                "user": _get_userinfo(node.get("author")),
+                "assignees": [
+                    userinfo
+                    for assignee in _get_nodes(node, "assignees")
+                    if (userinfo := _get_userinfo(assignee))
+                ],
+                "repo": repo_name,
+                "num_commits": str((node.get("commits") or {}).get("totalCount")),
+                "num_files_changed": str(node.get("changedFiles")),
+                "labels": [label["name"] for label in _get_nodes(node, "labels")],
+                "created_at": _parse_datetime(node.get("createdAt")),
+                "updated_at": _parse_datetime(node.get("updatedAt")),
+                "closed_at": _parse_datetime(node.get("closedAt")),
+                "merged_at": _parse_datetime(node.get("mergedAt")),
+                "merged_by": _get_userinfo(node.get("mergedBy")),
+            }
+        ),
+    )
+
+
+def convert_graphql_issue_to_document(
+    node: dict[str, Any], repo_external_access: ExternalAccess | None
+) -> Document:
+    repo_name = (node.get("repository") or {}).get("nameWithOwner")
+    closed_events = _get_nodes(node, "timelineItems")
+    return Document(
+        id=node["url"],
+        sections=_build_sections(node),
+        source=DocumentSource.GITHUB,
+        external_access=repo_external_access,
+        semantic_identifier=f"{node['number']}: {node['title']}",
+        doc_updated_at=get_updated_at(node),
+        # this metadata is used in perm sync
+        doc_metadata=DocMetadata(repo=repo_name or "").model_dump(),
+        metadata=_build_metadata(
+            {
+                "object_type": "Issue",
+                "id": node["number"],
+                "state": (node.get("state") or "").lower(),
+                "user": _get_userinfo(node.get("author")),
+                "assignees": [
+                    userinfo
+                    for assignee in _get_nodes(node, "assignees")
+                    if (userinfo := _get_userinfo(assignee))
+                ],
+                "repo": repo_name,
+                "labels": [label["name"] for label in _get_nodes(node, "labels")],
+                "created_at": _parse_datetime(node.get("createdAt")),
+                "updated_at": _parse_datetime(node.get("updatedAt")),
+                "closed_at": _parse_datetime(node.get("closedAt")),
+                "closed_by": (
+                    _get_userinfo(closed_events[-1].get("actor"))
+                    if closed_events and node.get("state") == "CLOSED"
+                    else None
+                ),
+            }
+        ),
+    )
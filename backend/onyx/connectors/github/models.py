@@ -15,3 +15,7 @@ class SerializedRepository(BaseModel):
         return Repository.Repository(
             requester, self.headers, self.raw_data, completed=True
         )
+
+
+class DocMetadata(BaseModel):
+    repo: str
@@ -10,14 +10,19 @@ from onyx.utils.logger import setup_logger
 logger = setup_logger()
 
 
-def sleep_after_rate_limit_exception(github_client: Github) -> None:
+def sleep_after_rate_limit_exception(
+    github_client: Github, graphql: bool = False
+) -> None:
     """
     Sleep until the GitHub rate limit resets.
 
     Args:
         github_client: The GitHub client that hit the rate limit
+        graphql: Whether the GraphQL rate limit was hit, which is separate from the
+            REST one
     """
-    sleep_time = github_client.get_rate_limit().core.reset.replace(
+    rate_limit = github_client.get_rate_limit()
+    sleep_time = (rate_limit.graphql if graphql else rate_limit.core).reset.replace(
         tzinfo=timezone.utc
     ) - datetime.now(tz=timezone.utc)
     sleep_time += timedelta(minutes=1)  # add an extra minute just to be safe
@@ -20,6 +20,7 @@ from google.oauth2.service_account import Credentials as ServiceAccountCredentia
 from googleapiclient.errors import HttpError  # type: ignore
 from typing_extensions import override
 
+from onyx.configs.app_configs import GOOGLE_DRIVE_CONNECTOR_CONVERSION_WORKERS
 from onyx.configs.app_configs import GOOGLE_DRIVE_CONNECTOR_SIZE_THRESHOLD
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.app_configs import MAX_DRIVE_WORKERS
@@ -40,6 +41,7 @@ from onyx.connectors.google_drive.file_retrieval import (
     get_all_files_in_my_drive_and_shared,
 )
 from onyx.connectors.google_drive.file_retrieval import get_files_in_shared_drive
+from onyx.connectors.google_drive.file_retrieval import get_permissions_for_files
 from onyx.connectors.google_drive.file_retrieval import get_root_folder_id
 from onyx.connectors.google_drive.models import DriveRetrievalStage
 from onyx.connectors.google_drive.models import GoogleDriveCheckpoint
@@ -47,9 +49,12 @@ from onyx.connectors.google_drive.models import GoogleDriveFileType
 from onyx.connectors.google_drive.models import RetrievedDriveFile
 from onyx.connectors.google_drive.models import StageCompletion
 from onyx.connectors.google_utils.google_auth import get_google_creds
+from onyx.connectors.google_utils.google_utils import AdaptiveWorkerCount
 from onyx.connectors.google_utils.google_utils import execute_paginated_retrieval
 from onyx.connectors.google_utils.google_utils import get_file_owners
 from onyx.connectors.google_utils.google_utils import GoogleFields
+from onyx.connectors.google_utils.google_utils import is_quota_error
+from onyx.connectors.google_utils.google_utils import MAX_BATCH_REQUESTS
 from onyx.connectors.google_utils.resources import get_admin_service
 from onyx.connectors.google_utils.resources import get_drive_service
 from onyx.connectors.google_utils.resources import GoogleDriveService
@@ -69,6 +74,7 @@ from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import ConnectorMissingCredentialError
 from onyx.connectors.models import Document
 from onyx.connectors.models import EntityFailure
+from onyx.connectors.models import SlimDocument
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.utils.logger import setup_logger
 from onyx.utils.retry_wrapper import retry_builder
@@ -77,8 +83,6 @@ from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.threadpool_concurrency import ThreadSafeDict
 
 logger = setup_logger()
-# TODO: Improve this by using the batch utility: https://googleapis.github.io/google-api-python-client/docs/batch.html
-# All file retrievals could be batched and made at once
 
 BATCHES_PER_CHECKPOINT = 1
 
@@ -245,6 +249,10 @@ class GoogleDriveConnector(
 
         self.size_threshold = GOOGLE_DRIVE_CONNECTOR_SIZE_THRESHOLD
 
+        self._conversion_workers = AdaptiveWorkerCount(
+            GOOGLE_DRIVE_CONNECTOR_CONVERSION_WORKERS
+        )
+
     def set_allow_images(self, value: bool) -> None:
         self.allow_images = value
 
@@ -1091,6 +1099,43 @@ class GoogleDriveConnector(
             end=end,
         )
 
+    def _prefetch_permissions(self, files: list[GoogleDriveFileType]) -> int:
+        """Files in shared drives only come with the ids of their permissions. Their
+        permissions are fetched here through the batch endpoint, instead of with a call
+        per file once the files are converted. Files whose permissions couldn't all be
+        fetched are left as they are. Returns how many calls hit the API quota."""
+        files_to_fetch = {
+            file["id"]: file
+            for file in files
+            if file.get("id")
+            and file.get("permissionIds")
+            and not file.get("permissions")
+        }
+        if not files_to_fetch:
+            return 0
+
+        try:
+            permissions_by_file_id, errors = get_permissions_for_files(
+                get_drive_service(self.creds, self.primary_admin_email),
+                list(files_to_fetch.keys()),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to batch fetch permissions, fetching per file: {e}")
+            return 0
+
+        for file_id, permissions in permissions_by_file_id.items():
+            file = files_to_fetch[file_id]
+            permission_ids = set(file["permissionIds"])
+            file_permissions = [
+                permission
+                for permission in permissions
+                if permission.get("id") in permission_ids
+            ]
+            if len(file_permissions) == len(permission_ids):
+                file["permissions"] = file_permissions
+
+        return sum(is_quota_error(error) for error in errors.values())
+
     def _extract_docs_from_google_drive(
         self,
         checkpoint: GoogleDriveCheckpoint,
@@ -1131,6 +1176,13 @@ class GoogleDriveConnector(
                 files_batch: list[RetrievedDriveFile],
             ) -> Iterator[Document | ConnectorFailure]:
                 nonlocal batches_complete
+                num_quota_errors = (
+                    self._prefetch_permissions(
+                        [file.drive_file for file in files_batch]
+                    )
+                    if include_permissions
+                    else 0
+                )
                 # Process the batch using run_functions_tuples_in_parallel
                 func_with_args = [
                     (
@@ -1145,8 +1197,16 @@ class GoogleDriveConnector(
                 ]
                 results = cast(
                     list[Document | ConnectorFailure | None],
-                    run_functions_tuples_in_parallel(func_with_args, max_workers=8),
+                    run_functions_tuples_in_parallel(
+                        func_with_args, max_workers=self._conversion_workers.value
+                    ),
+                )
+                num_quota_errors += sum(
+                    isinstance(result, ConnectorFailure)
+                    and is_quota_error(result.exception)
+                    for result in results
                 )
+                self._conversion_workers.update(num_quota_errors)
                 logger.debug(
                     f"finished processing batch {batches_complete} with {len(results)} results"
                 )
@@ -1262,7 +1322,8 @@ class GoogleDriveConnector(
         end: SecondsSinceUnixEpoch | None = None,
         callback: IndexingHeartbeatInterface | None = None,
     ) -> GenerateSlimDocumentOutput:
-        slim_batch = []
+        slim_batch: list[SlimDocument] = []
+        files_batch: list[GoogleDriveFileType] = []
         for file in self._fetch_drive_items(
             field_type=DriveFileFieldType.SLIM,
             checkpoint=checkpoint,
@@ -1271,18 +1332,12 @@ class GoogleDriveConnector(
         ):
             if file.error is not None:
                 raise file.error
-            if doc := build_slim_document(
-                self.creds,
-                file.drive_file,
-                # for now, always fetch permissions for slim runs
-                # TODO: move everything to load_from_checkpoint
-                # and only fetch permissions if needed
-                PermissionSyncContext(
-                    primary_admin_email=self.primary_admin_email,
-                    google_domain=self.google_domain,
-                ),
-            ):
-                slim_batch.append(doc)
+            files_batch.append(file.drive_file)
+            if len(files_batch) < MAX_BATCH_REQUESTS:
+                continue
+
+            slim_batch.extend(self._build_slim_documents(files_batch))
+            files_batch = []
             if len(slim_batch) >= SLIM_BATCH_SIZE:
                 yield slim_batch
                 slim_batch = []
@@ -1292,8 +1347,26 @@ class GoogleDriveConnector(
                             "_extract_slim_docs_from_google_drive: Stop signal detected"
                         )
                     callback.progress("_extract_slim_docs_from_google_drive", 1)
+        slim_batch.extend(self._build_slim_documents(files_batch))
         yield slim_batch
 
+    def _build_slim_documents(
+        self, files: list[GoogleDriveFileType]
+    ) -> list[SlimDocument]:
+        self._prefetch_permissions(files)
+        # for now, always fetch permissions for slim runs
+        # TODO: move everything to load_from_checkpoint
+        # and only fetch permissions if needed
+        permission_sync_context = PermissionSyncContext(
+            primary_admin_email=self.primary_admin_email,
+            google_domain=self.google_domain,
+        )
+        return [
+            doc
+            for file in files
+            if (doc := build_slim_document(self.creds, file, permission_sync_context))
+        ]
+
     def retrieve_all_slim_documents(
         self,
         start: SecondsSinceUnixEpoch | None = None,
@@ -12,11 +12,13 @@ from onyx.connectors.google_drive.constants import DRIVE_SHORTCUT_TYPE
 from onyx.connectors.google_drive.models import DriveRetrievalStage
 from onyx.connectors.google_drive.models import GoogleDriveFileType
 from onyx.connectors.google_drive.models import RetrievedDriveFile
+from onyx.connectors.google_utils.google_utils import execute_batch_requests
 from onyx.connectors.google_utils.google_utils import execute_paginated_retrieval
 from onyx.connectors.google_utils.google_utils import (
     execute_paginated_retrieval_with_max_pages,
 )
 from onyx.connectors.google_utils.google_utils import GoogleFields
+from onyx.connectors.google_utils.google_utils import NEXT_PAGE_TOKEN_KEY
 from onyx.connectors.google_utils.google_utils import ORDER_BY_KEY
 from onyx.connectors.google_utils.google_utils import PAGE_TOKEN_KEY
 from onyx.connectors.google_utils.resources import GoogleDriveService
@@ -376,3 +378,28 @@ def get_root_folder_id(service: Resource) -> str:
         .get(fileId="root", fields=GoogleFields.ID.value)
         .execute()[GoogleFields.ID.value]
     )
+
+
+def get_permissions_for_files(
+    service: GoogleDriveService,
+    file_ids: list[str],
+) -> tuple[dict[str, list[GoogleDriveFileType]], dict[str, HttpError]]:
+    """Fetches the permissions of many files through the batch endpoint. Files with
+    more permissions than fit in one page are left out, along with the files whose
+    call failed, which are returned as errors."""
+    responses, errors = execute_batch_requests(
+        service,
+        {
+            file_id: service.permissions().list(
+                fileId=file_id,
+                fields=f"{PERMISSION_FULL_DESCRIPTION},nextPageToken",
+                supportsAllDrives=True,
+            )
+            for file_id in file_ids
+        },
+    )
+    return {
+        file_id: response.get("permissions", [])
+        for file_id, response in responses.items()
+        if not response.get(NEXT_PAGE_TOKEN_KEY)
+    }, errors
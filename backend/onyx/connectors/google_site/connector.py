@@ -67,7 +67,9 @@ class GoogleSitesConnector(LoadConnector):
     def load_from_state(self) -> GenerateDocumentsOutput:
         documents: list[Document] = []
 
-        file_content_io = get_default_file_store().read_file(self.zip_path, mode="b")
+        file_content_io = get_default_file_store().read_file(
+            self.zip_path, mode="b", stream=True
+        )
 
         # load the HTML files
         files = load_files_from_zip(file_content_io)
@@ -7,6 +7,7 @@ from datetime import timezone
 from enum import Enum
 from typing import Any
 
+from googleapiclient.discovery import Resource  # type: ignore
 from googleapiclient.errors import HttpError  # type: ignore
 
 from onyx.connectors.google_drive.models import GoogleDriveFileType
@@ -251,3 +252,75 @@ def _execute_paginated_retrieval(
                 yield item
         else:
             yield results
+
+
+# the most calls the batch endpoint takes in one request
+MAX_BATCH_REQUESTS = 100
+
+_QUOTA_ERROR_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+
+
+def is_quota_error(error: BaseException | None) -> bool:
+    """Whether Google refused the call because a quota was used up."""
+    if not isinstance(error, HttpError):
+        return False
+    if error.resp.status == 429:
+        return True
+    if error.resp.status != 403:
+        return False
+    # 403s are also used for missing permissions, the reason in the body tells them apart
+    content = error.content
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", errors="replace")
+    return any(reason in str(content) for reason in _QUOTA_ERROR_REASONS)
+
+
+def execute_batch_requests(
+    service: Resource,
+    requests: dict[str, Any],
+) -> tuple[dict[str, Any], dict[str, HttpError]]:
+    """Makes the calls through the batch endpoint, up to `MAX_BATCH_REQUESTS` per HTTP
+    request, instead of one HTTP request per call. `requests` are the unexecuted
+    requests (e.g. `service.files().get(...)`) by id.
+
+    Returns the responses and the errors of the calls by id. The calls aren't retried,
+    so the caller decides what to do with the ones that failed."""
+    responses: dict[str, Any] = {}
+    errors: dict[str, HttpError] = {}
+
+    def _callback(request_id: str, response: Any, exception: HttpError | None) -> None:
+        if exception is not None:
+            errors[request_id] = exception
+        else:
+            responses[request_id] = response
+
+    request_items = list(requests.items())
+    for i in range(0, len(request_items), MAX_BATCH_REQUESTS):
+        batch = service.new_batch_http_request(callback=_callback)
+        for request_id, request in request_items[i : i + MAX_BATCH_REQUESTS]:
+            batch.add(request, request_id=request_id)
+        batch.execute()
+
+    return responses, errors
+
+
+class AdaptiveWorkerCount:
+    """How many threads make calls to a Google API at the same time. It's halved when
+    calls hit the quota and grows back by one after each batch that didn't."""
+
+    def __init__(self, max_workers: int, min_workers: int = 1) -> None:
+        self.max_workers = max(max_workers, 1)
+        self.min_workers = min(max(min_workers, 1), self.max_workers)
+        self.value = self.max_workers
+
+    def update(self, num_quota_errors: int) -> None:
+        if num_quota_errors > 0:
+            new_value = max(self.value // 2, self.min_workers)
+            if new_value != self.value:
+                logger.info(
+                    f"Hit the Google API quota {num_quota_errors} times, "
+                    f"reducing the workers from {self.value} to {new_value}"
+                )
+            self.value = new_value
+        else:
+            self.value = min(self.value + 1, self.max_workers)
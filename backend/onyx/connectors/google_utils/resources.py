@@ -1,3 +1,5 @@
+import threading
+from collections import OrderedDict
 from collections.abc import Callable
 from typing import Any
 
@@ -11,6 +13,21 @@ from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+# Building a service parses its discovery document and a service account acting as a
+# user fetches an access token for that user, so both are reused. The credentials are
+# shared by all threads. The services are kept per thread, since their http client
+# isn't thread safe.
+_MAX_CACHED_DELEGATED_CREDS = 256
+_MAX_CACHED_SERVICES_PER_THREAD = 32
+
+# the base credentials are kept in the values so that their id isn't reused
+_delegated_creds_cache: OrderedDict[
+    tuple[int, str | None],
+    tuple[ServiceAccountCredentials, ServiceAccountCredentials],
+] = OrderedDict()
+_delegated_creds_lock = threading.Lock()
+_thread_local = threading.local()
+
 
 class GoogleDriveService(Resource):
     pass
@@ -78,20 +95,54 @@ class RefreshableDriveObject:
         return execute
 
 
+def _get_delegated_creds(
+    creds: ServiceAccountCredentials, user_email: str | None
+) -> ServiceAccountCredentials:
+    key = (id(creds), user_email)
+    with _delegated_creds_lock:
+        cached = _delegated_creds_cache.get(key)
+        if cached is not None and cached[0] is creds:
+            _delegated_creds_cache.move_to_end(key)
+            return cached[1]
+
+        # NOTE: https://developers.google.com/identity/protocols/oauth2/service-account#error-codes
+        delegated_creds = creds.with_subject(user_email)
+        _delegated_creds_cache[key] = (creds, delegated_creds)
+        if len(_delegated_creds_cache) > _MAX_CACHED_DELEGATED_CREDS:
+            _delegated_creds_cache.popitem(last=False)
+        return delegated_creds
+
+
 def _get_google_service(
     service_name: str,
     service_version: str,
     creds: ServiceAccountCredentials | OAuthCredentials,
     user_email: str | None = None,
 ) -> GoogleDriveService | GoogleDocsService | AdminService | GmailService:
+    if not hasattr(_thread_local, "services"):
+        _thread_local.services = OrderedDict()
+    services: OrderedDict[tuple[str, str, int, str | None], tuple[Any, Resource]]
+    services = _thread_local.services
+
+    key = (service_name, service_version, id(creds), user_email)
+    cached = services.get(key)
+    if cached is not None and cached[0] is creds:
+        services.move_to_end(key)
+        return cached[1]
+
     service: Resource
     if isinstance(creds, ServiceAccountCredentials):
-        # NOTE: https://developers.google.com/identity/protocols/oauth2/service-account#error-codes
-        creds = creds.with_subject(user_email)
-        service = build(service_name, service_version, credentials=creds)
+        service = build(
+            service_name,
+            service_version,
+            credentials=_get_delegated_creds(creds, user_email),
+        )
     elif isinstance(creds, OAuthCredentials):
         service = build(service_name, service_version, credentials=creds)
 
+    services[key] = (creds, service)
+    if len(services) > _MAX_CACHED_SERVICES_PER_THREAD:
+        services.popitem(last=False)
     return service
 
 
@@ -7,10 +7,13 @@ from typing import Any
 
 from jira import JIRA
 from jira.resources import Issue
+from pydantic import BaseModel
 from typing_extensions import override
 
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import JIRA_CONNECTOR_FETCH_PARTITIONS
 from onyx.configs.app_configs import JIRA_CONNECTOR_LABELS_TO_SKIP
+from onyx.configs.app_configs import JIRA_CONNECTOR_MAX_CONCURRENT_PARTITIONS
 from onyx.configs.app_configs import JIRA_CONNECTOR_MAX_TICKET_SIZE
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
@@ -42,6 +45,7 @@ from onyx.connectors.models import SlimDocument
 from onyx.connectors.models import TextSection
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 
 logger = setup_logger()
@@ -71,6 +75,32 @@ _FIELD_PROJECT_NAME = "project_name"
 _FIELD_UPDATED = "updated"
 _FIELD_RESOLUTION_DATE = "resolutiondate"
 _FIELD_RESOLUTION_DATE_KEY = "resolution_date"
+_FIELD_SUMMARY = "summary"
+_FIELD_DESCRIPTION = "description"
+_FIELD_COMMENT = "comment"
+
+# The fields used by `process_jira_issue`, so that the other fields (e.g. custom
+# fields, attachments, changelogs) aren't sent back with every issue
+_JIRA_ISSUE_FIELDS = ",".join(
+    [
+        _FIELD_SUMMARY,
+        _FIELD_DESCRIPTION,
+        _FIELD_COMMENT,
+        _FIELD_LABELS,
+        _FIELD_REPORTER,
+        _FIELD_ASSIGNEE,
+        _FIELD_PRIORITY,
+        _FIELD_STATUS,
+        _FIELD_RESOLUTION,
+        _FIELD_CREATED,
+        _FIELD_UPDATED,
+        _FIELD_DUEDATE,
+        _FIELD_ISSUETYPE,
+        _FIELD_RESOLUTION_DATE,
+        _FIELD_PARENT,
+        _FIELD_PROJECT,
+    ]
+)
 
 
 def _perform_jql_search(
@@ -201,8 +231,21 @@ def process_jira_issue(
     )
 
 
+class JiraPartition(BaseModel):
+    """A window of the update time fetched with its own query."""
+
+    start: SecondsSinceUnixEpoch
+    end: SecondsSinceUnixEpoch
+    # the last window includes its end, the others stop right before it
+    end_inclusive: bool = False
+    offset: int = 0
+    done: bool = False
+
+
 class JiraConnectorCheckpoint(ConnectorCheckpoint):
     offset: int | None = None
+    # only set when the run is split into partitions
+    partitions: list[JiraPartition] | None = None
 
 
 class JiraConnector(CheckpointedConnector[JiraConnectorCheckpoint], SlimConnector):
@@ -216,12 +259,16 @@ class JiraConnector(CheckpointedConnector[JiraConnectorCheckpoint], SlimConnecto
         # skip it. This is generally used to avoid indexing extra sensitive
         # tickets.
         labels_to_skip: list[str] = JIRA_CONNECTOR_LABELS_TO_SKIP,
+        num_partitions: int = JIRA_CONNECTOR_FETCH_PARTITIONS,
+        max_concurrent_partitions: int = JIRA_CONNECTOR_MAX_CONCURRENT_PARTITIONS,
     ) -> None:
         self.batch_size = batch_size
         self.jira_base = jira_base_url.rstrip("/")  # Remove trailing slash if present
         self.jira_project = project_key
         self._comment_email_blacklist = comment_email_blacklist or []
         self.labels_to_skip = set(labels_to_skip)
+        self.num_partitions = max(num_partitions, 1)
+        self.max_concurrent_partitions = max(max_concurrent_partitions, 1)
 
         self._jira_client: JIRA | None = None
 
@@ -250,7 +297,10 @@ class JiraConnector(CheckpointedConnector[JiraConnectorCheckpoint], SlimConnecto
         return None
 
     def _get_jql_query(
-        self, start: SecondsSinceUnixEpoch, end: SecondsSinceUnixEpoch
+        self,
+        start: SecondsSinceUnixEpoch,
+        end: SecondsSinceUnixEpoch,
+        end_inclusive: bool = True,
     ) -> str:
         """Get the JQL query based on whether a specific project is set and time range"""
         start_date_str = datetime.fromtimestamp(start, tz=timezone.utc).strftime(
@@ -260,7 +310,10 @@ class JiraConnector(CheckpointedConnector[JiraConnectorCheckpoint], SlimConnecto
             "%Y-%m-%d %H:%M"
         )
 
-        time_jql = f"updated >= '{start_date_str}' AND updated <= '{end_date_str}'"
+        end_operator = "<=" if end_inclusive else "<"
+        time_jql = (
+            f"updated >= '{start_date_str}' AND updated {end_operator} '{end_date_str}'"
+        )
 
         if self.jira_project:
             base_jql = f"project = {self.quoted_jira_project}"
@@ -274,6 +327,9 @@ class JiraConnector(CheckpointedConnector[JiraConnectorCheckpoint], SlimConnecto
         end: SecondsSinceUnixEpoch,
         checkpoint: JiraConnectorCheckpoint,
     ) -> CheckpointOutput[JiraConnectorCheckpoint]:
+        if self.num_partitions > 1:
+            return self._load_partitions_from_checkpoint(start, end, checkpoint)
+
         jql = self._get_jql_query(start, end)
         try:
             return self._load_from_checkpoint(jql, checkpoint)
@@ -283,19 +339,10 @@ class JiraConnector(CheckpointedConnector[JiraConnectorCheckpoint], SlimConnecto
                 return self._load_from_checkpoint(jql, checkpoint)
             raise e
 
-    def _load_from_checkpoint(
-        self, jql: str, checkpoint: JiraConnectorCheckpoint
-    ) -> CheckpointOutput[JiraConnectorCheckpoint]:
-        # Get the current offset from checkpoint or start at 0
-        starting_offset = checkpoint.offset or 0
-        current_offset = starting_offset
-
-        for issue in _perform_jql_search(
-            jira_client=self.jira_client,
-            jql=jql,
-            start=current_offset,
-            max_results=_JIRA_FULL_PAGE_SIZE,
-        ):
+    def _process_issues(
+        self, issues: Iterable[Issue]
+    ) -> Iterable[Document | ConnectorFailure]:
+        for issue in issues:
             issue_key = issue.key
             try:
                 if document := process_jira_issue(
@@ -316,7 +363,23 @@ class JiraConnector(CheckpointedConnector[JiraConnectorCheckpoint], SlimConnecto
                     exception=e,
                 )
 
-            current_offset += 1
+    def _load_from_checkpoint(
+        self, jql: str, checkpoint: JiraConnectorCheckpoint
+    ) -> CheckpointOutput[JiraConnectorCheckpoint]:
+        # Get the current offset from checkpoint or start at 0
+        starting_offset = checkpoint.offset or 0
+
+        issues = list(
+            _perform_jql_search(
+                jira_client=self.jira_client,
+                jql=jql,
+                start=starting_offset,
+                max_results=_JIRA_FULL_PAGE_SIZE,
+                fields=_JIRA_ISSUE_FIELDS,
+            )
+        )
+        yield from self._process_issues(issues)
+        current_offset = starting_offset + len(issues)
 
         # Update checkpoint
         checkpoint = JiraConnectorCheckpoint(
@@ -326,6 +389,110 @@ class JiraConnector(CheckpointedConnector[JiraConnectorCheckpoint], SlimConnecto
         )
         return checkpoint
 
+    def _get_earliest_update(
+        self, start: SecondsSinceUnixEpoch, end: SecondsSinceUnixEpoch
+    ) -> SecondsSinceUnixEpoch | None:
+        """When the least recently updated issue in the range was updated, None if
+        there are no issues."""
+        issues = list(
+            _perform_jql_search(
+                jira_client=self.jira_client,
+                jql=f"{self._get_jql_query(start, end)} ORDER BY updated ASC",
+                start=0,
+                max_results=1,
+                fields=_FIELD_UPDATED,
+            )
+        )
+        if not issues:
+            return None
+        return time_str_to_utc(issues[0].fields.updated).timestamp()
+
+    def _build_partitions(
+        self, start: SecondsSinceUnixEpoch, end: SecondsSinceUnixEpoch
+    ) -> list[JiraPartition]:
+        # a first run starts at the epoch, so the windows start at the first update
+        # to not leave most of them empty
+        try:
+            earliest_update = self._get_earliest_update(start, end)
+        except Exception as e:
+            if not is_atlassian_date_error(e):
+                raise
+            # same fallback as when fetching in a single query. The windows start
+            # from the shifted date too, so they never use the rejected one
+            start -= ONE_HOUR
+            earliest_update = self._get_earliest_update(start, end)
+        if earliest_update is None:
+            return []
+        start = max(start, earliest_update)
+
+        # JQL dates are to the minute, so the windows are too
+        step = max((end - start) / self.num_partitions, 60)
+        boundaries = sorted(
+            {start}
+            | {
+                (start + i * step) // 60 * 60
+                for i in range(1, self.num_partitions)
+                if start + i * step < end
+            }
+        )
+        return [
+            JiraPartition(
+                start=window_start,
+                end=window_end,
+                end_inclusive=window_end == end,
+            )
+            for window_start, window_end in zip(boundaries, boundaries[1:] + [end])
+        ]
+
+    def _fetch_partition_page(self, partition: JiraPartition) -> list[Issue]:
+        return list(
+            _perform_jql_search(
+                jira_client=self.jira_client,
+                jql=self._get_jql_query(
+                    partition.start, partition.end, partition.end_inclusive
+                ),
+                start=partition.offset,
+                max_results=_JIRA_FULL_PAGE_SIZE,
+                fields=_JIRA_ISSUE_FIELDS,
+            )
+        )
+
+    def _load_partitions_from_checkpoint(
+        self,
+        start: SecondsSinceUnixEpoch,
+        end: SecondsSinceUnixEpoch,
+        checkpoint: JiraConnectorCheckpoint,
+    ) -> CheckpointOutput[JiraConnectorCheckpoint]:
+        """Fetches a page from each of the next partitions at the same time. Each
+        partition pages through its own query, so it keeps its own offset."""
+        partitions = checkpoint.partitions
+        if partitions is None:
+            partitions = self._build_partitions(start, end)
+            logger.info(f"Fetching Jira issues in {len(partitions)} partitions")
+
+        active_indices = [
+            i for i, partition in enumerate(partitions) if not partition.done
+        ][: self.max_concurrent_partitions]
+        pages: list[list[Issue]] = run_functions_tuples_in_parallel(
+            [(self._fetch_partition_page, (partitions[i],)) for i in active_indices]
+        )
+
+        next_partitions = list(partitions)
+        for i, issues in zip(active_indices, pages):
+            yield from self._process_issues(issues)
+            next_partitions[i] = partitions[i].model_copy(
+                update={
+                    "offset": partitions[i].offset + len(issues),
+                    # if we didn't retrieve a full batch, the partition is done
+                    "done": len(issues) < _JIRA_FULL_PAGE_SIZE,
+                }
+            )
+
+        return JiraConnectorCheckpoint(
+            partitions=next_partitions,
+            has_more=any(not partition.done for partition in next_partitions),
+        )
+
     def retrieve_all_slim_documents(
         self,
         start: SecondsSinceUnixEpoch | None = None,
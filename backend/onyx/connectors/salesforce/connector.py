@@ -1,4 +1,3 @@
-import csv
 import gc
 import json
 import os
@@ -28,12 +27,14 @@ from onyx.connectors.salesforce.doc_conversion import convert_sf_query_result_to
 from onyx.connectors.salesforce.doc_conversion import ID_PREFIX
 from onyx.connectors.salesforce.onyx_salesforce import OnyxSalesforce
 from onyx.connectors.salesforce.salesforce_calls import fetch_all_csvs_in_parallel
+from onyx.connectors.salesforce.salesforce_calls import fetch_csvs_as_completed
 from onyx.connectors.salesforce.sqlite_functions import OnyxSalesforceSQLite
 from onyx.connectors.salesforce.utils import ACCOUNT_OBJECT_TYPE
 from onyx.connectors.salesforce.utils import BASE_DATA_PATH
 from onyx.connectors.salesforce.utils import get_sqlite_db_path
 from onyx.connectors.salesforce.utils import MODIFIED_FIELD
 from onyx.connectors.salesforce.utils import NAME_FIELD
+from onyx.connectors.salesforce.utils import ObjectTypeSyncMetrics
 from onyx.connectors.salesforce.utils import USER_OBJECT_TYPE
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.utils.logger import setup_logger
@@ -68,6 +69,30 @@ _DEFAULT_ATTRIBUTES_TO_KEEP: dict[str, dict[str, str]] = {
 }
 
 
+def _stage_downloaded_csvs(
+    object_type: str,
+    csv_paths: list[str],
+    metrics: ObjectTypeSyncMetrics,
+    staging_dir: str,
+) -> list[str]:
+    """Stages the downloaded CSVs of an object type for loading into the sqlite db
+    and deletes them. Returns the paths of the staging dbs."""
+    stage_start = time.monotonic()
+    staging_db_paths: list[str] = []
+    for csv_path in csv_paths:
+        staging_db_path = os.path.join(
+            staging_dir, f"{os.path.basename(csv_path)}.sqlite"
+        )
+        metrics.num_records += OnyxSalesforceSQLite.stage_csv(
+            object_type, csv_path, staging_db_path
+        )
+        staging_db_paths.append(staging_db_path)
+        os.remove(csv_path)
+
+    metrics.stage_seconds = time.monotonic() - stage_start
+    return staging_db_paths
+
+
 class SalesforceCheckpoint(ConnectorCheckpoint):
     initial_sync_complete: bool
     current_timestamp: SecondsSinceUnixEpoch
@@ -91,6 +116,9 @@ class SalesforceConnectorContext:
 
     parent_child_names_to_relationships: dict[str, str] = {}
 
+    # object types to download, and whether to apply the time filter to them
+    all_types_to_filter: dict[str, bool] = {}
+
 
 def _extract_fields_and_associations_from_config(
     config: dict[str, Any], object_type: str
@@ -328,55 +356,36 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
         #     updated_ids.update(list(find_ids_by_type(object_type)))
 
         # This takes 10-70 minutes first time (idk why the range is so big)
-        total_types = len(object_type_to_csv_path)
-        logger.info(f"Starting to process {total_types} object types")
-
-        for i, (object_type, csv_paths) in enumerate(
-            object_type_to_csv_path.items(), 1
-        ):
-            logger.info(f"Processing object type {object_type} ({i}/{total_types})")
+        object_type_and_csv_paths = [
+            (object_type, csv_path)
+            for object_type, csv_paths in object_type_to_csv_path.items()
             # If path is None, it means it failed to fetch the csv
-            if csv_paths is None:
-                continue
-
-            # Go through each csv path and use it to update the db
-            for csv_path in csv_paths:
-                num_records = 0
-
-                logger.debug(
-                    f"Processing CSV: object_type={object_type} "
-                    f"csv={csv_path} "
-                    f"len={Path(csv_path).stat().st_size} "
-                    f"records={num_records}"
-                )
-
-                with open(csv_path, "r", newline="", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        num_records += 1
-
-                new_ids = sf_db.update_from_csv(
-                    object_type=object_type,
-                    csv_download_path=csv_path,
-                    remove_ids=remove_ids,
-                )
-                for new_id in new_ids:
-                    updated_ids[new_id] = object_type
+            if csv_paths is not None
+            for csv_path in csv_paths
+        ]
+        logger.info(
+            f"Starting to process {len(object_type_to_csv_path)} object types "
+            f"in {len(object_type_and_csv_paths)} CSVs"
+        )
 
-                sf_db.flush()
+        for object_type, csv_path, new_ids in sf_db.update_from_csvs_in_parallel(
+            object_type_and_csv_paths,
+            staging_dir=os.path.join(csv_directory, "staging"),
+            remove_ids=remove_ids,
+        ):
+            for new_id in new_ids:
+                updated_ids[new_id] = object_type
 
-                logger.debug(
-                    f"Added {len(new_ids)} new/updated records for {object_type}"
-                )
+            sf_db.flush()
 
-                logger.info(
-                    f"Processed CSV: object_type={object_type} "
-                    f"csv={csv_path} "
-                    f"len={Path(csv_path).stat().st_size} "
-                    f"records={num_records} "
-                    f"db_len={sf_db.file_size}"
-                )
-                os.remove(csv_path)
+            logger.info(
+                f"Processed CSV: object_type={object_type} "
+                f"csv={csv_path} "
+                f"len={Path(csv_path).stat().st_size} "
+                f"records={len(new_ids)} "
+                f"db_len={sf_db.file_size}"
+            )
+            os.remove(csv_path)
 
         return updated_ids
 
@@ -452,71 +461,75 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
         sf_db.connect()
 
         try:
-            sf_db.apply_schema()
+            sf_db.apply_schema(defer_secondary_indexes=True)
             sf_db.log_stats()
 
             ctx = self._make_context(
-                None, None, temp_dir, self.parent_object_list, self._sf_client
+                None,
+                None,
+                temp_dir,
+                self.parent_object_list,
+                self._sf_client,
+                download_csvs=False,
             )
             gc.collect()
 
-            # Step 2 - load CSV's to sqlite
-            object_type_to_csv_paths = SalesforceConnector.reconstruct_object_types(
-                temp_dir
-            )
-
-            total_types = len(object_type_to_csv_paths)
-            logger.info(f"Starting to process {total_types} object types")
-
-            for i, (object_type, csv_paths) in enumerate(
-                object_type_to_csv_paths.items(), 1
+            # Step 2 - download CSV's and load them into sqlite as they arrive.
+            # Each download is staged and deleted in its download thread, the staged
+            # data is merged into the db here while the other downloads continue.
+            staging_dir = os.path.join(temp_dir, "staging")
+            os.makedirs(staging_dir, exist_ok=True)
+            all_metrics: list[ObjectTypeSyncMetrics] = []
+
+            for object_type, staging_db_paths, metrics in fetch_csvs_as_completed(
+                sf_client=self._sf_client,
+                all_types_to_filter=ctx.all_types_to_filter,
+                queryable_fields_by_type=ctx.type_to_queryable_fields,
+                start=None,
+                end=None,
+                target_dir=temp_dir,
+                process_csvs=lambda object_type, csv_paths, metrics: _stage_downloaded_csvs(
+                    object_type, csv_paths, metrics, staging_dir
+                ),
             ):
-                logger.info(f"Processing object type {object_type} ({i}/{total_types})")
-                # If path is None, it means it failed to fetch the csv
-                if csv_paths is None:
-                    continue
+                # yield an empty list to keep the connector alive
+                yield docs_to_yield
 
-                # Go through each csv path and use it to update the db
-                for csv_path in csv_paths:
-                    num_records = 0
-                    with open(csv_path, "r", newline="", encoding="utf-8") as f:
-                        reader = csv.DictReader(f)
-                        for row in reader:
-                            num_records += 1
-
-                    logger.debug(
-                        f"Processing CSV: object_type={object_type} "
-                        f"csv={csv_path} "
-                        f"len={Path(csv_path).stat().st_size} "
-                        f"records={num_records}"
-                    )
+                # If None, it means it failed to fetch the csv
+                if staging_db_paths is None:
+                    continue
 
-                    # yield an empty list to keep the connector alive
-                    yield docs_to_yield
+                merge_start = time.monotonic()
+                for staging_db_path in staging_db_paths:
+                    try:
+                        new_ids = sf_db.merge_staged_db(object_type, staging_db_path)
+                    finally:
+                        os.remove(staging_db_path)
 
-                    new_ids = sf_db.update_from_csv(
-                        object_type=object_type,
-                        csv_download_path=csv_path,
-                    )
                     for new_id in new_ids:
                         changed_ids_to_type[new_id] = object_type
 
-                    sf_db.flush()
+                sf_db.flush()
+                metrics.merge_seconds = time.monotonic() - merge_start
+                all_metrics.append(metrics)
 
-                    logger.debug(
-                        f"Added {len(new_ids)} new/updated records for {object_type}"
-                    )
+                logger.info(f"Loaded object type: {metrics} db_len={sf_db.file_size}")
+                gc.collect()
 
-                    logger.info(
-                        f"Processed CSV: object_type={object_type} "
-                        f"csv={csv_path} "
-                        f"len={Path(csv_path).stat().st_size} "
-                        f"records={num_records} "
-                        f"db_len={sf_db.file_size}"
-                    )
+            logger.info(
+                f"Loaded all object types: "
+                f"object_types={len(all_metrics)} "
+                f"csvs={sum(m.num_csvs for m in all_metrics)} "
+                f"bytes={sum(m.num_bytes for m in all_metrics)} "
+                f"records={sum(m.num_records for m in all_metrics)} "
+                f"db_len={sf_db.file_size}"
+            )
 
-                    os.remove(csv_path)
-                    gc.collect()
+            # indexes are built once after the bulk load instead of row by row
+            sf_db.create_secondary_indexes()
+
+            # object types are loaded in the order their downloads finish
+            sf_db.backfill_relationship_types()
 
             gc.collect()
 
@@ -852,9 +865,13 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
         temp_dir: str,
         parent_object_list: list[str],
         sf_client: OnyxSalesforce,
+        download_csvs: bool = True,
     ) -> SalesforceConnectorContext:
         """NOTE: I suspect we're doing way too many queries here. Likely fewer queries
-        and just parsing all the info we need in less passes will work."""
+        and just parsing all the info we need in less passes will work.
+
+        If download_csvs is False, the caller is responsible for downloading the
+        object types in all_types_to_filter of the returned context."""
 
         parent_types = set(parent_object_list)
         child_types: set[str] = set()
@@ -1039,14 +1056,15 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
             all_types_to_filter[sf_type] = not full_sync
 
         # Step 1.2 - bulk download the CSV's for each object type
-        SalesforceConnector._download_object_csvs(
-            all_types_to_filter,
-            type_to_queryable_fields,
-            temp_dir,
-            sf_client,
-            start,
-            end,
-        )
+        if download_csvs:
+            SalesforceConnector._download_object_csvs(
+                all_types_to_filter,
+                type_to_queryable_fields,
+                temp_dir,
+                sf_client,
+                start,
+                end,
+            )
 
         return_context = SalesforceConnectorContext()
         return_context.parent_types = parent_types
@@ -1056,6 +1074,7 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
         return_context.parent_reference_fields_by_type = parent_reference_fields_by_type
         return_context.type_to_queryable_fields = type_to_queryable_fields
         return_context.prefix_to_type = prefix_to_type
+        return_context.all_types_to_filter = all_types_to_filter
 
         return_context.parent_to_child_relationships = parent_to_child_relationships
         return_context.parent_to_relationship_queryable_fields = (
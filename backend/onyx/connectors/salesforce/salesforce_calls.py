@@ -1,25 +1,40 @@
 import gc
 import os
+import threading
 import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from concurrent.futures import as_completed
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import TypeVar
 
 from pytz import UTC
 from simple_salesforce import Salesforce
+from simple_salesforce.bulk2 import QueryResult
 from simple_salesforce.bulk2 import SFBulk2Handler
 from simple_salesforce.bulk2 import SFBulk2Type
 from simple_salesforce.exceptions import SalesforceRefusedRequest
 
+from onyx.configs.app_configs import SALESFORCE_BULK_MAX_CONCURRENT_JOBS
+from onyx.configs.app_configs import SALESFORCE_MAX_PENDING_CSV_OBJECT_TYPES
 from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
     rate_limit_builder,
 )
 from onyx.connectors.interfaces import SecondsSinceUnixEpoch
 from onyx.connectors.salesforce.utils import MODIFIED_FIELD
+from onyx.connectors.salesforce.utils import ObjectTypeSyncMetrics
 from onyx.utils.logger import setup_logger
 from onyx.utils.retry_wrapper import retry_builder
 
 logger = setup_logger()
 
+R = TypeVar("R")
+
+# bulk jobs refused because the org hit its api limits are retried this many times
+_BULK_RATE_LIMIT_RETRIES = 5
+_BULK_RATE_LIMIT_BASE_DELAY = 30.0
+
 
 def is_salesforce_rate_limit_error(exception: Exception) -> bool:
     """Check if an exception is a Salesforce rate limit error."""
@@ -120,6 +135,34 @@ def _object_type_has_api_data(
     return True
 
 
+def _download_with_rate_limit_retries(
+    bulk_2_type: SFBulk2Type, sf_type: str, query: str, target_dir: str
+) -> list[QueryResult]:
+    """Runs a bulk query job, backing off while the org is over its api limits."""
+    attempt = 0
+    while True:
+        try:
+            return bulk_2_type.download(
+                query=query,
+                path=target_dir,
+                max_records=500000,
+            )
+        except SalesforceRefusedRequest as e:
+            attempt += 1
+            if (
+                not is_salesforce_rate_limit_error(e)
+                or attempt > _BULK_RATE_LIMIT_RETRIES
+            ):
+                raise
+
+            delay = _BULK_RATE_LIMIT_BASE_DELAY * 2 ** (attempt - 1)
+            logger.warning(
+                f"Salesforce rate limit exceeded downloading {sf_type}, "
+                f"retrying in {delay:.0f}s ({attempt}/{_BULK_RATE_LIMIT_RETRIES})"
+            )
+            time.sleep(delay)
+
+
 def _bulk_retrieve_from_salesforce(
     sf_type: str,
     query: str,
@@ -161,10 +204,8 @@ def _bulk_retrieve_from_salesforce(
 
     try:
         # This downloads the file to a file in the target path with a random name
-        results = bulk_2_type.download(
-            query=query,
-            path=target_dir,
-            max_records=500000,
+        results = _download_with_rate_limit_retries(
+            bulk_2_type, sf_type, query, target_dir
         )
 
         # prepend each downloaded csv with the object type (delimiter = '.')
@@ -191,21 +232,14 @@ def _bulk_retrieve_from_salesforce(
     return sf_type, all_download_paths
 
 
-def fetch_all_csvs_in_parallel(
+def _get_type_to_query(
     sf_client: Salesforce,
     all_types_to_filter: dict[str, bool],
     queryable_fields_by_type: dict[str, set[str]],
     start: SecondsSinceUnixEpoch | None,
     end: SecondsSinceUnixEpoch | None,
-    target_dir: str,
-) -> dict[str, list[str] | None]:
-    """
-    Fetches all the csvs in parallel for the given object types
-    Returns a dict of (sf_type, full_download_path)
-
-    NOTE: We can probably lift object type has api data out of here
-    """
-
+) -> dict[str, str]:
+    """Returns the bulk query to run for each object type that has data."""
     type_to_query = {}
 
     # query the available fields for each object type and determine how to filter
@@ -244,10 +278,33 @@ def fetch_all_csvs_in_parallel(
     logger.info(
         f"Object types to query: initial={len(all_types_to_filter)} queryable={len(type_to_query)}"
     )
+    return type_to_query
+
+
+def fetch_all_csvs_in_parallel(
+    sf_client: Salesforce,
+    all_types_to_filter: dict[str, bool],
+    queryable_fields_by_type: dict[str, set[str]],
+    start: SecondsSinceUnixEpoch | None,
+    end: SecondsSinceUnixEpoch | None,
+    target_dir: str,
+) -> dict[str, list[str] | None]:
+    """
+    Fetches all the csvs in parallel for the given object types
+    Returns a dict of (sf_type, full_download_path)
+
+    NOTE: We can probably lift object type has api data out of here
+    """
+
+    type_to_query = _get_type_to_query(
+        sf_client, all_types_to_filter, queryable_fields_by_type, start, end
+    )
 
     # Run the bulk retrieve in parallel
-    # limit to 4 to help with memory usage
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    # limit to help with memory usage and to stay within the org's bulk job limits
+    with ThreadPoolExecutor(
+        max_workers=SALESFORCE_BULK_MAX_CONCURRENT_JOBS
+    ) as executor:
         results = executor.map(
             lambda object_type: _bulk_retrieve_from_salesforce(
                 sf_type=object_type,
@@ -258,3 +315,73 @@ def fetch_all_csvs_in_parallel(
             type_to_query.keys(),
         )
         return dict(results)
+
+
+def fetch_csvs_as_completed(
+    sf_client: Salesforce,
+    all_types_to_filter: dict[str, bool],
+    queryable_fields_by_type: dict[str, set[str]],
+    start: SecondsSinceUnixEpoch | None,
+    end: SecondsSinceUnixEpoch | None,
+    target_dir: str,
+    process_csvs: Callable[[str, list[str], ObjectTypeSyncMetrics], R],
+    max_concurrent_jobs: int = SALESFORCE_BULK_MAX_CONCURRENT_JOBS,
+    max_pending_object_types: int = SALESFORCE_MAX_PENDING_CSV_OBJECT_TYPES,
+) -> Iterator[tuple[str, R | None, ObjectTypeSyncMetrics]]:
+    """Downloads the csvs for the given object types in parallel and yields
+    (sf_type, result of process_csvs, metrics) for each object type as soon as it
+    is ready, so the caller can load it while the other downloads continue.
+
+    process_csvs runs in the download thread right after the object type's csvs
+    are downloaded. The result is None if the download failed.
+
+    A new download is only started once fewer than max_pending_object_types object
+    types are downloading or waiting on the caller, which bounds local disk usage.
+    The caller is done with an object type once it asks for the next one.
+    """
+    type_to_query = _get_type_to_query(
+        sf_client, all_types_to_filter, queryable_fields_by_type, start, end
+    )
+
+    # a download must be able to start for every running job
+    pending_slots = threading.Semaphore(
+        max(max_pending_object_types, max_concurrent_jobs)
+    )
+    stopped = threading.Event()
+
+    def _download(sf_type: str) -> tuple[str, R | None, ObjectTypeSyncMetrics]:
+        metrics = ObjectTypeSyncMetrics(object_type=sf_type)
+        pending_slots.acquire()
+        if stopped.is_set():
+            return sf_type, None, metrics
+
+        download_start = time.monotonic()
+        _, csv_paths = _bulk_retrieve_from_salesforce(
+            sf_type=sf_type,
+            query=type_to_query[sf_type],
+            target_dir=target_dir,
+            sf_client=sf_client,
+        )
+        metrics.download_seconds = time.monotonic() - download_start
+        if csv_paths is None:
+            return sf_type, None, metrics
+
+        metrics.num_csvs = len(csv_paths)
+        metrics.num_bytes = sum(os.path.getsize(csv_path) for csv_path in csv_paths)
+        return sf_type, process_csvs(sf_type, csv_paths, metrics), metrics
+
+    with ThreadPoolExecutor(max_workers=max_concurrent_jobs) as executor:
+        futures = [executor.submit(_download, sf_type) for sf_type in type_to_query]
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                finally:
+                    pending_slots.release()
+        finally:
+            # unblock downloads waiting on a slot if the caller stopped early
+            stopped.set()
+            for future in futures:
+                future.cancel()
+            for _ in futures:
+                pending_slots.release()
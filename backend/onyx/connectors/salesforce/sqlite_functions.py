@@ -3,7 +3,10 @@ import json
 import os
 import sqlite3
 import time
+from collections import defaultdict
 from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -19,6 +22,12 @@ from shared_configs.utils import batch_list
 
 logger = setup_logger()
 
+# number of csv rows buffered before they are written with executemany
+_BULK_INSERT_BATCH_SIZE = 1024
+
+# SQLite typically has a limit of 999 variables
+_MAX_SQL_VARIABLES = 500
+
 
 class OnyxSalesforceSQLite:
     """Notes on context management using 'with self.conn':
@@ -94,10 +103,14 @@ class OnyxSalesforceSQLite:
             cursor = self._conn.cursor()
             cursor.execute("PRAGMA wal_checkpoint(FULL)")
 
-    def apply_schema(self) -> None:
+    def apply_schema(self, defer_secondary_indexes: bool = False) -> None:
         """Initialize the SQLite database with required tables if they don't exist.
 
         Non-destructive operation.
+
+        When bulk loading a fresh database, pass defer_secondary_indexes=True and
+        call create_secondary_indexes once the load is done. Maintaining the
+        indexes row by row during the load is much slower than building them once.
         """
         if self._conn is None:
             raise RuntimeError("Database connection is closed")
@@ -167,49 +180,8 @@ class OnyxSalesforceSQLite:
             """
             )
 
-            # Create indexes if they don't exist (SQLite ignores IF NOT EXISTS for indexes)
-            def create_index_if_not_exists(
-                index_name: str, create_statement: str
-            ) -> None:
-                cursor.execute(
-                    f"SELECT name FROM sqlite_master WHERE type='index' AND name='{index_name}'"
-                )
-                if not cursor.fetchone():
-                    cursor.execute(create_statement)
-
-            create_index_if_not_exists(
-                "idx_object_type",
-                """
-                CREATE INDEX idx_object_type
-                ON salesforce_objects(object_type, id)
-                WHERE object_type IS NOT NULL
-                """,
-            )
-
-            create_index_if_not_exists(
-                "idx_parent_id",
-                """
-                CREATE INDEX idx_parent_id
-                ON relationships(parent_id, child_id)
-                """,
-            )
-
-            create_index_if_not_exists(
-                "idx_child_parent",
-                """
-                CREATE INDEX idx_child_parent
-                ON relationships(child_id)
-                WHERE child_id IS NOT NULL
-                """,
-            )
-
-            create_index_if_not_exists(
-                "idx_relationship_types_lookup",
-                """
-                CREATE INDEX idx_relationship_types_lookup
-                ON relationship_types(parent_type, child_id, parent_id)
-                """,
-            )
+            if not defer_secondary_indexes:
+                OnyxSalesforceSQLite._create_secondary_indexes(cursor)
 
             elapsed = time.monotonic() - start
             logger.info(f"init_db - create tables and indices: elapsed={elapsed:.2f}")
@@ -237,6 +209,93 @@ class OnyxSalesforceSQLite:
             elapsed = time.monotonic() - start
             logger.info(f"init_db - update_user_email_map: elapsed={elapsed:.2f}")
 
+    def create_secondary_indexes(self) -> None:
+        """Creates the secondary indexes skipped by apply_schema(defer_secondary_indexes=True).
+
+        Non-destructive operation.
+        """
+        if self._conn is None:
+            raise RuntimeError("Database connection is closed")
+
+        start = time.monotonic()
+        with self._conn:
+            OnyxSalesforceSQLite._create_secondary_indexes(self._conn.cursor())
+
+        elapsed = time.monotonic() - start
+        logger.info(f"create_secondary_indexes: elapsed={elapsed:.2f}")
+
+    def backfill_relationship_types(self) -> None:
+        """Records the parent type of every relationship whose parent was loaded
+        after its child.
+
+        Relationship types are only looked up while loading a child, so when CSVs
+        are loaded in an arbitrary order some are missing until this runs.
+        """
+        if self._conn is None:
+            raise RuntimeError("Database connection is closed")
+
+        start = time.monotonic()
+        with self._conn:
+            cursor = self._conn.cursor()
+            cursor.execute(
+                """
+                INSERT OR IGNORE INTO relationship_types (child_id, parent_id, parent_type)
+                SELECT r.child_id, r.parent_id, o.object_type
+                FROM relationships r
+                JOIN salesforce_objects o ON o.id = r.parent_id
+                """
+            )
+            num_added = cursor.rowcount
+
+        elapsed = time.monotonic() - start
+        logger.info(
+            f"backfill_relationship_types: added={num_added} elapsed={elapsed:.2f}"
+        )
+
+    @staticmethod
+    def _create_secondary_indexes(cursor: sqlite3.Cursor) -> None:
+        # Create indexes if they don't exist (SQLite ignores IF NOT EXISTS for indexes)
+        def create_index_if_not_exists(index_name: str, create_statement: str) -> None:
+            cursor.execute(
+                f"SELECT name FROM sqlite_master WHERE type='index' AND name='{index_name}'"
+            )
+            if not cursor.fetchone():
+                cursor.execute(create_statement)
+
+        create_index_if_not_exists(
+            "idx_object_type",
+            """
+            CREATE INDEX idx_object_type
+            ON salesforce_objects(object_type, id)
+            WHERE object_type IS NOT NULL
+            """,
+        )
+
+        create_index_if_not_exists(
+            "idx_parent_id",
+            """
+            CREATE INDEX idx_parent_id
+            ON relationships(parent_id, child_id)
+            """,
+        )
+
+        create_index_if_not_exists(
+            "idx_child_parent",
+            """
+            CREATE INDEX idx_child_parent
+            ON relationships(child_id)
+            WHERE child_id IS NOT NULL
+            """,
+        )
+
+        create_index_if_not_exists(
+            "idx_relationship_types_lookup",
+            """
+            CREATE INDEX idx_relationship_types_lookup
+            ON relationship_types(parent_type, child_id, parent_id)
+            """,
+        )
+
     def get_user_id_by_email(self, email: str) -> str | None:
         """Get the Salesforce User ID for a given email address.
 
@@ -482,18 +541,22 @@ class OnyxSalesforceSQLite:
         Return a json string and a list of parent_id's in the record.
         """
         parent_ids: set[str] = set()
-        fields_to_remove: set[str] = set()
-
-        record = original_record.copy()
+        record: dict[str, Any] = {}
+
+        # builds the record in a single pass since this runs for every csv row
+        for field, value in original_record.items():
+            # LastModifiedById is always kept
+            if field == "LastModifiedById":
+                record[field] = value
+                if isinstance(value, str) and validate_salesforce_id(value):
+                    parent_ids.add(value)
+                continue
 
-        for field, value in record.items():
             # remove empty fields
             if not value:
-                fields_to_remove.add(field)
                 continue
 
             if field == "attributes":
-                fields_to_remove.add(field)
                 continue
 
             # remove salesforce id's (and add to parent id set)
@@ -503,78 +566,275 @@ class OnyxSalesforceSQLite:
                 and validate_salesforce_id(value)
             ):
                 parent_ids.add(value)
-                if remove_ids:
-                    fields_to_remove.add(field)
+                if not remove_ids:
+                    record[field] = value
                 continue
 
             # this field is real data, leave it alone
-
-        # Remove unwanted fields
-        for field in fields_to_remove:
-            if field != "LastModifiedById":
-                del record[field]
+            record[field] = value
 
         return record, parent_ids
 
+    @staticmethod
+    def _iter_normalized_csv_batches(
+        csv_path: str, remove_ids: bool
+    ) -> Iterator[list[tuple[str, str, set[str]]]]:
+        """Yields batches of (id, normalized json data, parent ids) for the rows
+        of a CSV file, in file order."""
+        # some customers need this to be larger than the default 128KB, go with 16MB
+        csv.field_size_limit(16 * 1024 * 1024)
+
+        with open(csv_path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            batch: list[tuple[str, str, set[str]]] = []
+            for row in reader:
+                if "Id" not in row:
+                    logger.warning(f"Row {row} does not have an Id field in {csv_path}")
+                    continue
+
+                normalized_record, parent_ids = OnyxSalesforceSQLite.normalize_record(
+                    row, remove_ids
+                )
+                batch.append((row["Id"], json.dumps(normalized_record), parent_ids))
+                if len(batch) >= _BULK_INSERT_BATCH_SIZE:
+                    yield batch
+                    batch = []
+
+            if batch:
+                yield batch
+
     def update_from_csv(
         self, object_type: str, csv_download_path: str, remove_ids: bool = True
     ) -> list[str]:
-        """Update the SF DB with a CSV file using SQLite storage."""
+        """Update the SF DB with a CSV file using SQLite storage.
+
+        Rows are buffered and written with executemany, one transaction per buffer.
+        """
         if self._conn is None:
             raise RuntimeError("Database connection is closed")
 
-        # some customers need this to be larger than the default 128KB, go with 16MB
-        csv.field_size_limit(16 * 1024 * 1024)
-
-        updated_ids = []
+        updated_ids: list[str] = []
 
         with self._conn:
             cursor = self._conn.cursor()
 
-            with open(csv_download_path, "r", newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                uncommitted_rows = 0
-                for row in reader:
-                    if "Id" not in row:
-                        logger.warning(
-                            f"Row {row} does not have an Id field in {csv_download_path}"
-                        )
-                        continue
+            for batch in OnyxSalesforceSQLite._iter_normalized_csv_batches(
+                csv_download_path, remove_ids
+            ):
+                # NOTE(rkuo): looks like we take a list and dump it as json into the db
+                cursor.executemany(
+                    """
+                    INSERT OR REPLACE INTO salesforce_objects (id, object_type, data)
+                    VALUES (?, ?, ?)
+                    """,
+                    [(row_id, object_type, data) for row_id, data, _ in batch],
+                )
+
+                # if an id shows up more than once, the last row wins
+                OnyxSalesforceSQLite._update_relationship_tables_bulk(
+                    cursor,
+                    {row_id: parent_ids for row_id, _, parent_ids in batch},
+                )
+                updated_ids.extend(row_id for row_id, _, _ in batch)
+
+                # periodically commit or else memory will balloon
+                self._conn.commit()
+
+            # If we're updating User objects, update the email map
+            if object_type == USER_OBJECT_TYPE:
+                OnyxSalesforceSQLite._update_user_email_map(cursor)
+
+        return updated_ids
 
-                    row_id = row["Id"]
+    @staticmethod
+    def stage_csv(
+        object_type: str,
+        csv_download_path: str,
+        staging_db_path: str,
+        remove_ids: bool = True,
+    ) -> int:
+        """Parses a CSV file into a standalone staging database that can later be
+        merged into the main database with merge_staged_db.
+
+        Staging only touches its own database file, so multiple CSV files can be
+        staged concurrently while the main database is being written to.
+
+        Returns the number of staged rows.
+        """
+        # leftovers of an interrupted run
+        if os.path.exists(staging_db_path):
+            os.remove(staging_db_path)
 
-                    normalized_record, parent_ids = (
-                        OnyxSalesforceSQLite.normalize_record(row, remove_ids)
+        conn = sqlite3.connect(staging_db_path, timeout=60.0)
+        try:
+            with conn:
+                # the staging db is throwaway, durability doesn't matter
+                conn.execute("PRAGMA journal_mode=OFF")
+                conn.execute("PRAGMA synchronous=OFF")
+                conn.execute(
+                    """
+                    CREATE TABLE staged_objects (
+                        seq INTEGER PRIMARY KEY,
+                        id TEXT NOT NULL,
+                        object_type TEXT NOT NULL,
+                        data TEXT NOT NULL
                     )
-                    normalized_record_json_str = json.dumps(normalized_record)
+                    """
+                )
+                conn.execute(
+                    """
+                    CREATE TABLE staged_relationships (
+                        child_id TEXT NOT NULL,
+                        parent_id TEXT NOT NULL,
+                        PRIMARY KEY (child_id, parent_id)
+                    ) WITHOUT ROWID
+                    """
+                )
 
-                    # Update main object data
-                    # NOTE(rkuo): looks like we take a list and dump it as json into the db
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO salesforce_objects (id, object_type, data)
-                        VALUES (?, ?, ?)
-                        """,
-                        (row_id, object_type, normalized_record_json_str),
+            num_records = 0
+            for batch in OnyxSalesforceSQLite._iter_normalized_csv_batches(
+                csv_download_path, remove_ids
+            ):
+                num_records += len(batch)
+                child_to_parent_ids = {
+                    row_id: parent_ids for row_id, _, parent_ids in batch
+                }
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO staged_objects (id, object_type, data) VALUES (?, ?, ?)",
+                        [(row_id, object_type, data) for row_id, data, _ in batch],
+                    )
+                    # the last row for an id determines its relationships
+                    conn.executemany(
+                        "DELETE FROM staged_relationships WHERE child_id = ?",
+                        [(child_id,) for child_id in child_to_parent_ids],
                     )
+                    conn.executemany(
+                        "INSERT INTO staged_relationships (child_id, parent_id) VALUES (?, ?)",
+                        [
+                            (child_id, parent_id)
+                            for child_id, parent_ids in child_to_parent_ids.items()
+                            for parent_id in parent_ids
+                        ],
+                    )
+        finally:
+            conn.close()
+
+        return num_records
+
+    def merge_staged_db(self, object_type: str, staging_db_path: str) -> list[str]:
+        """Merges a database produced by stage_csv into the main database using
+        set based statements. Objects end up as update_from_csv on the original CSV
+        would leave them, but relationship types are looked up only after all the
+        staged rows are inserted, so a parent that appears later in the same CSV
+        gets a relationship type here where update_from_csv would skip it.
+
+        Returns the ids of the merged rows, in CSV order."""
+        if self._conn is None:
+            raise RuntimeError("Database connection is closed")
+
+        self._conn.execute("ATTACH DATABASE ? AS staged", (staging_db_path,))
+        try:
+            with self._conn:
+                cursor = self._conn.cursor()
+
+                # rows are inserted in csv order, so the last duplicate wins
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO salesforce_objects (id, object_type, data)
+                    SELECT id, object_type, data FROM staged.staged_objects ORDER BY seq
+                    """
+                )
 
-                    # Update relationships using the same connection
-                    OnyxSalesforceSQLite._update_relationship_tables(
-                        cursor, row_id, parent_ids
+                # relationship types are only looked up for new relationships
+                cursor.execute(
+                    """
+                    INSERT OR IGNORE INTO relationship_types (child_id, parent_id, parent_type)
+                    SELECT s.child_id, s.parent_id, o.object_type
+                    FROM staged.staged_relationships s
+                    JOIN salesforce_objects o ON o.id = s.parent_id
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM relationships r
+                        WHERE r.child_id = s.child_id AND r.parent_id = s.parent_id
                     )
-                    updated_ids.append(row_id)
+                    """
+                )
+                cursor.execute(
+                    """
+                    INSERT OR IGNORE INTO relationships (child_id, parent_id)
+                    SELECT child_id, parent_id FROM staged.staged_relationships
+                    """
+                )
 
-                    # periodically commit or else memory will balloon
-                    uncommitted_rows += 1
-                    if uncommitted_rows >= 1024:
-                        self._conn.commit()
-                        uncommitted_rows = 0
+                # remove relationships the staged rows no longer have
+                for table in ("relationships", "relationship_types"):
+                    cursor.execute(
+                        f"""
+                        DELETE FROM {table}
+                        WHERE child_id IN (SELECT id FROM staged.staged_objects)
+                        AND NOT EXISTS (
+                            SELECT 1 FROM staged.staged_relationships s
+                            WHERE s.child_id = {table}.child_id
+                            AND s.parent_id = {table}.parent_id
+                        )
+                        """
+                    )
 
-            # If we're updating User objects, update the email map
-            if object_type == USER_OBJECT_TYPE:
-                OnyxSalesforceSQLite._update_user_email_map(cursor)
+                if object_type == USER_OBJECT_TYPE:
+                    OnyxSalesforceSQLite._update_user_email_map(cursor)
 
-        return updated_ids
+                cursor.execute("SELECT id FROM staged.staged_objects ORDER BY seq")
+                return [row[0] for row in cursor.fetchall()]
+        finally:
+            self._conn.execute("DETACH DATABASE staged")
+
+    def update_from_csvs_in_parallel(
+        self,
+        object_type_and_csv_paths: list[tuple[str, str]],
+        staging_dir: str,
+        remove_ids: bool = True,
+        max_workers: int = 4,
+    ) -> Iterator[tuple[str, str, list[str]]]:
+        """Stages the given CSV files concurrently and merges them into the main
+        database in the given order, each as soon as it and all CSVs before it are
+        staged. Merging in order means relationship types are recorded for parents
+        loaded by earlier CSVs, as when calling update_from_csv on each CSV in turn
+        (see merge_staged_db for how parents within the same CSV differ).
+
+        Yields (object_type, csv_path, updated_ids) as each CSV is merged.
+
+        Threads are used rather than processes since this runs inside daemonized
+        indexing processes, which are not allowed to have children. Parsing holds
+        the GIL, but the SQLite writes to the separate staging databases release it.
+        """
+        os.makedirs(staging_dir, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            staged: list[tuple[Future[int], str, str, str]] = []
+            for i, (object_type, csv_path) in enumerate(object_type_and_csv_paths):
+                staging_db_path = os.path.join(staging_dir, f"staged_{i}.sqlite")
+                future = executor.submit(
+                    OnyxSalesforceSQLite.stage_csv,
+                    object_type,
+                    csv_path,
+                    staging_db_path,
+                    remove_ids,
+                )
+                staged.append((future, object_type, csv_path, staging_db_path))
+
+            try:
+                for future, object_type, csv_path, staging_db_path in staged:
+                    try:
+                        future.result()
+                        updated_ids = self.merge_staged_db(object_type, staging_db_path)
+                    finally:
+                        if os.path.exists(staging_db_path):
+                            os.remove(staging_db_path)
+
+                    yield object_type, csv_path, updated_ids
+            finally:
+                for future, _, _, _ in staged:
+                    future.cancel()
 
     def get_child_ids(self, parent_id: str) -> set[str]:
         """Get all child IDs for a given parent ID."""
@@ -676,69 +936,97 @@ class OnyxSalesforceSQLite:
             return [row[0] for row in cursor.fetchall()]
 
     @staticmethod
-    def _update_relationship_tables(
-        cursor: sqlite3.Cursor, child_id: str, parent_ids: set[str]
+    def _update_relationship_tables_bulk(
+        cursor: sqlite3.Cursor, child_to_parent_ids: dict[str, set[str]]
     ) -> None:
-        """Given a child id and a set of parent id's, updates the
-        relationships of the child to the parents in the db and removes old relationships.
+        """Given a map of child ids to their sets of parent id's, updates the
+        relationships of the children to the parents in the db and removes old
+        relationships. Does a constant number of statements per batch of children
+        instead of several per child.
 
         Args:
-            conn: The database connection to use (must be in a transaction)
-            child_id: The ID of the child record
-            parent_ids: Set of parent IDs to link to
+            cursor: The database cursor to use (must be in a transaction)
+            child_to_parent_ids: Map of child ID to the set of parent IDs to link to
         """
 
         try:
             # Get existing parent IDs
-            cursor.execute(
-                "SELECT parent_id FROM relationships WHERE child_id = ?", (child_id,)
-            )
-            old_parent_ids = {row[0] for row in cursor.fetchall()}
+            old_parent_ids: dict[str, set[str]] = defaultdict(set)
+            for child_ids in batch_list(list(child_to_parent_ids), _MAX_SQL_VARIABLES):
+                id_placeholders = ",".join(["?" for _ in child_ids])
+                cursor.execute(
+                    f"SELECT child_id, parent_id FROM relationships WHERE child_id IN ({id_placeholders})",
+                    child_ids,
+                )
+                for child_id, parent_id in cursor.fetchall():
+                    old_parent_ids[child_id].add(parent_id)
 
             # Calculate differences
-            parent_ids_to_remove = old_parent_ids - parent_ids
-            parent_ids_to_add = parent_ids - old_parent_ids
+            relationships_to_remove: list[tuple[str, str]] = []
+            relationships_to_add: list[tuple[str, str]] = []
+            for child_id, parent_ids in child_to_parent_ids.items():
+                child_old_parent_ids = old_parent_ids.get(child_id, set())
+                relationships_to_remove.extend(
+                    (child_id, parent_id)
+                    for parent_id in child_old_parent_ids - parent_ids
+                )
+                relationships_to_add.extend(
+                    (child_id, parent_id)
+                    for parent_id in parent_ids - child_old_parent_ids
+                )
 
             # Remove old relationships
-            if parent_ids_to_remove:
+            if relationships_to_remove:
                 cursor.executemany(
                     "DELETE FROM relationships WHERE child_id = ? AND parent_id = ?",
-                    [(child_id, parent_id) for parent_id in parent_ids_to_remove],
+                    relationships_to_remove,
                 )
                 # Also remove from relationship_types
                 cursor.executemany(
                     "DELETE FROM relationship_types WHERE child_id = ? AND parent_id = ?",
-                    [(child_id, parent_id) for parent_id in parent_ids_to_remove],
+                    relationships_to_remove,
                 )
 
+            if not relationships_to_add:
+                return
+
             # Add new relationships
-            if parent_ids_to_add:
-                # First add to relationships table
-                cursor.executemany(
-                    "INSERT INTO relationships (child_id, parent_id) VALUES (?, ?)",
-                    [(child_id, parent_id) for parent_id in parent_ids_to_add],
+            # First add to relationships table
+            cursor.executemany(
+                "INSERT INTO relationships (child_id, parent_id) VALUES (?, ?)",
+                relationships_to_add,
+            )
+
+            # Then get the types of the parent objects and add to relationship_types
+            parent_types: dict[str, str] = {}
+            unique_parent_ids = list(
+                {parent_id for _, parent_id in relationships_to_add}
+            )
+            for parent_ids_batch in batch_list(unique_parent_ids, _MAX_SQL_VARIABLES):
+                id_placeholders = ",".join(["?" for _ in parent_ids_batch])
+                cursor.execute(
+                    f"SELECT id, object_type FROM salesforce_objects WHERE id IN ({id_placeholders})",
+                    parent_ids_batch,
+                )
+                parent_types.update(
+                    (parent_id, parent_type) for parent_id, parent_type in cursor
                 )
 
-                # Then get the types of the parent objects and add to relationship_types
-                for parent_id in parent_ids_to_add:
-                    cursor.execute(
-                        "SELECT object_type FROM salesforce_objects WHERE id = ?",
-                        (parent_id,),
-                    )
-                    result = cursor.fetchone()
-                    if result:
-                        parent_type = result[0]
-                        cursor.execute(
-                            """
-                            INSERT INTO relationship_types (child_id, parent_id, parent_type)
-                            VALUES (?, ?, ?)
-                            """,
-                            (child_id, parent_id, parent_type),
-                        )
+            cursor.executemany(
+                """
+                INSERT INTO relationship_types (child_id, parent_id, parent_type)
+                VALUES (?, ?, ?)
+                """,
+                [
+                    (child_id, parent_id, parent_types[parent_id])
+                    for child_id, parent_id in relationships_to_add
+                    if parent_id in parent_types
+                ],
+            )
 
         except Exception:
             logger.exception(
-                f"Error updating relationship tables: child_id={child_id} parent_ids={parent_ids}"
+                f"Error updating relationship tables: num_children={len(child_to_parent_ids)}"
             )
             raise
 
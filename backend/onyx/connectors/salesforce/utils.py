@@ -30,6 +30,36 @@ class SalesforceObject:
         )
 
 
+@dataclass
+class ObjectTypeSyncMetrics:
+    """Per object type stats of the download -> load pipeline of a sync."""
+
+    object_type: str
+    num_csvs: int = 0
+    num_bytes: int = 0
+    num_records: int = 0
+    download_seconds: float = 0.0
+    stage_seconds: float = 0.0
+    merge_seconds: float = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        total_seconds = self.download_seconds + self.stage_seconds + self.merge_seconds
+        return self.num_records / total_seconds if total_seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"object_type={self.object_type} "
+            f"csvs={self.num_csvs} "
+            f"bytes={self.num_bytes} "
+            f"records={self.num_records} "
+            f"download={self.download_seconds:.2f}s "
+            f"stage={self.stage_seconds:.2f}s "
+            f"merge={self.merge_seconds:.2f}s "
+            f"records_per_second={self.records_per_second:.0f}"
+        )
+
+
 # This defines the base path for all data files relative to this file
 # AKA BE CAREFUL WHEN MOVING THIS FILE
 BASE_DATA_PATH = os.path.join(os.path.dirname(__file__), "data")
@@ -49,29 +79,39 @@ def get_object_type_path(object_type: str) -> str:
 
 _CHECKSUM_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ012345"
 _LOOKUP = {format(i, "05b"): _CHECKSUM_CHARS[i] for i in range(32)}
+# maps each alphanumeric character to its bit in the checksum
+_CASE_TO_BIT = str.maketrans(
+    {
+        **{c: "1" for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"},
+        **{c: "0" for c in "abcdefghijklmnopqrstuvwxyz0123456789"},
+    }
+)
 
 
 def validate_salesforce_id(salesforce_id: str) -> bool:
     """Validate the checksum portion of an 18-character Salesforce ID.
 
+    This runs on every field of every record during a sync, so it avoids
+    building intermediate strings per chunk.
+
     Args:
         salesforce_id: An 18-character Salesforce ID
 
     Returns:
         bool: True if the checksum is valid, False otherwise
     """
-    if len(salesforce_id) != 18:
+    if (
+        len(salesforce_id) != 18
+        or not salesforce_id.isascii()
+        or not salesforce_id.isalnum()
+    ):
         return False
 
-    chunks = [salesforce_id[0:5], salesforce_id[5:10], salesforce_id[10:15]]
-
-    checksum = salesforce_id[15:18]
-    calculated_checksum = ""
-
-    for chunk in chunks:
-        result_string = "".join(
-            "1" if char.isupper() else "0" for char in reversed(chunk)
-        )
-        calculated_checksum += _LOOKUP[result_string]
+    # each 5 character chunk maps to one checksum character, the bits are
+    # read from the end of the chunk
+    bits = salesforce_id[:15].translate(_CASE_TO_BIT)
+    calculated_checksum = (
+        _LOOKUP[bits[4::-1]] + _LOOKUP[bits[9:4:-1]] + _LOOKUP[bits[14:9:-1]]
+    )
 
-    return checksum == calculated_checksum
+    return salesforce_id[15:18] == calculated_checksum
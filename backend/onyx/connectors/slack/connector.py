@@ -30,6 +30,7 @@ from typing_extensions import override
 from onyx.access.models import ExternalAccess
 from onyx.configs.app_configs import ENABLE_EXPENSIVE_EXPERT_CALLS
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import SLACK_NUM_CHANNEL_WORKERS
 from onyx.configs.app_configs import SLACK_NUM_THREADS
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.exceptions import ConnectorValidationError
@@ -67,6 +68,7 @@ from onyx.connectors.slack.utils import SlackTextCleaner
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.redis.redis_pool import get_redis_client
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 
@@ -87,6 +89,11 @@ class SlackCheckpoint(ConnectorCheckpoint):
         str
     ]  # apparently we identify threads/messages uniquely by timestamp?
 
+    # only used when fetching several channels at a time. These are the channels being
+    # fetched, their progress is kept in channel_completion_map like for current_channel
+    active_channels: list[ChannelType] | None = None
+    active_channel_access: dict[str, ExternalAccess | None] = {}
+
 
 def _collect_paginated_channels(
     client: WebClient,
@@ -610,11 +617,14 @@ class SlackConnector(
         batch_size: int = INDEX_BATCH_SIZE,
         num_threads: int = SLACK_NUM_THREADS,
         use_redis: bool = True,
+        # the number of channels to fetch messages from at the same time
+        num_channel_workers: int = SLACK_NUM_CHANNEL_WORKERS,
     ) -> None:
         self.channels = channels
         self.channel_regex_enabled = channel_regex_enabled
         self.batch_size = batch_size
         self.num_threads = num_threads
+        self.num_channel_workers = max(num_channel_workers, 1)
         self.client: WebClient | None = None
         self.fast_client: WebClient | None = None
         # just used for efficiency
@@ -634,15 +644,26 @@ class SlackConnector(
     def make_delay_lock(prefix: str) -> str:
         return f"{prefix}:delay_lock"
 
+    @staticmethod
+    def make_delay_ttl_lock(prefix: str) -> str:
+        return f"{prefix}:delay_ttl_lock"
+
     @staticmethod
     def make_delay_key(prefix: str) -> str:
         return f"{prefix}:delay"
 
     @staticmethod
     def make_slack_web_client(
-        prefix: str, token: str, max_retry_count: int, r: Redis
+        prefix: str,
+        token: str,
+        max_retry_count: int,
+        r: Redis,
+        max_concurrent_requests: int = 1,
     ) -> WebClient:
+        """max_concurrent_requests bounds the requests made at a time by all the
+        clients of the credential, see OnyxSlackWebClient."""
         delay_lock = SlackConnector.make_delay_lock(prefix)
+        delay_ttl_lock = SlackConnector.make_delay_ttl_lock(prefix)
         delay_key = SlackConnector.make_delay_key(prefix)
 
         # NOTE: slack has a built in RateLimitErrorRetryHandler, but it isn't designed
@@ -662,6 +683,7 @@ class SlackConnector(
             max_retry_count=max_retry_count,
             delay_key=delay_key,
             r=r,
+            delay_ttl_lock=delay_ttl_lock,
         )
         custom_retry_handlers: list[RetryHandler] = [
             connection_error_retry_handler,
@@ -674,6 +696,7 @@ class SlackConnector(
             r=r,
             token=token,
             retry_handlers=custom_retry_handlers,
+            max_concurrent_requests=max_concurrent_requests,
         )
         return client
 
@@ -706,8 +729,14 @@ class SlackConnector(
                 credentials_provider.get_provider_key()
             )
 
+            # one request per channel being fetched at a time, every request is
+            # serialized when channels are fetched one by one
             self.client = SlackConnector.make_slack_web_client(
-                self.credential_prefix, bot_token, self.MAX_RETRIES, self.redis
+                self.credential_prefix,
+                bot_token,
+                self.MAX_RETRIES,
+                self.redis,
+                max_concurrent_requests=self.num_channel_workers,
             )
         else:
             connection_error_retry_handler = ConnectionErrorRetryHandler(
@@ -748,6 +777,81 @@ class SlackConnector(
             callback=callback,
         )
 
+    def _process_message_batch(
+        self,
+        message_batch: list[MessageType],
+        channel: ChannelType,
+        channel_access: ExternalAccess | None,
+        seen_thread_ts: set[str],
+    ) -> Generator[Document | ConnectorFailure, None, int]:
+        """Processes the messages in parallel and yields the docs of the threads not
+        seen yet and the failures. Returns the number of filtered out messages."""
+        if self.client is None or self.text_cleaner is None:
+            raise ConnectorMissingCredentialError("Slack")
+
+        num_bot_filtered_messages = 0
+
+        # Process messages in parallel using ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+            # NOTE(rkuo): this seems to be assuming the slack sdk is thread safe.
+            # That's a very bold assumption! Haven't seen a direct issue with this
+            # yet, but likely not correct to rely on.
+
+            futures: list[Future[ProcessedSlackMessage]] = []
+            for message in message_batch:
+                # Capture the current context so that the thread gets the current tenant ID
+                current_context = contextvars.copy_context()
+                futures.append(
+                    executor.submit(
+                        current_context.run,
+                        _process_message,
+                        message=message,
+                        client=self.client,
+                        channel=channel,
+                        slack_cleaner=self.text_cleaner,
+                        user_cache=self.user_cache,
+                        seen_thread_ts=seen_thread_ts,
+                        channel_access=channel_access,
+                    )
+                )
+
+            for future in as_completed(futures):
+                processed_slack_message = future.result()
+                doc = processed_slack_message.doc
+                thread_or_message_ts = processed_slack_message.thread_or_message_ts
+                failure = processed_slack_message.failure
+                if doc:
+                    # handle race conditions here since this is single
+                    # threaded. Multi-threaded _process_message reads from this
+                    # but since this is single threaded, we won't run into simul
+                    # writes. At worst, we can duplicate a thread, which will be
+                    # deduped later on.
+                    if thread_or_message_ts not in seen_thread_ts:
+                        yield doc
+
+                    seen_thread_ts.add(thread_or_message_ts)
+                elif processed_slack_message.filter_reason:
+                    num_bot_filtered_messages += 1
+                elif failure:
+                    yield failure
+
+        return num_bot_filtered_messages
+
+    @staticmethod
+    def _is_bot_channel(
+        message_batch: list[MessageType], num_bot_filtered_messages: int
+    ) -> bool:
+        """Whether the first batch of messages of a channel shows that it is mostly
+        bot messages. Needs at least BOT_CHANNEL_MIN_BATCH_SIZE messages, we shouldn't
+        skip based on a small sampling of messages."""
+        if len(message_batch) <= SlackConnector.BOT_CHANNEL_MIN_BATCH_SIZE:
+            return False
+
+        bot_message_threshold = SlackConnector.BOT_CHANNEL_PERCENTAGE_THRESHOLD * len(
+            message_batch
+        )
+        return num_bot_filtered_messages > bot_message_threshold
+
     def _load_from_checkpoint(
         self,
         start: SecondsSinceUnixEpoch,
@@ -830,8 +934,6 @@ class SlackConnector(
         seen_thread_ts = set(checkpoint.seen_thread_ts)
 
         try:
-            num_bot_filtered_messages = 0
-
             oldest = str(start) if start else None
             latest = str(end)
 
@@ -859,49 +961,12 @@ class SlackConnector(
 
             num_threads_start = len(seen_thread_ts)
 
-            # Process messages in parallel using ThreadPoolExecutor
-            with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
-                # NOTE(rkuo): this seems to be assuming the slack sdk is thread safe.
-                # That's a very bold assumption! Haven't seen a direct issue with this
-                # yet, but likely not correct to rely on.
-
-                futures: list[Future[ProcessedSlackMessage]] = []
-                for message in message_batch:
-                    # Capture the current context so that the thread gets the current tenant ID
-                    current_context = contextvars.copy_context()
-                    futures.append(
-                        executor.submit(
-                            current_context.run,
-                            _process_message,
-                            message=message,
-                            client=self.client,
-                            channel=channel,
-                            slack_cleaner=self.text_cleaner,
-                            user_cache=self.user_cache,
-                            seen_thread_ts=seen_thread_ts,
-                            channel_access=checkpoint.current_channel_access,
-                        )
-                    )
-
-                for future in as_completed(futures):
-                    processed_slack_message = future.result()
-                    doc = processed_slack_message.doc
-                    thread_or_message_ts = processed_slack_message.thread_or_message_ts
-                    failure = processed_slack_message.failure
-                    if doc:
-                        # handle race conditions here since this is single
-                        # threaded. Multi-threaded _process_message reads from this
-                        # but since this is single threaded, we won't run into simul
-                        # writes. At worst, we can duplicate a thread, which will be
-                        # deduped later on.
-                        if thread_or_message_ts not in seen_thread_ts:
-                            yield doc
-
-                        seen_thread_ts.add(thread_or_message_ts)
-                    elif processed_slack_message.filter_reason:
-                        num_bot_filtered_messages += 1
-                    elif failure:
-                        yield failure
+            num_bot_filtered_messages = yield from self._process_message_batch(
+                message_batch=message_batch,
+                channel=channel,
+                channel_access=checkpoint.current_channel_access,
+                seen_thread_ts=seen_thread_ts,
+            )
 
             num_threads_processed = len(seen_thread_ts) - num_threads_start
 
@@ -940,19 +1005,13 @@ class SlackConnector(
             # bypass channels where the first set of messages seen are all bots
             # check at least MIN_BOT_MESSAGE_THRESHOLD messages are in the batch
             # we shouldn't skip based on a small sampling of messages
-            if (
-                channel_message_ts is None
-                and len(message_batch) > SlackConnector.BOT_CHANNEL_MIN_BATCH_SIZE
+            if channel_message_ts is None and self._is_bot_channel(
+                message_batch, num_bot_filtered_messages
             ):
-                if (
-                    num_bot_filtered_messages
-                    > SlackConnector.BOT_CHANNEL_PERCENTAGE_THRESHOLD
-                    * len(message_batch)
-                ):
-                    logger.warning(
-                        "Bypassing this channel since it appears to be mostly bot messages"
-                    )
-                    has_more_in_channel = False
+                logger.warning(
+                    "Bypassing this channel since it appears to be mostly bot messages"
+                )
+                has_more_in_channel = False
 
             if not has_more_in_channel:
                 num_channels_remaining -= 1
@@ -1008,12 +1067,236 @@ class SlackConnector(
 
         return checkpoint
 
+    def _activate_channel(
+        self,
+        checkpoint: SlackCheckpoint,
+        channel: ChannelType,
+        include_permissions: bool,
+    ) -> None:
+        if self.client is None:
+            raise ConnectorMissingCredentialError("Slack")
+
+        if include_permissions:
+            checkpoint.active_channel_access[channel["id"]] = get_channel_access(
+                client=self.client,
+                channel=channel,
+                user_cache=self.user_cache,
+            )
+        if checkpoint.active_channels is None:
+            checkpoint.active_channels = []
+        checkpoint.active_channels.append(channel)
+
+    def _fetch_channel_messages(
+        self,
+        channel: ChannelType,
+        oldest: str | None,
+        latest: str,
+    ) -> tuple[list[MessageType], bool] | Exception:
+        """_get_messages, with the error returned instead of raised so that one
+        channel failing doesn't lose the messages fetched for the others."""
+        if self.client is None:
+            raise ConnectorMissingCredentialError("Slack")
+
+        try:
+            return _get_messages(channel, self.client, oldest, latest)
+        except Exception as e:
+            return e
+
+    def _load_channels_concurrently_from_checkpoint(
+        self,
+        start: SecondsSinceUnixEpoch,
+        end: SecondsSinceUnixEpoch,
+        checkpoint: SlackCheckpoint,
+        include_permissions: bool = False,
+    ) -> CheckpointOutput[SlackCheckpoint]:
+        """Like _load_from_checkpoint, but with up to num_channel_workers channels
+        being fetched at a time, so that workspaces with many small channels aren't
+        bound by waiting on one conversations.history call after the other.
+
+        Each call fetches the next batch of messages of every active channel
+        concurrently, then processes the batches one after the other. The position
+        in each channel is kept in channel_completion_map and the channels being
+        fetched in active_channels, so the run can resume from any checkpoint.
+        Finished channels are replaced by the next ones not started yet.
+
+        The requests still go through the same client, so they wait on the delay
+        shared through Redis like the requests of the other workers, and the client
+        makes at most num_channel_workers requests for the credential at a time."""
+        if self.client is None or self.text_cleaner is None:
+            raise ConnectorMissingCredentialError("Slack")
+
+        checkpoint = cast(SlackCheckpoint, copy.deepcopy(checkpoint))
+
+        if checkpoint.channel_ids is None:
+            raw_channels = get_channels(self.client)
+            filtered_channels = filter_channels(
+                raw_channels, self.channels, self.channel_regex_enabled
+            )
+            logger.info(
+                f"Channels - initial checkpoint: "
+                f"all={len(raw_channels)} "
+                f"post_filtering={len(filtered_channels)}"
+            )
+
+            checkpoint.channel_ids = [c["id"] for c in filtered_channels]
+            checkpoint.active_channels = []
+            for channel in filtered_channels[: self.num_channel_workers]:
+                self._activate_channel(checkpoint, channel, include_permissions)
+            checkpoint.has_more = bool(checkpoint.active_channels)
+            return checkpoint
+
+        if checkpoint.active_channels is None:
+            # the checkpoint comes from fetching one channel at a time
+            checkpoint.active_channels = []
+            if checkpoint.current_channel is not None:
+                checkpoint.active_channels.append(checkpoint.current_channel)
+                checkpoint.active_channel_access[checkpoint.current_channel["id"]] = (
+                    checkpoint.current_channel_access
+                )
+            checkpoint.current_channel = None
+            checkpoint.current_channel_access = None
+
+        final_channel_ids = checkpoint.channel_ids
+        active_channels = checkpoint.active_channels
+        seen_thread_ts = set(checkpoint.seen_thread_ts)
+
+        oldest = str(start) if start else None
+        latest_by_channel_id = {
+            channel["id"]: checkpoint.channel_completion_map.get(channel["id"])
+            for channel in active_channels
+        }
+        message_batches = run_functions_tuples_in_parallel(
+            [
+                (
+                    self._fetch_channel_messages,
+                    (
+                        channel,
+                        oldest,
+                        latest_by_channel_id[channel["id"]] or str(end),
+                    ),
+                )
+                for channel in active_channels
+            ],
+            max_workers=self.num_channel_workers,
+        )
+
+        finished_channel_ids: set[str] = set()
+        for channel, result in zip(active_channels, message_batches):
+            channel_id = channel["id"]
+            channel_message_ts = latest_by_channel_id[channel_id]
+            try:
+                # the channel stays active and is retried on the next call
+                if isinstance(result, Exception):
+                    raise result
+
+                message_batch, has_more_in_channel = result
+                logger.info(
+                    f"Retrieved messages: "
+                    f"{len(message_batch)=} "
+                    f"{channel=} "
+                    f"{oldest=} "
+                    f"latest={channel_message_ts or str(end)}"
+                )
+
+                num_bot_filtered_messages = yield from self._process_message_batch(
+                    message_batch=message_batch,
+                    channel=channel,
+                    channel_access=checkpoint.active_channel_access.get(channel_id),
+                    seen_thread_ts=seen_thread_ts,
+                )
+
+                checkpoint.channel_completion_map[channel_id] = (
+                    message_batch[-1]["ts"]
+                    if message_batch
+                    else channel_message_ts or str(end)
+                )
+
+                # bypass channels where the first set of messages seen are all bots
+                if channel_message_ts is None and self._is_bot_channel(
+                    message_batch, num_bot_filtered_messages
+                ):
+                    logger.warning(
+                        f"Bypassing channel {channel['name']} since it appears to be "
+                        "mostly bot messages"
+                    )
+                    has_more_in_channel = False
+
+                if not has_more_in_channel:
+                    finished_channel_ids.add(channel_id)
+            except Exception as e:
+                logger.exception(f"Error processing channel {channel['name']}")
+                yield ConnectorFailure(
+                    failed_entity=EntityFailure(
+                        entity_id=channel_id,
+                        missed_time_range=(
+                            datetime.fromtimestamp(start, tz=timezone.utc),
+                            datetime.fromtimestamp(end, tz=timezone.utc),
+                        ),
+                    ),
+                    failure_message=str(e),
+                    exception=e,
+                )
+
+        checkpoint.seen_thread_ts = list(seen_thread_ts)
+        checkpoint.active_channels = [
+            channel
+            for channel in active_channels
+            if channel["id"] not in finished_channel_ids
+        ]
+        for channel_id in finished_channel_ids:
+            checkpoint.active_channel_access.pop(channel_id, None)
+
+        active_channel_ids = {channel["id"] for channel in checkpoint.active_channels}
+        new_channel_ids = [
+            channel_id
+            for channel_id in final_channel_ids
+            if channel_id not in checkpoint.channel_completion_map
+            and channel_id not in active_channel_ids
+        ][: self.num_channel_workers - len(checkpoint.active_channels)]
+        for channel_id in new_channel_ids:
+            try:
+                self._activate_channel(
+                    checkpoint,
+                    _get_channel_by_id(self.client, channel_id),
+                    include_permissions,
+                )
+            except Exception as e:
+                # not started yet, so it's picked up again on the next call
+                logger.exception(f"Error getting channel {channel_id}")
+                yield ConnectorFailure(
+                    failed_entity=EntityFailure(entity_id=channel_id),
+                    failure_message=str(e),
+                    exception=e,
+                )
+                break
+
+        num_channels_remaining = sum(
+            1
+            for channel_id in final_channel_ids
+            if channel_id not in checkpoint.channel_completion_map
+            or channel_id in active_channel_ids
+        )
+        logger.info(
+            f"All channels processing stats: "
+            f"processed={len(final_channel_ids) - num_channels_remaining} "
+            f"remaining={num_channels_remaining} "
+            f"active={len(checkpoint.active_channels)} "
+            f"total={len(final_channel_ids)}"
+        )
+
+        checkpoint.has_more = bool(checkpoint.active_channels)
+        return checkpoint
+
     def load_from_checkpoint(
         self,
         start: SecondsSinceUnixEpoch,
         end: SecondsSinceUnixEpoch,
         checkpoint: SlackCheckpoint,
     ) -> CheckpointOutput[SlackCheckpoint]:
+        if self.num_channel_workers > 1:
+            return self._load_channels_concurrently_from_checkpoint(
+                start, end, checkpoint, include_permissions=False
+            )
         return self._load_from_checkpoint(
             start, end, checkpoint, include_permissions=False
         )
@@ -1024,6 +1307,10 @@ class SlackConnector(
         end: SecondsSinceUnixEpoch,
         checkpoint: SlackCheckpoint,
     ) -> CheckpointOutput[SlackCheckpoint]:
+        if self.num_channel_workers > 1:
+            return self._load_channels_concurrently_from_checkpoint(
+                start, end, checkpoint, include_permissions=True
+            )
         return self._load_from_checkpoint(
             start, end, checkpoint, include_permissions=True
         )
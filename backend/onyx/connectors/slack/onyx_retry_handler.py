@@ -8,6 +8,8 @@ from slack_sdk.http_retry.request import HttpRequest
 from slack_sdk.http_retry.response import HttpResponse
 from slack_sdk.http_retry.state import RetryState
 
+from onyx.connectors.slack.utils import ONYX_SLACK_DELAY_TTL_LOCK_TTL
+from onyx.connectors.slack.utils import ONYX_SLACK_LOCK_BLOCKING_TIMEOUT
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -36,14 +38,18 @@ class OnyxRedisSlackRetryHandler(RetryHandler):
         max_retry_count: int,
         delay_key: str,
         r: Redis,
+        delay_ttl_lock: str | None = None,
     ):
         """
-        delay_lock: the redis key to use with RedisLock (to synchronize access to delay_key)
         delay_key: the redis key containing a shared TTL
+        delay_ttl_lock: the redis key to use with RedisLock to synchronize reading and
+        extending delay_key, needed when a credential's clients may make more than
+        one request at a time
         """
         super().__init__(max_retry_count=max_retry_count)
         self._redis: Redis = r
         self._delay_key = delay_key
+        self._delay_ttl_lock = delay_ttl_lock
 
     def _can_retry(
         self,
@@ -71,10 +77,10 @@ class OnyxRedisSlackRetryHandler(RetryHandler):
 
         We're combining this with an actual subclass of the slack web client so
         that the delay is used BEFORE calling an API endpoint. The subclassed client
-        has already taken the lock in redis when this method is called.
+        has already taken a request slot in redis when this method is called. With
+        more than one slot, delay_ttl_lock keeps concurrent rate limited requests from
+        overwriting each other's extension of the delay.
         """
-        ttl_ms: int | None = None
-
         retry_after_value: list[str] | None = None
         retry_after_header_name: Optional[str] = None
         duration_s: float = 1.0  # seconds
@@ -118,11 +124,15 @@ class OnyxRedisSlackRetryHandler(RetryHandler):
             duration_s += random.random()
 
         # Read and extend the ttl
-        ttl_ms = cast(int, self._redis.pttl(self._delay_key))
-        if ttl_ms < 0:  # negative values are error status codes ... see docs
-            ttl_ms = 0
-        ttl_ms_new = ttl_ms + int(duration_s * 1000.0)
-        self._redis.set(self._delay_key, "1", px=ttl_ms_new)
+        if self._delay_ttl_lock:
+            with self._redis.lock(
+                self._delay_ttl_lock,
+                timeout=ONYX_SLACK_DELAY_TTL_LOCK_TTL,
+                blocking_timeout=ONYX_SLACK_LOCK_BLOCKING_TIMEOUT,
+            ):
+                ttl_ms_new = self._extend_delay(duration_s)
+        else:
+            ttl_ms_new = self._extend_delay(duration_s)
 
         logger.warning(
             f"OnyxRedisSlackRetryHandler.prepare_for_next_attempt setting delay: "
@@ -132,3 +142,11 @@ class OnyxRedisSlackRetryHandler(RetryHandler):
         )
 
         state.increment_current_attempt()
+
+    def _extend_delay(self, duration_s: float) -> int:
+        ttl_ms = cast(int, self._redis.pttl(self._delay_key))
+        if ttl_ms < 0:  # negative values are error status codes ... see docs
+            ttl_ms = 0
+        ttl_ms_new = ttl_ms + int(duration_s * 1000.0)
+        self._redis.set(self._delay_key, "1", px=ttl_ms_new)
+        return ttl_ms_new
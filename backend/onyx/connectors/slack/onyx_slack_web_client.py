@@ -1,3 +1,4 @@
+import random
 import threading
 import time
 from typing import Any
@@ -10,6 +11,7 @@ from redis.lock import Lock as RedisLock
 from slack_sdk import WebClient
 
 from onyx.connectors.slack.utils import ONYX_SLACK_LOCK_BLOCKING_TIMEOUT
+from onyx.connectors.slack.utils import ONYX_SLACK_LOCK_SLOT_BLOCKING_TIMEOUT
 from onyx.connectors.slack.utils import ONYX_SLACK_LOCK_TOTAL_BLOCKING_TIMEOUT
 from onyx.connectors.slack.utils import ONYX_SLACK_LOCK_TTL
 from onyx.utils.logger import setup_logger
@@ -26,14 +28,27 @@ class OnyxSlackWebClient(WebClient):
     The retry handler writes the correct delay value to redis so that it is can be used
     by this wrapper.
 
+    Requests take one of max_concurrent_requests slots in redis, so all the clients of
+    a credential together make at most that many requests at a time. The first slot is
+    delay_lock itself, so with the default of 1 every request is serialized.
+
     """
 
     def __init__(
-        self, delay_lock: str, delay_key: str, r: Redis, *args: Any, **kwargs: Any
+        self,
+        delay_lock: str,
+        delay_key: str,
+        r: Redis,
+        *args: Any,
+        max_concurrent_requests: int = 1,
+        **kwargs: Any,
     ) -> None:
         super().__init__(*args, **kwargs)
         self._delay_key = delay_key
         self._delay_lock = delay_lock
+        self._request_locks = [delay_lock] + [
+            f"{delay_lock}:{slot}" for slot in range(1, max_concurrent_requests)
+        ]
         self._redis: Redis = r
         self.num_requests: int = 0
         self._lock = threading.Lock()
@@ -45,21 +60,46 @@ class OnyxSlackWebClient(WebClient):
         Redis and parsing/writing of retry values to Redis are handled properly in
         one place"""
         # lock and extend the ttl
-        lock: RedisLock = self._redis.lock(
-            self._delay_lock,
-            timeout=ONYX_SLACK_LOCK_TTL,
-        )
+        lock = self._acquire_request_lock()
+
+        try:
+            result = super()._perform_urllib_http_request(url=url, args=args)
+        finally:
+            if lock.owned():
+                lock.release()
+            else:
+                logger.warning(
+                    "OnyxSlackWebClient._perform_urllib_http_request lock not owned on release"
+                )
+
+        return result
+
+    def _acquire_request_lock(self) -> RedisLock:
+        locks: list[RedisLock] = [
+            self._redis.lock(name, timeout=ONYX_SLACK_LOCK_TTL)
+            for name in self._request_locks
+        ]
 
-        # try to acquire the lock
+        # try to acquire a lock
         start = time.monotonic()
         while True:
-            acquired = lock.acquire(blocking_timeout=ONYX_SLACK_LOCK_BLOCKING_TIMEOUT)
-            if acquired:
-                break
+            if len(locks) == 1:
+                lock = locks[0]
+                blocking_timeout = ONYX_SLACK_LOCK_BLOCKING_TIMEOUT
+            else:
+                # take any free slot, otherwise wait on a random busy one for a bit
+                for lock in locks:
+                    if lock.acquire(blocking=False):
+                        return lock
+                lock = random.choice(locks)
+                blocking_timeout = ONYX_SLACK_LOCK_SLOT_BLOCKING_TIMEOUT
+
+            if lock.acquire(blocking_timeout=blocking_timeout):
+                return lock
 
             # if we couldn't acquire the lock but it exists, there's at least some activity
             # so keep trying...
-            if self._redis.exists(self._delay_lock):
+            if any(self._redis.exists(name) for name in self._request_locks):
                 continue
 
             if time.monotonic() - start > ONYX_SLACK_LOCK_TOTAL_BLOCKING_TIMEOUT:
@@ -68,23 +108,6 @@ class OnyxSlackWebClient(WebClient):
                     f"timed out waiting for lock: {ONYX_SLACK_LOCK_TOTAL_BLOCKING_TIMEOUT=}"
                 )
 
-        try:
-            result = super()._perform_urllib_http_request(url=url, args=args)
-        finally:
-            if lock.owned():
-                lock.release()
-            else:
-                logger.warning(
-                    "OnyxSlackWebClient._perform_urllib_http_request lock not owned on release"
-                )
-
-        time.monotonic() - start
-        # logger.info(
-        #     f"OnyxSlackWebClient._perform_urllib_http_request: Releasing lock: {elapsed=}"
-        # )
-
-        return result
-
     def _perform_urllib_http_request_internal(
         self,
         url: str,
@@ -26,6 +26,11 @@ _SLACK_LIMIT = 900
 ONYX_SLACK_LOCK_TTL = 1800  # how long the lock is allowed to idle before it expires
 ONYX_SLACK_LOCK_BLOCKING_TIMEOUT = 60  # how long to wait for the lock per wait attempt
 ONYX_SLACK_LOCK_TOTAL_BLOCKING_TIMEOUT = 3600  # how long to wait for the lock in total
+# when a client may make several requests at once, how long to wait on one busy
+# request slot before checking the others again
+ONYX_SLACK_LOCK_SLOT_BLOCKING_TIMEOUT = 1
+# only held while reading and extending the retry TTL, never during an API call
+ONYX_SLACK_DELAY_TTL_LOCK_TTL = 10
 
 
 @lru_cache()
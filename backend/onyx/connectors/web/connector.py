@@ -1,9 +1,11 @@
+import asyncio
 import io
 import ipaddress
 import random
 import socket
-import time
+from collections.abc import Iterator
 from datetime import datetime
+from datetime import timedelta
 from datetime import timezone
 from enum import Enum
 from typing import Any
@@ -12,16 +14,25 @@ from typing import Tuple
 from urllib.parse import urljoin
 from urllib.parse import urlparse
 
+import httpx
 import requests
 from bs4 import BeautifulSoup
 from oauthlib.oauth2 import BackendApplicationClient
-from playwright.sync_api import BrowserContext
-from playwright.sync_api import Playwright
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+from playwright.async_api import Browser
+from playwright.async_api import BrowserContext
+from playwright.async_api import Playwright
 from requests_oauthlib import OAuth2Session  # type:ignore
 from urllib3.exceptions import MaxRetryError
 
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import WEB_CONNECTOR_CONDITIONAL_RECRAWL
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENT_PAGES
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS
+from onyx.configs.app_configs import (
+    WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS_PER_HOST,
+)
+from onyx.configs.app_configs import WEB_CONNECTOR_MIN_REQUEST_INTERVAL_SECONDS
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_ID
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_SECRET
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_TOKEN_URL
@@ -32,11 +43,22 @@ from onyx.connectors.exceptions import CredentialExpiredError
 from onyx.connectors.exceptions import InsufficientPermissionsError
 from onyx.connectors.exceptions import UnexpectedValidationError
 from onyx.connectors.interfaces import GenerateDocumentsOutput
+from onyx.connectors.interfaces import GenerateSlimDocumentOutput
 from onyx.connectors.interfaces import LoadConnector
+from onyx.connectors.interfaces import SecondsSinceUnixEpoch
+from onyx.connectors.interfaces import SlimConnector
 from onyx.connectors.models import Document
+from onyx.connectors.models import SlimDocument
 from onyx.connectors.models import TextSection
+from onyx.connectors.web.crawler import CrawlFrontier
+from onyx.connectors.web.crawler import HostRateLimiter
+from onyx.connectors.web.fingerprints import get_content_hash
+from onyx.connectors.web.fingerprints import PageFingerprint
+from onyx.connectors.web.fingerprints import PageFingerprintStore
 from onyx.file_processing.extract_file_text import read_pdf_file
+from onyx.file_processing.html_utils import ParsedHTML
 from onyx.file_processing.html_utils import web_html_cleanup
+from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.utils.logger import setup_logger
 from onyx.utils.sitemap import list_pages_for_site
 from shared_configs.configs import MULTI_TENANT
@@ -45,36 +67,97 @@ logger = setup_logger()
 
 
 class ScrapeSessionContext:
-    """Session level context for scraping"""
+    """Session level context for scraping. It lives for the whole crawl, so the
+    browser is started at most once, and only if a page needs JavaScript to be
+    rendered."""
 
-    def __init__(self, base_url: str, to_visit: list[str]):
+    def __init__(
+        self,
+        base_url: str,
+        to_visit: list[str],
+        previous_fingerprints: dict[str, PageFingerprint] | None = None,
+        sitemap_lastmod: dict[str, datetime] | None = None,
+    ):
         self.base_url = base_url
-        self.to_visit = to_visit
-        self.visited_links: set[str] = set()
+        self.frontier = CrawlFrontier(to_visit)
         self.content_hashes: set[int] = set()
+        # where crawled pages were redirected to
+        self.redirects: dict[str, str] = {}
+
+        # what the pages looked like when they were last indexed, by URL
+        self.previous_fingerprints = previous_fingerprints or {}
+        self.sitemap_lastmod = sitemap_lastmod or {}
 
         self.doc_batch: list[Document] = []
+        # pages of the batch that haven't changed since they were last indexed
+        self.unchanged_urls: list[str] = []
+        # fingerprints of the pages of the batch that changed, to be saved
+        self.fingerprints: dict[str, PageFingerprint] = {}
 
         self.at_least_one_doc: bool = False
         self.last_error: str | None = None
-        self.needs_retry: bool = False
 
-        self.playwright: Playwright | None = None
-        self.playwright_context: BrowserContext | None = None
+        self.host_limiter = HostRateLimiter(
+            max_concurrent_requests_per_host=WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS_PER_HOST,
+            min_request_interval_seconds=WEB_CONNECTOR_MIN_REQUEST_INTERVAL_SECONDS,
+        )
+        self.page_semaphore = asyncio.Semaphore(WEB_CONNECTOR_MAX_CONCURRENT_PAGES)
+        # number of pages per host that had to be rendered in the browser
+        self.rendered_pages_by_host: dict[str, int] = {}
 
-    def initialize(self) -> None:
-        self.stop()
-        self.playwright, self.playwright_context = start_playwright()
+        self.auth_headers = get_oauth_headers()
+        self.http_client: httpx.AsyncClient | None = None
 
-    def stop(self) -> None:
+        self.playwright: Playwright | None = None
+        self.browser: Browser | None = None
+        self.playwright_context: BrowserContext | None = None
+        self._browser_lock = asyncio.Lock()
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        if self.http_client is None:
+            self.http_client = start_http_client(self.auth_headers)
+        return self.http_client
+
+    async def get_browser_context(self) -> BrowserContext:
+        async with self._browser_lock:
+            if self.browser is not None and not self.browser.is_connected():
+                logger.warning("Browser disconnected, restarting it")
+                await self._stop_browser()
+
+            if self.playwright_context is None:
+                (
+                    self.playwright,
+                    self.browser,
+                    self.playwright_context,
+                ) = await start_playwright(self.auth_headers)
+            return self.playwright_context
+
+    async def _stop_browser(self) -> None:
         if self.playwright_context:
-            self.playwright_context.close()
+            try:
+                await self.playwright_context.close()
+            except Exception:
+                logger.debug("Failed to close the browser context", exc_info=True)
             self.playwright_context = None
 
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                logger.debug("Failed to close the browser", exc_info=True)
+            self.browser = None
+
         if self.playwright:
-            self.playwright.stop()
+            await self.playwright.stop()
             self.playwright = None
 
+    async def stop(self) -> None:
+        if self.http_client:
+            await self.http_client.aclose()
+            self.http_client = None
+
+        await self._stop_browser()
+
 
 class ScrapeResult:
     doc: Document | None = None
@@ -86,6 +169,12 @@ WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS = 20
 IFRAME_TEXT_LENGTH_THRESHOLD = 700
 # Message indicating JavaScript is disabled, which often appears when scraping fails
 JAVASCRIPT_DISABLED_MESSAGE = "You have JavaScript disabled in your browser"
+# Pages fetched over plain HTTP with less text than this are rendered in the browser,
+# since their content is probably loaded with JavaScript
+MIN_STATIC_PAGE_TEXT_LENGTH = 200
+# Once this many pages of a host needed to be rendered, the rest of its pages go
+# straight to the browser
+RENDERED_PAGES_BEFORE_SKIPPING_HTTP = 3
 
 # Define common headers that mimic a real browser
 DEFAULT_USER_AGENT = (
@@ -244,17 +333,59 @@ def get_internal_links(
     return internal_links
 
 
-def is_pdf_content(response: requests.Response) -> bool:
+def is_pdf_content(response: requests.Response | httpx.Response) -> bool:
     """Check if the response contains PDF content based on content-type header"""
     content_type = response.headers.get("content-type", "").lower()
     return any(pdf_type in content_type for pdf_type in PDF_MIME_TYPES)
 
 
-def start_playwright() -> Tuple[Playwright, BrowserContext]:
-    playwright = sync_playwright().start()
+def get_oauth_headers() -> dict[str, str]:
+    if not (
+        WEB_CONNECTOR_OAUTH_CLIENT_ID
+        and WEB_CONNECTOR_OAUTH_CLIENT_SECRET
+        and WEB_CONNECTOR_OAUTH_TOKEN_URL
+    ):
+        return {}
+
+    client = BackendApplicationClient(client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID)
+    oauth = OAuth2Session(client=client)
+    token = oauth.fetch_token(
+        token_url=WEB_CONNECTOR_OAUTH_TOKEN_URL,
+        client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID,
+        client_secret=WEB_CONNECTOR_OAUTH_CLIENT_SECRET,
+    )
+    return {"Authorization": "Bearer {}".format(token["access_token"])}
+
+
+async def _check_request_url(request: httpx.Request) -> None:
+    # runs for every request, including redirects, so that redirects can't be used
+    # to reach protected URLs
+    await asyncio.to_thread(protected_url_check, str(request.url))
+
+
+def start_http_client(auth_headers: dict[str, str]) -> httpx.AsyncClient:
+    headers = {
+        # left to httpx, which only advertises the encodings it can decode
+        key: value
+        for key, value in DEFAULT_HEADERS.items()
+        if key != "Accept-Encoding"
+    }
+    return httpx.AsyncClient(
+        headers={**headers, **auth_headers},
+        follow_redirects=True,
+        timeout=30,
+        limits=httpx.Limits(max_connections=WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS),
+        event_hooks={"request": [_check_request_url]},
+    )
+
+
+async def start_playwright(
+    auth_headers: dict[str, str],
+) -> Tuple[Playwright, Browser, BrowserContext]:
+    playwright = await async_playwright().start()
 
     # Launch browser with more realistic settings
-    browser = playwright.chromium.launch(
+    browser = await playwright.chromium.launch(
         headless=True,
         args=[
             "--disable-blink-features=AutomationControlled",
@@ -264,7 +395,7 @@ def start_playwright() -> Tuple[Playwright, BrowserContext]:
     )
 
     # Create a context with realistic browser properties
-    context = browser.new_context(
+    context = await browser.new_context(
         user_agent=DEFAULT_USER_AGENT,
         viewport={"width": 1440, "height": 900},
         device_scale_factor=2.0,
@@ -279,7 +410,7 @@ def start_playwright() -> Tuple[Playwright, BrowserContext]:
     )
 
     # Set additional headers to mimic a real browser
-    context.set_extra_http_headers(
+    await context.set_extra_http_headers(
         {
             "Accept": DEFAULT_HEADERS["Accept"],
             "Accept-Language": DEFAULT_HEADERS["Accept-Language"],
@@ -292,11 +423,12 @@ def start_playwright() -> Tuple[Playwright, BrowserContext]:
             "Sec-CH-UA-Platform": DEFAULT_HEADERS["Sec-CH-UA-Platform"],
             "Cache-Control": "max-age=0",
             "DNT": "1",
+            **auth_headers,
         }
     )
 
     # Add a script to modify navigator properties to avoid detection
-    context.add_init_script(
+    await context.add_init_script(
         """
         Object.defineProperty(navigator, 'webdriver', {
             get: () => undefined
@@ -310,26 +442,26 @@ def start_playwright() -> Tuple[Playwright, BrowserContext]:
     """
     )
 
-    if (
-        WEB_CONNECTOR_OAUTH_CLIENT_ID
-        and WEB_CONNECTOR_OAUTH_CLIENT_SECRET
-        and WEB_CONNECTOR_OAUTH_TOKEN_URL
-    ):
-        client = BackendApplicationClient(client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID)
-        oauth = OAuth2Session(client=client)
-        token = oauth.fetch_token(
-            token_url=WEB_CONNECTOR_OAUTH_TOKEN_URL,
-            client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID,
-            client_secret=WEB_CONNECTOR_OAUTH_CLIENT_SECRET,
-        )
-        context.set_extra_http_headers(
-            {"Authorization": "Bearer {}".format(token["access_token"])}
-        )
+    return playwright, browser, context
+
 
-    return playwright, context
+def _parse_sitemap_lastmod(lastmod: str) -> datetime | None:
+    try:
+        parsed = datetime.fromisoformat(lastmod.strip())
+    except ValueError:
+        return None
 
+    if len(lastmod.strip()) == len("YYYY-MM-DD"):
+        # only the day is known, so the page may have changed until the end of it
+        parsed += timedelta(days=1)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
 
-def extract_urls_from_sitemap(sitemap_url: str) -> list[str]:
+
+def extract_sitemap_entries(
+    sitemap_url: str,
+) -> tuple[list[str], dict[str, datetime]]:
+    """Returns the URLs in the sitemap and, for those that have one, when they were
+    last modified."""
     try:
         response = requests.get(sitemap_url, headers=DEFAULT_HEADERS)
         response.raise_for_status()
@@ -340,6 +472,18 @@ def extract_urls_from_sitemap(sitemap_url: str) -> list[str]:
             for loc_tag in soup.find_all("loc")
         ]
 
+        lastmod_by_url: dict[str, datetime] = {}
+        for url_tag in soup.find_all("url"):
+            loc_tag = url_tag.find("loc")
+            lastmod_tag = url_tag.find("lastmod")
+            if not loc_tag or not lastmod_tag:
+                continue
+            lastmod = _parse_sitemap_lastmod(lastmod_tag.text)
+            if lastmod:
+                lastmod_by_url[_ensure_absolute_url(sitemap_url, loc_tag.text)] = (
+                    lastmod
+                )
+
         if len(urls) == 0 and len(soup.find_all("urlset")) == 0:
             # the given url doesn't look like a sitemap, let's try to find one
             urls = list_pages_for_site(sitemap_url)
@@ -349,7 +493,7 @@ def extract_urls_from_sitemap(sitemap_url: str) -> list[str]:
                 f"No URLs found in sitemap {sitemap_url}. Try using the 'single' or 'recursive' scraping options instead."
             )
 
-        return urls
+        return urls, lastmod_by_url
     except requests.RequestException as e:
         raise RuntimeError(f"Failed to fetch sitemap from {sitemap_url}: {e}")
     except ValueError as e:
@@ -387,7 +531,7 @@ def _get_datetime_from_last_modified_header(last_modified: str) -> datetime | No
         return None
 
 
-def _handle_cookies(context: BrowserContext, url: str) -> None:
+async def _handle_cookies(context: BrowserContext, url: str) -> None:
     """Handle cookies for the given URL to help with bot detection"""
     try:
         # Parse the URL to get the domain
@@ -419,7 +563,7 @@ def _handle_cookies(context: BrowserContext, url: str) -> None:
         # Add cookies to the context
         for cookie in cookies:
             try:
-                context.add_cookies([cookie])  # type: ignore
+                await context.add_cookies([cookie])  # type: ignore
             except Exception as e:
                 logger.debug(f"Failed to add cookie {cookie['name']} for {domain}: {e}")
     except Exception:
@@ -428,7 +572,32 @@ def _handle_cookies(context: BrowserContext, url: str) -> None:
         )
 
 
-class WebConnector(LoadConnector):
+def _get_not_modified_result(
+    url: str, previous: PageFingerprint, session_ctx: ScrapeSessionContext
+) -> ScrapeResult:
+    session_ctx.unchanged_urls.append(url)
+    return ScrapeResult()
+
+
+async def _is_not_modified(
+    url: str, previous: PageFingerprint, session_ctx: ScrapeSessionContext
+) -> bool:
+    conditional_headers = previous.get_conditional_headers()
+    if not conditional_headers:
+        return False
+
+    try:
+        async with session_ctx.host_limiter.limit(url):
+            response = await session_ctx.get_http_client().head(
+                url, headers=conditional_headers
+            )
+    except httpx.HTTPError as e:
+        logger.debug(f"Conditional request for {url} failed: {e}")
+        return False
+    return response.status_code == 304
+
+
+class WebConnector(LoadConnector, SlimConnector):
     MAX_RETRIES = 3
 
     def __init__(
@@ -440,11 +609,17 @@ class WebConnector(LoadConnector):
         scroll_before_scraping: bool = False,
         **kwargs: Any,
     ) -> None:
+        self.base_url = base_url
         self.mintlify_cleanup = mintlify_cleanup
         self.batch_size = batch_size
         self.recursive = False
+        self.sitemap_lastmod: dict[str, datetime] = {}
         self.scroll_before_scraping = scroll_before_scraping
         self.web_connector_type = web_connector_type
+        # the cc-pair the pages are indexed for, set by set_page_fingerprint_scope.
+        # Without it every page is crawled and no fingerprints are kept
+        self.fingerprint_cc_pair: tuple[int, int] | None = None
+        self.skip_unchanged_pages = False
         if web_connector_type == WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value:
             self.recursive = True
             self.to_visit_list = [_ensure_valid_url(base_url)]
@@ -454,7 +629,9 @@ class WebConnector(LoadConnector):
             self.to_visit_list = [_ensure_valid_url(base_url)]
 
         elif web_connector_type == WEB_CONNECTOR_VALID_SETTINGS.SITEMAP:
-            self.to_visit_list = extract_urls_from_sitemap(_ensure_valid_url(base_url))
+            self.to_visit_list, self.sitemap_lastmod = extract_sitemap_entries(
+                _ensure_valid_url(base_url)
+            )
 
         elif web_connector_type == WEB_CONNECTOR_VALID_SETTINGS.UPLOAD:
             # Explicitly check if running in multi-tenant mode to prevent potential security risks
@@ -479,239 +656,502 @@ class WebConnector(LoadConnector):
             logger.warning("Unexpected credentials provided for Web Connector")
         return None
 
-    def _do_scrape(
+    def _fingerprint_page(
+        self,
+        result: ScrapeResult,
+        url: str,
+        content_hash: str,
+        headers: httpx.Headers,
+        session_ctx: ScrapeSessionContext,
+    ) -> None:
+        """Drops the document if the page hasn't changed since it was last indexed."""
+        previous = session_ctx.previous_fingerprints.get(url)
+        unchanged = previous is not None and previous.content_hash == content_hash
+        session_ctx.fingerprints[url] = PageFingerprint(
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            content_hash=content_hash,
+            # the unchanged content isn't indexed again, so it keeps the time it
+            # was crawled for the index
+            crawled_at=(
+                previous.crawled_at
+                if previous is not None and unchanged
+                else datetime.now(timezone.utc)
+            ),
+        )
+
+        if unchanged:
+            result.doc = None
+            session_ctx.unchanged_urls.append(url)
+
+    def _build_result(
         self,
         index: int,
-        initial_url: str,
+        url: str,
+        parsed_html: ParsedHTML,
+        headers: httpx.Headers,
         session_ctx: ScrapeSessionContext,
     ) -> ScrapeResult:
-        """Returns a ScrapeResult object with a doc and retry flag."""
+        result = ScrapeResult()
 
-        if session_ctx.playwright is None:
-            raise RuntimeError("scrape_context.playwright is None")
+        # Sometimes pages with #! will serve duplicate content
+        # There are also just other ways this can happen
+        hashed_text = hash((parsed_html.title, parsed_html.cleaned_text))
+        if hashed_text in session_ctx.content_hashes:
+            logger.info(f"{index}: Skipping duplicate title + content for {url}")
+            return result
 
-        if session_ctx.playwright_context is None:
-            raise RuntimeError("scrape_context.playwright_context is None")
+        session_ctx.content_hashes.add(hashed_text)
+
+        last_modified = headers.get("Last-Modified")
+        result.doc = Document(
+            id=url,
+            sections=[TextSection(link=url, text=parsed_html.cleaned_text)],
+            source=DocumentSource.WEB,
+            semantic_identifier=parsed_html.title or url,
+            metadata={},
+            doc_updated_at=(
+                _get_datetime_from_last_modified_header(last_modified)
+                if last_modified
+                else None
+            ),
+        )
+        self._fingerprint_page(
+            result,
+            url,
+            get_content_hash(parsed_html.title, parsed_html.cleaned_text),
+            headers,
+            session_ctx,
+        )
+        return result
 
-        result = ScrapeResult()
+    def _parse_page(
+        self, url: str, content: str, base_url: str
+    ) -> tuple[ParsedHTML, set[str]]:
+        """Returns the cleaned page and the links to crawl from it. Runs in a worker
+        thread, so the links are added to the frontier by the caller, on the event
+        loop."""
+        soup = BeautifulSoup(content, "html.parser")
+        links = get_internal_links(base_url, url, soup) if self.recursive else set()
+        return web_html_cleanup(soup, self.mintlify_cleanup), links
+
+    def _check_redirect(
+        self,
+        index: int,
+        initial_url: str,
+        final_url: str,
+        session_ctx: ScrapeSessionContext,
+    ) -> bool:
+        """Returns False if the page was redirected to a page that is already being
+        crawled."""
+        if final_url == initial_url:
+            return True
+
+        # the page may be fetched more than once, e.g. when retrying it
+        if session_ctx.redirects.get(initial_url) == final_url:
+            return True
+
+        if not session_ctx.frontier.mark_seen(final_url):
+            logger.info(
+                f"{index}: {initial_url} redirected to {final_url} - already indexed"
+            )
+            return False
 
-        # Handle cookies for the URL
-        _handle_cookies(session_ctx.playwright_context, initial_url)
+        logger.info(f"{index}: {initial_url} redirected to {final_url}")
+        session_ctx.redirects[initial_url] = final_url
+        return True
 
-        # First do a HEAD request to check content type without downloading the entire content
-        head_response = requests.head(
-            initial_url, headers=DEFAULT_HEADERS, allow_redirects=True
+    async def _scrape_pdf(
+        self, url: str, response: httpx.Response, session_ctx: ScrapeSessionContext
+    ) -> ScrapeResult:
+        result = ScrapeResult()
+        page_text, metadata, images = await asyncio.to_thread(
+            read_pdf_file, file=io.BytesIO(response.content)
+        )
+        last_modified = response.headers.get("Last-Modified")
+
+        result.doc = Document(
+            id=url,
+            sections=[TextSection(link=url, text=page_text)],
+            source=DocumentSource.WEB,
+            semantic_identifier=url.split("/")[-1],
+            metadata=metadata,
+            doc_updated_at=(
+                _get_datetime_from_last_modified_header(last_modified)
+                if last_modified
+                else None
+            ),
         )
-        is_pdf = is_pdf_content(head_response)
+        self._fingerprint_page(
+            result,
+            url,
+            get_content_hash(page_text),
+            response.headers,
+            session_ctx,
+        )
+        return result
 
-        if is_pdf or initial_url.lower().endswith(".pdf"):
-            # PDF files are not checked for links
-            response = requests.get(initial_url, headers=DEFAULT_HEADERS)
-            page_text, metadata, images = read_pdf_file(
-                file=io.BytesIO(response.content)
-            )
-            last_modified = response.headers.get("Last-Modified")
-
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=page_text)],
-                source=DocumentSource.WEB,
-                semantic_identifier=initial_url.split("/")[-1],
-                metadata=metadata,
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
-                ),
+    async def _scrape_with_http(
+        self,
+        index: int,
+        initial_url: str,
+        previous: PageFingerprint | None,
+        session_ctx: ScrapeSessionContext,
+    ) -> ScrapeResult | None:
+        """Fetches the page without a browser. Returns None if the page has to be
+        rendered in the browser instead."""
+        result = ScrapeResult()
+
+        async with session_ctx.host_limiter.limit(initial_url):
+            response = await session_ctx.get_http_client().get(
+                initial_url,
+                headers=previous.get_conditional_headers() if previous else None,
             )
 
+        if previous and response.status_code == 304:
+            return _get_not_modified_result(initial_url, previous, session_ctx)
+
+        if is_pdf_content(response) or initial_url.lower().endswith(".pdf"):
+            # PDF files are not checked for links
+            return await self._scrape_pdf(initial_url, response, session_ctx)
+
+        if response.status_code == 403:
+            # usually bot detection, which the browser tends to get around
+            return None
+
+        url = str(response.url)
+        if not self._check_redirect(index, initial_url, url, session_ctx):
             return result
 
-        page = session_ctx.playwright_context.new_page()
-        try:
-            # Can't use wait_until="networkidle" because it interferes with the scrolling behavior
-            page_response = page.goto(
-                initial_url,
-                timeout=30000,  # 30 seconds
-                wait_until="domcontentloaded",  # Wait for DOM to be ready
-            )
+        parsed_html, links = await asyncio.to_thread(
+            self._parse_page, url, response.text, session_ctx.base_url
+        )
+        for link in links:
+            session_ctx.frontier.add(link)
 
-            last_modified = (
-                page_response.header_value("Last-Modified") if page_response else None
+        if response.is_error:
+            session_ctx.last_error = (
+                f"Skipped indexing {url} due to HTTP {response.status_code} response"
             )
-            final_url = page.url
-            if final_url != initial_url:
-                protected_url_check(final_url)
-                initial_url = final_url
-                if initial_url in session_ctx.visited_links:
-                    logger.info(
-                        f"{index}: {initial_url} redirected to {final_url} - already indexed"
+            logger.info(session_ctx.last_error)
+            result.retry = True
+            return result
+
+        if (
+            JAVASCRIPT_DISABLED_MESSAGE in parsed_html.cleaned_text
+            or len(parsed_html.cleaned_text) < MIN_STATIC_PAGE_TEXT_LENGTH
+        ):
+            return None
+
+        return self._build_result(
+            index, url, parsed_html, response.headers, session_ctx
+        )
+
+    async def _scrape_with_browser(
+        self, index: int, initial_url: str, session_ctx: ScrapeSessionContext
+    ) -> ScrapeResult:
+        result = ScrapeResult()
+        context = await session_ctx.get_browser_context()
+
+        # Handle cookies for the URL
+        await _handle_cookies(context, initial_url)
+
+        async with session_ctx.page_semaphore:
+            page = await context.new_page()
+            try:
+                async with session_ctx.host_limiter.limit(initial_url):
+                    # Can't use wait_until="networkidle" because it interferes with the scrolling behavior
+                    page_response = await page.goto(
+                        initial_url,
+                        timeout=30000,  # 30 seconds
+                        wait_until="domcontentloaded",  # Wait for DOM to be ready
                     )
-                    page.close()
+
+                headers = httpx.Headers(
+                    await page_response.all_headers() if page_response else {}
+                )
+                final_url = page.url
+                if final_url != initial_url:
+                    await asyncio.to_thread(protected_url_check, final_url)
+                if not self._check_redirect(index, initial_url, final_url, session_ctx):
                     return result
+                initial_url = final_url
 
-                logger.info(f"{index}: {initial_url} redirected to {final_url}")
-                session_ctx.visited_links.add(initial_url)
-
-            # If we got here, the request was successful
-            if self.scroll_before_scraping:
-                scroll_attempts = 0
-                previous_height = page.evaluate("document.body.scrollHeight")
-                while scroll_attempts < WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS:
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    # wait for the content to load if we scrolled
-                    page.wait_for_load_state("networkidle", timeout=30000)
-                    time.sleep(0.5)  # let javascript run
-
-                    new_height = page.evaluate("document.body.scrollHeight")
-                    if new_height == previous_height:
-                        break  # Stop scrolling when no more content is loaded
-                    previous_height = new_height
-                    scroll_attempts += 1
-
-            content = page.content()
-            soup = BeautifulSoup(content, "html.parser")
-
-            if self.recursive:
-                internal_links = get_internal_links(
-                    session_ctx.base_url, initial_url, soup
+                # If we got here, the request was successful
+                if self.scroll_before_scraping:
+                    scroll_attempts = 0
+                    previous_height = await page.evaluate("document.body.scrollHeight")
+                    while scroll_attempts < WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS:
+                        await page.evaluate(
+                            "window.scrollTo(0, document.body.scrollHeight)"
+                        )
+                        # wait for the content to load if we scrolled
+                        await page.wait_for_load_state("networkidle", timeout=30000)
+                        await asyncio.sleep(0.5)  # let javascript run
+
+                        new_height = await page.evaluate("document.body.scrollHeight")
+                        if new_height == previous_height:
+                            break  # Stop scrolling when no more content is loaded
+                        previous_height = new_height
+                        scroll_attempts += 1
+
+                content = await page.content()
+                parsed_html, links = await asyncio.to_thread(
+                    self._parse_page, initial_url, content, session_ctx.base_url
                 )
-                for link in internal_links:
-                    if link not in session_ctx.visited_links:
-                        session_ctx.to_visit.append(link)
-
-            if page_response and str(page_response.status)[0] in ("4", "5"):
-                session_ctx.last_error = f"Skipped indexing {initial_url} due to HTTP {page_response.status} response"
-                logger.info(session_ctx.last_error)
-                result.retry = True
-                return result
+                for link in links:
+                    session_ctx.frontier.add(link)
+
+                if page_response and str(page_response.status)[0] in ("4", "5"):
+                    session_ctx.last_error = f"Skipped indexing {initial_url} due to HTTP {page_response.status} response"
+                    logger.info(session_ctx.last_error)
+                    result.retry = True
+                    return result
 
-            # after this point, we don't need the caller to retry
-            parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+                # after this point, we don't need the caller to retry
 
-            """For websites containing iframes that need to be scraped,
-            the code below can extract text from within these iframes.
-            """
-            logger.debug(
-                f"{index}: Length of cleaned text {len(parsed_html.cleaned_text)}"
-            )
-            if JAVASCRIPT_DISABLED_MESSAGE in parsed_html.cleaned_text:
-                iframe_count = page.frame_locator("iframe").locator("html").count()
-                if iframe_count > 0:
-                    iframe_texts = (
-                        page.frame_locator("iframe").locator("html").all_inner_texts()
+                """For websites containing iframes that need to be scraped,
+                the code below can extract text from within these iframes.
+                """
+                logger.debug(
+                    f"{index}: Length of cleaned text {len(parsed_html.cleaned_text)}"
+                )
+                if JAVASCRIPT_DISABLED_MESSAGE in parsed_html.cleaned_text:
+                    iframe_count = (
+                        await page.frame_locator("iframe").locator("html").count()
                     )
-                    document_text = "\n".join(iframe_texts)
-                    """ 700 is the threshold value for the length of the text extracted
-                    from the iframe based on the issue faced """
-                    if len(parsed_html.cleaned_text) < IFRAME_TEXT_LENGTH_THRESHOLD:
-                        parsed_html.cleaned_text = document_text
-                    else:
-                        parsed_html.cleaned_text += "\n" + document_text
-
-            # Sometimes pages with #! will serve duplicate content
-            # There are also just other ways this can happen
-            hashed_text = hash((parsed_html.title, parsed_html.cleaned_text))
-            if hashed_text in session_ctx.content_hashes:
-                logger.info(
-                    f"{index}: Skipping duplicate title + content for {initial_url}"
+                    if iframe_count > 0:
+                        iframe_texts = (
+                            await page.frame_locator("iframe")
+                            .locator("html")
+                            .all_inner_texts()
+                        )
+                        document_text = "\n".join(iframe_texts)
+                        """ 700 is the threshold value for the length of the text extracted
+                        from the iframe based on the issue faced """
+                        if len(parsed_html.cleaned_text) < IFRAME_TEXT_LENGTH_THRESHOLD:
+                            parsed_html.cleaned_text = document_text
+                        else:
+                            parsed_html.cleaned_text += "\n" + document_text
+
+                result = self._build_result(
+                    index, initial_url, parsed_html, headers, session_ctx
                 )
-                return result
+            finally:
+                await page.close()
+
+        return result
 
-            session_ctx.content_hashes.add(hashed_text)
-
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=parsed_html.cleaned_text)],
-                source=DocumentSource.WEB,
-                semantic_identifier=parsed_html.title or initial_url,
-                metadata={},
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
-                ),
+    async def _do_scrape(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+    ) -> ScrapeResult:
+        """Returns a ScrapeResult object with a doc and retry flag. Pages are fetched
+        over plain HTTP first, and only rendered in the browser if they need
+        JavaScript (or scrolling)."""
+        previous = session_ctx.previous_fingerprints.get(initial_url)
+        sitemap_lastmod = session_ctx.sitemap_lastmod.get(initial_url)
+        if previous and sitemap_lastmod and sitemap_lastmod <= previous.crawled_at:
+            logger.debug(
+                f"{index}: {initial_url} is unchanged according to the sitemap"
             )
-        finally:
-            page.close()
+            session_ctx.unchanged_urls.append(initial_url)
+            return ScrapeResult()
 
-        return result
+        host = urlparse(initial_url).netloc
+        if (
+            not self.scroll_before_scraping
+            and session_ctx.rendered_pages_by_host.get(host, 0)
+            < RENDERED_PAGES_BEFORE_SKIPPING_HTTP
+        ):
+            result = await self._scrape_with_http(
+                index, initial_url, previous, session_ctx
+            )
+            if result is not None:
+                return result
 
-    def load_from_state(self) -> GenerateDocumentsOutput:
-        """Traverses through all pages found on the website
-        and converts them into documents"""
+            logger.debug(f"{index}: Rendering {initial_url} in the browser")
+            session_ctx.rendered_pages_by_host[host] = (
+                session_ctx.rendered_pages_by_host.get(host, 0) + 1
+            )
+        elif previous and await _is_not_modified(initial_url, previous, session_ctx):
+            # rendering is expensive, so pages are only rendered if they changed
+            return _get_not_modified_result(initial_url, previous, session_ctx)
 
-        if not self.to_visit_list:
-            raise ValueError("No URLs to visit")
+        return await self._scrape_with_browser(index, initial_url, session_ctx)
 
-        base_url = self.to_visit_list[0]  # For the recursive case
-        check_internet_connection(base_url)  # make sure we can connect to the base url
+    async def _scrape_with_retries(
+        self, initial_url: str, session_ctx: ScrapeSessionContext
+    ) -> None:
+        try:
+            await asyncio.to_thread(protected_url_check, initial_url)
+        except Exception as e:
+            session_ctx.last_error = f"Invalid URL {initial_url} due to {e}"
+            logger.warning(session_ctx.last_error)
+            return
 
-        session_ctx = ScrapeSessionContext(base_url, self.to_visit_list)
-        session_ctx.initialize()
+        index = session_ctx.frontier.num_visited
+        logger.info(f"{index}: Visiting {initial_url}")
 
-        while session_ctx.to_visit:
-            initial_url = session_ctx.to_visit.pop()
-            if initial_url in session_ctx.visited_links:
-                continue
-            session_ctx.visited_links.add(initial_url)
+        # Add retry mechanism with exponential backoff
+        retry_count = 0
+
+        while retry_count < self.MAX_RETRIES:
+            if retry_count > 0:
+                # Add a random delay between retries (exponential backoff)
+                delay = min(2**retry_count + random.uniform(0, 1), 10)
+                logger.info(
+                    f"Retry {retry_count}/{self.MAX_RETRIES} for {initial_url} after {delay:.2f}s delay"
+                )
+                await asyncio.sleep(delay)
 
             try:
-                protected_url_check(initial_url)
+                result = await self._do_scrape(index, initial_url, session_ctx)
+                if result.retry:
+                    continue
+
+                if result.doc:
+                    session_ctx.doc_batch.append(result.doc)
             except Exception as e:
-                session_ctx.last_error = f"Invalid URL {initial_url} due to {e}"
-                logger.warning(session_ctx.last_error)
+                session_ctx.last_error = f"Failed to fetch '{initial_url}': {e}"
+                logger.exception(session_ctx.last_error)
                 continue
+            finally:
+                retry_count += 1
+
+            break  # success / don't retry
+
+    async def _crawl_batch(self, session_ctx: ScrapeSessionContext) -> None:
+        """Crawls pages concurrently until there is a full batch of documents and
+        unchanged pages or there is nothing left to crawl. Pages that are already
+        being crawled when the batch fills up are finished, so a batch can be
+        slightly larger than batch_size."""
+        in_progress: set[asyncio.Task[None]] = set()
+        while True:
+            while (
+                len(in_progress) < WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS
+                and len(session_ctx.doc_batch) + len(session_ctx.unchanged_urls)
+                < self.batch_size
+                and (url := session_ctx.frontier.pop()) is not None
+            ):
+                in_progress.add(
+                    asyncio.create_task(self._scrape_with_retries(url, session_ctx))
+                )
+
+            if not in_progress:
+                return
 
-            index = len(session_ctx.visited_links)
-            logger.info(f"{index}: Visiting {initial_url}")
+            # pages being crawled may add more links to the frontier
+            done, in_progress = await asyncio.wait(
+                in_progress, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                task.result()
 
-            # Add retry mechanism with exponential backoff
-            retry_count = 0
+    def set_page_fingerprint_scope(
+        self, connector_id: int, credential_id: int, skip_unchanged_pages: bool
+    ) -> None:
+        """Keeps the fingerprints of the crawled pages for the cc-pair. Unchanged
+        pages are only skipped with skip_unchanged_pages, which must be off when
+        every page needs to be indexed again, e.g. re-indexing from the beginning."""
+        self.fingerprint_cc_pair = (connector_id, credential_id)
+        self.skip_unchanged_pages = skip_unchanged_pages
+
+    def _get_fingerprint_store(self) -> PageFingerprintStore | None:
+        if not WEB_CONNECTOR_CONDITIONAL_RECRAWL or self.fingerprint_cc_pair is None:
+            return None
+        connector_id, credential_id = self.fingerprint_cc_pair
+        return PageFingerprintStore(
+            connector_id, credential_id, self.web_connector_type, self.base_url
+        )
 
-            while retry_count < self.MAX_RETRIES:
-                if retry_count > 0:
-                    # Add a random delay between retries (exponential backoff)
-                    delay = min(2**retry_count + random.uniform(0, 1), 10)
-                    logger.info(
-                        f"Retry {retry_count}/{self.MAX_RETRIES} for {initial_url} after {delay:.2f}s delay"
-                    )
-                    time.sleep(delay)
-
-                try:
-                    result = self._do_scrape(index, initial_url, session_ctx)
-                    if result.retry:
-                        continue
-
-                    if result.doc:
-                        session_ctx.doc_batch.append(result.doc)
-                except Exception as e:
-                    session_ctx.last_error = f"Failed to fetch '{initial_url}': {e}"
-                    logger.exception(session_ctx.last_error)
-                    session_ctx.initialize()
-                    continue
-                finally:
-                    retry_count += 1
+    def _crawl(
+        self, fingerprint_store: PageFingerprintStore | None
+    ) -> Iterator[ScrapeSessionContext]:
+        """Yields the session context after each batch, with the documents and the
+        unchanged pages of the batch. The batch is cleared when the crawl resumes."""
 
-                break  # success / don't retry
+        if not self.to_visit_list:
+            raise ValueError("No URLs to visit")
 
-            if len(session_ctx.doc_batch) >= self.batch_size:
-                session_ctx.initialize()
-                session_ctx.at_least_one_doc = True
-                yield session_ctx.doc_batch
+        base_url = self.to_visit_list[0]  # For the recursive case
+        check_internet_connection(base_url)  # make sure we can connect to the base url
+
+        previous_fingerprints = (
+            fingerprint_store.load()
+            if fingerprint_store and self.skip_unchanged_pages
+            else {}
+        )
+        session_ctx = ScrapeSessionContext(
+            base_url,
+            self.to_visit_list,
+            previous_fingerprints=previous_fingerprints,
+            sitemap_lastmod=self.sitemap_lastmod,
+        )
+        if self.recursive:
+            # unchanged pages aren't read, so their links aren't known. The pages
+            # found by the last crawl are visited again instead
+            for url in previous_fingerprints:
+                session_ctx.frontier.add(url)
+
+        # the crawl runs on its own event loop, which is kept between batches so that
+        # the browser and connections stay open
+        loop = asyncio.new_event_loop()
+        try:
+            while session_ctx.frontier:
+                loop.run_until_complete(self._crawl_batch(session_ctx))
+
+                if session_ctx.doc_batch or session_ctx.unchanged_urls:
+                    session_ctx.at_least_one_doc = True
+                yield session_ctx
                 session_ctx.doc_batch = []
+                session_ctx.unchanged_urls = []
+                session_ctx.fingerprints = {}
 
-        if session_ctx.doc_batch:
-            session_ctx.stop()
-            session_ctx.at_least_one_doc = True
-            yield session_ctx.doc_batch
+            if not session_ctx.at_least_one_doc:
+                if session_ctx.last_error:
+                    raise RuntimeError(session_ctx.last_error)
+                raise RuntimeError("No valid pages found.")
+        finally:
+            loop.run_until_complete(session_ctx.stop())
+            loop.close()
 
-        if not session_ctx.at_least_one_doc:
-            if session_ctx.last_error:
-                raise RuntimeError(session_ctx.last_error)
-            raise RuntimeError("No valid pages found.")
+    def load_from_state(self) -> GenerateDocumentsOutput:
+        """Traverses through all pages found on the website
+        and converts them into documents. Pages that haven't changed since they were
+        last indexed are skipped"""
+        fingerprint_store = self._get_fingerprint_store()
+        for session_ctx in self._crawl(fingerprint_store):
+            # the fingerprints are only used once the documents have been
+            # indexed, see PageFingerprintStore.load
+            if fingerprint_store:
+                fingerprint_store.save(session_ctx.fingerprints)
+
+            if session_ctx.doc_batch:
+                yield session_ctx.doc_batch
 
-        session_ctx.stop()
+    def retrieve_all_slim_documents(
+        self,
+        start: SecondsSinceUnixEpoch | None = None,
+        end: SecondsSinceUnixEpoch | None = None,
+        callback: IndexingHeartbeatInterface | None = None,
+    ) -> GenerateSlimDocumentOutput:
+        """Includes the unchanged pages that load_from_state skips, so that pruning
+        doesn't remove them"""
+        for session_ctx in self._crawl(self._get_fingerprint_store()):
+            if callback and callback.should_stop():
+                raise RuntimeError("retrieve_all_slim_documents: Stop signal detected")
+
+            slim_doc_batch = [
+                SlimDocument(id=doc.id) for doc in session_ctx.doc_batch
+            ] + [SlimDocument(id=url) for url in session_ctx.unchanged_urls]
+            if slim_doc_batch:
+                yield slim_doc_batch
+
+            if callback:
+                callback.progress("retrieve_all_slim_documents", len(slim_doc_batch))
 
     def validate_connector_settings(self) -> None:
         # Make sure we have at least one valid URL to check
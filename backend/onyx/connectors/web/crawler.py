@@ -0,0 +1,77 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+
+class CrawlFrontier:
+    """The URLs left to crawl. URLs are deduplicated when they are added, so a URL is
+    only crawled once over the whole crawl no matter how many pages link to it.
+
+    The URLs seen are kept in memory for the crawl, across batches, and not across
+    runs: the connector has no checkpoint to resume a crawl from, so a run that is
+    retried crawls from the start again. Work across runs is saved by the page
+    fingerprints instead. Not thread safe, only use it from the event loop."""
+
+    def __init__(self, urls: Iterable[str]) -> None:
+        self._to_visit: deque[str] = deque()
+        self._seen: set[str] = set()
+        self.num_visited = 0
+        for url in urls:
+            self.add(url)
+
+    def add(self, url: str) -> bool:
+        """Returns False if the URL was already added."""
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        self._to_visit.append(url)
+        return True
+
+    def mark_seen(self, url: str) -> bool:
+        """For URLs reached without going through the frontier, e.g. redirects.
+        Returns False if the URL was already added."""
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        return True
+
+    def pop(self) -> str | None:
+        if not self._to_visit:
+            return None
+        self.num_visited += 1
+        return self._to_visit.popleft()
+
+    def __len__(self) -> int:
+        return len(self._to_visit)
+
+
+class HostRateLimiter:
+    """Limits how many requests run against a host at once and spaces out when they
+    start."""
+
+    def __init__(
+        self, max_concurrent_requests_per_host: int, min_request_interval_seconds: float
+    ) -> None:
+        self.max_concurrent_requests_per_host = max_concurrent_requests_per_host
+        self.min_request_interval_seconds = min_request_interval_seconds
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.setdefault(
+            host, asyncio.Semaphore(self.max_concurrent_requests_per_host)
+        )
+        async with semaphore:
+            # reserve the next start time for this host before waiting for it
+            now = time.monotonic()
+            start_at = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start_at + self.min_request_interval_seconds
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+            yield
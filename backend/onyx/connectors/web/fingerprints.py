@@ -0,0 +1,122 @@
+"""Remembers what the pages crawled by a web connector looked like when they were
+last indexed, so that re-crawls can send conditional requests and skip pages that
+haven't changed.
+
+Fingerprints are kept per cc-pair and saved while crawling, before the page has been
+indexed. A fingerprint is only used if the page is still a document of the cc-pair
+and the document was indexed after the fingerprinted content was crawled, so pages
+whose batch failed to index or that were deleted are crawled and indexed again."""
+
+import hashlib
+from datetime import datetime
+from typing import cast
+
+from pydantic import BaseModel
+
+from onyx.configs.app_configs import WEB_CONNECTOR_PAGE_FINGERPRINT_TTL_SECONDS
+from onyx.db.document import (
+    get_document_last_modified_for_connector_credential_pair,
+)
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.batching import batch_generator
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_FINGERPRINT_KEY_PREFIX = "web_connector_page_fingerprints"
+_EXISTING_DOCUMENTS_BATCH_SIZE = 1000
+
+
+class PageFingerprint(BaseModel):
+    etag: str | None = None
+    last_modified: str | None = None
+    content_hash: str
+    # when the content with content_hash was crawled. Not updated when the page is
+    # crawled again unchanged, since it is only indexed again if it changed
+    crawled_at: datetime
+
+    def get_conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def get_content_hash(*parts: str | None) -> str:
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update((part or "").encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class PageFingerprintStore:
+    def __init__(
+        self,
+        connector_id: int,
+        credential_id: int,
+        web_connector_type: str,
+        base_url: str,
+    ) -> None:
+        self.connector_id = connector_id
+        self.credential_id = credential_id
+        # the connector settings are part of the key since they can be edited
+        settings_hash = get_content_hash(web_connector_type, base_url)
+        self.key = (
+            f"{_FINGERPRINT_KEY_PREFIX}:{connector_id}:{credential_id}:{settings_hash}"
+        )
+
+    def load(self) -> dict[str, PageFingerprint]:
+        """Fingerprints of the pages that are still documents of the cc-pair and
+        have been indexed since they were fingerprinted, by URL."""
+        try:
+            stored = cast(dict[bytes, bytes], get_redis_client().hgetall(self.key))
+            fingerprints = {
+                url.decode("utf-8"): PageFingerprint.model_validate_json(fingerprint)
+                for url, fingerprint in stored.items()
+            }
+
+            # a document's last_modified is only set once it has been written to
+            # the index, so it is older than the fingerprint if the batch failed
+            last_modified_by_url: dict[str, datetime] = {}
+            with get_session_with_current_tenant() as db_session:
+                for urls in batch_generator(
+                    fingerprints.keys(), _EXISTING_DOCUMENTS_BATCH_SIZE
+                ):
+                    last_modified_by_url.update(
+                        get_document_last_modified_for_connector_credential_pair(
+                            db_session, self.connector_id, self.credential_id, urls
+                        )
+                    )
+        except Exception as e:
+            logger.warning(
+                f"Failed to load web page fingerprints, crawling all pages: {e}"
+            )
+            return {}
+
+        return {
+            url: fingerprint
+            for url, fingerprint in fingerprints.items()
+            if url in last_modified_by_url
+            and last_modified_by_url[url] >= fingerprint.crawled_at
+        }
+
+    def save(self, fingerprints: dict[str, PageFingerprint]) -> None:
+        if not fingerprints:
+            return
+
+        try:
+            redis_client = get_redis_client()
+            redis_client.hset(
+                self.key,
+                mapping={
+                    url: fingerprint.model_dump_json()
+                    for url, fingerprint in fingerprints.items()
+                },
+            )
+            redis_client.expire(self.key, WEB_CONNECTOR_PAGE_FINGERPRINT_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to save web page fingerprints: {e}")
@@ -219,6 +219,38 @@ def get_documents_for_connector_credential_pair(
     return db_session.scalars(stmt).all()
 
 
+def get_document_ids_for_connector_credential_pair_in_batches(
+    db_session: Session,
+    connector_id: int,
+    credential_id: int,
+    batch_size: int = 10_000,
+) -> Generator[list[str], None, None]:
+    """Yields the document ids of the cc pair in batches, ordered by id. Pages by id
+    instead of by offset, so every batch is an index lookup."""
+    last_id: str | None = None
+    while True:
+        stmt = (
+            select(DocumentByConnectorCredentialPair.id)
+            .where(
+                and_(
+                    DocumentByConnectorCredentialPair.connector_id == connector_id,
+                    DocumentByConnectorCredentialPair.credential_id == credential_id,
+                )
+            )
+            .order_by(DocumentByConnectorCredentialPair.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(DocumentByConnectorCredentialPair.id > last_id)
+
+        doc_ids = list(db_session.scalars(stmt).all())
+        if doc_ids:
+            yield doc_ids
+        if len(doc_ids) < batch_size:
+            return
+        last_id = doc_ids[-1]
+
+
 def get_documents_by_ids(
     db_session: Session,
     document_ids: list[str],
@@ -228,6 +260,35 @@ def get_documents_by_ids(
     return list(documents)
 
 
+def get_document_last_modified_for_connector_credential_pair(
+    db_session: Session,
+    connector_id: int,
+    credential_id: int,
+    document_ids: list[str],
+) -> dict[str, datetime]:
+    """When each of the given documents of the cc-pair was last modified, documents
+    that aren't part of the cc-pair are left out."""
+    stmt = (
+        select(DbDocument.id, DbDocument.last_modified)
+        .join(
+            DocumentByConnectorCredentialPair,
+            DocumentByConnectorCredentialPair.id == DbDocument.id,
+        )
+        .where(
+            and_(
+                DocumentByConnectorCredentialPair.connector_id == connector_id,
+                DocumentByConnectorCredentialPair.credential_id == credential_id,
+                DbDocument.id.in_(document_ids),
+            )
+        )
+    )
+    return {
+        document_id: last_modified
+        for document_id, last_modified in db_session.execute(stmt).all()
+        if last_modified is not None
+    }
+
+
 def get_document_connector_count(
     db_session: Session,
     document_id: str,
@@ -1,4 +1,7 @@
 import base64
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from io import BytesIO
 
 from langchain_core.messages import BaseMessage
@@ -6,14 +9,57 @@ from langchain_core.messages import HumanMessage
 from langchain_core.messages import SystemMessage
 from PIL import Image
 
+from onyx.configs.app_configs import (
+    IMAGE_SUMMARIZATION_MAX_CONCURRENT_REQUESTS_PER_PROVIDER,
+)
 from onyx.configs.app_configs import IMAGE_SUMMARIZATION_SYSTEM_PROMPT
 from onyx.configs.app_configs import IMAGE_SUMMARIZATION_USER_PROMPT
+from onyx.configs.app_configs import IMAGE_SUMMARY_CACHE_TTL_SECONDS
 from onyx.llm.interfaces import LLM
+from onyx.llm.output_cache import cache_output
+from onyx.llm.output_cache import get_cached_output
+from onyx.llm.output_cache import get_llm_output_cache_key
 from onyx.llm.utils import message_to_string
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+_IMAGE_SUMMARY_CACHE_KEY_PREFIX = "image_summary"
+
+# bounds the requests in flight to each LLM provider across all indexing batches
+_provider_semaphores: dict[str, threading.BoundedSemaphore] = {}
+# held while an image is summarized, so that identical images summarized at the
+# same time wait for the cached summary instead of calling the LLM again
+_summary_key_locks: dict[str, threading.Lock] = {}
+_summary_key_lock_users: dict[str, int] = {}
+_locks_lock = threading.Lock()
+
+
+def _get_provider_semaphore(model_provider: str) -> threading.BoundedSemaphore:
+    with _locks_lock:
+        if model_provider not in _provider_semaphores:
+            _provider_semaphores[model_provider] = threading.BoundedSemaphore(
+                IMAGE_SUMMARIZATION_MAX_CONCURRENT_REQUESTS_PER_PROVIDER
+            )
+        return _provider_semaphores[model_provider]
+
+
+@contextmanager
+def _lock_summary_key(key: str) -> Iterator[None]:
+    with _locks_lock:
+        lock = _summary_key_locks.setdefault(key, threading.Lock())
+        _summary_key_lock_users[key] = _summary_key_lock_users.get(key, 0) + 1
+
+    try:
+        with lock:
+            yield
+    finally:
+        with _locks_lock:
+            _summary_key_lock_users[key] -= 1
+            if not _summary_key_lock_users[key]:
+                del _summary_key_lock_users[key]
+                del _summary_key_locks[key]
+
 
 def prepare_image_bytes(image_data: bytes) -> str:
     """Prepare image bytes for summarization.
@@ -74,7 +120,32 @@ def summarize_image_with_error_handling(
     user_prompt = (
         f"The image has the file name '{context_name}'.\n{user_prompt_template}"
     )
-    return summarize_image_pipeline(llm, image_data, user_prompt, system_prompt)
+
+    if IMAGE_SUMMARY_CACHE_TTL_SECONDS <= 0:
+        with _get_provider_semaphore(llm.config.model_provider):
+            return summarize_image_pipeline(llm, image_data, user_prompt, system_prompt)
+
+    # the file name is deliberately left out of the key, it only gives the LLM
+    # context and the same image is often stored under different names
+    key = get_llm_output_cache_key(
+        _IMAGE_SUMMARY_CACHE_KEY_PREFIX,
+        llm,
+        system_prompt,
+        user_prompt_template,
+        image_data,
+    )
+    with _lock_summary_key(key):
+        cached_summary = get_cached_output(key)
+        if cached_summary is not None:
+            return cached_summary
+
+        with _get_provider_semaphore(llm.config.model_provider):
+            summary = summarize_image_pipeline(
+                llm, image_data, user_prompt, system_prompt
+            )
+        if summary:
+            cache_output(key, summary, IMAGE_SUMMARY_CACHE_TTL_SECONDS)
+        return summary
 
 
 def _summarize_image(
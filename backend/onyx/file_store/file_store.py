@@ -1,3 +1,5 @@
+import hashlib
+import io
 import tempfile
 import uuid
 from abc import ABC
@@ -9,6 +11,7 @@ from typing import IO
 
 import boto3
 import puremagic
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from mypy_boto3_s3 import S3Client
@@ -17,9 +20,13 @@ from sqlalchemy.orm import Session
 from onyx.configs.app_configs import AWS_REGION_NAME
 from onyx.configs.app_configs import S3_AWS_ACCESS_KEY_ID
 from onyx.configs.app_configs import S3_AWS_SECRET_ACCESS_KEY
+from onyx.configs.app_configs import S3_DEDUPLICATE_BY_CONTENT_HASH
 from onyx.configs.app_configs import S3_ENDPOINT_URL
 from onyx.configs.app_configs import S3_FILE_STORE_BUCKET_NAME
 from onyx.configs.app_configs import S3_FILE_STORE_PREFIX
+from onyx.configs.app_configs import S3_MULTIPART_MAX_CONCURRENCY
+from onyx.configs.app_configs import S3_MULTIPART_PART_SIZE
+from onyx.configs.app_configs import S3_MULTIPART_THRESHOLD
 from onyx.configs.app_configs import S3_VERIFY_SSL
 from onyx.configs.constants import FileOrigin
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
@@ -31,6 +38,8 @@ from onyx.db.file_record import get_filerecord_by_prefix
 from onyx.db.file_record import upsert_filerecord
 from onyx.db.models import FileRecord
 from onyx.db.models import FileRecord as FileStoreModel
+from onyx.file_store.constants import MAX_IN_MEMORY_SIZE
+from onyx.file_store.constants import STANDARD_CHUNK_SIZE
 from onyx.file_store.s3_key_utils import generate_s3_key
 from onyx.utils.file import FileWithMimeType
 from onyx.utils.logger import setup_logger
@@ -38,6 +47,9 @@ from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
+# S3 object metadata key used to record the SHA-256 of the stored content
+_CONTENT_HASH_METADATA_KEY = "sha256"
+
 
 class FileStore(ABC):
     """
@@ -97,7 +109,11 @@ class FileStore(ABC):
 
     @abstractmethod
     def read_file(
-        self, file_id: str, mode: str | None = None, use_tempfile: bool = False
+        self,
+        file_id: str,
+        mode: str | None = None,
+        use_tempfile: bool = False,
+        stream: bool = False,
     ) -> IO[bytes]:
         """
         Read the content of a given file by the ID
@@ -107,6 +123,9 @@ class FileStore(ABC):
         - mode: Mode to open the file (e.g. 'b' for binary)
         - use_tempfile: Whether to use a temporary file to store the contents
                         in order to avoid loading the entire file into memory
+        - stream: Whether to return a seekable file-like object that lazily fetches
+                  the contents from the blob store as it is read. Takes precedence
+                  over use_tempfile.
 
         Returns:
             Contents of the file and metadata dict
@@ -151,6 +170,72 @@ class FileStore(ABC):
         """
 
 
+class _S3RangedReader(io.RawIOBase):
+    """Read-only, seekable view of an S3 object. Bytes are only fetched (via ranged
+    GETs) when they are actually read, so callers that stream through a large file
+    or only look at parts of it (e.g. the central directory of a zip) never hold
+    the whole object in memory."""
+
+    def __init__(
+        self, s3_client: S3Client, bucket_name: str, object_key: str, size: int
+    ) -> None:
+        super().__init__()
+        self._s3_client = s3_client
+        self._bucket_name = bucket_name
+        self._object_key = object_key
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            new_position = offset
+        elif whence == io.SEEK_CUR:
+            new_position = self._position + offset
+        elif whence == io.SEEK_END:
+            new_position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence value: {whence}")
+
+        if new_position < 0:
+            raise ValueError(f"Negative seek position {new_position}")
+
+        self._position = new_position
+        return self._position
+
+    def _fetch(self, length: int) -> bytes:
+        end = min(self._position + length, self._size) - 1
+        if end < self._position:
+            return b""
+
+        response = self._s3_client.get_object(
+            Bucket=self._bucket_name,
+            Key=self._object_key,
+            Range=f"bytes={self._position}-{end}",
+        )
+        data = response["Body"].read()
+        self._position += len(data)
+        return data
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._fetch(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def readall(self) -> bytes:
+        # the default implementation reads in tiny increments, which would
+        # translate into a flood of GET requests
+        return self._fetch(self._size - self._position)
+
+
 class S3BackedFileStore(FileStore):
     """Isn't necessarily S3, but is any S3-compatible storage (e.g. MinIO)"""
 
@@ -163,6 +248,10 @@ class S3BackedFileStore(FileStore):
         s3_endpoint_url: str | None = None,
         s3_prefix: str | None = None,
         s3_verify_ssl: bool = True,
+        multipart_threshold: int = S3_MULTIPART_THRESHOLD,
+        multipart_part_size: int = S3_MULTIPART_PART_SIZE,
+        multipart_max_concurrency: int = S3_MULTIPART_MAX_CONCURRENCY,
+        deduplicate_by_content_hash: bool = S3_DEDUPLICATE_BY_CONTENT_HASH,
     ) -> None:
         self._s3_client: S3Client | None = None
         self._bucket_name = bucket_name
@@ -172,6 +261,14 @@ class S3BackedFileStore(FileStore):
         self._s3_endpoint_url = s3_endpoint_url
         self._s3_prefix = s3_prefix or "onyx-files"
         self._s3_verify_ssl = s3_verify_ssl
+        self._multipart_threshold = multipart_threshold
+        self._deduplicate_by_content_hash = deduplicate_by_content_hash
+        self._transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_part_size,
+            max_concurrency=multipart_max_concurrency,
+            use_threads=multipart_max_concurrency > 1,
+        )
 
     def _get_s3_client(self) -> S3Client:
         """Initialize S3 client if not already done"""
@@ -316,25 +413,51 @@ class S3BackedFileStore(FileStore):
         if file_id is None:
             file_id = str(uuid.uuid4())
 
-        s3_client = self._get_s3_client()
         bucket_name = self._get_bucket_name()
         s3_key = self._get_s3_key(file_id)
 
-        # Read content from IO object
-        if hasattr(content, "read"):
-            file_content = content.read()
-            if hasattr(content, "seek"):
-                content.seek(0)  # Reset position for potential re-reads
-        else:
-            file_content = content
-
-        # Upload to S3
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=s3_key,
-            Body=file_content,
-            ContentType=file_type,
-        )
+        if not hasattr(content, "read"):
+            content = BytesIO(cast(bytes, content))
+
+        # multipart uploads need bytes, text streams are already fully in memory
+        upload_source: IO = content
+        if isinstance(content, io.TextIOBase):
+            upload_source = BytesIO(content.read().encode("utf-8"))
+
+        # the spooled copy is only needed to hash non-seekable streams
+        spooled_content: IO | None = None
+        object_metadata: dict[str, str] = {}
+        try:
+            already_uploaded = False
+            if self._deduplicate_by_content_hash:
+                if not _is_seekable(upload_source):
+                    spooled_content = tempfile.SpooledTemporaryFile(
+                        max_size=MAX_IN_MEMORY_SIZE
+                    )
+                    content_hash = _hash_content(
+                        upload_source, spool_to=spooled_content
+                    )
+                    upload_source = spooled_content
+                else:
+                    content_hash = _hash_content(upload_source)
+                object_metadata[_CONTENT_HASH_METADATA_KEY] = content_hash
+                already_uploaded = self._object_has_content_hash(s3_key, content_hash)
+
+            if already_uploaded:
+                logger.debug(f"Content for {file_id} is unchanged, skipping upload")
+            else:
+                self._upload(
+                    content=upload_source,
+                    s3_key=s3_key,
+                    file_type=file_type,
+                    object_metadata=object_metadata,
+                )
+        finally:
+            if spooled_content is not None:
+                spooled_content.close()
+
+        if _is_seekable(content):
+            content.seek(0)  # Reset position for potential re-reads
 
         with get_session_with_current_tenant_if_none(db_session) as db_session:
             # Save metadata to database
@@ -352,11 +475,55 @@ class S3BackedFileStore(FileStore):
 
         return file_id
 
+    def _upload(
+        self,
+        content: IO,
+        s3_key: str,
+        file_type: str,
+        object_metadata: dict[str, str],
+    ) -> None:
+        """Small payloads go up in a single PUT. Anything larger than the multipart
+        threshold (or of unknown size) is streamed up in parallel parts, so the
+        full content never has to be held in memory."""
+        s3_client = self._get_s3_client()
+        bucket_name = self._get_bucket_name()
+
+        remaining_size = _get_remaining_size(content)
+        if remaining_size is not None and remaining_size < self._multipart_threshold:
+            s3_client.put_object(
+                Bucket=bucket_name,
+                Key=s3_key,
+                Body=content.read(),
+                ContentType=file_type,
+                Metadata=object_metadata,
+            )
+            return
+
+        s3_client.upload_fileobj(
+            content,
+            bucket_name,
+            s3_key,
+            ExtraArgs={"ContentType": file_type, "Metadata": object_metadata},
+            Config=self._transfer_config,
+        )
+
+    def _object_has_content_hash(self, s3_key: str, content_hash: str) -> bool:
+        s3_client = self._get_s3_client()
+        try:
+            head = s3_client.head_object(Bucket=self._get_bucket_name(), Key=s3_key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+        return head.get("Metadata", {}).get(_CONTENT_HASH_METADATA_KEY) == content_hash
+
     def read_file(
         self,
         file_id: str,
         mode: str | None = None,
         use_tempfile: bool = False,
+        stream: bool = False,
         db_session: Session | None = None,
     ) -> IO[bytes]:
         with get_session_with_current_tenant_if_none(db_session) as db_session:
@@ -365,6 +532,24 @@ class S3BackedFileStore(FileStore):
             )
 
         s3_client = self._get_s3_client()
+
+        if stream:
+            try:
+                head = s3_client.head_object(
+                    Bucket=file_record.bucket_name, Key=file_record.object_key
+                )
+            except ClientError:
+                logger.error(f"Failed to read file {file_id} from S3")
+                raise
+
+            raw_reader = _S3RangedReader(
+                s3_client=s3_client,
+                bucket_name=file_record.bucket_name,
+                object_key=file_record.object_key,
+                size=head["ContentLength"],
+            )
+            return io.BufferedReader(raw_reader, buffer_size=STANDARD_CHUNK_SIZE)
+
         try:
             response = s3_client.get_object(
                 Bucket=file_record.bucket_name, Key=file_record.object_key
@@ -373,16 +558,16 @@ class S3BackedFileStore(FileStore):
             logger.error(f"Failed to read file {file_id} from S3")
             raise
 
-        file_content = response["Body"].read()
-
         if use_tempfile:
-            # Always open in binary mode for temp files since we're writing bytes
+            # Always open in binary mode for temp files since we're writing bytes.
+            # Copy in chunks so that the full file is never held in memory.
             temp_file = tempfile.NamedTemporaryFile(mode="w+b", delete=False)
-            temp_file.write(file_content)
+            for chunk in response["Body"].iter_chunks(chunk_size=STANDARD_CHUNK_SIZE):
+                temp_file.write(chunk)
             temp_file.seek(0)
             return temp_file
         else:
-            return BytesIO(file_content)
+            return BytesIO(response["Body"].read())
 
     def read_file_record(
         self, file_id: str, db_session: Session | None = None
@@ -509,6 +694,44 @@ class S3BackedFileStore(FileStore):
         return file_records
 
 
+def _is_seekable(content: IO) -> bool:
+    seekable = getattr(content, "seekable", None)
+    if seekable is not None:
+        return bool(seekable())
+    return hasattr(content, "seek") and hasattr(content, "tell")
+
+
+def _get_remaining_size(content: IO) -> int | None:
+    """Number of bytes between the current position and the end of the stream,
+    or None if that can't be determined without consuming the stream."""
+    if not _is_seekable(content):
+        return None
+
+    position = content.tell()
+    end = content.seek(0, io.SEEK_END)
+    content.seek(position)
+    return end - position
+
+
+def _hash_content(content: IO, spool_to: IO | None = None) -> str:
+    """SHA-256 of the remaining content, read in chunks. Seekable content is
+    rewound afterwards; otherwise the bytes are copied into `spool_to` (which is
+    left rewound) so that they can still be uploaded."""
+    start_position = content.tell() if spool_to is None else 0
+    hasher = hashlib.sha256()
+    while chunk := content.read(STANDARD_CHUNK_SIZE):
+        hasher.update(chunk)
+        if spool_to is not None:
+            spool_to.write(chunk)
+
+    if spool_to is not None:
+        spool_to.seek(0)
+    else:
+        content.seek(start_position)
+
+    return hasher.hexdigest()
+
+
 def get_s3_file_store() -> S3BackedFileStore:
     """
     Returns the S3 file store implementation.
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import cast
 
 from chonkie import SentenceChunker
@@ -34,6 +35,9 @@ CHUNK_OVERLAP = 0
 # overwhelm the actual contents of the chunk
 MAX_METADATA_PERCENTAGE = 0.25
 CHUNK_MIN_CONTENT = 256
+# The blurb and mini chunk splitters count the tokens of the same sentences one after
+# the other, only needs to hold the sentences of a couple of chunks
+_SENTENCE_TOKEN_COUNT_CACHE_SIZE = 1024
 
 logger = setup_logger()
 
@@ -157,7 +161,11 @@ class Chunker:
         self.max_context = 0
         self.prompt_tokens = 0
 
+        # SECTION_SEPARATOR is added between every two sections of a chunk
+        self.section_separator_token_count = len(tokenizer.encode(SECTION_SEPARATOR))
+
         # Create a token counter function that returns the count instead of the tokens
+        @lru_cache(maxsize=_SENTENCE_TOKEN_COUNT_CACHE_SIZE)
         def token_counter(text: str) -> int:
             return len(tokenizer.encode(text))
 
@@ -273,10 +281,24 @@ class Chunker:
         chunks: list[DocAwareChunk] = []
         link_offsets: dict[int, str] = {}
         chunk_text = ""
+        # Running token count and link offset of chunk_text, so that the growing chunk
+        # doesn't have to be re-encoded for every section added to it. The count is
+        # None when it can't be summed up and chunk_text has to be encoded instead.
+        chunk_token_count: int | None = 0
+        chunk_offset = 0
+
+        section_texts = [clean_text(str(section.text or "")) for section in sections]
+        # image sections are chunked on their own and never need a count
+        section_token_counts = self.tokenizer.count_tokens_batch(
+            [
+                "" if section.image_file_id else section_text
+                for section, section_text in zip(sections, section_texts)
+            ]
+        )
 
         for section_idx, section in enumerate(sections):
             # Get section text and other attributes
-            section_text = clean_text(str(section.text or ""))
+            section_text = section_texts[section_idx]
             section_link_text = section.link or ""
             image_url = section.image_file_id
 
@@ -304,6 +326,8 @@ class Chunker:
                     )
                     chunk_text = ""
                     link_offsets = {}
+                    chunk_token_count = 0
+                    chunk_offset = 0
 
                 # Create a chunk specifically for this image section
                 # (Using the text summary that was generated during processing)
@@ -321,7 +345,7 @@ class Chunker:
                 continue
 
             # CASE 2: Normal text section
-            section_token_count = len(self.tokenizer.encode(section_text))
+            section_token_count = section_token_counts[section_idx]
 
             # If the section is large on its own, split it separately
             if section_token_count > content_token_limit:
@@ -338,6 +362,8 @@ class Chunker:
                     )
                     chunk_text = ""
                     link_offsets = {}
+                    chunk_token_count = 0
+                    chunk_offset = 0
 
                 # chunker is in `text` mode
                 split_texts = cast(list[str], self.chunk_splitter.chunk(section_text))
@@ -375,16 +401,34 @@ class Chunker:
                 continue
 
             # If we can still fit this section into the current chunk, do so
-            current_token_count = len(self.tokenizer.encode(chunk_text))
-            current_offset = len(shared_precompare_cleanup(chunk_text))
+            if chunk_token_count is None:
+                current_token_count = len(self.tokenizer.encode(chunk_text))
+            else:
+                current_token_count = chunk_token_count
+            current_offset = chunk_offset
             next_section_tokens = (
-                len(self.tokenizer.encode(SECTION_SEPARATOR)) + section_token_count
+                self.section_separator_token_count + section_token_count
+            )
+            section_count_summable = self.tokenizer.supports_summed_token_counts(
+                section_text
             )
+            # the separator doesn't change the cleaned up length
+            section_offset = len(shared_precompare_cleanup(section_text))
 
             if next_section_tokens + current_token_count <= content_token_limit:
                 if chunk_text:
                     chunk_text += SECTION_SEPARATOR
+                    chunk_token_count = (
+                        current_token_count + next_section_tokens
+                        if chunk_token_count is not None and section_count_summable
+                        else None
+                    )
+                else:
+                    chunk_token_count = (
+                        section_token_count if section_count_summable else None
+                    )
                 chunk_text += section_text
+                chunk_offset += section_offset
                 link_offsets[current_offset] = section_link_text
             else:
                 # finalize the existing chunk
@@ -401,6 +445,10 @@ class Chunker:
                 # start a new chunk
                 link_offsets = {0: section_link_text}
                 chunk_text = section_text
+                chunk_token_count = (
+                    section_token_count if section_count_summable else None
+                )
+                chunk_offset = section_offset
 
         # finalize any leftover text chunk
         if chunk_text.strip() or not chunks:
@@ -426,12 +474,10 @@ class Chunker:
         # Title prep
         title = self._extract_blurb(document.get_title_for_document_index() or "")
         title_prefix = title + RETURN_SEPARATOR if title else ""
-        title_tokens = len(self.tokenizer.encode(title_prefix))
 
         # Metadata prep
         metadata_suffix_semantic = ""
         metadata_suffix_keyword = ""
-        metadata_tokens = 0
         if self.include_metadata:
             (
                 metadata_suffix_semantic,
@@ -439,7 +485,9 @@ class Chunker:
             ) = _get_metadata_suffix_for_document_index(
                 document.metadata, include_separator=True
             )
-            metadata_tokens = len(self.tokenizer.encode(metadata_suffix_semantic))
+        title_tokens, metadata_tokens = self.tokenizer.count_tokens_batch(
+            [title_prefix, metadata_suffix_semantic]
+        )
 
         # If metadata is too large, skip it in the semantic content
         if metadata_tokens >= self.chunk_token_limit * MAX_METADATA_PERCENTAGE:
@@ -450,8 +498,7 @@ class Chunker:
         doc_token_count = 0
         if self.enable_contextual_rag:
             doc_content = document.get_text_content()
-            tokenized_doc = self.tokenizer.tokenize(doc_content)
-            doc_token_count = len(tokenized_doc)
+            doc_token_count = len(self.tokenizer.encode(doc_content))
 
             # check if doc + title + metadata fits in a single chunk. If so, no need for contextual RAG
             single_chunk_fits = (
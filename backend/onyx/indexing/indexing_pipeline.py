@@ -1,5 +1,6 @@
 from collections import defaultdict
 from collections.abc import Callable
+from collections.abc import Sequence
 from typing import Protocol
 
 from pydantic import BaseModel
@@ -8,15 +9,20 @@ from sqlalchemy.orm import Session
 
 from onyx.access.access import get_access_for_documents
 from onyx.access.models import DocumentAccess
+from onyx.configs.app_configs import CONTEXTUAL_RAG_CACHE_TTL_SECONDS
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_NAME
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_PROVIDER
 from onyx.configs.app_configs import ENABLE_CONTEXTUAL_RAG
+from onyx.configs.app_configs import IMAGE_SUMMARIZATION_MAX_WORKERS
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.configs.app_configs import MAX_TOKENS_FOR_FULL_INCLUSION
 from onyx.configs.app_configs import USE_CHUNK_SUMMARY
 from onyx.configs.app_configs import USE_DOCUMENT_SUMMARY
 from onyx.configs.constants import DEFAULT_BOOST
 from onyx.configs.llm_configs import get_image_extraction_and_analysis_enabled
+from onyx.configs.model_configs import (
+    INFORMATION_CONTENT_CLASSIFICATION_CACHE_TTL_SECONDS,
+)
 from onyx.configs.model_configs import USE_INFORMATION_CONTENT_CLASSIFICATION
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     get_experts_stores_representations,
@@ -63,7 +69,6 @@ from onyx.indexing.embedder import embed_chunks_with_failure_handling
 from onyx.indexing.embedder import IndexingEmbedder
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import DocMetadataAwareIndexChunk
-from onyx.indexing.models import IndexChunk
 from onyx.indexing.models import UpdatableChunkData
 from onyx.indexing.vector_db_insertion import write_chunks_to_vector_db_with_backoff
 from onyx.llm.chat_llm import LLMRateLimitError
@@ -71,6 +76,11 @@ from onyx.llm.factory import get_default_llm_with_vision
 from onyx.llm.factory import get_default_llms
 from onyx.llm.factory import get_llm_for_contextual_rag
 from onyx.llm.interfaces import LLM
+from onyx.llm.output_cache import cache_output
+from onyx.llm.output_cache import cache_outputs
+from onyx.llm.output_cache import get_cached_outputs
+from onyx.llm.output_cache import get_llm_output_cache_key
+from onyx.llm.output_cache import get_output_cache_key
 from onyx.llm.utils import MAX_CONTEXT_TOKENS
 from onyx.llm.utils import message_to_string
 from onyx.natural_language_processing.search_nlp_models import (
@@ -84,14 +94,26 @@ from onyx.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT2
 from onyx.prompts.chat_prompts import DOCUMENT_SUMMARY_PROMPT
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import run_in_background
+from onyx.utils.threadpool_concurrency import wait_on_background
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import (
     INDEXING_INFORMATION_CONTENT_CLASSIFICATION_CUTOFF_LENGTH,
 )
+from shared_configs.configs import INDEXING_INFORMATION_CONTENT_CLASSIFICATION_MAX
+from shared_configs.configs import INDEXING_INFORMATION_CONTENT_CLASSIFICATION_MIN
+from shared_configs.configs import (
+    INDEXING_INFORMATION_CONTENT_CLASSIFICATION_TEMPERATURE,
+)
+from shared_configs.configs import INFORMATION_CONTENT_MODEL_TAG
+from shared_configs.configs import INFORMATION_CONTENT_MODEL_VERSION
 
 
 logger = setup_logger()
 
+_CONTEXTUAL_RAG_CACHE_KEY_PREFIX = "contextual_rag"
+_CONTENT_CLASSIFICATION_CACHE_KEY_PREFIX = "content_classification"
+
 
 class DocumentBatchPrepareContext(BaseModel):
     updatable_docs: list[Document]
@@ -170,41 +192,90 @@ def _upsert_documents_in_db(
             )
 
 
+def _get_content_classification_cache_key(content: str) -> str:
+    # the model and the settings used to turn its output into a boost factor are
+    # part of the key, so changing any of them is a cache miss
+    return get_output_cache_key(
+        _CONTENT_CLASSIFICATION_CACHE_KEY_PREFIX,
+        INFORMATION_CONTENT_MODEL_VERSION,
+        INFORMATION_CONTENT_MODEL_TAG or "",
+        str(INDEXING_INFORMATION_CONTENT_CLASSIFICATION_MIN),
+        str(INDEXING_INFORMATION_CONTENT_CLASSIFICATION_MAX),
+        str(INDEXING_INFORMATION_CONTENT_CLASSIFICATION_TEMPERATURE),
+        content,
+    )
+
+
+def _get_cached_content_boost_factors(contents: list[str]) -> dict[str, float]:
+    if INFORMATION_CONTENT_CLASSIFICATION_CACHE_TTL_SECONDS <= 0:
+        return {}
+
+    cached_values = get_cached_outputs(
+        [_get_content_classification_cache_key(c) for c in contents]
+    )
+    return {
+        content: float(cached)
+        for content, cached in zip(contents, cached_values)
+        if cached is not None
+    }
+
+
+def _cache_content_boost_factors(boost_factors: dict[str, float]) -> None:
+    if INFORMATION_CONTENT_CLASSIFICATION_CACHE_TTL_SECONDS <= 0:
+        return
+
+    cache_outputs(
+        {
+            _get_content_classification_cache_key(content): str(boost_factor)
+            for content, boost_factor in boost_factors.items()
+        },
+        INFORMATION_CONTENT_CLASSIFICATION_CACHE_TTL_SECONDS,
+    )
+
+
 def _get_aggregated_chunk_boost_factor(
-    chunks: list[IndexChunk],
+    chunks: Sequence[DocAwareChunk],
     information_content_classification_model: InformationContentClassificationModel,
 ) -> list[float]:
-    """Calculates the aggregated boost factor for a chunk based on its content."""
-
-    short_chunk_content_dict = {
-        chunk_num: chunk.content
-        for chunk_num, chunk in enumerate(chunks)
-        if len(chunk.content.split())
-        <= INDEXING_INFORMATION_CONTENT_CLASSIFICATION_CUTOFF_LENGTH
-    }
-    short_chunk_contents = list(short_chunk_content_dict.values())
-    short_chunk_keys = list(short_chunk_content_dict.keys())
+    """Calculates the aggregated boost factor for a chunk based on its content.
+    Scores of previously classified content are read from the cache, only the
+    remaining short chunks are sent to the model server."""
+
+    # the same content (e.g. a boilerplate footer) only needs to be classified once
+    short_chunk_contents = list(
+        dict.fromkeys(
+            chunk.content
+            for chunk in chunks
+            if len(chunk.content.split())
+            <= INDEXING_INFORMATION_CONTENT_CLASSIFICATION_CUTOFF_LENGTH
+        )
+    )
+    score_map = _get_cached_content_boost_factors(short_chunk_contents)
+    uncached_contents = [
+        content for content in short_chunk_contents if content not in score_map
+    ]
 
     try:
-        predictions = information_content_classification_model.predict(
-            short_chunk_contents
+        predictions = (
+            information_content_classification_model.predict(uncached_contents)
+            if uncached_contents
+            else []
         )
-        # Create a mapping of chunk positions to their scores
-        score_map = {
-            short_chunk_keys[i]: prediction.content_boost_factor
-            for i, prediction in enumerate(predictions)
+        new_scores = {
+            content: prediction.content_boost_factor
+            for content, prediction in zip(uncached_contents, predictions)
         }
-        # Default to 1.0 for longer chunks, use predicted score for short chunks
-        chunk_content_scores = [score_map.get(i, 1.0) for i in range(len(chunks))]
+        _cache_content_boost_factors(new_scores)
+        score_map.update(new_scores)
 
-        return chunk_content_scores
+        # Default to 1.0 for longer chunks, use predicted score for short chunks
+        return [score_map.get(chunk.content, 1.0) for chunk in chunks]
 
     except Exception as e:
         logger.exception(
             f"Error predicting content classification for chunks: {e}. Falling back to individual examples."
         )
 
-        chunks_with_scores: list[IndexChunk] = []
         chunk_content_scores = []
 
         for chunk in chunks:
@@ -213,7 +284,10 @@ def _get_aggregated_chunk_boost_factor(
                 > INDEXING_INFORMATION_CONTENT_CLASSIFICATION_CUTOFF_LENGTH
             ):
                 chunk_content_scores.append(1.0)
-                chunks_with_scores.append(chunk)
+                continue
+
+            if chunk.content in score_map:
+                chunk_content_scores.append(score_map[chunk.content])
                 continue
 
             try:
@@ -222,7 +296,6 @@ def _get_aggregated_chunk_boost_factor(
                         0
                     ].content_boost_factor
                 )
-                chunks_with_scores.append(chunk)
             except Exception as e:
                 logger.exception(
                     f"Error predicting content classification for chunk: {e}."
@@ -441,6 +514,29 @@ def filter_documents(document_batch: list[Document]) -> list[Document]:
     return documents
 
 
+def _summarize_image(llm: LLM, image_file_id: str) -> str:
+    """Returns the text of the processed section of an image, which is never empty"""
+    try:
+        file_store = get_default_file_store()
+
+        file_record = file_store.read_file_record(file_id=image_file_id)
+        if not file_record:
+            logger.warning(f"Image file {image_file_id} not found in FileStore")
+            return "[Image could not be processed]"
+
+        # Get the image data
+        image_data = file_store.read_file(file_id=image_file_id).read()
+        summary = summarize_image_with_error_handling(
+            llm=llm,
+            image_data=image_data,
+            context_name=file_record.display_name or "Image",
+        )
+        return summary or "[Image could not be summarized]"
+    except Exception as e:
+        logger.error(f"Error processing image section: {e}")
+        return "[Error processing image]"
+
+
 def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
     """
     Process all sections in documents by:
@@ -482,54 +578,34 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
             for document in documents
         ]
 
+    # summarize each distinct image once, several at a time
+    image_file_ids = list(
+        dict.fromkeys(
+            section.image_file_id
+            for document in documents
+            for section in document.sections
+            if isinstance(section, ImageSection)
+        )
+    )
+    image_texts = run_functions_tuples_in_parallel(
+        [(_summarize_image, (llm, image_file_id)) for image_file_id in image_file_ids],
+        max_workers=IMAGE_SUMMARIZATION_MAX_WORKERS,
+    )
+    image_file_id_to_text = dict(zip(image_file_ids, image_texts))
+
     indexed_documents: list[IndexingDocument] = []
 
     for document in documents:
         processed_sections: list[Section] = []
 
         for section in document.sections:
-            # For ImageSection, process and create base Section with both text and image_file_id
+            # For ImageSection, create base Section with both the summary text and image_file_id
             if isinstance(section, ImageSection):
-                # Default section with image path preserved - ensure text is always a string
                 processed_section = Section(
                     link=section.link,
                     image_file_id=section.image_file_id,
-                    text="",  # Initialize with empty string
+                    text=image_file_id_to_text[section.image_file_id],
                 )
-
-                # Try to get image summary
-                try:
-                    file_store = get_default_file_store()
-
-                    file_record = file_store.read_file_record(
-                        file_id=section.image_file_id
-                    )
-                    if not file_record:
-                        logger.warning(
-                            f"Image file {section.image_file_id} not found in FileStore"
-                        )
-
-                        processed_section.text = "[Image could not be processed]"
-                    else:
-                        # Get the image data
-                        image_data_io = file_store.read_file(
-                            file_id=section.image_file_id
-                        )
-                        image_data = image_data_io.read()
-                        summary = summarize_image_with_error_handling(
-                            llm=llm,
-                            image_data=image_data,
-                            context_name=file_record.display_name or "Image",
-                        )
-
-                        if summary:
-                            processed_section.text = summary
-                        else:
-                            processed_section.text = "[Image could not be summarized]"
-                except Exception as e:
-                    logger.error(f"Error processing image section: {e}")
-                    processed_section.text = "[Error processing image]"
-
                 processed_sections.append(processed_section)
 
             # For TextSection, create a base Section with text and link
@@ -550,30 +626,66 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
     return indexed_documents
 
 
+def _get_contextual_rag_cache_key(llm: LLM, prompt: str) -> str:
+    # the prompt contains the prompt template and the document and chunk content,
+    # so a change to any of them is a cache miss
+    return get_llm_output_cache_key(
+        _CONTEXTUAL_RAG_CACHE_KEY_PREFIX, llm, str(MAX_CONTEXT_TOKENS), prompt
+    )
+
+
+def _get_cached_contextual_rag_outputs(
+    llm: LLM, prompts: list[str]
+) -> list[str | None]:
+    if CONTEXTUAL_RAG_CACHE_TTL_SECONDS <= 0:
+        return [None] * len(prompts)
+    return get_cached_outputs(
+        [_get_contextual_rag_cache_key(llm, prompt) for prompt in prompts]
+    )
+
+
+def _invoke_contextual_rag_llm(llm: LLM, prompt: str) -> str:
+    output = message_to_string(llm.invoke(prompt, max_tokens=MAX_CONTEXT_TOKENS))
+    if output and CONTEXTUAL_RAG_CACHE_TTL_SECONDS > 0:
+        cache_output(
+            _get_contextual_rag_cache_key(llm, prompt),
+            output,
+            CONTEXTUAL_RAG_CACHE_TTL_SECONDS,
+        )
+    return output
+
+
+def _invoke_contextual_rag_llm_with_cache(llm: LLM, prompt: str) -> str:
+    cached_output = _get_cached_contextual_rag_outputs(llm, [prompt])[0]
+    if cached_output is not None:
+        return cached_output
+    return _invoke_contextual_rag_llm(llm, prompt)
+
+
 def add_document_summaries(
     chunks_by_doc: list[DocAwareChunk],
     llm: LLM,
     tokenizer: BaseTokenizer,
     trunc_doc_tokens: int,
+    doc_tokens: list[int] | None = None,
 ) -> list[int] | None:
     """
     Adds a document summary to a list of chunks from the same document.
     Returns the number of tokens in the document.
     """
 
-    doc_tokens = []
     # this is value is the same for each chunk in the document; 0 indicates
     # There is not enough space for contextual RAG (the chunk content
     # and possibly metadata took up too much space)
     if chunks_by_doc[0].contextual_rag_reserved_tokens == 0:
         return None
 
-    doc_tokens = tokenizer.encode(chunks_by_doc[0].source_document.get_text_content())
+    doc_tokens = doc_tokens or tokenizer.encode(
+        chunks_by_doc[0].source_document.get_text_content()
+    )
     doc_content = tokenizer_trim_middle(doc_tokens, trunc_doc_tokens, tokenizer)
     summary_prompt = DOCUMENT_SUMMARY_PROMPT.format(document=doc_content)
-    doc_summary = message_to_string(
-        llm.invoke(summary_prompt, max_tokens=MAX_CONTEXT_TOKENS)
-    )
+    doc_summary = _invoke_contextual_rag_llm_with_cache(llm, summary_prompt)
 
     for chunk in chunks_by_doc:
         chunk.doc_summary = doc_summary
@@ -612,24 +724,19 @@ def add_chunk_summaries(
     if not doc_info:
         # This happens if the document is too long AND document summaries are turned off
         # In this case we compute a doc summary using the LLM
-        doc_info = message_to_string(
-            llm.invoke(
-                DOCUMENT_SUMMARY_PROMPT.format(document=doc_content),
-                max_tokens=MAX_CONTEXT_TOKENS,
-            )
+        doc_info = _invoke_contextual_rag_llm_with_cache(
+            llm, DOCUMENT_SUMMARY_PROMPT.format(document=doc_content)
         )
 
     context_prompt1 = CONTEXTUAL_RAG_PROMPT1.format(document=doc_info)
+    prompts = [
+        context_prompt1 + CONTEXTUAL_RAG_PROMPT2.format(chunk=chunk.content)
+        for chunk in chunks_by_doc
+    ]
 
-    def assign_context(chunk: DocAwareChunk) -> None:
-        context_prompt2 = CONTEXTUAL_RAG_PROMPT2.format(chunk=chunk.content)
+    def assign_context(chunk: DocAwareChunk, prompt: str) -> None:
         try:
-            chunk.chunk_context = message_to_string(
-                llm.invoke(
-                    context_prompt1 + context_prompt2,
-                    max_tokens=MAX_CONTEXT_TOKENS,
-                )
-            )
+            chunk.chunk_context = _invoke_contextual_rag_llm(llm, prompt)
         except LLMRateLimitError as e:
             # Erroring during chunker is undesirable, so we log the error and continue
             # TODO: for v2, add robust retry logic
@@ -639,8 +746,18 @@ def add_chunk_summaries(
             logger.exception(f"Error adding chunk summary: {e}", exc_info=e)
             chunk.chunk_context = ""
 
+    # unchanged chunks keep their context from the last time they were indexed
+    chunks_to_assign: list[tuple[DocAwareChunk, str]] = []
+    for chunk, prompt, cached_context in zip(
+        chunks_by_doc, prompts, _get_cached_contextual_rag_outputs(llm, prompts)
+    ):
+        if cached_context is None:
+            chunks_to_assign.append((chunk, prompt))
+        else:
+            chunk.chunk_context = cached_context
+
     run_functions_tuples_in_parallel(
-        [(assign_context, (chunk,)) for chunk in chunks_by_doc]
+        [(assign_context, (chunk, prompt)) for chunk, prompt in chunks_to_assign]
     )
 
 
@@ -658,24 +775,42 @@ def add_contextual_summaries(
     for chunk in chunks:
         doc2chunks[chunk.source_document.id].append(chunk)
 
-    # The number of tokens allowed for the document when computing a document summary
-    trunc_doc_summary_tokens = llm.config.max_input_tokens - len(
-        tokenizer.encode(DOCUMENT_SUMMARY_PROMPT)
+    summary_prompt_tokens, prompt_tokens = tokenizer.count_tokens_batch(
+        [DOCUMENT_SUMMARY_PROMPT, CONTEXTUAL_RAG_PROMPT1 + CONTEXTUAL_RAG_PROMPT2]
     )
+    # The number of tokens allowed for the document when computing a document summary
+    trunc_doc_summary_tokens = llm.config.max_input_tokens - summary_prompt_tokens
 
-    prompt_tokens = len(
-        tokenizer.encode(CONTEXTUAL_RAG_PROMPT1 + CONTEXTUAL_RAG_PROMPT2)
-    )
     # The number of tokens allowed for the document when computing a
     # "chunk in context of document" summary
     trunc_doc_chunk_tokens = (
         llm.config.max_input_tokens - prompt_tokens - chunk_token_limit
     )
-    for chunks_by_doc in doc2chunks.values():
-        doc_tokens = None
+
+    # encode the documents that have room for contextual RAG in one batch
+    docs_to_encode = [
+        chunks_by_doc
+        for chunks_by_doc in doc2chunks.values()
+        if chunks_by_doc[0].contextual_rag_reserved_tokens != 0
+    ]
+    doc_id_to_tokens = {
+        chunks_by_doc[0].source_document.id: doc_tokens
+        for chunks_by_doc, doc_tokens in zip(
+            docs_to_encode,
+            tokenizer.encode_batch(
+                [
+                    chunks_by_doc[0].source_document.get_text_content()
+                    for chunks_by_doc in docs_to_encode
+                ]
+            ),
+        )
+    }
+
+    for doc_id, chunks_by_doc in doc2chunks.items():
+        doc_tokens = doc_id_to_tokens.get(doc_id)
         if USE_DOCUMENT_SUMMARY:
             doc_tokens = add_document_summaries(
-                chunks_by_doc, llm, tokenizer, trunc_doc_summary_tokens
+                chunks_by_doc, llm, tokenizer, trunc_doc_summary_tokens, doc_tokens
             )
 
         if USE_CHUNK_SUMMARY:
@@ -779,6 +914,18 @@ def index_doc_batch(
             chunk_token_limit=chunker.chunk_token_limit * 2,
         )
 
+    # content classification only needs the chunk content, so it runs while the
+    # chunks are being embedded
+    content_classification_task = (
+        run_in_background(
+            _get_aggregated_chunk_boost_factor,
+            chunks,
+            information_content_classification_model,
+        )
+        if USE_INFORMATION_CONTENT_CLASSIFICATION and chunks
+        else None
+    )
+
     logger.debug("Starting embedding")
     chunks_with_embeddings, embedding_failures = (
         embed_chunks_with_failure_handling(
@@ -791,13 +938,24 @@ def index_doc_batch(
         else ([], [])
     )
 
-    chunk_content_scores = (
-        _get_aggregated_chunk_boost_factor(
-            chunks_with_embeddings, information_content_classification_model
-        )
-        if USE_INFORMATION_CONTENT_CLASSIFICATION
-        else [1.0] * len(chunks_with_embeddings)
-    )
+    if content_classification_task is not None:
+        # chunks of documents that failed embedding are dropped, so the scores
+        # are matched up by chunk rather than by position
+        all_chunk_scores = wait_on_background(content_classification_task)
+        # large chunks reuse the chunk id of their first chunk, so they are told
+        # apart by their large chunk id
+        score_by_chunk = {
+            (chunk.source_document.id, chunk.chunk_id, chunk.large_chunk_id): score
+            for chunk, score in zip(chunks, all_chunk_scores)
+        }
+        chunk_content_scores = [
+            score_by_chunk[
+                (chunk.source_document.id, chunk.chunk_id, chunk.large_chunk_id)
+            ]
+            for chunk in chunks_with_embeddings
+        ]
+    else:
+        chunk_content_scores = [1.0] * len(chunks_with_embeddings)
 
     updatable_ids = [doc.id for doc in ctx.updatable_docs]
     updatable_chunk_data = [
@@ -883,16 +1041,24 @@ def index_doc_batch(
                     combined_content = " ".join(
                         [chunk.content for chunk in document_chunks]
                     )
-                    token_count = (
-                        len(llm_tokenizer.encode(combined_content))
-                        if llm_tokenizer
-                        else 0
-                    )
-                    user_file_id_to_token_count[user_file_id] = token_count
                     user_file_id_to_raw_text[user_file_id] = combined_content
                 else:
                     user_file_id_to_token_count[user_file_id] = None
 
+        # count the tokens of all user files in one batch
+        user_file_ids_with_text = list(user_file_id_to_raw_text.keys())
+        token_counts = (
+            llm_tokenizer.count_tokens_batch(
+                [
+                    user_file_id_to_raw_text[user_file_id]
+                    for user_file_id in user_file_ids_with_text
+                ]
+            )
+            if llm_tokenizer
+            else [0] * len(user_file_ids_with_text)
+        )
+        user_file_id_to_token_count.update(zip(user_file_ids_with_text, token_counts))
+
         # we're concerned about race conditions where multiple simultaneous indexings might result
         # in one set of metadata overwriting another one in vespa.
         # we still write data here for the immediate and most likely correct sync, but
@@ -0,0 +1,74 @@
+"""Caches model outputs (e.g. LLM responses or classification scores) in Redis, keyed
+by everything that goes into the request, so that unchanged content (e.g. when
+documents are re-indexed) doesn't need another model call. Keys are scoped to the
+current tenant. Failing to read or write the cache is logged and treated as a miss."""
+
+import hashlib
+from typing import cast
+
+from onyx.llm.interfaces import LLM
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+
+def get_output_cache_key(namespace: str, *parts: str | bytes) -> str:
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        # separates the parts so that moving text from one part to the next
+        # can't give the same key
+        hasher.update(b"\0")
+    return f"{namespace}:{hasher.hexdigest()}"
+
+
+def get_llm_output_cache_key(namespace: str, llm: LLM, *parts: str | bytes) -> str:
+    return get_output_cache_key(
+        namespace, llm.config.model_provider, llm.config.model_name, *parts
+    )
+
+
+def get_cached_outputs(keys: list[str]) -> list[str | None]:
+    """Reads the outputs of many keys in one round trip, None for misses."""
+    if not keys:
+        return []
+
+    try:
+        cached_outputs = cast(list[bytes | None], get_redis_client().mget(keys))
+    except Exception as e:
+        logger.warning(f"Failed to read cached outputs: {e}")
+        return [None] * len(keys)
+
+    return [
+        cached.decode("utf-8") if cached is not None else None
+        for cached in cached_outputs
+    ]
+
+
+def get_cached_output(key: str) -> str | None:
+    return get_cached_outputs([key])[0]
+
+
+def cache_output(key: str, output: str, ttl_seconds: int) -> None:
+    try:
+        get_redis_client().set(key, output, ex=ttl_seconds)
+    except Exception as e:
+        logger.warning(f"Failed to cache output: {e}")
+
+
+def cache_outputs(outputs: dict[str, str], ttl_seconds: int) -> None:
+    """Writes many outputs in one round trip."""
+    if not outputs:
+        return
+
+    try:
+        # using pipeline doesn't automatically add the tenant_id prefix
+        tenant_id = get_current_tenant_id()
+        pipeline = get_redis_client().pipeline(transaction=False)
+        for key, output in outputs.items():
+            pipeline.set(f"{tenant_id}:{key}", output, ex=ttl_seconds)
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f"Failed to cache outputs: {e}")
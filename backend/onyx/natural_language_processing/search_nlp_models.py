@@ -22,6 +22,9 @@ from onyx.configs.model_configs import (
     BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
 )
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
+from onyx.configs.model_configs import EMBEDDING_BATCH_MAX_SIZE_MULTIPLIER
+from onyx.configs.model_configs import EMBEDDING_BATCH_TOKEN_BUDGET
+from onyx.configs.model_configs import INFORMATION_CONTENT_CLASSIFICATION_BATCH_SIZE
 from onyx.connectors.models import ConnectorStopSignal
 from onyx.db.models import SearchSettings
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
@@ -29,18 +32,26 @@ from onyx.natural_language_processing.exceptions import (
     ModelServerRateLimitError,
 )
 from onyx.natural_language_processing.utils import get_tokenizer
-from onyx.natural_language_processing.utils import tokenizer_trim_content
+from onyx.natural_language_processing.utils import tokenizer_trim_contents_with_counts
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
 from shared_configs.configs import MODEL_SERVER_HOST
 from shared_configs.configs import MODEL_SERVER_PORT
+from shared_configs.configs import MODEL_SERVER_PRIORITY_HEADER
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
+from shared_configs.enums import ModelServerRequestPriority
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import ConnectorClassificationRequest
 from shared_configs.model_server_models import ConnectorClassificationResponse
+from shared_configs.model_server_models import (
+    CONTENT_CLASSIFICATION_BINARY_MEDIA_TYPE,
+)
 from shared_configs.model_server_models import ContentClassificationPrediction
+from shared_configs.model_server_models import (
+    decode_content_classification_predictions,
+)
 from shared_configs.model_server_models import Embedding
 from shared_configs.model_server_models import EmbedRequest
 from shared_configs.model_server_models import EmbedResponse
@@ -49,6 +60,7 @@ from shared_configs.model_server_models import IntentRequest
 from shared_configs.model_server_models import IntentResponse
 from shared_configs.model_server_models import RerankRequest
 from shared_configs.model_server_models import RerankResponse
+from shared_configs.utils import batch_by_token_budget
 from shared_configs.utils import batch_list
 
 logger = setup_logger()
@@ -130,6 +142,11 @@ class EmbeddingModel:
             if request_id:
                 headers["X-Onyx-Request-ID"] = request_id
 
+            # lets the model server run query embeddings ahead of indexing
+            headers[MODEL_SERVER_PRIORITY_HEADER] = (
+                ModelServerRequestPriority.for_text_type(embed_request.text_type).value
+            )
+
             response = requests.post(
                 self.embed_server_endpoint,
                 headers=headers,
@@ -180,11 +197,28 @@ class EmbeddingModel:
         text_type: EmbedTextType,
         batch_size: int,
         max_seq_length: int,
+        token_counts: list[int],
+        max_tokens_per_batch: int | None = None,
         num_threads: int = INDEXING_EMBEDDING_MODEL_NUM_THREADS,
         tenant_id: str | None = None,
         request_id: str | None = None,
     ) -> list[Embedding]:
-        text_batches = batch_list(texts, batch_size)
+        # API providers already pack as many texts into a request as their
+        # limits allow, only local models fit more short texts in a batch
+        max_batch_size = (
+            batch_size
+            if self.provider_type
+            else batch_size * EMBEDDING_BATCH_MAX_SIZE_MULTIPLIER
+        )
+        text_idx_batches = batch_by_token_budget(
+            token_counts,
+            max_tokens_per_batch=max_tokens_per_batch or batch_size * max_seq_length,
+            max_batch_size=max_batch_size,
+        )
+        text_batches = [
+            [texts[text_idx] for text_idx in text_idx_batch]
+            for text_idx_batch in text_idx_batches
+        ]
 
         logger.debug(f"Encoding {len(texts)} texts in {len(text_batches)} batches")
 
@@ -278,7 +312,14 @@ class EmbeddingModel:
                 )
                 embeddings.extend(batch_embeddings)
 
-        return embeddings
+        # the batches are sorted by length, put the embeddings back in text order
+        ordered_embeddings: list[Embedding] = [[] for _ in texts]
+        for text_idx, embedding in zip(
+            (text_idx for batch in text_idx_batches for text_idx in batch), embeddings
+        ):
+            ordered_embeddings[text_idx] = embedding
+
+        return ordered_embeddings
 
     def encode(
         self,
@@ -301,13 +342,16 @@ class EmbeddingModel:
             # This is applied during indexing as a catchall for overly long titles (or other uncapped fields)
             # Note that this uses just the default tokenizer which may also lead to very minor miscountings
             # However this slight miscounting is very unlikely to have any material impact.
-            texts = [
-                tokenizer_trim_content(
-                    content=text,
-                    desired_length=max_seq_length,
-                    tokenizer=self.tokenizer,
-                )
-                for text in texts
+            texts, token_counts = tokenizer_trim_contents_with_counts(
+                contents=texts,
+                desired_length=max_seq_length,
+                tokenizer=self.tokenizer,
+            )
+        else:
+            # texts longer than the max sequence length are truncated by the model
+            token_counts = [
+                min(token_count, max_seq_length)
+                for token_count in self.tokenizer.count_tokens_batch(texts)
             ]
 
         batch_size = (
@@ -321,6 +365,8 @@ class EmbeddingModel:
             text_type=text_type,
             batch_size=batch_size,
             max_seq_length=max_seq_length,
+            token_counts=token_counts,
+            max_tokens_per_batch=EMBEDDING_BATCH_TOKEN_BUDGET,
             tenant_id=tenant_id,
             request_id=request_id,
         )
@@ -431,19 +477,39 @@ class InformationContentClassificationModel:
             model_server_url + "/custom/content-classification"
         )
 
-    def predict(
-        self,
-        queries: list[str],
+    def _predict_batch(
+        self, queries: list[str]
     ) -> list[ContentClassificationPrediction]:
-        response = requests.post(self.content_server_endpoint, json=queries)
+        response = requests.post(
+            self.content_server_endpoint,
+            json=queries,
+            headers={"Accept": CONTENT_CLASSIFICATION_BINARY_MEDIA_TYPE},
+        )
         response.raise_for_status()
 
+        # older model servers ignore the Accept header and always respond with JSON
+        if response.headers.get("content-type", "").startswith(
+            CONTENT_CLASSIFICATION_BINARY_MEDIA_TYPE
+        ):
+            return decode_content_classification_predictions(response.content)
+
         model_responses = InformationContentClassificationResponses(
             information_content_classifications=response.json()
         )
 
         return model_responses.information_content_classifications
 
+    def predict(
+        self,
+        queries: list[str],
+        batch_size: int = INFORMATION_CONTENT_CLASSIFICATION_BATCH_SIZE,
+    ) -> list[ContentClassificationPrediction]:
+        predictions: list[ContentClassificationPrediction] = []
+        for batch in batch_list(queries, batch_size):
+            predictions.extend(self._predict_batch(batch))
+
+        return predictions
+
 
 class ConnectorClassificationModel:
     def __init__(
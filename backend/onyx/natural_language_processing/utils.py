@@ -1,14 +1,17 @@
 import os
+import threading
 from abc import ABC
 from abc import abstractmethod
 from copy import copy
 
 from tokenizers import Encoding  # type: ignore
+from tokenizers import normalizers  # type: ignore
+from tokenizers import pre_tokenizers  # type: ignore
 from tokenizers import Tokenizer  # type: ignore
-from transformers import logging as transformer_logging  # type:ignore
 
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.configs.model_configs import DOCUMENT_ENCODER_MODEL
+from onyx.configs.model_configs import TOKENIZER_CACHE_DIR
 from onyx.context.search.models import InferenceChunk
 from onyx.utils.logger import setup_logger
 from shared_configs.enums import EmbeddingProvider
@@ -16,8 +19,14 @@ from shared_configs.enums import EmbeddingProvider
 TRIM_SEP_PAT = "\n... {n} tokens removed...\n"
 
 logger = setup_logger()
-transformer_logging.set_verbosity_error()
-os.environ["TOKENIZERS_PARALLELISM"] = "false"
+# read by transformers when it is first imported, which this module doesn't
+# need to do itself
+os.environ.setdefault("TRANSFORMERS_VERBOSITY", "error")
+# encode_batch can use all cores when this is explicitly set to "true", which the
+# docprocessing worker does (see DOCPROCESSING_TOKENIZERS_PARALLELISM). It is off
+# elsewhere since processes that fork after using a parallel tokenizer make the
+# children fall back to a single thread
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 os.environ["HF_HUB_DISABLE_TELEMETRY"] = "1"
 os.environ["TRANSFORMERS_NO_ADVISORY_WARNINGS"] = "1"
 
@@ -35,6 +44,22 @@ class BaseTokenizer(ABC):
     def decode(self, tokens: list[int]) -> str:
         pass
 
+    def encode_batch(self, strings: list[str]) -> list[list[int]]:
+        """Encodes many strings at once, the same as calling encode on each.
+        Tokenizers with a native batch API override this to encode outside of
+        the GIL."""
+        return [self.encode(string) for string in strings]
+
+    def count_tokens_batch(self, strings: list[str]) -> list[int]:
+        return [len(tokens) for tokens in self.encode_batch(strings)]
+
+    def supports_summed_token_counts(self, string: str) -> bool:
+        """Whether the token count of any text made by joining `string` with other
+        such strings using whitespace is the sum of the token counts of the parts.
+        Lets callers that build text up piece by piece keep a running token count
+        instead of re-encoding the whole text after every piece."""
+        return False
+
 
 class TiktokenTokenizer(BaseTokenizer):
     _instances: dict[str, "TiktokenTokenizer"] = {}
@@ -54,9 +79,17 @@ class TiktokenTokenizer(BaseTokenizer):
         # this ignores special tokens that the model is trained on, see encode_ordinary for details
         return self.encoder.encode_ordinary(string)
 
+    def encode_batch(self, strings: list[str]) -> list[list[int]]:
+        return self.encoder.encode_ordinary_batch(strings)
+
     def tokenize(self, string: str) -> list[str]:
         encoded = self.encode(string)
-        decoded = [self.encoder.decode([token]) for token in encoded]
+        # decodes the bytes of every token in one call, the same as decoding
+        # each token on its own
+        decoded = [
+            token_bytes.decode("utf-8", errors="replace")
+            for token_bytes in self.encoder.decode_tokens_bytes(encoded)
+        ]
 
         if len(decoded) != len(encoded):
             logger.warning(
@@ -69,9 +102,63 @@ class TiktokenTokenizer(BaseTokenizer):
         return self.encoder.decode(tokens)
 
 
+# pre-tokenizers that split on whitespace and drop it, so tokens never span it
+_WHITESPACE_SPLITTING_PRE_TOKENIZERS = (
+    pre_tokenizers.BertPreTokenizer,
+    pre_tokenizers.Whitespace,
+    pre_tokenizers.WhitespaceSplit,
+)
+# normalizers that only change characters in place, never across whitespace
+_CHARACTER_NORMALIZERS = (
+    normalizers.BertNormalizer,
+    normalizers.Lowercase,
+    normalizers.NFC,
+    normalizers.NFD,
+    normalizers.NFKC,
+    normalizers.NFKD,
+    normalizers.StripAccents,
+)
+
+
+def _load_hf_tokenizer(model_name: str) -> Tokenizer:
+    """Loads the tokenizer from TOKENIZER_CACHE_DIR if it was saved there before,
+    otherwise from the hub, saving it to TOKENIZER_CACHE_DIR for later loads."""
+    if not TOKENIZER_CACHE_DIR:
+        return Tokenizer.from_pretrained(model_name)
+
+    cache_path = os.path.join(
+        TOKENIZER_CACHE_DIR, model_name.replace("/", "__"), "tokenizer.json"
+    )
+    if os.path.isfile(cache_path):
+        return Tokenizer.from_file(cache_path)
+
+    tokenizer = Tokenizer.from_pretrained(model_name)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # write to a temporary file first so that concurrent loads never read
+        # a partially written tokenizer
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tokenizer.save(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(
+            f"Failed to save tokenizer for {model_name} to {cache_path}: {e}"
+        )
+    return tokenizer
+
+
 class HuggingFaceTokenizer(BaseTokenizer):
     def __init__(self, model_name: str):
-        self.encoder: Tokenizer = Tokenizer.from_pretrained(model_name)
+        self.encoder: Tokenizer = _load_hf_tokenizer(model_name)
+        # e.g. WordPiece (BERT) tokenizers
+        self._splits_on_whitespace = (
+            isinstance(self.encoder.pre_tokenizer, _WHITESPACE_SPLITTING_PRE_TOKENIZERS)
+            and (
+                self.encoder.normalizer is None
+                or isinstance(self.encoder.normalizer, _CHARACTER_NORMALIZERS)
+            )
+            and self.encoder.truncation is None
+        )
 
     def _safer_encode(self, string: str) -> Encoding:
         """
@@ -90,9 +177,34 @@ class HuggingFaceTokenizer(BaseTokenizer):
         # this returns no special tokens
         return self._safer_encode(string).ids
 
+    def encode_batch(self, strings: list[str]) -> list[list[int]]:
+        # a batch would be padded to its longest string
+        if self.encoder.padding is not None:
+            return super().encode_batch(strings)
+
+        # the batch is encoded in rust with the GIL released
+        try:
+            encodings = self.encoder.encode_batch(strings, add_special_tokens=False)
+        except Exception:
+            # some string needs the ascii fallback of _safer_encode
+            encodings = [self._safer_encode(string) for string in strings]
+        return [encoding.ids for encoding in encodings]
+
     def tokenize(self, string: str) -> list[str]:
         return self._safer_encode(string).tokens
 
+    def supports_summed_token_counts(self, string: str) -> bool:
+        if not self._splits_on_whitespace:
+            return False
+
+        # strings that can't be encoded as is are encoded as ascii as a whole by
+        # _safer_encode, which changes the count of the other parts
+        try:
+            string.encode("utf-8")
+        except UnicodeEncodeError:
+            return False
+        return True
+
     def decode(self, tokens: list[int]) -> str:
         return self.encoder.decode(tokens)
 
@@ -109,14 +221,17 @@ def _check_tokenizer_cache(
     if id_tuple not in _TOKENIZER_CACHE:
         tokenizer = None
 
-        if model_name:
+        if model_provider is None and model_name == DOCUMENT_ENCODER_MODEL:
+            # shares the instance with the default tokenizer
+            tokenizer = _get_default_tokenizer()
+        elif model_name:
             tokenizer = _try_initialize_tokenizer(model_name, model_provider)
 
         if not tokenizer:
             logger.info(
                 f"Falling back to default embedding model tokenizer: {DOCUMENT_ENCODER_MODEL}"
             )
-            tokenizer = HuggingFaceTokenizer(DOCUMENT_ENCODER_MODEL)
+            tokenizer = _get_default_tokenizer()
 
         _TOKENIZER_CACHE[id_tuple] = tokenizer
 
@@ -153,7 +268,18 @@ def _try_initialize_tokenizer(
     return None
 
 
-_DEFAULT_TOKENIZER: BaseTokenizer = HuggingFaceTokenizer(DOCUMENT_ENCODER_MODEL)
+# loaded on first use rather than at import, since loading it may go to the hub
+_DEFAULT_TOKENIZER: BaseTokenizer | None = None
+_DEFAULT_TOKENIZER_LOCK = threading.Lock()
+
+
+def _get_default_tokenizer() -> BaseTokenizer:
+    global _DEFAULT_TOKENIZER
+    if _DEFAULT_TOKENIZER is None:
+        with _DEFAULT_TOKENIZER_LOCK:
+            if _DEFAULT_TOKENIZER is None:
+                _DEFAULT_TOKENIZER = HuggingFaceTokenizer(DOCUMENT_ENCODER_MODEL)
+    return _DEFAULT_TOKENIZER
 
 
 def get_tokenizer(
@@ -166,10 +292,36 @@ def get_tokenizer(
             logger.debug(
                 f"Invalid provider_type '{provider_type}'. Falling back to default tokenizer."
             )
-            return _DEFAULT_TOKENIZER
+            return _get_default_tokenizer()
     return _check_tokenizer_cache(provider_type, model_name)
 
 
+def warm_up_tokenizer(
+    model_name: str | None = None,
+    provider_type: EmbeddingProvider | str | None = None,
+    non_blocking: bool = False,
+) -> None:
+    """Loads a tokenizer ahead of its first use. Without a model name, the
+    default tokenizer is loaded."""
+
+    def _warm_up() -> None:
+        try:
+            if model_name is None:
+                _get_default_tokenizer()
+            else:
+                get_tokenizer(model_name, provider_type)
+        except Exception as e:
+            logger.warning(
+                f"Failed to warm up tokenizer for "
+                f"{model_name or DOCUMENT_ENCODER_MODEL}: {e}"
+            )
+
+    if non_blocking:
+        threading.Thread(target=_warm_up, daemon=True).start()
+    else:
+        _warm_up()
+
+
 def tokenizer_trim_content(
     content: str, desired_length: int, tokenizer: BaseTokenizer
 ) -> str:
@@ -180,6 +332,32 @@ def tokenizer_trim_content(
     return tokenizer.decode(tokens[:desired_length])
 
 
+def tokenizer_trim_contents_with_counts(
+    contents: list[str], desired_length: int, tokenizer: BaseTokenizer
+) -> tuple[list[str], list[int]]:
+    """Same as tokenizer_trim_contents, also returns the token count of each
+    trimmed string so callers don't need to encode them again."""
+    trimmed_contents: list[str] = []
+    token_counts: list[int] = []
+    for content, tokens in zip(contents, tokenizer.encode_batch(contents)):
+        if len(tokens) <= desired_length:
+            trimmed_contents.append(content)
+        else:
+            trimmed_contents.append(tokenizer.decode(tokens[:desired_length]))
+        token_counts.append(min(len(tokens), desired_length))
+    return trimmed_contents, token_counts
+
+
+def tokenizer_trim_contents(
+    contents: list[str], desired_length: int, tokenizer: BaseTokenizer
+) -> list[str]:
+    """Same as tokenizer_trim_content for many strings, encoded as one batch."""
+    trimmed_contents, _ = tokenizer_trim_contents_with_counts(
+        contents, desired_length, tokenizer
+    )
+    return trimmed_contents
+
+
 def tokenizer_trim_middle(
     tokens: list[int], desired_length: int, tokenizer: BaseTokenizer
 ) -> str:
@@ -202,8 +380,10 @@ def tokenizer_trim_chunks(
     max_chunk_toks: int = DOC_EMBEDDING_CONTEXT_SIZE,
 ) -> list[InferenceChunk]:
     new_chunks = copy(chunks)
-    for ind, chunk in enumerate(new_chunks):
-        new_content = tokenizer_trim_content(chunk.content, max_chunk_toks, tokenizer)
+    new_contents = tokenizer_trim_contents(
+        [chunk.content for chunk in chunks], max_chunk_toks, tokenizer
+    )
+    for ind, (chunk, new_content) in enumerate(zip(new_chunks, new_contents)):
         if len(new_content) != len(chunk.content):
             new_chunk = copy(chunk)
             new_chunk.content = new_content
@@ -12,6 +12,7 @@ import redis
 from fastapi import Request
 from redis import asyncio as aioredis
 from redis.client import Redis
+from redis.commands.helpers import list_or_args
 from redis.lock import Lock as RedisLock
 
 from onyx.configs.app_configs import REDIS_AUTH_KEY_PREFIX
@@ -75,6 +76,15 @@ class TenantRedis(redis.Redis):
 
         return wrapper
 
+    def _prefix_mget(self, method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(keys: Any, *args: Any, **kwargs: Any) -> Any:
+            return method(
+                [self._prefixed(key) for key in list_or_args(keys, args)], **kwargs
+            )
+
+        return wrapper
+
     def _prefix_scan_iter(self, method: Callable) -> Callable:
         @functools.wraps(method)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -124,12 +134,16 @@ class TenantRedis(redis.Redis):
             "hexists",
             "hset",
             "hdel",
+            "hgetall",
+            "expire",
             "ttl",
             "pttl",
         ]  # Regular methods that need simple prefixing
 
         if item == "scan_iter" or item == "sscan_iter":
             return self._prefix_scan_iter(original_attr)
+        elif item == "mget":
+            return self._prefix_mget(original_attr)
         elif item in methods_to_wrap and callable(original_attr):
             return self._prefix_method(original_attr)
         return original_attr
@@ -844,7 +844,7 @@ def fetch_chat_file(
             file_id = txt_file_id
 
     media_type = file_record.file_type
-    file_io = file_store.read_file(file_id, mode="b")
+    file_io = file_store.read_file(file_id, mode="b", stream=True)
 
     return StreamingResponse(file_io, media_type=media_type)
 
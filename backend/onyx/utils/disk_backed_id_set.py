@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import tempfile
+from collections.abc import Iterable
+from types import TracebackType
+
+from onyx.utils.batching import batch_generator
+
+# stays under the limit on the number of variables of older SQLite versions (999)
+_QUERY_BATCH_SIZE = 500
+_INSERT_BATCH_SIZE = 10_000
+
+
+class DiskBackedIdSet:
+    """A set of ids kept in a SQLite file instead of in memory, for sets that are too
+    large for one worker, e.g. the ids of all the documents of a connector. Only the
+    ids being added or looked up are held in memory.
+
+    The file is deleted when the set is closed. Meant to be used as a context manager
+    from a single thread."""
+
+    def __init__(self, directory: str | None = None) -> None:
+        self._directory = tempfile.TemporaryDirectory(dir=directory)
+        self._connection = sqlite3.connect(
+            os.path.join(self._directory.name, "ids.sqlite3")
+        )
+        # the file is thrown away afterwards, so it doesn't need to survive a crash
+        self._connection.execute("PRAGMA journal_mode = OFF")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._connection.execute(
+            "CREATE TABLE ids (id TEXT PRIMARY KEY NOT NULL) WITHOUT ROWID"
+        )
+
+    def add_many(self, ids: Iterable[str]) -> None:
+        for batch in batch_generator(ids, _INSERT_BATCH_SIZE):
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO ids (id) VALUES (?)", ((id,) for id in batch)
+            )
+        self._connection.commit()
+
+    def missing(self, ids: Iterable[str]) -> list[str]:
+        """The ids that are not in the set, in the order they were given."""
+        missing_ids: list[str] = []
+        for batch in batch_generator(ids, _QUERY_BATCH_SIZE):
+            placeholders = ",".join("?" * len(batch))
+            found_ids = {
+                row[0]
+                for row in self._connection.execute(
+                    f"SELECT id FROM ids WHERE id IN ({placeholders})", batch
+                )
+            }
+            missing_ids.extend(id for id in batch if id not in found_ids)
+        return missing_ids
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM ids").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+        self._directory.cleanup()
+
+    def __enter__(self) -> "DiskBackedIdSet":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -0,0 +1,113 @@
+"""Benchmarks the indexing Chunker on synthetic documents.
+
+Covers section heavy documents (e.g. Slack threads, spreadsheets with a section per
+row) as well as documents with a few large sections.
+
+Basic Usage:
+
+python scripts/chunker_benchmark.py
+
+python scripts/chunker_benchmark.py --model nomic-ai/nomic-embed-text-v1 --repeat 5
+
+For tiktoken based tokenizers, pass the embedding provider as well:
+
+python scripts/chunker_benchmark.py --model text-embedding-3-small --provider openai
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# makes it so `PYTHONPATH=.` is not required when running this script
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from onyx.configs.constants import DocumentSource  # noqa: E402
+from onyx.configs.model_configs import DOCUMENT_ENCODER_MODEL  # noqa: E402
+from onyx.connectors.models import IndexingDocument  # noqa: E402
+from onyx.connectors.models import Section  # noqa: E402
+from onyx.connectors.models import TextSection  # noqa: E402
+from onyx.indexing.chunker import Chunker  # noqa: E402
+from onyx.natural_language_processing.utils import get_tokenizer  # noqa: E402
+
+_WORDS = (
+    "the quick brown fox jumps over lazy dog customer revenue pipeline "
+    "deployment incident ticket review meeting follow up action item release "
+    "quarter forecast budget approved pending blocked resolved"
+).split()
+
+# name -> (number of sections, words per section)
+_CASES: dict[str, tuple[int, int]] = {
+    "slack_thread": (2_000, 12),
+    "spreadsheet": (5_000, 6),
+    "wiki_page": (40, 150),
+    "long_sections": (5, 3_000),
+}
+
+
+def _make_document(
+    name: str, num_sections: int, words_per_section: int
+) -> IndexingDocument:
+    sections: list[TextSection] = []
+    for i in range(num_sections):
+        words = random.choices(_WORDS, k=words_per_section)
+        sections.append(
+            TextSection(text=" ".join(words) + ".", link=f"https://example.com/{i}")
+        )
+
+    return IndexingDocument(
+        id=name,
+        source=DocumentSource.WEB,
+        semantic_identifier=name,
+        metadata={"case": name},
+        doc_updated_at=None,
+        sections=list(sections),
+        processed_sections=[
+            Section(text=section.text, link=section.link) for section in sections
+        ],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=DOCUMENT_ENCODER_MODEL)
+    parser.add_argument("--provider", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--multipass", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    tokenizer = get_tokenizer(args.model, args.provider)
+    chunker = Chunker(
+        tokenizer=tokenizer,
+        enable_multipass=args.multipass,
+        enable_large_chunks=args.multipass,
+    )
+
+    for name, (num_sections, words_per_section) in _CASES.items():
+        document = _make_document(name, num_sections, words_per_section)
+
+        timings = []
+        num_chunks = 0
+        for _ in range(args.repeat):
+            start = time.monotonic()
+            num_chunks = len(chunker.chunk([document]))
+            timings.append(time.monotonic() - start)
+
+        median = statistics.median(timings)
+        print(
+            f"{name}: sections={num_sections} "
+            f"words_per_section={words_per_section} "
+            f"chunks={num_chunks} "
+            f"median={median:.3f}s "
+            f"sections_per_second={num_sections / median:.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
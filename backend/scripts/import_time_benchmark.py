@@ -0,0 +1,93 @@
+"""Benchmarks how long it takes to import the main entry points of the backend.
+
+Every import runs in a fresh interpreter, which is what a starting API server or
+Celery worker pays before it can do anything. Also lists the packages that take the
+longest to import for each entry point, from `python -X importtime`.
+
+Basic Usage:
+
+python scripts/import_time_benchmark.py
+
+python scripts/import_time_benchmark.py --modules onyx.main --repeat 5 --top 20
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# the backend directory, so that `PYTHONPATH=.` is not required
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_DEFAULT_MODULES = [
+    "onyx.main",
+    "onyx.background.celery.versioned_apps.primary",
+    "onyx.background.celery.versioned_apps.light",
+    "onyx.background.celery.versioned_apps.heavy",
+    "onyx.background.celery.versioned_apps.docfetching",
+    "onyx.background.celery.versioned_apps.docprocessing",
+    "onyx.background.celery.versioned_apps.monitoring",
+    "onyx.background.celery.versioned_apps.beat",
+]
+
+# import time: self [us] | cumulative | imported package
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+\d+\s+\|\s+(\S+)$")
+
+
+def _run_import(module: str, importtime: bool) -> tuple[float, str]:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", f"import {module}"]
+
+    env = {**os.environ, "PYTHONPATH": parent_dir}
+    start = time.monotonic()
+    result = subprocess.run(command, cwd=parent_dir, env=env, capture_output=True)
+    elapsed = time.monotonic() - start
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"Importing {module} failed:\n{result.stderr.decode(errors='replace')}"
+        )
+    return elapsed, result.stderr.decode(errors="replace")
+
+
+def _slowest_packages(importtime_output: str, top: int) -> list[str]:
+    # sums up the time spent in the modules of each top level package, e.g.
+    # everything under `transformers.`
+    self_time_by_package: dict[str, int] = defaultdict(int)
+    for line in importtime_output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_micros, module = match.groups()
+            self_time_by_package[module.split(".")[0]] += int(self_micros)
+
+    slowest = sorted(self_time_by_package.items(), key=lambda x: -x[1])[:top]
+    return [f"{package}: {micros / 1e6:.2f}s" for package, micros in slowest]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", nargs="+", default=_DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        # the first import also compiles bytecode, which isn't paid on startup
+        _run_import(module, importtime=False)
+
+        timings = [_run_import(module, importtime=False)[0] for _ in range(args.repeat)]
+        print(f"{module}: median={statistics.median(timings):.2f}s")
+
+        if args.top:
+            _, importtime_output = _run_import(module, importtime=True)
+            for line in _slowest_packages(importtime_output, args.top):
+                print(f"    {line}")
+
+
+if __name__ == "__main__":
+    main()
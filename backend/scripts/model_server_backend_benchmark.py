@@ -0,0 +1,145 @@
+"""Compares the ONNX Runtime backend of the model server against PyTorch for the local
+embedding and reranking models.
+
+Reports the latency of both backends and how close the ONNX results are to the
+PyTorch ones: the cosine similarity of the embeddings and the difference in rerank
+scores and rankings.
+
+Basic Usage:
+
+python scripts/model_server_backend_benchmark.py
+
+python scripts/model_server_backend_benchmark.py --quantization avx512_vnni --repeat 5
+
+python scripts/model_server_backend_benchmark.py \
+    --embedding-model nomic-ai/nomic-embed-text-v1 \
+    --rerank-model mixedbread-ai/mxbai-rerank-xsmall-v1
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+# makes it so `PYTHONPATH=.` is not required when running this script
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+_WORDS = (
+    "the quick brown fox jumps over lazy dog customer revenue pipeline "
+    "deployment incident ticket review meeting follow up action item release "
+    "quarter forecast budget approved pending blocked resolved"
+).split()
+
+
+def _make_texts(num_texts: int, min_words: int, max_words: int) -> list[str]:
+    return [
+        " ".join(random.choices(_WORDS, k=random.randint(min_words, max_words)))
+        for _ in range(num_texts)
+    ]
+
+
+def _time(func: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    # the first call also warms up the model
+    result = func()
+    timings = []
+    for _ in range(repeat):
+        start = time.monotonic()
+        func()
+        timings.append(time.monotonic() - start)
+    return statistics.median(timings), result
+
+
+def _benchmark_embedding(model_name: str, texts: list[str], repeat: int) -> None:
+    from model_server.onnx_backend import load_onnx_embedding_model
+    from sentence_transformers import SentenceTransformer  # type: ignore
+
+    torch_model = SentenceTransformer(model_name, trust_remote_code=True)
+    onnx_model = load_onnx_embedding_model(model_name)
+
+    torch_seconds, torch_embeddings = _time(
+        lambda: torch_model.encode(texts, normalize_embeddings=True), repeat
+    )
+    onnx_seconds, onnx_embeddings = _time(
+        lambda: onnx_model.encode(texts, normalize_embeddings=True), repeat
+    )
+
+    # the embeddings are normalized, so the dot product is the cosine similarity
+    similarities = np.sum(torch_embeddings * onnx_embeddings, axis=1)
+    print(
+        f"embedding: model={model_name} texts={len(texts)} "
+        f"torch={torch_seconds:.2f}s onnx={onnx_seconds:.2f}s "
+        f"speedup={torch_seconds / onnx_seconds:.2f}x "
+        f"mean_cosine={similarities.mean():.4f} min_cosine={similarities.min():.4f}"
+    )
+
+
+def _benchmark_reranking(
+    model_name: str, query: str, passages: list[str], repeat: int
+) -> None:
+    from model_server.onnx_backend import load_onnx_reranking_model
+    from sentence_transformers import CrossEncoder  # type: ignore
+
+    pairs = [(query, passage) for passage in passages]
+    torch_model = CrossEncoder(model_name)
+    onnx_model = load_onnx_reranking_model(model_name)
+
+    torch_seconds, torch_scores = _time(lambda: torch_model.predict(pairs), repeat)
+    onnx_seconds, onnx_scores = _time(lambda: onnx_model.predict(pairs), repeat)
+
+    top_k = min(10, len(passages))
+    torch_top = set(np.argsort(-torch_scores)[:top_k])
+    onnx_top = set(np.argsort(-onnx_scores)[:top_k])
+    print(
+        f"reranking: model={model_name} passages={len(passages)} "
+        f"torch={torch_seconds:.2f}s onnx={onnx_seconds:.2f}s "
+        f"speedup={torch_seconds / onnx_seconds:.2f}x "
+        f"max_score_diff={np.abs(torch_scores - onnx_scores).max():.4f} "
+        f"top_{top_k}_overlap={len(torch_top & onnx_top) / top_k:.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--embedding-model", default="nomic-ai/nomic-embed-text-v1")
+    parser.add_argument(
+        "--rerank-model", default="mixedbread-ai/mxbai-rerank-xsmall-v1"
+    )
+    parser.add_argument(
+        "--quantization",
+        default=None,
+        choices=["arm64", "avx2", "avx512", "avx512_vnni"],
+    )
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--num-texts", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-embedding", action="store_true")
+    parser.add_argument("--skip-reranking", action="store_true")
+    args = parser.parse_args()
+
+    # read by the ONNX backend when it is imported
+    if args.quantization:
+        os.environ["ONNX_QUANTIZATION_CONFIG"] = args.quantization
+    os.environ["ONNX_INTRA_OP_NUM_THREADS"] = str(args.threads)
+
+    random.seed(args.seed)
+    # a mix of mini-chunk and full chunk lengths
+    texts = _make_texts(args.num_texts, min_words=5, max_words=350)
+
+    if not args.skip_embedding:
+        _benchmark_embedding(args.embedding_model, texts, args.repeat)
+    if not args.skip_reranking:
+        _benchmark_reranking(
+            args.rerank_model, "release pipeline incident review", texts, args.repeat
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Benchmarks loading Salesforce CSV exports into the connector's SQLite db.
+
+Generates synthetic Account / Contact / Opportunity CSVs and loads them with
+both the sequential path (update_from_csv, used by delta syncs) and the staged
+parallel path with deferred indexes (used by full syncs).
+
+Basic Usage:
+
+python scripts/salesforce_sqlite_benchmark.py --accounts 20000 --children-per-account 5
+
+Running the sequential path on an older commit gives the pre-bulk baseline.
+"""
+
+import argparse
+import csv
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+# makes it so `PYTHONPATH=.` is not required when running this script
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from onyx.connectors.salesforce.sqlite_functions import (  # noqa: E402
+    OnyxSalesforceSQLite,
+)
+from onyx.connectors.salesforce.utils import ACCOUNT_OBJECT_TYPE  # noqa: E402
+
+
+def _make_id(prefix: str, i: int) -> str:
+    # salesforce ids are 18 characters, starting with a 3 character type prefix
+    return f"{prefix}{i:015d}"
+
+
+def _random_text(length: int) -> str:
+    return "".join(random.choices(string.ascii_letters + " ", k=length))
+
+
+def _write_csv(path: str, rows: list[dict[str, str]]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def generate_csvs(
+    directory: str, num_accounts: int, children_per_account: int
+) -> list[tuple[str, str]]:
+    account_ids = [_make_id("001", i) for i in range(num_accounts)]
+    accounts = [
+        {
+            "Id": account_id,
+            "Name": _random_text(20),
+            "Description": _random_text(200),
+            "LastModifiedDate": "2024-01-01T00:00:00.000Z",
+        }
+        for account_id in account_ids
+    ]
+
+    num_children = num_accounts * children_per_account
+    contacts = [
+        {
+            "Id": _make_id("003", i),
+            "AccountId": random.choice(account_ids),
+            "LastName": _random_text(12),
+            "Description": _random_text(200),
+            "LastModifiedDate": "2024-01-01T00:00:00.000Z",
+        }
+        for i in range(num_children)
+    ]
+    opportunities = [
+        {
+            "Id": _make_id("006", i),
+            "AccountId": random.choice(account_ids),
+            "Name": _random_text(20),
+            "Amount": str(random.randint(1, 1_000_000)),
+            "LastModifiedDate": "2024-01-01T00:00:00.000Z",
+        }
+        for i in range(num_children)
+    ]
+
+    object_type_and_csv_paths = []
+    for object_type, rows in (
+        (ACCOUNT_OBJECT_TYPE, accounts),
+        ("Contact", contacts),
+        ("Opportunity", opportunities),
+    ):
+        csv_path = os.path.join(directory, f"{object_type}.csv")
+        _write_csv(csv_path, rows)
+        object_type_and_csv_paths.append((object_type, csv_path))
+
+    return object_type_and_csv_paths
+
+
+def run_sequential(
+    db_path: str, object_type_and_csv_paths: list[tuple[str, str]]
+) -> float:
+    sf_db = OnyxSalesforceSQLite(db_path)
+    sf_db.connect()
+    start = time.monotonic()
+    sf_db.apply_schema()
+    for object_type, csv_path in object_type_and_csv_paths:
+        sf_db.update_from_csv(object_type, csv_path)
+    elapsed = time.monotonic() - start
+    sf_db.close()
+    return elapsed
+
+
+def run_staged(
+    db_path: str,
+    object_type_and_csv_paths: list[tuple[str, str]],
+    staging_dir: str,
+    max_workers: int,
+) -> float:
+    sf_db = OnyxSalesforceSQLite(db_path)
+    sf_db.connect()
+    start = time.monotonic()
+    sf_db.apply_schema(defer_secondary_indexes=True)
+    for _ in sf_db.update_from_csvs_in_parallel(
+        object_type_and_csv_paths, staging_dir=staging_dir, max_workers=max_workers
+    ):
+        pass
+    sf_db.create_secondary_indexes()
+    elapsed = time.monotonic() - start
+    sf_db.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=20_000)
+    parser.add_argument("--children-per-account", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        object_type_and_csv_paths = generate_csvs(
+            directory, args.accounts, args.children_per_account
+        )
+        num_rows = args.accounts * (1 + 2 * args.children_per_account)
+        print(
+            f"Generated {num_rows} rows in {len(object_type_and_csv_paths)} CSVs, "
+            f"cpu_count={os.cpu_count()}"
+        )
+
+        sequential = run_sequential(
+            os.path.join(directory, "sequential.sqlite"), object_type_and_csv_paths
+        )
+        print(
+            f"sequential update_from_csv: {sequential:.2f}s "
+            f"({num_rows / sequential:.0f} rows/s)"
+        )
+
+        staged = run_staged(
+            os.path.join(directory, "staged.sqlite"),
+            object_type_and_csv_paths,
+            os.path.join(directory, "staging"),
+            args.workers,
+        )
+        print(
+            f"staged parallel ({args.workers} workers): {staged:.2f}s "
+            f"({num_rows / staged:.0f} rows/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -50,6 +50,55 @@ DISABLE_RERANK_FOR_STREAMING = (
 # model. If torch finds more threads on its own, this value is not used.
 MIN_THREADS_ML_MODELS = int(os.environ.get("MIN_THREADS_ML_MODELS") or 1)
 
+# Backend used to run the local embedding and reranking models, "torch" or "onnx".
+# With "onnx", models are run with ONNX Runtime and exported to ONNX on first use if
+# they don't ship ONNX weights (requires optimum[onnxruntime]). Falls back to torch
+# if a model can't be loaded with ONNX Runtime
+LOCAL_MODEL_INFERENCE_BACKEND = (
+    os.environ.get("LOCAL_MODEL_INFERENCE_BACKEND") or "torch"
+).lower()
+# Dynamically quantizes the ONNX models to int8 for the given CPU instruction set,
+# one of "arm64", "avx2", "avx512" or "avx512_vnni". Unset runs the unquantized model
+ONNX_QUANTIZATION_CONFIG = os.environ.get("ONNX_QUANTIZATION_CONFIG") or None
+# Threads used by ONNX Runtime within an operator, 0 lets ONNX Runtime decide
+ONNX_INTRA_OP_NUM_THREADS = int(os.environ.get("ONNX_INTRA_OP_NUM_THREADS") or 0)
+# Where exported and quantized ONNX models are saved, so that the export only happens
+# once per model
+ONNX_MODEL_DIR = os.environ.get("ONNX_MODEL_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "onyx_onnx_models"
+)
+
+# Memory the model server can use for local models. Loading a model beyond this evicts
+# the least recently used models that aren't pinned. 0 keeps every model loaded
+MODEL_SERVER_MEMORY_BUDGET_MB = int(
+    os.environ.get("MODEL_SERVER_MEMORY_BUDGET_MB") or 0
+)
+
+# Max number of requests the model server runs on local models at once. Requests over
+# the limit wait in a queue, interactive ones (query embeddings and reranking) are
+# started before indexing ones
+MODEL_SERVER_MAX_CONCURRENT_REQUESTS = int(
+    os.environ.get("MODEL_SERVER_MAX_CONCURRENT_REQUESTS") or 4
+)
+# Indexing requests can only use some of the slots, so interactive requests don't have
+# to wait on a running indexing request
+MODEL_SERVER_MAX_CONCURRENT_INDEXING_REQUESTS = int(
+    os.environ.get("MODEL_SERVER_MAX_CONCURRENT_INDEXING_REQUESTS")
+    or max(MODEL_SERVER_MAX_CONCURRENT_REQUESTS - 1, 1)
+)
+# Requests beyond these queue depths are rejected with a 429 and a Retry-After header
+MODEL_SERVER_MAX_QUEUED_INTERACTIVE_REQUESTS = int(
+    os.environ.get("MODEL_SERVER_MAX_QUEUED_INTERACTIVE_REQUESTS") or 256
+)
+MODEL_SERVER_MAX_QUEUED_INDEXING_REQUESTS = int(
+    os.environ.get("MODEL_SERVER_MAX_QUEUED_INDEXING_REQUESTS") or 32
+)
+MODEL_SERVER_RETRY_AFTER_SECONDS = int(
+    os.environ.get("MODEL_SERVER_RETRY_AFTER_SECONDS") or 5
+)
+# Header used by the model server clients to pass the priority of a request
+MODEL_SERVER_PRIORITY_HEADER = "X-Onyx-Request-Priority"
+
 # Model server that has indexing only set will throw exception if used for reranking
 # or intent classification
 INDEXING_ONLY = os.environ.get("INDEXING_ONLY", "").lower() == "true"
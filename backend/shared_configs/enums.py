@@ -19,3 +19,24 @@ class RerankerProvider(str, Enum):
 class EmbedTextType(str, Enum):
     QUERY = "query"
     PASSAGE = "passage"
+
+
+class ModelServerRequestPriority(str, Enum):
+    # from highest to lowest priority
+    INTERACTIVE = "interactive"
+    INDEXING = "indexing"
+
+    @classmethod
+    def for_text_type(cls, text_type: EmbedTextType) -> "ModelServerRequestPriority":
+        # queries are embedded while a user waits on the results
+        if text_type == EmbedTextType.QUERY:
+            return cls.INTERACTIVE
+        return cls.INDEXING
+
+
+class LocalModelType(str, Enum):
+    EMBEDDING = "embedding"
+    RERANKING = "reranking"
+    INTENT = "intent"
+    INFORMATION_CONTENT = "information_content"
+    CONNECTOR_CLASSIFIER = "connector_classifier"
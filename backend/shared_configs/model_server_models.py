@@ -1,7 +1,11 @@
+import struct
+
 from pydantic import BaseModel
 
+from shared_configs.configs import DOC_EMBEDDING_CONTEXT_SIZE
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
+from shared_configs.enums import LocalModelType
 from shared_configs.enums import RerankerProvider
 
 
@@ -85,3 +89,60 @@ class ContentClassificationPrediction(BaseModel):
 
 class InformationContentClassificationResponses(BaseModel):
     information_content_classifications: list[ContentClassificationPrediction]
+
+
+# Content classification responses can also be sent as a packed (label, boost
+# factor) pair per input instead of JSON, when requested through the Accept header
+CONTENT_CLASSIFICATION_BINARY_MEDIA_TYPE = "application/octet-stream"
+_CONTENT_CLASSIFICATION_BINARY_FORMAT = struct.Struct("<bd")
+
+
+def encode_content_classification_predictions(
+    predictions: list[ContentClassificationPrediction],
+) -> bytes:
+    return b"".join(
+        _CONTENT_CLASSIFICATION_BINARY_FORMAT.pack(
+            prediction.predicted_label, prediction.content_boost_factor
+        )
+        for prediction in predictions
+    )
+
+
+def decode_content_classification_predictions(
+    data: bytes,
+) -> list[ContentClassificationPrediction]:
+    return [
+        ContentClassificationPrediction(
+            predicted_label=predicted_label, content_boost_factor=content_boost_factor
+        )
+        for predicted_label, content_boost_factor in (
+            _CONTENT_CLASSIFICATION_BINARY_FORMAT.iter_unpack(data)
+        )
+    ]
+
+
+class LocalModelRequest(BaseModel):
+    model_type: LocalModelType
+    model_name: str
+
+    # This disables the "model_" protected namespace for pydantic
+    model_config = {"protected_namespaces": ()}
+
+
+class PreloadModelRequest(LocalModelRequest):
+    # only used for embedding models
+    max_context_length: int = DOC_EMBEDDING_CONTEXT_SIZE
+    pin: bool = False
+
+
+class LoadedModelInfo(BaseModel):
+    model_type: LocalModelType
+    model_name: str
+    size_bytes: int
+    load_seconds: float
+    pinned: bool
+    last_used: float
+    num_uses: int
+
+    # This disables the "model_" protected namespace for pydantic
+    model_config = {"protected_namespaces": ()}
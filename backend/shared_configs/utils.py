@@ -9,3 +9,31 @@ def batch_list(
     batch_size: int,
 ) -> list[list[T]]:
     return [lst[i : i + batch_size] for i in range(0, len(lst), batch_size)]
+
+
+def batch_by_token_budget(
+    token_counts: list[int],
+    max_tokens_per_batch: int,
+    max_batch_size: int,
+) -> list[list[int]]:
+    """Groups the indices of items into batches of items with a similar number of
+    tokens. Each batch is padded to its longest item when it is embedded, so a batch
+    is closed once its size times the tokens of its longest item would exceed
+    max_tokens_per_batch. An item that is over the budget on its own still gets
+    a batch. Callers restore the original order from the returned indices."""
+    batches: list[list[int]] = []
+    current_batch: list[int] = []
+    for idx in sorted(range(len(token_counts)), key=token_counts.__getitem__):
+        # items are sorted by length, so this item is the longest in the batch
+        if current_batch and (
+            len(current_batch) >= max_batch_size
+            or (len(current_batch) + 1) * token_counts[idx] > max_tokens_per_batch
+        ):
+            batches.append(current_batch)
+            current_batch = []
+        current_batch.append(idx)
+
+    if current_batch:
+        batches.append(current_batch)
+
+    return batches
@@ -0,0 +1,108 @@
+"""Runs workers against a real Redis to check that they share the rate limit of a
+credential."""
+
+import time
+from collections.abc import Callable
+from collections.abc import Generator
+from uuid import uuid4
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.cross_connector_utils.distributed_rate_limiter import (
+    DistributedRateLimiter,
+)
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+
+
+@pytest.fixture
+def make_limiter(
+    tenant_context: None,
+) -> Generator[Callable[..., DistributedRateLimiter], None, None]:
+    # a fresh credential per test, so that the tests don't share buckets
+    credential_key = f"test-credential-{uuid4()}"
+    limiters: list[DistributedRateLimiter] = []
+
+    def _make_limiter(
+        max_calls: int = 5, period: float = 1, credential: str = credential_key
+    ) -> DistributedRateLimiter:
+        limiter = DistributedRateLimiter(
+            source=DocumentSource.GITHUB,
+            credential_key=credential,
+            max_calls=max_calls,
+            period=period,
+        )
+        limiters.append(limiter)
+        return limiter
+
+    yield _make_limiter
+
+    redis_client = get_redis_client()
+    for limiter in limiters:
+        redis_client.delete(limiter._key)
+
+
+def _run_workers(
+    limiters: list[DistributedRateLimiter], calls_per_worker: int
+) -> list[float]:
+    """Each limiter is a worker making calls. Returns when each call was made."""
+
+    def worker(limiter: DistributedRateLimiter) -> list[float]:
+        call_times = []
+        for _ in range(calls_per_worker):
+            limiter.acquire()
+            call_times.append(time.monotonic())
+        return call_times
+
+    results = run_functions_tuples_in_parallel(
+        [(worker, (limiter,)) for limiter in limiters]
+    )
+    return sorted(call_time for call_times in results for call_time in call_times)
+
+
+def test_workers_share_the_rate_limit(
+    make_limiter: Callable[..., DistributedRateLimiter],
+) -> None:
+    limiters = [make_limiter(max_calls=5, period=1) for _ in range(4)]
+
+    start = time.monotonic()
+    call_times = _run_workers(limiters, calls_per_worker=5)
+
+    # the first 5 calls use the full bucket, the other 15 come in at 5 per second
+    assert len(call_times) == 20
+    assert call_times[4] - start < 0.5
+    assert call_times[-1] - start >= 2.8
+    for first, last in zip(call_times, call_times[10:]):
+        # no more than 10 calls in any second
+        assert last - first >= 0.9
+
+
+def test_retry_after_blocks_all_workers(
+    make_limiter: Callable[..., DistributedRateLimiter],
+) -> None:
+    limiter = make_limiter(max_calls=100, period=1)
+    other_worker = make_limiter(max_calls=100, period=1)
+    other_credential = make_limiter(max_calls=100, period=1, credential="other")
+
+    limiter.update_from_response({"Retry-After": "2"}, 429)
+
+    start = time.monotonic()
+    other_credential.acquire()
+    assert time.monotonic() - start < 0.5
+
+    other_worker.acquire()
+    assert time.monotonic() - start >= 1.5
+
+
+def test_remaining_header_caps_the_bucket(
+    make_limiter: Callable[..., DistributedRateLimiter],
+) -> None:
+    limiter = make_limiter(max_calls=10, period=10)
+    limiter.update_from_response({"X-RateLimit-Remaining": "2"}, 200)
+
+    start = time.monotonic()
+    run_functions_tuples_in_parallel([(limiter.acquire, ()) for _ in range(3)])
+
+    # the third call waits for a token to come back, 1 per second
+    assert time.monotonic() - start >= 0.8
@@ -237,6 +237,80 @@ class TestExternalStorageFileStore:
                 assert call_args[1]["Key"] == "onyx-files/public/test-file.txt"
                 assert call_args[1]["ContentType"] == "text/plain"
 
+    def _make_ranged_s3_client(self, content: bytes) -> Mock:
+        """Mock S3 client that honors the Range header on get_object"""
+
+        def get_object(**kwargs: Any) -> dict[str, Any]:
+            data = content
+            byte_range = kwargs.get("Range")
+            if byte_range:
+                start_str, end_str = byte_range.removeprefix("bytes=").split("-")
+                end = int(end_str) + 1 if end_str else len(content)
+                data = content[int(start_str) : end]
+            body = Mock()
+            body.read.return_value = data
+            body.iter_chunks.side_effect = lambda chunk_size: (
+                data[i : i + chunk_size] for i in range(0, len(data), chunk_size)
+            )
+            return {"Body": body}
+
+        mock_s3_client: Mock = Mock()
+        mock_s3_client.get_object.side_effect = get_object
+        mock_s3_client.head_object.return_value = {"ContentLength": len(content)}
+        return mock_s3_client
+
+    @patch("boto3.client")
+    def test_s3_read_file_stream(
+        self, mock_boto3: MagicMock, sample_content: bytes
+    ) -> None:
+        """Test that streamed reads are seekable and fetch data lazily"""
+        mock_s3_client = self._make_ranged_s3_client(sample_content)
+        mock_boto3.return_value = mock_s3_client
+        file_record = Mock(bucket_name="test-bucket", object_key="key")
+
+        with patch(
+            "onyx.file_store.file_store.get_filerecord_by_file_id",
+            return_value=file_record,
+        ):
+            file_store = S3BackedFileStore(bucket_name="test-bucket")
+            file_io = file_store.read_file(
+                "test-file.txt", mode="b", stream=True, db_session=Mock()
+            )
+
+        # nothing is downloaded until the stream is actually read
+        mock_s3_client.get_object.assert_not_called()
+
+        file_io.seek(-7, 2)
+        assert file_io.read() == sample_content[-7:]
+        file_io.seek(0)
+        assert file_io.read(4) == sample_content[:4]
+        file_io.seek(0)
+        assert file_io.read() == sample_content
+
+    @patch("boto3.client")
+    def test_s3_read_file_tempfile_is_chunked(
+        self, mock_boto3: MagicMock, sample_content: bytes
+    ) -> None:
+        """Test that tempfile reads spool the S3 body to disk in chunks"""
+        mock_s3_client = self._make_ranged_s3_client(sample_content)
+        mock_boto3.return_value = mock_s3_client
+        file_record = Mock(bucket_name="test-bucket", object_key="key")
+
+        with (
+            patch(
+                "onyx.file_store.file_store.get_filerecord_by_file_id",
+                return_value=file_record,
+            ),
+            patch("onyx.file_store.file_store.STANDARD_CHUNK_SIZE", 5),
+        ):
+            file_store = S3BackedFileStore(bucket_name="test-bucket")
+            file_io = file_store.read_file(
+                "test-file.txt", mode="b", use_tempfile=True, db_session=Mock()
+            )
+
+        assert file_io.read() == sample_content
+        file_io.close()
+
     def test_minio_client_initialization(self) -> None:
         """Test S3 client initialization with MinIO endpoint"""
         with (
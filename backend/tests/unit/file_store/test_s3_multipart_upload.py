@@ -0,0 +1,145 @@
+from collections.abc import Generator
+from io import BytesIO
+from io import StringIO
+from typing import Any
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import boto3
+import pytest
+from moto import mock_aws
+from mypy_boto3_s3 import S3Client
+
+from onyx.configs.constants import FileOrigin
+from onyx.file_store.file_store import S3BackedFileStore
+
+_BUCKET_NAME = "test-bucket"
+_PART_SIZE = 5 * 1024 * 1024  # smallest part size S3 allows
+
+
+class _NonSeekableIO:
+    """Minimal stream that can only be read forwards, like a network body"""
+
+    def __init__(self, content: bytes) -> None:
+        self._content = BytesIO(content)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._content.read(size)
+
+
+@pytest.fixture
+def s3_client() -> Generator[S3Client, None, None]:
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=_BUCKET_NAME)
+        yield client
+
+
+def _make_file_store(
+    s3_client: S3Client, deduplicate_by_content_hash: bool = False
+) -> S3BackedFileStore:
+    file_store = S3BackedFileStore(
+        bucket_name=_BUCKET_NAME,
+        multipart_threshold=_PART_SIZE,
+        multipart_part_size=_PART_SIZE,
+        multipart_max_concurrency=4,
+        deduplicate_by_content_hash=deduplicate_by_content_hash,
+    )
+    file_store._s3_client = s3_client
+    return file_store
+
+
+def _save(file_store: S3BackedFileStore, content: Any, file_id: str) -> None:
+    file_store.save_file(
+        content=content,
+        display_name=file_id,
+        file_origin=FileOrigin.OTHER,
+        file_type="application/octet-stream",
+        file_id=file_id,
+        db_session=Mock(),
+    )
+
+
+def _get_object(s3_client: S3Client, file_id: str) -> dict[str, Any]:
+    return dict(
+        s3_client.get_object(Bucket=_BUCKET_NAME, Key=f"onyx-files/public/{file_id}")
+    )
+
+
+def test_small_file_uses_single_put(s3_client: S3Client) -> None:
+    file_store = _make_file_store(s3_client)
+    content = BytesIO(b"small file")
+
+    with patch.object(
+        s3_client, "upload_fileobj", wraps=s3_client.upload_fileobj
+    ) as upload_spy:
+        _save(file_store, content, "small.txt")
+
+    upload_spy.assert_not_called()
+    assert _get_object(s3_client, "small.txt")["Body"].read() == b"small file"
+    # content is rewound for potential re-reads
+    assert content.tell() == 0
+
+
+def test_large_file_uses_multipart_upload(s3_client: S3Client) -> None:
+    file_store = _make_file_store(s3_client)
+    content = bytes(range(256)) * (_PART_SIZE * 2 // 256 + 1)
+
+    _save(file_store, BytesIO(content), "large.bin")
+
+    s3_object = _get_object(s3_client, "large.bin")
+    assert s3_object["Body"].read() == content
+    # multipart uploads have an ETag of the form "<md5>-<number of parts>"
+    assert s3_object["ETag"].strip('"').endswith("-3")
+    assert s3_object["ContentType"] == "application/octet-stream"
+
+
+def test_large_text_stream_is_uploaded(s3_client: S3Client) -> None:
+    file_store = _make_file_store(s3_client)
+    content = "a" * (_PART_SIZE + 1)
+
+    _save(file_store, StringIO(content), "text.json")
+
+    assert _get_object(s3_client, "text.json")["Body"].read() == content.encode()
+
+
+def test_non_seekable_stream_is_uploaded(s3_client: S3Client) -> None:
+    file_store = _make_file_store(s3_client)
+    content = b"x" * (_PART_SIZE + 1)
+
+    _save(file_store, _NonSeekableIO(content), "stream.bin")
+
+    assert _get_object(s3_client, "stream.bin")["Body"].read() == content
+
+
+def test_dedup_skips_upload_of_unchanged_content(s3_client: S3Client) -> None:
+    file_store = _make_file_store(s3_client, deduplicate_by_content_hash=True)
+
+    _save(file_store, BytesIO(b"same content"), "dedup.txt")
+    with patch.object(s3_client, "put_object", wraps=s3_client.put_object) as put_spy:
+        _save(file_store, BytesIO(b"same content"), "dedup.txt")
+        put_spy.assert_not_called()
+
+        _save(file_store, _NonSeekableIO(b"new content"), "dedup.txt")
+        put_spy.assert_called_once()
+
+    assert _get_object(s3_client, "dedup.txt")["Body"].read() == b"new content"
+
+
+def test_read_back_streamed_and_ranged(s3_client: S3Client) -> None:
+    file_store = _make_file_store(s3_client)
+    content = b"0123456789" * 1000
+    _save(file_store, BytesIO(content), "ranged.txt")
+
+    file_record = Mock(
+        bucket_name=_BUCKET_NAME, object_key="onyx-files/public/ranged.txt"
+    )
+    with patch(
+        "onyx.file_store.file_store.get_filerecord_by_file_id",
+        return_value=file_record,
+    ):
+        file_io = file_store.read_file("ranged.txt", stream=True, db_session=Mock())
+        file_io.seek(5)
+        assert file_io.read(10) == content[5:15]
+        file_io.seek(-10, 2)
+        assert file_io.read() == content[-10:]
@@ -13,6 +13,12 @@ from shared_configs.configs import (
 from shared_configs.configs import INDEXING_INFORMATION_CONTENT_CLASSIFICATION_MAX
 from shared_configs.configs import INDEXING_INFORMATION_CONTENT_CLASSIFICATION_MIN
 from shared_configs.model_server_models import ContentClassificationPrediction
+from shared_configs.model_server_models import (
+    decode_content_classification_predictions,
+)
+from shared_configs.model_server_models import (
+    encode_content_classification_predictions,
+)
 
 
 @pytest.fixture
@@ -143,3 +149,17 @@ def test_batch_processing(
     assert len(results) == 40
     # Verify batching occurred (should have called predict_proba twice)
     assert mock_content_model.predict_proba.call_count == 2
+
+
+def test_binary_content_classification_predictions_round_trip() -> None:
+    predictions = [
+        ContentClassificationPrediction(predicted_label=1, content_boost_factor=0.95),
+        ContentClassificationPrediction(predicted_label=0, content_boost_factor=0.7),
+    ]
+
+    assert (
+        decode_content_classification_predictions(
+            encode_content_classification_predictions(predictions)
+        )
+        == predictions
+    )
@@ -0,0 +1,97 @@
+import threading
+from unittest.mock import MagicMock
+
+from model_server.model_registry import ModelRegistry
+from shared_configs.enums import LocalModelType
+
+EMBEDDING = LocalModelType.EMBEDDING
+
+
+def _fake_model(size_bytes: int) -> MagicMock:
+    tensor = MagicMock()
+    tensor.numel.return_value = size_bytes
+    tensor.element_size.return_value = 1
+    model = MagicMock()
+    model.parameters.return_value = [tensor]
+    model.buffers.return_value = []
+    return model
+
+
+def test_registry_loads_each_model_once() -> None:
+    registry = ModelRegistry(memory_budget_bytes=None)
+    load = MagicMock(side_effect=lambda: _fake_model(10))
+
+    first = registry.get(EMBEDDING, "model-a", load)
+    second = registry.get(EMBEDDING, "model-a", load)
+
+    assert first is second
+    assert load.call_count == 1
+    (loaded_model,) = registry.get_loaded_models()
+    assert loaded_model.size_bytes == 10
+    assert loaded_model.num_uses == 2
+
+
+def test_registry_evicts_least_recently_used_unpinned_models() -> None:
+    registry = ModelRegistry(memory_budget_bytes=100)
+    registry.get(EMBEDDING, "model-a", lambda: _fake_model(40))
+    registry.get(EMBEDDING, "model-b", lambda: _fake_model(40))
+    registry.get(EMBEDDING, "model-c", lambda: _fake_model(10))
+    registry.set_pinned(EMBEDDING, "model-a", True)
+    # model-b is now the least recently used model that isn't pinned
+    registry.get(EMBEDDING, "model-c", lambda: _fake_model(10))
+
+    registry.get(EMBEDDING, "model-d", lambda: _fake_model(40))
+
+    assert [model.model_name for model in registry.get_loaded_models()] == [
+        "model-a",
+        "model-c",
+        "model-d",
+    ]
+
+
+def test_registry_keeps_pinned_models_over_budget() -> None:
+    registry = ModelRegistry(memory_budget_bytes=50)
+    registry.get(EMBEDDING, "model-a", lambda: _fake_model(40))
+    registry.set_pinned(EMBEDDING, "model-a", True)
+
+    registry.get(EMBEDDING, "model-b", lambda: _fake_model(40))
+    assert len(registry.get_loaded_models()) == 2
+
+    # once unpinned, model-a is evicted to get back under the budget
+    assert registry.set_pinned(EMBEDDING, "model-a", False)
+    assert [model.model_name for model in registry.get_loaded_models()] == ["model-b"]
+    assert not registry.set_pinned(EMBEDDING, "model-a", True)
+
+
+def test_registry_serves_loaded_models_while_loading_another() -> None:
+    registry = ModelRegistry(memory_budget_bytes=None)
+    registry.get(EMBEDDING, "model-a", lambda: _fake_model(10))
+
+    loading_started = threading.Event()
+    finish_loading = threading.Event()
+    num_loads = 0
+
+    def slow_load() -> MagicMock:
+        nonlocal num_loads
+        num_loads += 1
+        loading_started.set()
+        finish_loading.wait(timeout=5)
+        return _fake_model(10)
+
+    loaders = [
+        threading.Thread(target=registry.get, args=(EMBEDDING, "model-b", slow_load))
+        for _ in range(2)
+    ]
+    for loader in loaders:
+        loader.start()
+    assert loading_started.wait(timeout=5)
+
+    # doesn't wait for model-b to be loaded
+    registry.get(EMBEDDING, "model-a", lambda: _fake_model(10))
+    assert not finish_loading.is_set()
+
+    finish_loading.set()
+    for loader in loaders:
+        loader.join(timeout=5)
+    assert num_loads == 1
+    assert len(registry.get_loaded_models()) == 2
@@ -0,0 +1,29 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from model_server.onnx_backend import OnnxCrossEncoder
+
+
+def test_onnx_cross_encoder_matches_cross_encoder_scores() -> None:
+    logits_by_passage = {"relevant": 2.0, "unrelated": -3.0, "somewhat": 0.5}
+
+    def tokenize(queries: list[str], passages: list[str], **kwargs: Any) -> dict:
+        return {"passages": passages}
+
+    def run_model(passages: list[str]) -> MagicMock:
+        return MagicMock(
+            logits=np.array([[logits_by_passage[passage]] for passage in passages])
+        )
+
+    cross_encoder = OnnxCrossEncoder(model=run_model, tokenizer=tokenize)
+    passages = ["relevant", "unrelated", "somewhat"]
+
+    scores = cross_encoder.predict(
+        [("query", passage) for passage in passages], batch_size=2
+    )
+
+    # single label models get a sigmoid over the logits, like CrossEncoder
+    expected = [1 / (1 + np.exp(-logits_by_passage[p])) for p in passages]
+    assert np.allclose(scores, expected)
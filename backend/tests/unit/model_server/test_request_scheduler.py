@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from model_server.request_scheduler import ModelServerOverloadedError
+from model_server.request_scheduler import RequestScheduler
+from shared_configs.enums import ModelServerRequestPriority
+
+INTERACTIVE = ModelServerRequestPriority.INTERACTIVE
+INDEXING = ModelServerRequestPriority.INDEXING
+
+
+def _make_scheduler() -> RequestScheduler:
+    return RequestScheduler(
+        max_concurrent_requests=2,
+        max_concurrent_requests_by_priority={INDEXING: 1},
+        max_queued_requests_by_priority={INTERACTIVE: 10, INDEXING: 2},
+    )
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_run_before_queued_indexing_requests() -> None:
+    scheduler = _make_scheduler()
+    started: list[str] = []
+    release = asyncio.Event()
+
+    async def run(name: str, priority: ModelServerRequestPriority) -> None:
+        async with scheduler.slot(priority):
+            started.append(name)
+            await release.wait()
+
+    tasks = [asyncio.create_task(run("indexing-1", INDEXING))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(run("indexing-2", INDEXING)))
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(run("interactive", INTERACTIVE)))
+    await asyncio.sleep(0)
+
+    # indexing is limited to one slot, so the other one is free for interactive
+    # requests even though an indexing request was queued first
+    assert started == ["indexing-1", "interactive"]
+    assert scheduler.get_stats()[INDEXING.value] == {"running": 1, "queued": 1}
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == ["indexing-1", "interactive", "indexing-2"]
+    assert scheduler.get_stats()[INDEXING.value] == {"running": 0, "queued": 0}
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_requests() -> None:
+    scheduler = _make_scheduler()
+    release = asyncio.Event()
+
+    async def run() -> None:
+        async with scheduler.slot(INDEXING):
+            await release.wait()
+
+    # one running and two queued
+    tasks = [asyncio.create_task(run()) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(ModelServerOverloadedError):
+        async with scheduler.slot(INDEXING):
+            pass
+
+    # interactive requests have their own queue
+    async with scheduler.slot(INTERACTIVE):
+        pass
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiters_give_up_their_place() -> None:
+    scheduler = _make_scheduler()
+    release = asyncio.Event()
+
+    async def run() -> None:
+        async with scheduler.slot(INDEXING):
+            await release.wait()
+
+    running = asyncio.create_task(run())
+    waiting = asyncio.create_task(run())
+    await asyncio.sleep(0)
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert scheduler.get_stats()[INDEXING.value] == {"running": 1, "queued": 0}
+
+    release.set()
+    await running
+    assert scheduler.get_stats()[INDEXING.value] == {"running": 0, "queued": 0}
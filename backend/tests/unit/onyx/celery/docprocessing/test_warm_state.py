@@ -0,0 +1,88 @@
+import threading
+from unittest.mock import MagicMock
+
+from onyx.background.celery.tasks.docprocessing.warm_state import (
+    DocumentBatchPrefetcher,
+)
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+
+
+def _make_doc(doc_id: str) -> Document:
+    return Document(
+        id=doc_id,
+        sections=[TextSection(text="text", link=None)],
+        source=DocumentSource.FILE,
+        semantic_identifier=doc_id,
+        metadata={},
+    )
+
+
+def _make_storage(batches: dict[int, list[Document]]) -> MagicMock:
+    storage = MagicMock()
+    storage.cc_pair_id = 1
+    storage.index_attempt_id = 2
+    storage.get_batch.side_effect = lambda batch_num: batches.get(batch_num)
+    return storage
+
+
+def test_prefetched_batch_is_not_fetched_again() -> None:
+    storage = _make_storage({0: [_make_doc("a")], 1: [_make_doc("b")]})
+    prefetcher = DocumentBatchPrefetcher(max_prefetched_batches=2)
+
+    assert prefetcher.get_batch(storage, 0) == [_make_doc("a")]
+    prefetcher.prefetch(storage, 1)
+    assert prefetcher.get_batch(storage, 1) == [_make_doc("b")]
+
+    fetched = [call.args[0] for call in storage.get_batch.call_args_list]
+    assert fetched == [0, 1]
+
+
+def test_missing_prefetched_batch_is_fetched_directly() -> None:
+    batches: dict[int, list[Document]] = {}
+    storage = _make_storage(batches)
+    prefetcher = DocumentBatchPrefetcher(max_prefetched_batches=2)
+
+    # batch 1 has not been stored yet when it is prefetched
+    prefetcher.prefetch(storage, 1)
+    batches[1] = [_make_doc("late")]
+
+    assert prefetcher.get_batch(storage, 1) == [_make_doc("late")]
+
+
+def test_failed_prefetch_falls_back_to_direct_fetch() -> None:
+    storage = _make_storage({})
+    fail_once = threading.Event()
+
+    def get_batch(batch_num: int) -> list[Document]:
+        if not fail_once.is_set():
+            fail_once.set()
+            raise RuntimeError("S3 hiccup")
+        return [_make_doc("retried")]
+
+    storage.get_batch.side_effect = get_batch
+    prefetcher = DocumentBatchPrefetcher(max_prefetched_batches=2)
+
+    prefetcher.prefetch(storage, 3)
+    assert prefetcher.get_batch(storage, 3) == [_make_doc("retried")]
+
+
+def test_claimed_batches_are_not_prefetched() -> None:
+    storage = _make_storage({0: [_make_doc("a")]})
+    prefetcher = DocumentBatchPrefetcher(max_prefetched_batches=2)
+
+    prefetcher.get_batch(storage, 0)
+    prefetcher.prefetch(storage, 0)
+
+    assert storage.get_batch.call_count == 1
+
+
+def test_prefetch_is_bounded() -> None:
+    storage = _make_storage({i: [_make_doc(str(i))] for i in range(5)})
+    prefetcher = DocumentBatchPrefetcher(max_prefetched_batches=2)
+
+    for batch_num in range(5):
+        prefetcher.prefetch(storage, batch_num)
+
+    assert len(prefetcher._pending) == 2
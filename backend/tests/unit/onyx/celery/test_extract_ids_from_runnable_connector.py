@@ -0,0 +1,40 @@
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+from onyx.background.celery.celery_utils import extract_ids_from_runnable_connector
+from onyx.background.celery.celery_utils import (
+    extract_ids_from_runnable_connector_to_disk,
+)
+from onyx.connectors.interfaces import GenerateDocumentsOutput
+from onyx.connectors.interfaces import GenerateSlimDocumentOutput
+from onyx.connectors.interfaces import LoadConnector
+from onyx.connectors.interfaces import SlimConnector
+from onyx.connectors.models import SlimDocument
+from onyx.utils.disk_backed_id_set import DiskBackedIdSet
+
+
+class _SlimAndLoadConnector(LoadConnector, SlimConnector):
+    def load_credentials(self, credentials: dict[str, Any]) -> None:
+        return None
+
+    def retrieve_all_slim_documents(
+        self, *args: Any, **kwargs: Any
+    ) -> GenerateSlimDocumentOutput:
+        yield [SlimDocument(id="slim-1"), SlimDocument(id="slim-2")]
+
+    def load_from_state(self) -> GenerateDocumentsOutput:
+        yield [MagicMock(id="loaded-1")]
+
+
+def test_slim_connectors_also_load_documents(tmp_path: Path) -> None:
+    expected_ids = {"slim-1", "slim-2", "loaded-1"}
+
+    assert extract_ids_from_runnable_connector(_SlimAndLoadConnector()) == (
+        expected_ids
+    )
+
+    with DiskBackedIdSet(directory=str(tmp_path)) as id_set:
+        extract_ids_from_runnable_connector_to_disk(_SlimAndLoadConnector(), id_set)
+        assert len(id_set) == len(expected_ids)
+        assert id_set.missing(sorted(expected_ids)) == []
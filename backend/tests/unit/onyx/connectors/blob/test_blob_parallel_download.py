@@ -0,0 +1,76 @@
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from onyx.configs.constants import BlobType
+from onyx.connectors.blob.connector import BlobStorageConnector
+
+_BUCKET_NAME = "onyx-test-bucket"
+
+
+@pytest.fixture
+def blob_connector() -> Iterator[BlobStorageConnector]:
+    with (
+        mock_aws(),
+        patch(
+            "onyx.file_processing.extract_file_text.get_unstructured_api_key",
+            return_value=None,
+        ),
+    ):
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket=_BUCKET_NAME)
+
+        connector = BlobStorageConnector(
+            bucket_type=BlobType.S3.value, bucket_name=_BUCKET_NAME, batch_size=4
+        )
+        connector.s3_client = s3_client
+        yield connector
+
+
+def test_documents_keep_listing_order(blob_connector: BlobStorageConnector) -> None:
+    assert blob_connector.s3_client is not None
+    keys = [f"docs/file_{i:02d}.txt" for i in range(10)]
+    for key in keys:
+        blob_connector.s3_client.put_object(
+            Bucket=_BUCKET_NAME, Key=key, Body=f"contents of {key}".encode()
+        )
+    blob_connector.s3_client.put_object(Bucket=_BUCKET_NAME, Key="docs/", Body=b"")
+
+    batches = list(blob_connector.load_from_state())
+
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    docs = [doc for batch in batches for doc in batch]
+    assert [doc.semantic_identifier for doc in docs] == [
+        key.split("/")[-1] for key in keys
+    ]
+    assert [doc.sections[0].text for doc in docs] == [
+        f"contents of {key}" for key in keys
+    ]
+
+
+def test_objects_over_the_size_limit_are_not_downloaded(
+    blob_connector: BlobStorageConnector,
+) -> None:
+    assert blob_connector.s3_client is not None
+    blob_connector.s3_client.put_object(
+        Bucket=_BUCKET_NAME, Key="small.txt", Body=b"small"
+    )
+    blob_connector.s3_client.put_object(
+        Bucket=_BUCKET_NAME, Key="large.txt", Body=b"x" * 100
+    )
+
+    with (
+        patch("onyx.connectors.blob.connector.BLOB_STORAGE_MAX_OBJECT_SIZE_BYTES", 50),
+        patch.object(
+            blob_connector,
+            "_download_object",
+            wraps=blob_connector._download_object,
+        ) as download_object,
+    ):
+        docs = [doc for batch in blob_connector.load_from_state() for doc in batch]
+
+    assert [doc.semantic_identifier for doc in docs] == ["small.txt"]
+    download_object.assert_called_once_with("small.txt")
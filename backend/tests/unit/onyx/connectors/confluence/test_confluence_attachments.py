@@ -0,0 +1,164 @@
+import time
+from collections.abc import Generator
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.confluence.connector import ConfluenceConnector
+from onyx.connectors.models import ConnectorFailure
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[key] = value.encode("utf-8")
+
+
+@pytest.fixture
+def fake_redis() -> Generator[_FakeRedis, None, None]:
+    redis_client = _FakeRedis()
+    with patch(
+        "onyx.connectors.confluence.attachment_cache.get_redis_client",
+        return_value=redis_client,
+    ):
+        yield redis_client
+
+
+@pytest.fixture
+def confluence_client() -> MagicMock:
+    return MagicMock()
+
+
+@pytest.fixture
+def confluence_connector(confluence_client: MagicMock) -> ConfluenceConnector:
+    connector = ConfluenceConnector(
+        wiki_base="https://example.atlassian.net/wiki", space="TEST", is_cloud=False
+    )
+    connector._confluence_client = confluence_client
+    return connector
+
+
+def _create_attachment(id: str, version: int = 1) -> dict[str, Any]:
+    return {
+        "id": id,
+        "title": f"attachment-{id}.txt",
+        "version": {"number": version},
+        "metadata": {"mediaType": "text/plain"},
+        "_links": {"webui": f"/download/attachments/{id}"},
+    }
+
+
+def _create_page() -> tuple[dict[str, Any], Document]:
+    page = {"id": "1", "title": "Page"}
+    doc = Document(
+        id="https://example.atlassian.net/wiki/spaces/TEST/pages/1",
+        sections=[TextSection(text="page", link="page")],
+        source=DocumentSource.CONFLUENCE,
+        semantic_identifier="Page",
+        metadata={},
+    )
+    return page, doc
+
+
+def _convert_attachment_to_content(
+    attachment: dict[str, Any], **kwargs: Any
+) -> tuple[str | None, str | None]:
+    # the first attachments finish last
+    time.sleep(0.03 / int(attachment["id"]))
+    if attachment["title"].startswith("broken"):
+        raise ValueError("broken attachment")
+    return f"text {attachment['id']}", None
+
+
+def test_attachments_are_converted_in_order_and_cached(
+    confluence_connector: ConfluenceConnector,
+    confluence_client: MagicMock,
+    fake_redis: _FakeRedis,
+) -> None:
+    attachments = [_create_attachment(str(i)) for i in range(1, 4)]
+    confluence_client.paginated_cql_retrieval.return_value = attachments
+
+    with patch(
+        "onyx.connectors.confluence.connector.convert_attachment_to_content",
+        side_effect=_convert_attachment_to_content,
+    ) as mock_convert:
+        page, doc = _create_page()
+        result = confluence_connector._fetch_page_attachments(page, doc)
+        assert isinstance(result, Document)
+        assert [section.text for section in result.sections[1:]] == [
+            "text 1",
+            "text 2",
+            "text 3",
+        ]
+        assert mock_convert.call_count == 3
+
+        # only the attachment with a new version is downloaded again
+        attachments[1]["version"]["number"] = 2
+        page, doc = _create_page()
+        result = confluence_connector._fetch_page_attachments(page, doc)
+        assert isinstance(result, Document)
+        assert [section.text for section in result.sections[1:]] == [
+            "text 1",
+            "text 2",
+            "text 3",
+        ]
+        assert mock_convert.call_count == 4
+        assert mock_convert.call_args.kwargs["attachment"]["id"] == "2"
+
+
+def test_attachments_cached_without_images_are_converted_with_images(
+    confluence_connector: ConfluenceConnector,
+    confluence_client: MagicMock,
+    fake_redis: _FakeRedis,
+) -> None:
+    attachments = [_create_attachment("1")]
+    confluence_client.paginated_cql_retrieval.return_value = attachments
+
+    with patch(
+        "onyx.connectors.confluence.connector.convert_attachment_to_content",
+        side_effect=_convert_attachment_to_content,
+    ) as mock_convert:
+        page, doc = _create_page()
+        confluence_connector._fetch_page_attachments(page, doc)
+
+        confluence_connector.set_allow_images(True)
+        page, doc = _create_page()
+        confluence_connector._fetch_page_attachments(page, doc)
+
+    assert mock_convert.call_count == 2
+    assert mock_convert.call_args.kwargs["allow_images"] is True
+
+
+def test_first_failing_attachment_fails_the_document(
+    confluence_connector: ConfluenceConnector,
+    confluence_client: MagicMock,
+    fake_redis: _FakeRedis,
+) -> None:
+    attachments = [_create_attachment(str(i)) for i in range(1, 4)]
+    attachments[0]["title"] = "broken-1.txt"
+    attachments[2]["title"] = "broken-3.txt"
+    confluence_client.paginated_cql_retrieval.return_value = attachments
+
+    with patch(
+        "onyx.connectors.confluence.connector.convert_attachment_to_content",
+        side_effect=_convert_attachment_to_content,
+    ):
+        page, doc = _create_page()
+        result = confluence_connector._fetch_page_attachments(page, doc)
+
+    assert isinstance(result, ConnectorFailure)
+    assert result.failure_message.startswith(
+        "Failed to extract/summarize attachment broken-1.txt"
+    )
+    # the attachment that was converted is cached for the retry
+    assert len(fake_redis.values) == 1
@@ -0,0 +1,106 @@
+import time
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.cross_connector_utils.distributed_rate_limiter import (
+    DistributedRateLimiter,
+)
+from onyx.connectors.cross_connector_utils.distributed_rate_limiter import (
+    get_rate_limit_from_headers,
+)
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    RateLimitTriedTooManyTimesError,
+)
+
+_MODULE = "onyx.connectors.cross_connector_utils.distributed_rate_limiter"
+
+
+@pytest.mark.parametrize(
+    "headers,status_code,expected",
+    [
+        ({}, 200, (None, 0.0)),
+        ({"Retry-After": "12"}, 429, (0, 12.0)),
+        ({"X-RateLimit-Remaining": "42"}, 200, (42, 0.0)),
+        ({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "20"}, 200, (0, 20.0)),
+        # an invalid header is ignored
+        ({"Retry-After": "soon"}, 503, (None, 0.0)),
+    ],
+)
+def test_get_rate_limit_from_headers(
+    headers: dict[str, str],
+    status_code: int,
+    expected: tuple[int | None, float],
+) -> None:
+    assert get_rate_limit_from_headers(headers, status_code) == expected
+
+
+def test_get_rate_limit_from_headers_with_reset_timestamp() -> None:
+    reset = str(int(time.time()) + 60)
+    remaining, wait_seconds = get_rate_limit_from_headers(
+        {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}
+    )
+    assert remaining == 0
+    assert 55 < wait_seconds <= 60
+
+
+def _make_limiter(**kwargs: float) -> DistributedRateLimiter:
+    return DistributedRateLimiter(
+        source=DocumentSource.GITHUB,
+        credential_key="credential",
+        max_calls=10,
+        period=1,
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+def test_limiter_waits_for_tokens() -> None:
+    limiter = _make_limiter()
+    with (
+        patch.object(limiter, "_take_tokens", side_effect=[0.5, 0.25, 0.0]),
+        patch(f"{_MODULE}.time.sleep") as mock_sleep,
+    ):
+        limiter.acquire()
+
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.5, 0.25]
+
+
+def test_limiter_gives_up_after_max_wait() -> None:
+    limiter = _make_limiter(max_wait_seconds=1)
+    with (
+        patch.object(limiter, "_take_tokens", return_value=0.75),
+        patch(f"{_MODULE}.time.sleep"),
+        pytest.raises(RateLimitTriedTooManyTimesError),
+    ):
+        limiter.acquire()
+
+
+def test_limiter_lets_calls_through_without_redis() -> None:
+    limiter = _make_limiter()
+    with patch(f"{_MODULE}.get_redis_client", side_effect=ConnectionError("no redis")):
+        limiter.acquire()
+        limiter.update_from_response({"Retry-After": "5"}, 429)
+
+
+def test_wrap_request_retries_rate_limited_requests() -> None:
+    limiter = _make_limiter()
+    rate_limited = requests.Response()
+    rate_limited.status_code = 429
+    rate_limited.headers["Retry-After"] = "3"
+    ok = requests.Response()
+    ok.status_code = 200
+    ok.headers["X-RateLimit-Remaining"] = "7"
+    request_fn = MagicMock(side_effect=[rate_limited, ok])
+
+    with (
+        patch.object(limiter, "acquire") as mock_acquire,
+        patch.object(limiter, "update_from_response") as mock_update,
+    ):
+        response = limiter.wrap_request(request_fn)("https://api.github.com")
+
+    assert response is ok
+    assert mock_acquire.call_count == 2
+    assert [call.args[1] for call in mock_update.call_args_list] == [429, 200]
@@ -3,6 +3,7 @@ from collections.abc import Callable
 from collections.abc import Generator
 from datetime import datetime
 from datetime import timezone
+from typing import Any
 from typing import cast
 from unittest.mock import MagicMock
 from unittest.mock import patch
@@ -805,18 +806,22 @@ def test_load_from_checkpoint_cursor_pagination_completion(
     type(mock_empty_issues_list)._PaginatedList__nextUrl = None
     mock_repo1.get_issues.return_value = mock_empty_issues_list
     mock_repo2.get_issues.return_value = mock_empty_issues_list
-    with patch.object(
-        github_connector, "get_all_repos", return_value=[mock_repo1, mock_repo2]
-    ), patch.object(
-        github_connector,
-        "_pull_requests_func",
-        side_effect=replacement_pull_requests_func,
-    ), patch.object(
-        SerializedRepository,
-        "to_Repository",
-        side_effect=to_repository_side_effect,
-        autospec=True,
-    ) as mock_to_repository:
+    with (
+        patch.object(
+            github_connector, "get_all_repos", return_value=[mock_repo1, mock_repo2]
+        ),
+        patch.object(
+            github_connector,
+            "_pull_requests_func",
+            side_effect=replacement_pull_requests_func,
+        ),
+        patch.object(
+            SerializedRepository,
+            "to_Repository",
+            side_effect=to_repository_side_effect,
+            autospec=True,
+        ) as mock_to_repository,
+    ):
         end_time = time.time()
         outputs = list(
             load_everything_from_checkpoint_connector_from_checkpoint(
@@ -923,3 +928,153 @@ def test_load_from_checkpoint_cursor_pagination_completion(
     assert (
         pull_requests_func_invocation_count == 3
     )  # twice for repo2 PRs, once for repo1 PRs
+
+
+def _create_graphql_response(
+    connection_name: str,
+    nodes: list[dict[str, Any]],
+    end_cursor: str | None,
+    has_next_page: bool,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    return {}, {
+        "data": {
+            "repository": {
+                connection_name: {
+                    "pageInfo": {"hasNextPage": has_next_page, "endCursor": end_cursor},
+                    "nodes": nodes,
+                }
+            }
+        }
+    }
+
+
+def _create_graphql_node(
+    number: int, object_type: str, comments: list[str] | None = None
+) -> dict[str, Any]:
+    path = "pull" if object_type == "pullRequests" else "issues"
+    return {
+        "databaseId": number,
+        "number": number,
+        "title": f"Title {number}",
+        "body": f"Body {number}",
+        "url": f"https://github.com/test-org/test-repo/{path}/{number}",
+        "state": "MERGED",
+        "merged": True,
+        "createdAt": "2023-01-01T00:00:00Z",
+        "updatedAt": "2023-01-02T00:00:00Z",
+        "author": {"login": "octocat", "name": "Octo Cat", "email": ""},
+        "labels": {"nodes": [{"name": "bug"}]},
+        "comments": {
+            "totalCount": len(comments or []),
+            "nodes": [{"body": comment} for comment in comments or []],
+        },
+        "baseRepository": {"nameWithOwner": "test-org/test-repo"},
+        "repository": {"nameWithOwner": "test-org/test-repo"},
+    }
+
+
+def test_load_from_checkpoint_with_graphql(
+    build_github_connector: Callable[..., GithubConnector],
+    mock_github_client: MagicMock,
+    create_mock_repo: Callable[..., MagicMock],
+) -> None:
+    github_connector = build_github_connector()
+    github_connector.use_graphql = True
+    mock_repo = create_mock_repo()
+    mock_repo.full_name = "test-org/test-repo"
+    mock_github_client.get_repo.return_value = mock_repo
+    mock_github_client.requester.graphql_query.side_effect = [
+        _create_graphql_response(
+            "pullRequests",
+            [_create_graphql_node(1, "pullRequests", comments=["LGTM", "Thanks"])],
+            end_cursor="cursor-1",
+            has_next_page=True,
+        ),
+        _create_graphql_response(
+            "pullRequests",
+            [_create_graphql_node(2, "pullRequests")],
+            end_cursor="cursor-2",
+            has_next_page=False,
+        ),
+        _create_graphql_response(
+            "issues",
+            [_create_graphql_node(3, "issues")],
+            end_cursor="cursor-3",
+            has_next_page=False,
+        ),
+    ]
+
+    with patch.object(SerializedRepository, "to_Repository", return_value=mock_repo):
+        outputs = load_everything_from_checkpoint_connector(
+            github_connector, 0, time.time()
+        )
+
+    assert [len(output.items) for output in outputs] == [0, 1, 2]
+    # the GraphQL cursor is kept in the checkpoint to fetch the next page
+    assert outputs[1].next_checkpoint.cursor_url == "cursor-1"
+    assert outputs[1].next_checkpoint.num_retrieved == 1
+    assert outputs[-1].next_checkpoint.has_more is False
+
+    pr = outputs[1].items[0]
+    assert isinstance(pr, Document)
+    assert pr.id == "https://github.com/test-org/test-repo/pull/1"
+    assert [section.text for section in pr.sections] == [
+        "Body 1",
+        "LGTM\nComment: Thanks",
+    ]
+    assert pr.metadata["state"] == "closed"
+    assert pr.metadata["labels"] == ["bug"]
+    assert pr.metadata["user"] == str({"login": "octocat", "name": "Octo Cat"})
+
+    assert [cast(Document, item).id for item in outputs[2].items] == [
+        "https://github.com/test-org/test-repo/pull/2",
+        "https://github.com/test-org/test-repo/issues/3",
+    ]
+
+    variables = [
+        call.args[1]
+        for call in mock_github_client.requester.graphql_query.call_args_list
+    ]
+    assert [variables["cursor"] for variables in variables] == [
+        None,
+        "cursor-1",
+        None,
+    ]
+    # polls only fetch the issues updated since the start
+    assert variables[2]["since"] is not None
+
+
+def test_load_from_checkpoint_with_graphql_rate_limit(
+    build_github_connector: Callable[..., GithubConnector],
+    mock_github_client: MagicMock,
+    create_mock_repo: Callable[..., MagicMock],
+) -> None:
+    github_connector = build_github_connector()
+    github_connector.use_graphql = True
+    github_connector.include_issues = False
+    mock_repo = create_mock_repo()
+    mock_repo.full_name = "test-org/test-repo"
+    mock_github_client.get_repo.return_value = mock_repo
+    mock_github_client.requester.graphql_query.side_effect = [
+        GithubException(400, {"errors": [{"type": "RATE_LIMITED"}]}, {}),
+        _create_graphql_response(
+            "pullRequests",
+            [_create_graphql_node(1, "pullRequests")],
+            end_cursor="cursor-1",
+            has_next_page=False,
+        ),
+    ]
+
+    with (
+        patch.object(SerializedRepository, "to_Repository", return_value=mock_repo),
+        patch(
+            "onyx.connectors.github.connector.sleep_after_rate_limit_exception"
+        ) as mock_sleep,
+    ):
+        outputs = load_everything_from_checkpoint_connector(
+            github_connector, 0, time.time()
+        )
+
+    mock_sleep.assert_called_once_with(mock_github_client, graphql=True)
+    assert len(outputs[1].items) == 1
+    assert outputs[-1].next_checkpoint.has_more is False
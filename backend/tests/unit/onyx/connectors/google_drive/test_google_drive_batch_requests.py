@@ -0,0 +1,154 @@
+import threading
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import httplib2  # type: ignore
+from google.oauth2.credentials import Credentials as OAuthCredentials  # type: ignore
+from googleapiclient.errors import HttpError  # type: ignore
+
+from onyx.connectors.google_drive.connector import GoogleDriveConnector
+from onyx.connectors.google_drive.file_retrieval import get_permissions_for_files
+from onyx.connectors.google_utils.google_utils import AdaptiveWorkerCount
+from onyx.connectors.google_utils.google_utils import is_quota_error
+from onyx.connectors.google_utils.resources import get_drive_service
+
+
+def _http_error(status: int, reason: str = "") -> HttpError:
+    content = f'{{"error": {{"errors": [{{"reason": "{reason}"}}]}}}}'
+    return HttpError(httplib2.Response({"status": status}), content.encode())
+
+
+class _FakeBatch:
+    def __init__(self, service: "_FakeDriveService", callback: Callable) -> None:
+        self.service = service
+        self.callback = callback
+        self.requests: list[tuple[str, dict[str, Any]]] = []
+
+    def add(self, request: dict[str, Any], request_id: str) -> None:
+        self.requests.append((request_id, request))
+
+    def execute(self) -> None:
+        self.service.num_batches += 1
+        for request_id, request in self.requests:
+            response = self.service.responses[request["fileId"]]
+            if isinstance(response, HttpError):
+                self.callback(request_id, None, response)
+            else:
+                self.callback(request_id, response, None)
+
+
+class _FakeDriveService:
+    def __init__(self, responses: dict[str, dict[str, Any] | HttpError]) -> None:
+        self.responses = responses
+        self.num_batches = 0
+
+    def permissions(self) -> "_FakeDriveService":
+        return self
+
+    def list(self, **kwargs: Any) -> dict[str, Any]:
+        return kwargs
+
+    def new_batch_http_request(self, callback: Callable) -> _FakeBatch:
+        return _FakeBatch(self, callback)
+
+
+def _permission(id: str) -> dict[str, str]:
+    return {"id": id, "type": "user", "emailAddress": f"{id}@example.com"}
+
+
+def test_get_permissions_for_files() -> None:
+    service = _FakeDriveService(
+        {
+            **{
+                f"file-{i}": {"permissions": [_permission(f"p{i}")]} for i in range(150)
+            },
+            "paginated": {"permissions": [], "nextPageToken": "next"},
+            "rate-limited": _http_error(429),
+        }
+    )
+    file_ids = [f"file-{i}" for i in range(150)] + ["paginated", "rate-limited"]
+
+    permissions, errors = get_permissions_for_files(service, file_ids)  # type: ignore
+
+    # 100 calls per batch
+    assert service.num_batches == 2
+    assert len(permissions) == 150
+    assert permissions["file-7"] == [_permission("p7")]
+    # the files that need more calls are left to the caller
+    assert "paginated" not in permissions
+    assert list(errors.keys()) == ["rate-limited"]
+
+
+def test_prefetch_permissions() -> None:
+    connector = GoogleDriveConnector(include_shared_drives=True)
+    connector._creds = MagicMock()
+    connector._primary_admin_email = "admin@example.com"
+    service = _FakeDriveService(
+        {
+            "complete": {"permissions": [_permission("p1"), _permission("p2")]},
+            "missing": {"permissions": [_permission("p1")]},
+            "rate-limited": _http_error(403, "userRateLimitExceeded"),
+        }
+    )
+    files: list[dict[str, Any]] = [
+        {"id": "complete", "permissionIds": ["p1"]},
+        {"id": "missing", "permissionIds": ["p1", "p2"]},
+        {"id": "rate-limited", "permissionIds": ["p1"]},
+        {"id": "my-drive", "permissions": [_permission("p1")]},
+    ]
+
+    with patch(
+        "onyx.connectors.google_drive.connector.get_drive_service",
+        return_value=service,
+    ):
+        num_quota_errors = connector._prefetch_permissions(files)
+
+    assert num_quota_errors == 1
+    assert files[0]["permissions"] == [_permission("p1")]
+    # these still get their permissions when the file is converted
+    assert "permissions" not in files[1]
+    assert "permissions" not in files[2]
+
+
+def test_is_quota_error() -> None:
+    assert is_quota_error(_http_error(429))
+    assert is_quota_error(_http_error(403, "rateLimitExceeded"))
+    assert not is_quota_error(_http_error(403, "insufficientFilePermissions"))
+    assert not is_quota_error(ValueError("rateLimitExceeded"))
+
+
+def test_adaptive_worker_count() -> None:
+    workers = AdaptiveWorkerCount(max_workers=8)
+    workers.update(num_quota_errors=3)
+    assert workers.value == 4
+    workers.update(num_quota_errors=1)
+    workers.update(num_quota_errors=1)
+    workers.update(num_quota_errors=1)
+    assert workers.value == 1
+    workers.update(num_quota_errors=0)
+    assert workers.value == 2
+    for _ in range(10):
+        workers.update(num_quota_errors=0)
+    assert workers.value == 8
+
+
+def test_services_are_reused_per_thread() -> None:
+    creds = OAuthCredentials(token="token")
+    with patch("onyx.connectors.google_utils.resources.build") as mock_build:
+        mock_build.side_effect = lambda *args, **kwargs: MagicMock()
+        service = get_drive_service(creds, "user@example.com")
+        assert get_drive_service(creds, "user@example.com") is service
+
+        other_thread_services = []
+        thread = threading.Thread(
+            target=lambda: other_thread_services.append(
+                get_drive_service(creds, "user@example.com")
+            )
+        )
+        thread.start()
+        thread.join()
+
+    assert other_thread_services[0] is not service
+    assert mock_build.call_count == 2
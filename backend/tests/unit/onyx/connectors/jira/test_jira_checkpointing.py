@@ -198,6 +198,96 @@ def test_load_from_checkpoint_happy_path(
     assert kwargs["maxResults"] == PAGE_SIZE
 
 
+def test_load_from_checkpoint_with_partitions(
+    jira_connector: JiraConnector, create_mock_issue: Callable[..., MagicMock]
+) -> None:
+    """Test fetching the time range in partitions, each with its own offset"""
+    jira_connector.num_partitions = 2
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc).timestamp()
+    end = datetime(2023, 1, 1, 4, tzinfo=timezone.utc).timestamp()
+
+    first_partition_issues = [
+        create_mock_issue(key=f"TEST-{i}", updated="2023-01-01T01:00:00.000+0000")
+        for i in range(1, 4)
+    ]
+    second_partition_issue = create_mock_issue(
+        key="TEST-4", updated="2023-01-01T03:00:00.000+0000"
+    )
+
+    def search_issues(
+        jql_str: str, startAt: int, maxResults: int, fields: str | None
+    ) -> list[MagicMock]:
+        if "ORDER BY updated ASC" in jql_str:
+            return first_partition_issues[:1]
+        # the windows start at the first update
+        if "updated < '2023-01-01 02:30'" in jql_str:
+            return first_partition_issues[startAt : startAt + maxResults]
+        assert "updated >= '2023-01-01 02:30'" in jql_str
+        assert "updated <= '2023-01-01 04:00'" in jql_str
+        return [second_partition_issue][startAt : startAt + maxResults]
+
+    jira_client = cast(JIRA, jira_connector._jira_client)
+    search_issues_mock = cast(MagicMock, jira_client.search_issues)
+    search_issues_mock.side_effect = search_issues
+
+    outputs = load_everything_from_checkpoint_connector(jira_connector, start, end)
+
+    assert len(outputs) == 2
+    assert [cast(Document, item).id for item in outputs[0].items] == [
+        "https://jira.example.com/browse/TEST-1",
+        "https://jira.example.com/browse/TEST-2",
+        "https://jira.example.com/browse/TEST-4",
+    ]
+    partitions = outputs[0].next_checkpoint.partitions
+    assert partitions is not None
+    assert [(p.offset, p.done) for p in partitions] == [(2, False), (1, True)]
+    assert outputs[0].next_checkpoint.has_more is True
+
+    assert [cast(Document, item).id for item in outputs[1].items] == [
+        "https://jira.example.com/browse/TEST-3",
+    ]
+    assert outputs[1].next_checkpoint.has_more is False
+
+    # only the fields used to build the documents are requested
+    _, kwargs = search_issues_mock.call_args
+    assert "comment" in kwargs["fields"].split(",")
+    assert "*all" not in kwargs["fields"]
+
+
+def test_load_from_checkpoint_with_partitions_date_error(
+    jira_connector: JiraConnector, create_mock_issue: Callable[..., MagicMock]
+) -> None:
+    """Test that the partitions fall back to an earlier start on Atlassian date
+    errors, like the single query does"""
+    jira_connector.num_partitions = 2
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc).timestamp()
+    end = datetime(2023, 1, 1, 4, tzinfo=timezone.utc).timestamp()
+    issue = create_mock_issue(key="TEST-1", updated="2023-01-01T01:00:00.000+0000")
+
+    def search_issues(
+        jql_str: str, startAt: int, maxResults: int, fields: str | None
+    ) -> list[MagicMock]:
+        if "updated >= '2023-01-01 00:00'" in jql_str:
+            raise JIRAError("The value for field 'updated' is invalid")
+        if "ORDER BY updated ASC" in jql_str:
+            assert "updated >= '2022-12-31 23:00'" in jql_str
+            return [issue]
+        # the windows start at the first update
+        if "updated >= '2023-01-01 01:00'" in jql_str:
+            return [issue][startAt : startAt + maxResults]
+        return []
+
+    jira_client = cast(JIRA, jira_connector._jira_client)
+    cast(MagicMock, jira_client.search_issues).side_effect = search_issues
+
+    outputs = load_everything_from_checkpoint_connector(jira_connector, start, end)
+
+    assert [cast(Document, item).id for item in outputs[0].items] == [
+        "https://jira.example.com/browse/TEST-1",
+    ]
+    assert outputs[-1].next_checkpoint.has_more is False
+
+
 def test_load_from_checkpoint_with_issue_processing_error(
     jira_connector: JiraConnector, create_mock_issue: Callable[..., MagicMock]
 ) -> None:
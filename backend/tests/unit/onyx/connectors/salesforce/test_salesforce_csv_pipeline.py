@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.connectors.salesforce.salesforce_calls import fetch_csvs_as_completed
+from onyx.connectors.salesforce.sqlite_functions import OnyxSalesforceSQLite
+from onyx.connectors.salesforce.utils import ACCOUNT_OBJECT_TYPE
+from onyx.connectors.salesforce.utils import ObjectTypeSyncMetrics
+
+_OBJECT_TYPES = [f"Type{i}" for i in range(6)]
+
+
+class _FakeDownloads:
+    """Writes a csv per object type and tracks how many object types are on disk"""
+
+    def __init__(self, target_dir: str) -> None:
+        self.target_dir = target_dir
+        self.lock = threading.Lock()
+        self.on_disk = 0
+        self.max_on_disk = 0
+
+    def bulk_retrieve(
+        self, sf_type: str, query: str, target_dir: str, sf_client: Any
+    ) -> tuple[str, list[str] | None]:
+        with self.lock:
+            self.on_disk += 1
+            self.max_on_disk = max(self.max_on_disk, self.on_disk)
+
+        time.sleep(0.01)
+        csv_path = os.path.join(target_dir, f"{sf_type}.csv")
+        Path(csv_path).write_text("Id\n")
+        return sf_type, [csv_path]
+
+    def loaded(self) -> None:
+        with self.lock:
+            self.on_disk -= 1
+
+
+def _process_csvs(
+    object_type: str, csv_paths: list[str], metrics: ObjectTypeSyncMetrics
+) -> list[str]:
+    metrics.num_records = len(csv_paths)
+    return csv_paths
+
+
+def _fetch(downloads: _FakeDownloads) -> Any:
+    return fetch_csvs_as_completed(
+        sf_client=MagicMock(),
+        all_types_to_filter={object_type: False for object_type in _OBJECT_TYPES},
+        queryable_fields_by_type={},
+        start=None,
+        end=None,
+        target_dir=downloads.target_dir,
+        process_csvs=_process_csvs,
+        max_concurrent_jobs=2,
+        max_pending_object_types=2,
+    )
+
+
+def test_fetch_csvs_as_completed_bounds_pending_object_types(tmp_path: Path) -> None:
+    downloads = _FakeDownloads(str(tmp_path))
+    with (
+        patch(
+            "onyx.connectors.salesforce.salesforce_calls._get_type_to_query",
+            return_value={object_type: "query" for object_type in _OBJECT_TYPES},
+        ),
+        patch(
+            "onyx.connectors.salesforce.salesforce_calls._bulk_retrieve_from_salesforce",
+            side_effect=downloads.bulk_retrieve,
+        ),
+    ):
+        seen_types = []
+        for object_type, csv_paths, metrics in _fetch(downloads):
+            assert csv_paths == [os.path.join(tmp_path, f"{object_type}.csv")]
+            assert metrics.num_csvs == 1
+            assert metrics.num_bytes == len("Id\n")
+            assert metrics.num_records == 1
+
+            # a slow consumer must hold back further downloads
+            time.sleep(0.05)
+            seen_types.append(object_type)
+            downloads.loaded()
+
+    assert sorted(seen_types) == _OBJECT_TYPES
+    assert downloads.max_on_disk <= 2
+
+
+def test_fetch_csvs_as_completed_stops_early(tmp_path: Path) -> None:
+    downloads = _FakeDownloads(str(tmp_path))
+    with (
+        patch(
+            "onyx.connectors.salesforce.salesforce_calls._get_type_to_query",
+            return_value={object_type: "query" for object_type in _OBJECT_TYPES},
+        ),
+        patch(
+            "onyx.connectors.salesforce.salesforce_calls._bulk_retrieve_from_salesforce",
+            side_effect=downloads.bulk_retrieve,
+        ),
+    ):
+        results = _fetch(downloads)
+        next(results)
+        # must not wait on the downloads that are blocked on a pending slot
+        results.close()
+
+    assert len(os.listdir(tmp_path)) < len(_OBJECT_TYPES)
+
+
+def test_backfill_relationship_types_for_parents_loaded_late(tmp_path: Path) -> None:
+    parent_id = "001000000000000AAA"
+    child_id = "003000000000000AAA"
+    contacts_csv = tmp_path / "Contact.csv"
+    contacts_csv.write_text(f"Id,AccountId\n{child_id},{parent_id}\n")
+    accounts_csv = tmp_path / "Account.csv"
+    accounts_csv.write_text(f"Id,Name\n{parent_id},Acme\n")
+
+    sf_db = OnyxSalesforceSQLite(str(tmp_path / "salesforce_db.sqlite"))
+    sf_db.connect()
+    sf_db.apply_schema()
+
+    # the child is loaded before its parent
+    sf_db.update_from_csv("Contact", str(contacts_csv))
+    sf_db.update_from_csv(ACCOUNT_OBJECT_TYPE, str(accounts_csv))
+    assert not list(
+        sf_db.get_changed_parent_ids_by_type([child_id], {ACCOUNT_OBJECT_TYPE})
+    )
+
+    sf_db.backfill_relationship_types()
+    assert [
+        (parent_type, changed_parent_id)
+        for parent_type, changed_parent_id, _ in sf_db.get_changed_parent_ids_by_type(
+            [child_id], {ACCOUNT_OBJECT_TYPE}
+        )
+    ] == [(ACCOUNT_OBJECT_TYPE, parent_id)]
+
+    sf_db.close()
@@ -813,6 +813,118 @@ def test_salesforce_sqlite() -> None:
         _clear_sf_db(directory)
 
 
+def _write_csv(directory: str, filename: str, records: list[dict]) -> str:
+    fields = sorted({field for record in records for field in record})
+    csv_path = os.path.join(directory, filename)
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(records)
+    return csv_path
+
+
+def _dump_sf_db(sf_db: OnyxSalesforceSQLite) -> dict[str, list[tuple]]:
+    assert sf_db._conn is not None
+    return {
+        table: sorted(sf_db._conn.execute(f"SELECT * FROM {table}").fetchall())
+        for table in (
+            "salesforce_objects",
+            "relationships",
+            "relationship_types",
+            "user_email_map",
+        )
+    }
+
+
+def test_staged_parallel_load_matches_update_from_csv() -> None:
+    accounts = [
+        {"Id": _VALID_SALESFORCE_IDS[0], "Name": "Acme Inc."},
+        {"Id": _VALID_SALESFORCE_IDS[1], "Name": "Globex Corp"},
+    ]
+    users = [
+        {"Id": _VALID_SALESFORCE_IDS[30], "Email": "user@example.com"},
+    ]
+    # the second row for the same contact moves it to another account
+    contacts = [
+        {
+            "Id": _VALID_SALESFORCE_IDS[40],
+            "AccountId": _VALID_SALESFORCE_IDS[0],
+            "OwnerId": _VALID_SALESFORCE_IDS[30],
+            "LastName": "First",
+        },
+        {
+            "Id": _VALID_SALESFORCE_IDS[41],
+            "AccountId": _VALID_SALESFORCE_IDS[1],
+            "OwnerId": _VALID_SALESFORCE_IDS[30],
+            "LastName": "Other",
+        },
+        {
+            "Id": _VALID_SALESFORCE_IDS[40],
+            "AccountId": _VALID_SALESFORCE_IDS[1],
+            "OwnerId": _VALID_SALESFORCE_IDS[30],
+            "LastName": "Second",
+        },
+    ]
+    updated_contacts = [
+        {
+            "Id": _VALID_SALESFORCE_IDS[41],
+            "AccountId": _VALID_SALESFORCE_IDS[0],
+            "OwnerId": _VALID_SALESFORCE_IDS[30],
+            "LastName": "Moved",
+        },
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        object_type_and_csv_paths = [
+            (ACCOUNT_OBJECT_TYPE, _write_csv(directory, "accounts.csv", accounts)),
+            (USER_OBJECT_TYPE, _write_csv(directory, "users.csv", users)),
+            ("Contact", _write_csv(directory, "contacts.csv", contacts)),
+        ]
+        updated_csv_path = _write_csv(directory, "updated.csv", updated_contacts)
+
+        row_db = OnyxSalesforceSQLite(os.path.join(directory, "row.sqlite"))
+        row_db.connect()
+        row_db.apply_schema()
+        for object_type, csv_path in object_type_and_csv_paths:
+            row_db.update_from_csv(object_type, csv_path)
+        row_db.update_from_csv("Contact", updated_csv_path)
+
+        staged_db = OnyxSalesforceSQLite(os.path.join(directory, "staged.sqlite"))
+        staged_db.connect()
+        staged_db.apply_schema(defer_secondary_indexes=True)
+        staged_ids: dict[str, list[str]] = {}
+        for _, csv_path, ids in staged_db.update_from_csvs_in_parallel(
+            object_type_and_csv_paths,
+            staging_dir=os.path.join(directory, "staging"),
+        ):
+            staged_ids[csv_path] = ids
+        for _, _, ids in staged_db.update_from_csvs_in_parallel(
+            [("Contact", updated_csv_path)],
+            staging_dir=os.path.join(directory, "staging"),
+        ):
+            assert ids == [_VALID_SALESFORCE_IDS[41]]
+        staged_db.create_secondary_indexes()
+
+        assert staged_ids[object_type_and_csv_paths[2][1]] == [
+            _VALID_SALESFORCE_IDS[40],
+            _VALID_SALESFORCE_IDS[41],
+            _VALID_SALESFORCE_IDS[40],
+        ]
+        assert _dump_sf_db(staged_db) == _dump_sf_db(row_db)
+        assert staged_db.get_child_ids(_VALID_SALESFORCE_IDS[0]) == {
+            _VALID_SALESFORCE_IDS[41]
+        }
+        assert staged_db.get_user_id_by_email("user@example.com") == (
+            _VALID_SALESFORCE_IDS[30]
+        )
+        record = staged_db.get_record(_VALID_SALESFORCE_IDS[40])
+        assert record is not None and record.data["LastName"] == "Second"
+        assert not os.listdir(os.path.join(directory, "staging"))
+
+        row_db.close()
+        staged_db.close()
+
+
 @pytest.mark.skip(reason="Enable when credentials are available")
 def test_salesforce_bulk_retrieve() -> None:
 
@@ -0,0 +1,113 @@
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import ConnectorFailure
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.connectors.slack.connector import ProcessedSlackMessage
+from onyx.connectors.slack.connector import SlackCheckpoint
+from onyx.connectors.slack.connector import SlackConnector
+from onyx.connectors.slack.models import ChannelType
+from onyx.connectors.slack.models import MessageType
+from tests.unit.onyx.connectors.utils import load_everything_from_checkpoint_connector
+
+_CHANNELS = [
+    {"id": "C1", "name": "general", "created": 0},
+    {"id": "C2", "name": "random", "created": 0},
+    {"id": "C3", "name": "dev", "created": 0},
+]
+
+# channel id -> pages of messages, from the newest to the oldest
+_PAGES = {
+    "C1": [[{"ts": "400"}, {"ts": "300"}], [{"ts": "200"}]],
+    "C2": [[{"ts": "350"}]],
+    "C3": [[{"ts": "250"}, {"ts": "150"}]],
+}
+
+
+def _get_messages(
+    channel: ChannelType, client: Any, oldest: str | None, latest: str
+) -> tuple[list[dict[str, str]], bool]:
+    pages = _PAGES[channel["id"]]
+    for i, page in enumerate(pages):
+        if float(page[0]["ts"]) < float(latest):
+            return page, i < len(pages) - 1
+    return [], False
+
+
+def _process_message(
+    message: MessageType, channel: ChannelType, **kwargs: Any
+) -> ProcessedSlackMessage:
+    return ProcessedSlackMessage(
+        doc=Document(
+            id=f"{channel['id']}__{message['ts']}",
+            sections=[TextSection(text="text")],
+            source=DocumentSource.SLACK,
+            semantic_identifier=message["ts"],
+            metadata={},
+        ),
+        thread_or_message_ts=message["ts"],
+        filter_reason=None,
+        failure=None,
+    )
+
+
+def test_load_channels_concurrently() -> None:
+    connector = SlackConnector(num_channel_workers=2, use_redis=False)
+    connector.client = MagicMock()
+    connector.text_cleaner = MagicMock()
+
+    channels_by_id = {channel["id"]: channel for channel in _CHANNELS}
+    failed_once: set[str] = set()
+
+    def get_messages(
+        channel: ChannelType, client: Any, oldest: str | None, latest: str
+    ) -> tuple[list[dict[str, str]], bool]:
+        # the first request for C2 fails, it should be retried on the next call
+        if channel["id"] == "C2" and "C2" not in failed_once:
+            failed_once.add("C2")
+            raise RuntimeError("rate limited")
+        return _get_messages(channel, client, oldest, latest)
+
+    with (
+        patch("onyx.connectors.slack.connector.get_channels", return_value=_CHANNELS),
+        patch(
+            "onyx.connectors.slack.connector._get_channel_by_id",
+            side_effect=lambda client, channel_id: channels_by_id[channel_id],
+        ),
+        patch(
+            "onyx.connectors.slack.connector._get_messages", side_effect=get_messages
+        ),
+        patch(
+            "onyx.connectors.slack.connector._process_message",
+            side_effect=_process_message,
+        ),
+    ):
+        outputs = load_everything_from_checkpoint_connector(connector, 0, 500)
+
+    first_checkpoint = outputs[0].next_checkpoint
+    assert first_checkpoint.channel_ids == ["C1", "C2", "C3"]
+    assert [c["id"] for c in first_checkpoint.active_channels or []] == ["C1", "C2"]
+
+    # C1 is half done and C2 failed, so both stay active
+    second_checkpoint: SlackCheckpoint = outputs[1].next_checkpoint
+    assert [c["id"] for c in second_checkpoint.active_channels or []] == ["C1", "C2"]
+    assert second_checkpoint.channel_completion_map == {"C1": "300"}
+    assert any(isinstance(item, ConnectorFailure) for item in outputs[1].items)
+
+    docs = [item for output in outputs for item in output.items]
+    assert sorted(doc.id for doc in docs if isinstance(doc, Document)) == [
+        "C1__200",
+        "C1__300",
+        "C1__400",
+        "C2__350",
+        "C3__150",
+        "C3__250",
+    ]
+
+    last_checkpoint = outputs[-1].next_checkpoint
+    assert not last_checkpoint.has_more
+    assert last_checkpoint.active_channels == []
+    assert set(last_checkpoint.channel_completion_map) == {"C1", "C2", "C3"}
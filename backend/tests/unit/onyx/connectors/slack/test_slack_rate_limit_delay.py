@@ -0,0 +1,201 @@
+import threading
+import time
+from functools import partial
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from slack_sdk import WebClient
+from slack_sdk.http_retry.request import HttpRequest
+from slack_sdk.http_retry.response import HttpResponse
+from slack_sdk.http_retry.state import RetryState
+
+from onyx.connectors.slack.onyx_retry_handler import OnyxRedisSlackRetryHandler
+from onyx.connectors.slack.onyx_slack_web_client import OnyxSlackWebClient
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+
+
+class _FakeLock:
+    def __init__(self, redis: "_FakeRedis", name: str) -> None:
+        self._redis = redis
+        self._name = name
+        self._owned = False
+
+    def acquire(
+        self, blocking: bool = True, blocking_timeout: float | None = None
+    ) -> bool:
+        deadline = time.monotonic() + (blocking_timeout or 0)
+        while True:
+            with self._redis.mutex:
+                if self._name not in self._redis.held_locks:
+                    self._redis.held_locks.add(self._name)
+                    self._owned = True
+                    return True
+            if not blocking or time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+
+    def owned(self) -> bool:
+        return self._owned
+
+    def release(self) -> None:
+        with self._redis.mutex:
+            self._redis.held_locks.discard(self._name)
+        self._owned = False
+
+    def __enter__(self) -> "_FakeLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.release()
+
+
+class _FakeRedis:
+    """The parts of Redis the Slack client and retry handler use, shared by the
+    clients like Redis is shared by the workers."""
+
+    def __init__(self) -> None:
+        self.mutex = threading.Lock()
+        self.held_locks: set[str] = set()
+        self.expiries: dict[str, float] = {}
+
+    def lock(self, name: str, **kwargs: Any) -> _FakeLock:
+        return _FakeLock(self, name)
+
+    def exists(self, name: str) -> int:
+        return int(name in self.held_locks)
+
+    def set(self, name: str, value: str, px: int) -> None:
+        self.expiries[name] = time.monotonic() + px / 1000.0
+
+    def pttl(self, name: str) -> int:
+        if name not in self.expiries:
+            return -2
+        return max(int((self.expiries[name] - time.monotonic()) * 1000.0), 0) or -2
+
+
+def _make_client(redis: _FakeRedis, max_concurrent_requests: int = 1) -> WebClient:
+    return OnyxSlackWebClient(
+        delay_lock="delay_lock",
+        delay_key="delay",
+        r=redis,  # type: ignore[arg-type]
+        token="xoxb-test",
+        max_concurrent_requests=max_concurrent_requests,
+    )
+
+
+def _make_tracked_request() -> tuple[Any, list[int]]:
+    """A slow request that records how many requests were running at once."""
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+
+    def request(self: WebClient, *, url: str, args: Any) -> dict[str, Any]:
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.2)
+        with lock:
+            running[0] -= 1
+        return {}
+
+    return request, max_running
+
+
+def test_requests_are_serialized_across_clients_by_default() -> None:
+    redis = _FakeRedis()
+    clients = [_make_client(redis), _make_client(redis)]
+    request, max_running = _make_tracked_request()
+
+    with patch.object(WebClient, "_perform_urllib_http_request", request):
+        run_functions_tuples_in_parallel(
+            [
+                (
+                    partial(
+                        client._perform_urllib_http_request,  # type: ignore[attr-defined]
+                        url="url",
+                        args={},
+                    ),
+                    (),
+                )
+                for client in clients * 2
+            ]
+        )
+
+    assert max_running[0] == 1
+
+
+def test_concurrent_requests_are_bounded_per_credential() -> None:
+    redis = _FakeRedis()
+    clients = [_make_client(redis, 2), _make_client(redis, 2)]
+    request, max_running = _make_tracked_request()
+
+    with patch.object(WebClient, "_perform_urllib_http_request", request):
+        run_functions_tuples_in_parallel(
+            [
+                (
+                    partial(
+                        client._perform_urllib_http_request,  # type: ignore[attr-defined]
+                        url="url",
+                        args={},
+                    ),
+                    (),
+                )
+                for client in clients * 3
+            ]
+        )
+
+    assert max_running[0] == 2
+    assert not redis.held_locks
+
+
+def test_rate_limit_delay_is_shared_across_clients() -> None:
+    redis = _FakeRedis()
+    handler = OnyxRedisSlackRetryHandler(
+        max_retry_count=3,
+        delay_key="delay",
+        r=redis,  # type: ignore[arg-type]
+        delay_ttl_lock="delay_ttl_lock",
+    )
+    client = _make_client(redis, 2)
+
+    # another client was rate limited
+    with patch("onyx.connectors.slack.onyx_retry_handler.random.random") as jitter:
+        jitter.return_value = 0.0
+        handler.prepare_for_next_attempt(
+            state=RetryState(),
+            request=HttpRequest(method="POST", url="url", headers={}),
+            response=HttpResponse(status_code=429, headers={"Retry-After": ["1"]}),
+        )
+
+    with patch.object(
+        WebClient, "_perform_urllib_http_request_internal", return_value={}
+    ):
+        start = time.monotonic()
+        client._perform_urllib_http_request_internal(  # type: ignore[attr-defined]
+            "url", MagicMock()
+        )
+        elapsed = time.monotonic() - start
+
+    assert elapsed >= 0.9
+
+
+def test_rate_limit_delays_are_added_up() -> None:
+    redis = MagicMock()
+    redis.pttl.return_value = 30_000
+    handler = OnyxRedisSlackRetryHandler(
+        max_retry_count=3, delay_key="delay", r=redis, delay_ttl_lock="lock"
+    )
+
+    with patch("onyx.connectors.slack.onyx_retry_handler.random.random") as jitter:
+        jitter.return_value = 0.0
+        handler.prepare_for_next_attempt(
+            state=RetryState(),
+            request=HttpRequest(method="POST", url="url", headers={}),
+            response=HttpResponse(status_code=429, headers={"Retry-After": ["10"]}),
+        )
+
+    # the delay is added to the current one, under the lock shared by the clients
+    redis.lock.assert_called_once()
+    redis.set.assert_called_once_with("delay", "1", px=40_000)
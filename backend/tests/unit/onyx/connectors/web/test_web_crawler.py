@@ -0,0 +1,203 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from onyx.connectors.web.connector import WEB_CONNECTOR_VALID_SETTINGS
+from onyx.connectors.web.connector import WebConnector
+from onyx.connectors.web.crawler import CrawlFrontier
+from onyx.connectors.web.fingerprints import PageFingerprint
+from onyx.connectors.web.fingerprints import PageFingerprintStore
+
+_BASE_URL = "https://docs.example.com/docs"
+_BODY_TEXT = "Some documentation about the product. " * 20
+
+_PAGES = {
+    "/docs": ["/docs/a", "/docs/b"],
+    "/docs/a": ["/docs/b", "/docs/c", "/blog"],
+    "/docs/b": ["/docs/a", "/docs"],
+    "/docs/c": ["/docs/a#section"],
+}
+
+
+class _FakeSite:
+    def __init__(self) -> None:
+        self.versions = {path: 0 for path in _PAGES}
+        self.num_full_responses = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        links = _PAGES.get(path)
+        if links is None:
+            return httpx.Response(404)
+
+        etag = f'"{path}-{self.versions[path]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+
+        self.num_full_responses += 1
+        anchors = "".join(f'<a href="{link}">link</a>' for link in links)
+        html = (
+            f"<html><head><title>{path}</title></head>"
+            f"<body><p>{path} v{self.versions[path]} {_BODY_TEXT}</p>{anchors}</body>"
+            "</html>"
+        )
+        return httpx.Response(200, html=html, headers={"ETag": etag})
+
+
+class _FakeFingerprintStore:
+    def __init__(self) -> None:
+        self.fingerprints: dict[str, PageFingerprint] = {}
+
+    def load(self) -> dict[str, PageFingerprint]:
+        return dict(self.fingerprints)
+
+    def save(self, fingerprints: dict[str, PageFingerprint]) -> None:
+        self.fingerprints.update(fingerprints)
+
+
+@contextmanager
+def _serve(
+    site: _FakeSite, fingerprint_store: _FakeFingerprintStore | None = None
+) -> Iterator[None]:
+    def start_http_client(auth_headers: dict[str, str]) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(site.handle))
+
+    def start_playwright(*args: Any) -> None:
+        raise AssertionError("Static pages shouldn't be rendered in the browser")
+
+    with (
+        patch("onyx.connectors.web.connector.check_internet_connection"),
+        patch("onyx.connectors.web.connector.start_http_client", new=start_http_client),
+        patch("onyx.connectors.web.connector.start_playwright", new=start_playwright),
+        patch.object(
+            WebConnector, "_get_fingerprint_store", return_value=fingerprint_store
+        ),
+    ):
+        yield
+
+
+def _make_connector(
+    batch_size: int = 10, skip_unchanged_pages: bool = True
+) -> WebConnector:
+    connector = WebConnector(
+        base_url=_BASE_URL,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+        batch_size=batch_size,
+    )
+    connector.set_page_fingerprint_scope(
+        connector_id=1, credential_id=1, skip_unchanged_pages=skip_unchanged_pages
+    )
+    return connector
+
+
+def test_crawl_frontier_deduplicates_urls() -> None:
+    frontier = CrawlFrontier(["https://a.com", "https://a.com"])
+    assert frontier.add("https://a.com/b")
+    assert not frontier.add("https://a.com/b")
+    assert not frontier.mark_seen("https://a.com/b")
+
+    assert [frontier.pop(), frontier.pop(), frontier.pop()] == [
+        "https://a.com",
+        "https://a.com/b",
+        None,
+    ]
+
+
+@pytest.mark.parametrize("batch_size", [1, 10])
+def test_recursive_crawl_over_http(batch_size: int) -> None:
+    with _serve(_FakeSite()):
+        batches = list(_make_connector(batch_size).load_from_state())
+
+    # pages outside of the base url aren't crawled, and every page is crawled once
+    assert sorted(doc.id for batch in batches for doc in batch) == [
+        f"{_BASE_URL}",
+        f"{_BASE_URL}/a",
+        f"{_BASE_URL}/b",
+        f"{_BASE_URL}/c",
+    ]
+    if batch_size == 1:
+        assert len(batches) > 1
+
+
+def test_recrawl_skips_unchanged_pages() -> None:
+    site = _FakeSite()
+    fingerprint_store = _FakeFingerprintStore()
+    with _serve(site, fingerprint_store):
+        list(_make_connector().load_from_state())
+        assert len(fingerprint_store.fingerprints) == 4
+
+        site.versions["/docs/c"] += 1
+        site.num_full_responses = 0
+        docs = [doc for batch in _make_connector().load_from_state() for doc in batch]
+        # the root page wasn't read again, the pages under it were still found
+        assert [doc.id for doc in docs] == [f"{_BASE_URL}/c"]
+        assert site.num_full_responses == 1
+
+        # pruning still sees the unchanged pages
+        slim_docs = [
+            doc
+            for batch in _make_connector().retrieve_all_slim_documents()
+            for doc in batch
+        ]
+        assert len(slim_docs) == 4
+
+
+def test_reindex_from_beginning_crawls_unchanged_pages() -> None:
+    site = _FakeSite()
+    fingerprint_store = _FakeFingerprintStore()
+    with _serve(site, fingerprint_store):
+        list(_make_connector().load_from_state())
+
+        docs = [
+            doc
+            for batch in _make_connector(skip_unchanged_pages=False).load_from_state()
+            for doc in batch
+        ]
+        assert len(docs) == 4
+        assert len(fingerprint_store.fingerprints) == 4
+
+
+def test_fingerprints_are_kept_per_cc_pair() -> None:
+    keys = {
+        PageFingerprintStore(connector_id, credential_id, "recursive", _BASE_URL).key
+        for connector_id, credential_id in [(1, 1), (1, 2), (2, 1)]
+    }
+    assert len(keys) == 3
+
+
+def test_fingerprints_of_pages_not_indexed_since_are_not_used() -> None:
+    crawled_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    fingerprint = PageFingerprint(content_hash="hash", crawled_at=crawled_at)
+    redis_client = MagicMock()
+    redis_client.hgetall.return_value = {
+        f"{_BASE_URL}/{path}".encode(): fingerprint.model_dump_json().encode()
+        for path in ["indexed", "failed", "deleted"]
+    }
+
+    with (
+        patch(
+            "onyx.connectors.web.fingerprints.get_redis_client",
+            return_value=redis_client,
+        ),
+        patch("onyx.connectors.web.fingerprints.get_session_with_current_tenant"),
+        patch(
+            "onyx.connectors.web.fingerprints."
+            "get_document_last_modified_for_connector_credential_pair",
+            return_value={
+                f"{_BASE_URL}/indexed": crawled_at + timedelta(minutes=1),
+                # the batch with the new content failed to index
+                f"{_BASE_URL}/failed": crawled_at - timedelta(days=1),
+            },
+        ),
+    ):
+        fingerprints = PageFingerprintStore(1, 1, "recursive", _BASE_URL).load()
+
+    assert list(fingerprints) == [f"{_BASE_URL}/indexed"]
@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import Any
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from onyx.file_processing.image_summarization import (
+    summarize_image_with_error_handling,
+)
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[key] = value.encode()
+
+
+def _mock_llm(model_name: str = "vision-model") -> Mock:
+    llm = Mock()
+    llm.config.model_provider = "openai"
+    llm.config.model_name = model_name
+    return llm
+
+
+def test_identical_images_are_summarized_once() -> None:
+    calls = 0
+
+    def summarize(*args: Any) -> str:
+        nonlocal calls
+        calls += 1
+        # keeps the other threads waiting on the same image
+        time.sleep(0.05)
+        return "a logo"
+
+    with (
+        patch(
+            "onyx.llm.output_cache.get_redis_client",
+            return_value=_FakeRedis(),
+        ),
+        patch(
+            "onyx.file_processing.image_summarization.summarize_image_pipeline",
+            side_effect=summarize,
+        ),
+    ):
+        summaries: list[str | None] = []
+        threads = [
+            threading.Thread(
+                target=lambda i=i: summaries.append(
+                    summarize_image_with_error_handling(
+                        _mock_llm(), b"logo bytes", f"logo{i}.png"
+                    )
+                )
+            )
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert summaries == ["a logo"] * 4
+        assert calls == 1
+
+        # a different image or model is summarized again
+        summarize_image_with_error_handling(_mock_llm(), b"other bytes", "logo.png")
+        summarize_image_with_error_handling(
+            _mock_llm("other-model"), b"logo bytes", "logo.png"
+        )
+        assert calls == 3
+
+
+def test_failed_summaries_are_not_cached() -> None:
+    redis = _FakeRedis()
+    with (
+        patch(
+            "onyx.llm.output_cache.get_redis_client",
+            return_value=redis,
+        ),
+        patch(
+            "onyx.file_processing.image_summarization.summarize_image_pipeline",
+            return_value="",
+        ),
+    ):
+        assert not summarize_image_with_error_handling(
+            _mock_llm(), b"logo bytes", "logo.png"
+        )
+    assert not redis.values
@@ -12,6 +12,7 @@ from onyx.indexing.chunker import Chunker
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_pipeline import process_image_sections
 from onyx.llm.utils import MAX_CONTEXT_TOKENS
+from onyx.natural_language_processing.utils import BaseTokenizer
 from tests.unit.onyx.indexing.conftest import MockHeartbeat
 
 
@@ -105,3 +106,55 @@ def test_chunker_heartbeat(
 
     assert mock_heartbeat.call_count == 1
     assert len(chunks) > 0
+
+
+class _ExactCountTokenizer(BaseTokenizer):
+    """Wraps a tokenizer but always makes the chunker re-encode whole chunks"""
+
+    def __init__(self, tokenizer: BaseTokenizer) -> None:
+        self.tokenizer = tokenizer
+
+    def encode(self, string: str) -> list[int]:
+        return self.tokenizer.encode(string)
+
+    def tokenize(self, string: str) -> list[str]:
+        return self.tokenizer.tokenize(string)
+
+    def decode(self, tokens: list[int]) -> str:
+        return self.tokenizer.decode(tokens)
+
+
+def test_chunk_section_heavy_document_matches_exact_token_counts(
+    embedder: DefaultIndexingEmbedder,
+) -> None:
+    tokenizer = embedder.embedding_model.tokenizer
+    assert tokenizer.supports_summed_token_counts("This is a message.")
+
+    document = Document(
+        id="test_doc",
+        source=DocumentSource.SLACK,
+        semantic_identifier="Test Thread",
+        metadata={},
+        doc_updated_at=None,
+        sections=[
+            TextSection(
+                text=f"Message {i}: can't deploy   the service-{i}, see CI run #{i}."
+                + (" It failed again." * (i % 7)),
+                link=f"link{i}",
+            )
+            for i in range(300)
+        ],
+    )
+    indexing_documents = process_image_sections([document])
+
+    chunks = Chunker(tokenizer=tokenizer, enable_multipass=True).chunk(
+        indexing_documents
+    )
+    exact_chunks = Chunker(
+        tokenizer=_ExactCountTokenizer(tokenizer), enable_multipass=True
+    ).chunk(indexing_documents)
+
+    assert len(chunks) > 1
+    assert [chunk.model_dump() for chunk in chunks] == [
+        chunk.model_dump() for chunk in exact_chunks
+    ]
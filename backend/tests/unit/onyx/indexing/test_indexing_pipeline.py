@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+from io import BytesIO
 from typing import Any
 from typing import cast
 from typing import List
@@ -18,6 +20,7 @@ from onyx.indexing.indexing_pipeline import add_contextual_summaries
 from onyx.indexing.indexing_pipeline import filter_documents
 from onyx.indexing.indexing_pipeline import process_image_sections
 from onyx.indexing.models import ChunkEmbedding
+from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import IndexChunk
 from onyx.llm.utils import get_max_input_tokens
 from onyx.natural_language_processing.search_nlp_models import (
@@ -26,6 +29,47 @@ from onyx.natural_language_processing.search_nlp_models import (
 from shared_configs.configs import (
     INDEXING_INFORMATION_CONTENT_CLASSIFICATION_CUTOFF_LENGTH,
 )
+from shared_configs.contextvars import get_current_tenant_id
+
+
+class _FakeRedis:
+    """Prefixes keys with the tenant id like TenantRedis does, except for commands
+    sent through a pipeline."""
+
+    def __init__(self, values: dict[str, bytes] | None = None) -> None:
+        self.values: dict[str, bytes] = {} if values is None else values
+
+    def _prefixed(self, key: str) -> str:
+        prefix = f"{get_current_tenant_id()}:"
+        return key if key.startswith(prefix) else prefix + key
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.values.get(self._prefixed(key)) for key in keys]
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[self._prefixed(key)] = value.encode()
+
+    def pipeline(self, transaction: bool = True) -> "_FakeRedisPipeline":
+        return _FakeRedisPipeline(self.values)
+
+
+class _FakeRedisPipeline:
+    def __init__(self, values: dict[str, bytes]) -> None:
+        self.values = values
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[key] = value.encode()
+
+    def execute(self) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def content_classification_cache() -> Iterator[_FakeRedis]:
+    # keeps content classification scores from leaking between tests
+    fake_redis = _FakeRedis()
+    with patch("onyx.llm.output_cache.get_redis_client", return_value=fake_redis):
+        yield fake_redis
 
 
 def create_test_document(
@@ -261,6 +305,37 @@ def test_get_aggregated_boost_factor_individual_failure() -> None:
     assert "Failed to predict content classification for chunk" in str(exc_info.value)
 
 
+def test_get_aggregated_boost_factor_reuses_cached_scores() -> None:
+    mock_model = Mock()
+    mock_model.predict.side_effect = lambda contents: [
+        ContentClassificationPrediction(predicted_label=1, content_boost_factor=0.8)
+        for _ in contents
+    ]
+
+    first_scores = _get_aggregated_chunk_boost_factor(
+        chunks=[
+            create_test_chunk("Short content", 0),
+            create_test_chunk("Short content", 1),
+        ],
+        information_content_classification_model=mock_model,
+    )
+    assert first_scores == [0.8, 0.8]
+    # the same content is only classified once
+    assert mock_model.predict.call_args[0][0] == ["Short content"]
+
+    second_scores = _get_aggregated_chunk_boost_factor(
+        chunks=[
+            create_test_chunk("Short content", 0),
+            create_test_chunk("New short content", 1),
+        ],
+        information_content_classification_model=mock_model,
+    )
+    assert second_scores == [0.8, 0.8]
+    # only the new content is sent to the model server
+    assert mock_model.predict.call_count == 2
+    assert mock_model.predict.call_args[0][0] == ["New short content"]
+
+
 @patch("onyx.llm.utils.GEN_AI_MAX_TOKENS", 4096)
 @pytest.mark.parametrize("enable_contextual_rag", [True, False])
 def test_contextual_rag(
@@ -338,3 +413,127 @@ def test_contextual_rag(
             count += 1
         assert chunk.doc_summary == doc_summary
         assert chunk.chunk_context == chunk_context
+
+
+def test_process_image_sections_summarizes_each_image_once() -> None:
+    documents = [
+        Document(
+            id=f"doc{i}",
+            semantic_identifier=f"doc{i}",
+            sections=[
+                TextSection(text="Some text", link="link"),
+                ImageSection(image_file_id="logo", link="link"),
+                ImageSection(image_file_id=f"diagram{i}", link="link"),
+            ],
+            source=DocumentSource.CONFLUENCE,
+            metadata={},
+        )
+        for i in range(3)
+    ]
+
+    file_store = Mock()
+    file_store.read_file_record.side_effect = lambda file_id: (
+        None if file_id == "diagram2" else Mock(display_name=file_id)
+    )
+    file_store.read_file.side_effect = lambda file_id: BytesIO(file_id.encode())
+
+    with (
+        patch(
+            "onyx.indexing.indexing_pipeline.get_image_extraction_and_analysis_enabled",
+            return_value=True,
+        ),
+        patch(
+            "onyx.indexing.indexing_pipeline.get_default_llm_with_vision",
+            return_value=Mock(),
+        ),
+        patch(
+            "onyx.indexing.indexing_pipeline.get_default_file_store",
+            return_value=file_store,
+        ),
+        patch(
+            "onyx.indexing.indexing_pipeline.summarize_image_with_error_handling",
+            side_effect=lambda llm, image_data, context_name: f"summary of {context_name}",
+        ) as summarize,
+    ):
+        indexing_documents = process_image_sections(documents)
+
+    assert sorted(call.kwargs["context_name"] for call in summarize.call_args_list) == [
+        "diagram0",
+        "diagram1",
+        "logo",
+    ]
+    assert [
+        [section.text for section in document.processed_sections]
+        for document in indexing_documents
+    ] == [
+        ["Some text", "summary of logo", "summary of diagram0"],
+        ["Some text", "summary of logo", "summary of diagram1"],
+        ["Some text", "summary of logo", "[Image could not be processed]"],
+    ]
+
+
+@patch("onyx.llm.utils.GEN_AI_MAX_TOKENS", 4096)
+def test_contextual_rag_reuses_cached_summaries(
+    embedder: DefaultIndexingEmbedder,
+) -> None:
+    def make_document(last_section: str) -> Document:
+        return Document(
+            id="test_doc",
+            source=DocumentSource.WEB,
+            semantic_identifier="Test Document",
+            metadata={},
+            doc_updated_at=None,
+            sections=[
+                TextSection(
+                    text="This is a long section that should be split. " * 100,
+                    link="link1",
+                ),
+                TextSection(text=last_section, link="link2"),
+            ],
+        )
+
+    prompts: list[str] = []
+
+    def mock_llm_invoke(prompt: str, **kwargs: Any) -> Mock:
+        prompts.append(prompt)
+        m = Mock()
+        m.content = f"Test{len(prompts)}"
+        return m
+
+    mock_llm = Mock()
+    mock_llm.config.model_provider = "openai"
+    mock_llm.config.model_name = "gpt-4o"
+    mock_llm.config.max_input_tokens = get_max_input_tokens(
+        model_provider="openai", model_name="gtp-4o"
+    )
+    mock_llm.invoke = mock_llm_invoke
+
+    chunker = Chunker(
+        tokenizer=embedder.embedding_model.tokenizer,
+        enable_multipass=False,
+        enable_contextual_rag=True,
+    )
+
+    def index(document: Document) -> list[DocAwareChunk]:
+        return add_contextual_summaries(
+            chunks=chunker.chunk(process_image_sections([document])),
+            llm=mock_llm,
+            tokenizer=embedder.embedding_model.tokenizer,
+            chunk_token_limit=chunker.chunk_token_limit * 2,
+        )
+
+    with patch("onyx.llm.output_cache.get_redis_client", return_value=_FakeRedis()):
+        first_chunks = index(make_document("A short section."))
+        num_first_prompts = len(prompts)
+        assert num_first_prompts == len(first_chunks) + 1
+
+        # nothing changed, so nothing is sent to the LLM again
+        second_chunks = index(make_document("A short section."))
+        assert len(prompts) == num_first_prompts
+        assert [(c.doc_summary, c.chunk_context) for c in second_chunks] == [
+            (c.doc_summary, c.chunk_context) for c in first_chunks
+        ]
+
+        # a changed document gets a new summary and new chunk contexts
+        index(make_document("A different short section."))
+        assert len(prompts) == num_first_prompts + len(first_chunks) + 1
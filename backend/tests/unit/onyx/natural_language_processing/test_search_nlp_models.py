@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import EmbedRequest
+from shared_configs.model_server_models import EmbedResponse
+from shared_configs.utils import batch_by_token_budget
+
+
+def test_batch_by_token_budget_groups_similar_lengths() -> None:
+    token_counts = [500, 5, 6, 480, 7, 5]
+
+    batches = batch_by_token_budget(
+        token_counts, max_tokens_per_batch=1_000, max_batch_size=4
+    )
+
+    # the short texts share a batch instead of being padded to the long ones
+    assert batches == [[1, 5, 2, 4], [3, 0]]
+
+
+def test_batch_by_token_budget_allows_oversized_items() -> None:
+    assert batch_by_token_budget(
+        [2_000, 10], max_tokens_per_batch=1_000, max_batch_size=8
+    ) == [[1], [0]]
+
+
+def test_batch_encode_texts_restores_text_order() -> None:
+    model = EmbeddingModel(
+        server_host="localhost",
+        server_port=9000,
+        model_name=None,
+        normalize=True,
+        query_prefix=None,
+        passage_prefix=None,
+        api_key=None,
+        api_url=None,
+        provider_type=None,
+    )
+    texts = ["word " * 600, "short", "word " * 500, "also short"]
+
+    requests: list[list[str]] = []
+
+    def fake_request(
+        embed_request: EmbedRequest, **kwargs: str | None
+    ) -> EmbedResponse:
+        requests.append(embed_request.texts)
+        return EmbedResponse(
+            embeddings=[[float(texts.index(text))] for text in embed_request.texts]
+        )
+
+    with patch.object(model, "_make_model_server_request", side_effect=fake_request):
+        embeddings = model.encode(
+            texts,
+            EmbedTextType.PASSAGE,
+            local_embedding_batch_size=2,
+            max_seq_length=512,
+        )
+
+    assert embeddings == [[0.0], [1.0], [2.0], [3.0]]
+    # the short texts aren't padded to the length of the long ones
+    assert requests == [[texts[1], texts[3]], [texts[0], texts[2]]]
+
+
+def test_batch_encode_texts_keeps_batch_size_for_api_providers() -> None:
+    model = EmbeddingModel(
+        server_host="localhost",
+        server_port=9000,
+        model_name="text-embedding-3-small",
+        normalize=True,
+        query_prefix=None,
+        passage_prefix=None,
+        api_key="key",
+        api_url=None,
+        provider_type=EmbeddingProvider.OPENAI,
+    )
+    texts = [f"short text {i}" for i in range(5)]
+
+    requests: list[list[str]] = []
+
+    def fake_request(
+        embed_request: EmbedRequest, **kwargs: str | None
+    ) -> EmbedResponse:
+        requests.append(embed_request.texts)
+        return EmbedResponse(embeddings=[[0.0] for _ in embed_request.texts])
+
+    with patch.object(model, "_make_model_server_request", side_effect=fake_request):
+        model.encode(
+            texts,
+            EmbedTextType.PASSAGE,
+            api_embedding_batch_size=2,
+            max_seq_length=512,
+        )
+
+    # short texts aren't packed into bigger requests for API providers
+    assert [len(request) for request in requests] == [2, 2, 1]
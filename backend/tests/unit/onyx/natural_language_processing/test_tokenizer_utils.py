@@ -0,0 +1,98 @@
+from pathlib import Path
+from unittest.mock import patch
+
+from tokenizers import models  # type: ignore
+from tokenizers import pre_tokenizers
+from tokenizers import Tokenizer
+
+from onyx.natural_language_processing import utils
+from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.natural_language_processing.utils import get_tokenizer
+from onyx.natural_language_processing.utils import tokenizer_trim_content
+from onyx.natural_language_processing.utils import tokenizer_trim_contents
+from onyx.natural_language_processing.utils import (
+    tokenizer_trim_contents_with_counts,
+)
+
+_STRINGS = [
+    "This is a short sentence.",
+    "",
+    "Ünïcödé text with accents, and punctuation!",
+    "weird characters like \udeb4 fall back to ascii",
+    "A much longer piece of text that repeats itself. " * 50,
+]
+
+
+def _tokenizer() -> BaseTokenizer:
+    return get_tokenizer(model_name="intfloat/e5-base-v2", provider_type=None)
+
+
+def test_encode_batch_matches_encode() -> None:
+    tokenizer = _tokenizer()
+
+    assert tokenizer.encode_batch(_STRINGS) == [
+        tokenizer.encode(string) for string in _STRINGS
+    ]
+    assert tokenizer.count_tokens_batch(_STRINGS) == [
+        len(tokenizer.encode(string)) for string in _STRINGS
+    ]
+    assert tokenizer.encode_batch([]) == []
+
+
+def test_tokenizer_trim_contents_matches_tokenizer_trim_content() -> None:
+    tokenizer = _tokenizer()
+
+    assert tokenizer_trim_contents(_STRINGS, 20, tokenizer) == [
+        tokenizer_trim_content(string, 20, tokenizer) for string in _STRINGS
+    ]
+
+
+def test_tokenizer_trim_contents_with_counts_counts_trimmed_tokens() -> None:
+    tokenizer = _tokenizer()
+
+    trimmed_contents, token_counts = tokenizer_trim_contents_with_counts(
+        _STRINGS, 20, tokenizer
+    )
+
+    assert trimmed_contents == tokenizer_trim_contents(_STRINGS, 20, tokenizer)
+    assert token_counts == [
+        min(len(tokenizer.encode(string)), 20) for string in _STRINGS
+    ]
+
+
+def _word_level_tokenizer() -> Tokenizer:
+    tokenizer = Tokenizer(
+        models.WordLevel({"[UNK]": 0, "hello": 1, "world": 2}, unk_token="[UNK]")
+    )
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    return tokenizer
+
+
+def test_hf_tokenizer_is_saved_to_and_loaded_from_cache_dir(tmp_path: Path) -> None:
+    with (
+        patch.object(utils, "TOKENIZER_CACHE_DIR", str(tmp_path)),
+        patch.object(
+            Tokenizer, "from_pretrained", return_value=_word_level_tokenizer()
+        ) as from_pretrained,
+    ):
+        assert utils.HuggingFaceTokenizer("org/model").encode("hello world") == [1, 2]
+        assert (tmp_path / "org__model" / "tokenizer.json").is_file()
+
+        # later loads don't go to the hub
+        assert utils.HuggingFaceTokenizer("org/model").encode("hello world") == [1, 2]
+        assert from_pretrained.call_count == 1
+
+
+def test_default_tokenizer_is_loaded_on_first_use() -> None:
+    with (
+        patch.object(utils, "_DEFAULT_TOKENIZER", None),
+        patch.object(
+            Tokenizer, "from_pretrained", return_value=_word_level_tokenizer()
+        ) as from_pretrained,
+    ):
+        assert from_pretrained.call_count == 0
+
+        utils.warm_up_tokenizer()
+        tokenizer = utils.get_tokenizer(model_name=None, provider_type="unknown")
+        assert tokenizer.encode("hello world") == [1, 2]
+        assert from_pretrained.call_count == 1
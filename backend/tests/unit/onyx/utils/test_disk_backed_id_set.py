@@ -0,0 +1,26 @@
+import os
+from pathlib import Path
+
+from onyx.utils.disk_backed_id_set import DiskBackedIdSet
+
+
+def test_missing_ids_keep_their_order(tmp_path: Path) -> None:
+    with DiskBackedIdSet(directory=str(tmp_path)) as id_set:
+        id_set.add_many(f"doc-{i}" for i in range(0, 2_000, 2))
+        # duplicates are ignored
+        id_set.add_many(["doc-0", "doc-2"])
+        assert len(id_set) == 1_000
+
+        ids_to_check = [f"doc-{i}" for i in reversed(range(1_500))]
+        assert id_set.missing(ids_to_check) == [
+            f"doc-{i}" for i in reversed(range(1_500)) if i % 2
+        ]
+        assert id_set.missing([]) == []
+
+
+def test_file_is_deleted_on_close(tmp_path: Path) -> None:
+    with DiskBackedIdSet(directory=str(tmp_path)) as id_set:
+        id_set.add_many(["doc-1"])
+        assert os.listdir(tmp_path)
+
+    assert not os.listdir(tmp_path)